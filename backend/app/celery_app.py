@@ -16,6 +16,9 @@ app = Celery(
     include=[
         'app.tasks.ai_generation',
         'app.tasks.margin_sync',  # 两融数据同步任务
+        'app.tasks.static_export',  # 公开页面静态导出
+        'app.tasks.related_articles',  # 相关文章计算
+        'app.tasks.content_counters',  # 内容计数校正
     ]
 )
 
@@ -68,9 +71,31 @@ app.conf.update(
             'schedule': __import__('celery.schedules', fromlist=['crontab']).crontab(hour=18, minute=30),
             'options': {'queue': 'celery'},
         },
+        # 每天 04:00 校正内容计数（栏目 / 分类文章数、全站统计）
+        'reconcile-content-counters-daily': {
+            'task': 'tasks.reconcile_content_counters',
+            'schedule': __import__('celery.schedules', fromlist=['crontab']).crontab(hour=4, minute=0),
+            'options': {'queue': 'celery'},
+        },
     },
 )
 
+# 静态导出启用时，每小时做一次全量增量扫描（兜底投递失败与栏目改名等未触发导出的变更）
+if os.getenv('STATIC_EXPORT_ENABLED', 'False') == 'True':
+    app.conf.beat_schedule['export-static-pages-hourly'] = {
+        'task': 'tasks.export_static_pages',
+        'schedule': __import__('celery.schedules', fromlist=['crontab']).crontab(minute=15),
+        'options': {'queue': 'celery'},
+    }
+
+# 相关文章启用时，每天凌晨全量重建一次（IDF 随语料变化，兜底投递失败的增量更新）
+if os.getenv('RELATED_ARTICLES_ENABLED', 'False') == 'True':
+    app.conf.beat_schedule['rebuild-related-articles-daily'] = {
+        'task': 'tasks.update_related_articles',
+        'schedule': __import__('celery.schedules', fromlist=['crontab']).crontab(hour=3, minute=30),
+        'options': {'queue': 'celery'},
+    }
+
 # 任务预处理信号
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, **kwargs):
@@ -2,9 +2,10 @@
 数据库连接和会话配置
 """
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 # 从环境变量获取数据库 URL
 # 使用 SQLite 作为默认数据库（本地开发和线上都适用）
@@ -22,13 +23,125 @@ else:
     # 默认使用 SQLite
     DATABASE_URL = "sqlite:///./trustagency.db"
 
+# 只读副本（可选）：指向定期拷贝的快照文件等，未配置时读主库
+# 例如 DATABASE_READ_URL=sqlite:////app/data/trustagency-replica.db
+_db_read_url_env = _os_module.getenv("DATABASE_READ_URL", None)
+DATABASE_READ_URL = (
+    _db_read_url_env if _db_read_url_env and "sqlite" in _db_read_url_env else DATABASE_URL
+)
+
+# SQLite 引擎模式：
+# - static: 单连接 StaticPool（开发环境默认，行为与旧版本一致）
+# - pooled: 连接池 + WAL（生产环境默认），每个线程/请求检出独立连接
+SQLITE_ENGINE_MODE = os.getenv(
+    "SQLITE_ENGINE_MODE",
+    "pooled" if os.getenv("ENVIRONMENT", "development") == "production" else "static",
+).lower()
+
+# 连接级 PRAGMA（pooled 模式下对每个新连接生效）
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # 负数表示 KiB，约 64MB
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+
+# 读写连接池分别配置：写入在 SQLite 中天然串行，写池保持较小即可
+DB_WRITER_POOL_SIZE = int(os.getenv("DB_WRITER_POOL_SIZE", "4"))
+DB_WRITER_MAX_OVERFLOW = int(os.getenv("DB_WRITER_MAX_OVERFLOW", "4"))
+DB_READER_POOL_SIZE = int(os.getenv("DB_READER_POOL_SIZE", "16"))
+DB_READER_MAX_OVERFLOW = int(os.getenv("DB_READER_MAX_OVERFLOW", "16"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """内存数据库无法跨连接共享，只能使用单连接 StaticPool"""
+    return ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite:/")
+
+
+def _install_sqlite_pragmas(target_engine, pragmas):
+    """在每个新建的 DBAPI 连接上执行 PRAGMA"""
+
+    @event.listens_for(target_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+
+
+def _sqlite_pragmas():
+    """生产模式下的连接 PRAGMA 列表"""
+    return [
+        "journal_mode=WAL",
+        f"busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"mmap_size={SQLITE_MMAP_SIZE}",
+        f"cache_size={SQLITE_CACHE_SIZE}",
+        f"synchronous={SQLITE_SYNCHRONOUS}",
+    ]
+
+
+def create_sqlite_engine(url: str, pool_size: int, max_overflow: int, extra_pragmas=None):
+    """
+    创建 SQLite 引擎
+
+    static 模式或内存数据库沿用单连接 StaticPool；pooled 模式使用 QueuePool，
+    每次检出独立连接，并在连接建立时设置 WAL 等 PRAGMA。
+
+    Args:
+        url: 数据库 URL
+        pool_size: 连接池常驻连接数
+        max_overflow: 连接池溢出连接数
+        extra_pragmas: 额外的连接 PRAGMA（如只读连接的 query_only）
+    """
+    if SQLITE_ENGINE_MODE != "pooled" or _is_memory_sqlite(url):
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        if extra_pragmas:
+            _install_sqlite_pragmas(sqlite_engine, list(extra_pragmas))
+        return sqlite_engine
+
+    sqlite_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            # 由 busy_timeout PRAGMA 控制锁等待，驱动层超时保持一致
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=False,
+    )
+    _install_sqlite_pragmas(sqlite_engine, _sqlite_pragmas() + list(extra_pragmas or []))
+    return sqlite_engine
+
+
+# 只读连接的 PRAGMA：任何写操作都会报错，防止读路径误写而去争抢写锁
+READ_ONLY_PRAGMAS = ["query_only=ON"]
+
 # 根据数据库类型配置引擎
 if DATABASE_URL.startswith("sqlite"):
-    # SQLite 配置（开发环境）
-    engine = create_engine(
+    # SQLite 配置：写引擎（管理后台写入、后台任务）
+    engine = create_sqlite_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+        pool_size=DB_WRITER_POOL_SIZE,
+        max_overflow=DB_WRITER_MAX_OVERFLOW,
+    )
+    # 读引擎（公开读流量）：独立连接 + query_only，内存数据库无法跨连接共享，只能复用写引擎
+    read_engine = (
+        engine
+        if _is_memory_sqlite(DATABASE_READ_URL)
+        else create_sqlite_engine(
+            DATABASE_READ_URL,
+            pool_size=DB_READER_POOL_SIZE,
+            max_overflow=DB_READER_MAX_OVERFLOW,
+            extra_pragmas=READ_ONLY_PRAGMAS,
+        )
     )
 else:
     # PostgreSQL 配置（生产环境）
@@ -37,9 +150,81 @@ else:
         echo=False,
         pool_pre_ping=True,
     )
+    read_engine = engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读会话：不 autoflush、提交后不过期，查询结果在会话关闭后仍可直接序列化
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=read_engine,
+)
+
+
+# ==================== 异步引擎（公开读接口，只读）====================
+# async def 路由中直接使用同步 Session 会在查询期间阻塞事件循环，
+# 公开读接口改用 aiosqlite 驱动的 AsyncSession。
+
+def to_async_url(url: str) -> str:
+    """将同步数据库 URL 转换为对应的异步驱动 URL"""
+    if url.startswith("sqlite+aiosqlite:"):
+        return url
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+def create_async_db_engine(url: str, pool_size: int, max_overflow: int, extra_pragmas=None):
+    """
+    创建异步引擎
+
+    SQLite 复用与同步引擎相同的模式和 PRAGMA 设置（通过 sync_engine 的 connect 事件）。
+    """
+    async_url = to_async_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(async_url, pool_pre_ping=True)
+
+    if SQLITE_ENGINE_MODE != "pooled" or _is_memory_sqlite(url):
+        async_db_engine = create_async_engine(
+            async_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        if extra_pragmas:
+            _install_sqlite_pragmas(async_db_engine.sync_engine, list(extra_pragmas))
+        return async_db_engine
+
+    async_db_engine = create_async_engine(
+        async_url,
+        connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    _install_sqlite_pragmas(
+        async_db_engine.sync_engine, _sqlite_pragmas() + list(extra_pragmas or [])
+    )
+    return async_db_engine
+
+
+async_engine = create_async_db_engine(
+    DATABASE_READ_URL,
+    pool_size=DB_READER_POOL_SIZE,
+    max_overflow=DB_READER_MAX_OVERFLOW,
+    extra_pragmas=None if _is_memory_sqlite(DATABASE_READ_URL) else READ_ONLY_PRAGMAS,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # 声明基类（用于 ORM 模型）
 Base = declarative_base()
 
@@ -51,6 +236,31 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    """
+    获取只读数据库会话（公开 GET 接口、SSR 页面使用）
+
+    连接开启 query_only，可通过 DATABASE_READ_URL 指向只读副本；
+    需要写入（如浏览量）时请另外依赖 get_db。
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    获取异步数据库会话（公开读接口使用，与 get_read_db 一样是只读连接）
+
+    服务层仍是同步 ORM 代码时，可通过 ``await db.run_sync(fn)`` 在异步驱动上执行，
+    查询期间不会阻塞事件循环。
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
     """初始化数据库：创建表、默认管理员、栏目、平台、AI配置"""
     from app.models.admin_user import AdminUser
@@ -71,6 +281,11 @@ def init_db():
     
     db = SessionLocal()
     try:
+        # 0. 内容计数表新建时按现有数据统计一次（之后由保存钩子增量维护）
+        from app.services.content_counters import ContentCounterService
+        if ContentCounterService.ensure_initialized(db):
+            print("✅ 内容计数已初始化")
+        
         # 1. 创建默认管理员
         admin = db.query(AdminUser).filter(AdminUser.username == "admin").first()
         if not admin:
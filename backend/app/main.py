@@ -3,16 +3,14 @@ FastAPI 应用主文件
 """
 import os
 from datetime import datetime
-from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, HTMLResponse
-from pathlib import Path
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-import html
 
 # 初始化日志系统
 from app.utils.logging_setup import setup_logging
@@ -30,8 +28,6 @@ app = FastAPI(
     openapi_url="/api/openapi.json",
 )
 
-SITE_NAME = os.getenv("SITE_NAME", "鹰眼查融")
-
 # 公开站点基础 URL（用于 canonical / OG）
 def get_public_site_url(request: Request) -> str:
     base_url = os.getenv("PUBLIC_SITE_URL")
@@ -62,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ==================== Gzip 压缩中间件 ====================
@@ -121,50 +118,19 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
 # 注册异常处理中间件
 app.add_middleware(ExceptionHandlerMiddleware)
 
+# ==================== 数据库查询监控中间件 ====================
+# 最外层注册：统计整个请求期间的 SQL 次数/耗时，写入 Server-Timing 与 X-DB-Queries
+if os.getenv("DB_METRICS_ENABLED", "True") == "True":
+    from app.middleware.db_metrics import DBMetricsMiddleware
+    app.add_middleware(DBMetricsMiddleware)
+
 # 🔥 IMPORTANT: 挂载静态文件必须在注册路由之前！
 # StaticFiles 挂载必须最先执行，否则后续路由会拦截请求
 import os
 import sys
 
-def get_backend_dir():
-    """
-    获取后端目录的绝对路径，支持多环境
-    
-    优先级顺序：
-    1. 环境变量 BACKEND_DIR（推荐用于 Docker 和生产）
-    2. __file__ 相对路径（本地开发和 Docker）
-    3. 当前工作目录（作为备选）
-    4. Docker 容器内的默认路径
-    
-    这种方法确保在各种环境下都能正确识别路径
-    """
-    candidates = [
-        # 1. 环境变量（最高优先级）
-        os.getenv("BACKEND_DIR"),
-        # 2. 相对于当前文件的相对路径（最可靠）
-        str(Path(__file__).parent.parent.resolve()),
-        # 3. 当前工作目录
-        os.getcwd(),
-        # 4. Docker 容器内的默认路径
-        "/app",
-    ]
-    
-    for candidate in candidates:
-        if candidate:
-            try:
-                path = Path(candidate).resolve()
-                if path.exists():
-                    return path
-            except (OSError, ValueError):
-                # 某些路径在当前环境中不可访问
-                continue
-    
-    # 最后的保障：使用 __file__ 计算路径
-    return Path(__file__).parent.parent.resolve()
-
-
-# 获取后端目录
-BACKEND_DIR = get_backend_dir()
+# 获取后端目录（定位逻辑见 app/utils/site_paths.py）
+from app.utils.site_paths import BACKEND_DIR, SITE_DIR
 ADMIN_DIR = BACKEND_DIR / "site" / "admin"
 
 # 调试输出（仅在非生产环境）
@@ -181,10 +147,21 @@ if static_path.exists():
 # 🔥 导入所有数据库模型，确保 SQLAlchemy 可以识别所有表
 # 这必须在路由导入之前进行，以便 init_db() 可以创建所有表
 from app.models import AdminUser, Platform, Section, Category, Article, AIGenerationTask, AIConfig
-from app.database import get_db
+from app.database import get_read_db
+from app.services.article_service import ArticleService
+from app.services.related_articles import RelatedArticleService
+from app.services.sitemap_service import SitemapService
+from app.services.platform_catalog import get_catalog
+from app.services.page_render_service import (
+    PageRenderService,
+    MARGIN_STOCK_TEMPLATE_PATH,
+    MARGIN_STOCK_TEMPLATE_SLOTS,
+)
+from app.utils.ssr_template import template_loader
+from app.utils.page_cache import page_cache_key, get_page, store_page
 
 # 导入路由
-from app.routes import auth, platforms, articles, tasks, sections, categories, ai_configs, upload, website_settings, margin, external_tasks
+from app.routes import auth, platforms, articles, tasks, sections, categories, ai_configs, upload, website_settings, margin, external_tasks, site
 from app.admin import setup_admin_routes
 
 # 导入响应模块
@@ -209,6 +186,9 @@ app.include_router(margin.router)
 # 外部任务 API（供 OpenClaw 等外部系统调用）
 app.include_router(external_tasks.router)
 
+# 首页数据快照
+app.include_router(site.router)
+
 # 设置管理后台路由
 setup_admin_routes(app)
 
@@ -260,109 +240,36 @@ async def init_endpoint():
         return {"status": "error", "message": str(e)}
 
 
-@app.get("/sitemap.xml", include_in_schema=False)
-async def sitemap_xml(request: Request, db: Session = Depends(get_db)):
-    """动态生成 sitemap.xml，自动包含最新文章与动态页面。"""
-    from app.models.margin import MarginDetail
-
-    public_site_url = get_public_site_url(request)
-
-    def fmt_date(value) -> str:
-        if not value:
-            return datetime.now().date().isoformat()
-        if hasattr(value, "date"):
-            try:
-                return value.date().isoformat()
-            except Exception:
-                pass
-        return value.isoformat()
-
-    entries: list[dict[str, str]] = []
-
-    def add_url(loc: str, lastmod: str, changefreq: str, priority: str):
-        entries.append(
-            {
-                "loc": loc,
-                "lastmod": lastmod,
-                "changefreq": changefreq,
-                "priority": priority,
-            }
-        )
-
-    today = datetime.now().date().isoformat()
-
-    static_pages = [
-        ("/", today, "daily", "1.0"),
-        ("/platforms/", today, "daily", "0.9"),
-        ("/compare/", today, "weekly", "0.85"),
-        ("/qa/", today, "weekly", "0.8"),
-        ("/wiki/", today, "weekly", "0.8"),
-        ("/guides/", today, "weekly", "0.8"),
-        ("/margin/", today, "daily", "0.9"),
-        ("/margin/ranking/net_buy/", today, "daily", "0.8"),
-        ("/margin/ranking/rzye/", today, "daily", "0.8"),
-        ("/margin/ranking/rqye/", today, "daily", "0.8"),
-        ("/margin/ranking/rqyl/", today, "daily", "0.8"),
-        ("/about/", today, "monthly", "0.7"),
-        ("/legal/", today, "yearly", "0.6"),
-    ]
-
-    for path, lastmod, changefreq, priority in static_pages:
-        add_url(f"{public_site_url}{path}", lastmod, changefreq, priority)
-
-    platforms = db.query(Platform).filter(Platform.is_active == True).all()
-    for platform in platforms:
-        add_url(
-            f"{public_site_url}/platforms/{platform.slug}/",
-            fmt_date(platform.updated_at or platform.created_at),
-            "weekly",
-            "0.85",
-        )
-
-    articles = db.query(Article).filter(Article.is_published == True).all()
-    for article in articles:
-        add_url(
-            f"{public_site_url}/article/{article.slug}",
-            fmt_date(article.published_at or article.updated_at or article.created_at),
-            "weekly",
-            "0.8",
-        )
+# sitemap 响应头：允许缓存，但每次需用 ETag / Last-Modified 重新验证
+SITEMAP_CACHE_CONTROL = "public, no-cache"
 
-    margin_codes = [row[0] for row in db.query(MarginDetail.ts_code).distinct().all() if row[0]]
-    latest_margin = db.query(MarginDetail).order_by(MarginDetail.trade_date.desc()).first()
-    latest_margin_date = fmt_date(latest_margin.trade_date) if latest_margin else today
-    for ts_code in margin_codes:
-        add_url(
-            f"{public_site_url}/margin/stock/{ts_code}/",
-            latest_margin_date,
-            "daily",
-            "0.7",
-        )
 
-    xml_lines = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
-    ]
-
-    for entry in entries:
-        xml_lines.extend(
-            [
-                "  <url>",
-                f"    <loc>{html.escape(entry['loc'])}</loc>",
-                f"    <lastmod>{entry['lastmod']}</lastmod>",
-                f"    <changefreq>{entry['changefreq']}</changefreq>",
-                f"    <priority>{entry['priority']}</priority>",
-                "  </url>",
-            ]
-        )
+@app.get("/sitemap.xml", include_in_schema=False)
+async def sitemap_xml(request: Request, db: Session = Depends(get_read_db)):
+    """sitemap 索引，列出按类型拆分的子 sitemap。"""
+    page, last_modified, cache_status = SitemapService.get_index(db, get_public_site_url(request))
+    return page.to_response(
+        request,
+        cache_status,
+        media_type="application/xml",
+        last_modified=last_modified,
+        cache_control=SITEMAP_CACHE_CONTROL,
+    )
 
-    xml_lines.append("</urlset>")
-    xml_content = "\n".join(xml_lines)
 
-    return Response(
-        content=xml_content,
+@app.get("/sitemap-{kind}-{page_no:int}.xml", include_in_schema=False)
+async def sitemap_part_xml(kind: str, page_no: int, request: Request, db: Session = Depends(get_read_db)):
+    """子 sitemap（固定页面、平台、文章、两融个股），每个文件不超过 50,000 个 URL。"""
+    result = SitemapService.get_sitemap(db, kind, page_no, get_public_site_url(request))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    page, last_modified, cache_status = result
+    return page.to_response(
+        request,
+        cache_status,
         media_type="application/xml",
-        headers={"Cache-Control": "no-cache, no-store, must-revalidate"},
+        last_modified=last_modified,
+        cache_control=SITEMAP_CACHE_CONTROL,
     )
 
 # 调试端点 - 检查管理员用户
@@ -475,203 +382,58 @@ async def health_check():
 
 # 公开文章预览路由 - /article/:slug
 @app.get("/article/{slug}", include_in_schema=False)
-async def view_article(request: Request, slug: str, db: Session = Depends(get_db)):
+async def view_article(
+    request: Request,
+    slug: str,
+    db: Session = Depends(get_read_db),
+):
     """公开文章查看页面 — 返回嵌入文章数据的HTML"""
-    from sqlalchemy.orm import joinedload
-    import json
-    from bs4 import BeautifulSoup
+    from sqlalchemy.orm import joinedload, defer
     
-    article = (
-        db.query(Article)
-        .options(joinedload(Article.section), joinedload(Article.category_obj))
+    # 先只查询 ID 与版本（updated_at），命中页面缓存时无需加载正文
+    version = (
+        db.query(Article.id, Article.updated_at)
         .filter(and_(Article.slug == slug, Article.is_published == True))
         .first()
     )
     
-    if not article:
+    if not version:
         raise HTTPException(status_code=404, detail="文章不存在或未发布")
     
-    # 增加浏览量
-    article.view_count = (article.view_count or 0) + 1
-    db.add(article)
-    db.commit()
-    
-    template_path = BACKEND_DIR / "static" / "article_view.html"
-    if not template_path.exists():
-        raise HTTPException(status_code=500, detail="模板文件不存在")
-    html_content = template_path.read_text(encoding="utf-8")
+    # 增加浏览量（文章从只读会话读取，浏览量写入计数缓冲后批量落库）
+    ArticleService.increment_view_count(version.id)
     
     public_site_url = get_public_site_url(request)
-    section_name = article.section.name if article.section else "未分类"
-    category_name = article.category_obj.name if article.category_obj else "未分类"
-    content_html = article.content or ""
-    
-    # 提取纯文本与图片
-    try:
-        soup = BeautifulSoup(content_html, "html.parser")
-        plain_text = " ".join(soup.get_text().split())
-    except Exception:
-        plain_text = ""
+    cache_key = page_cache_key("article", slug, version.updated_at, public_site_url)
+    page = get_page(cache_key)
+    if page is not None:
+        return page.to_response(request, "HIT")
     
-    images: list[str] = []
-    try:
-        soup = BeautifulSoup(content_html, "html.parser")
-        for img in soup.find_all("img"):
-            src = (img.get("src") or "").strip()
-            if not src:
-                continue
-            if src.startswith("http"):
-                images.append(src)
-            elif src.startswith("/"):
-                images.append(f"{public_site_url}{src}")
-            else:
-                images.append(f"{public_site_url}/{src.lstrip('/')}")
-    except Exception:
-        pass
-    
-    auto_summary = (
-        plain_text[:160] + ("…" if len(plain_text) > 160 else "") if plain_text else ""
-    )
-    summary_text = (article.summary and article.summary.strip()) or auto_summary
-    
-    seo_title = article.seo_title or article.title or SITE_NAME
-    seo_description = article.meta_description or summary_text or ""
-    seo_keywords = article.meta_keywords or ""
-    
-    article_url = f"{public_site_url}/article/{article.slug}"
-    
-    article_data = {
-        "id": article.id,
-        "title": article.title or "",
-        "slug": article.slug,
-        "content": content_html,
-        "summary": article.summary or "",
-        "section_name": section_name,
-        "category_name": category_name,
-        "view_count": article.view_count or 0,
-        "created_at": article.created_at.isoformat() if article.created_at else None,
-        "published_at": article.published_at.isoformat() if article.published_at else None,
-        "is_published": article.is_published,
-        "seo_title": seo_title,
-        "seo_keywords": seo_keywords,
-        "seo_description": seo_description,
-        "canonical_url": article_url,
-    }
-    
-    pub_date = article.published_at or article.created_at
-    pub_date_str = pub_date.isoformat() if pub_date else None
-    
-    schema_data = {
-        "@context": "https://schema.org",
-        "@type": "Article",
-        "@id": f"{article_url}#article",
-        "headline": article.title,
-        "description": summary_text,
-        "articleSection": category_name,
-        "datePublished": pub_date_str,
-        "mainEntityOfPage": article_url,
-        "url": article_url,
-        "author": {"@type": "Person", "name": "Admin"},
-        "publisher": {"@type": "Organization", "name": SITE_NAME},
-        "inLanguage": "zh-CN",
-        "image": images or None,
-        "wordCount": len(plain_text.split()) if plain_text else 0,
-    }
-    schema_data = {k: v for k, v in schema_data.items() if v is not None}
-    
-    article_json = json.dumps(article_data, ensure_ascii=False)
-    # 防止 XSS：转义 </script> 序列，避免脚本注入
-    article_json = article_json.replace("</", "<\\/")
-    schema_json = json.dumps(schema_data, ensure_ascii=False, indent=2)
-    schema_json = schema_json.replace("</", "<\\/")
-    
-    # 组装 SSR 内容
-    published_display = pub_date.strftime("%Y-%m-%d %H:%M") if pub_date else ""
-    status_badge = (
-        ""
-        if article.is_published
-        else '<span class="badge" style="background:#ffc107;color:#000">草稿</span>'
-    )
-    category_badge = (
-        f'<span class="badge">分类 {html.escape(category_name)}</span>'
-        if category_name
-        else ""
-    )
-    summary_block = (
-        f'<div class="summary-box"><strong>摘要：</strong>{html.escape(summary_text)}</div>'
-        if summary_text
-        else ""
-    )
-    public_link = (
-        f'<p style="margin-top:24px;font-size:13px;color:#666;">公开链接：'
-        f'<a href="/article/{article.slug}" target="_blank" rel="noopener">/article/{article.slug}</a></p>'
-        if article.is_published and article.slug
-        else ""
+    article = (
+        db.query(Article)
+        .options(joinedload(Article.section), joinedload(Article.category_obj), defer(Article.plain_text))
+        .filter(Article.id == version.id)
+        .first()
     )
-    article_inner_html = f"""
-        <h1>{html.escape(article.title or "")}</h1>
-        <div class="meta">
-          <span class="badge">栏目 {html.escape(section_name)}</span>
-          {category_badge}
-          {status_badge}
-          <span>浏览 {article.view_count or 0}</span>
-          {f'<span style="margin-left:8px">发布时间 {published_display}</span>' if published_display else ''}
-        </div>
-        {summary_block}
-        <article class="content">{content_html}</article>
-        {public_link}
-    """
-    
-    # 使用 BeautifulSoup 修改整体 HTML，确保 meta / title / canonical 全量更新并注入 SSR 内容
-    page_soup = BeautifulSoup(html_content, "html.parser")
-    
-    if page_soup.title:
-        page_soup.title.string = f"{seo_title} - {SITE_NAME}"
+    view_count, _ = ArticleService.get_display_counts(article)
+    related = RelatedArticleService.to_items(RelatedArticleService.get_related(db, article.id))
     
-    meta_map = {
-        ("id", "seo-description"): ("content", seo_description),
-        ("id", "seo-keywords"): ("content", seo_keywords),
-        ("id", "og-title"): ("content", article.title or ""),
-        ("id", "og-description"): ("content", seo_description),
-        ("id", "og-url"): ("content", article_url),
-        ("id", "twitter-title"): ("content", article.title or ""),
-        ("id", "twitter-description"): ("content", seo_description),
-    }
-    for (attr_key, attr_val), (target_attr, target_value) in meta_map.items():
-        tag = page_soup.find(attrs={attr_key: attr_val})
-        if tag:
-            tag[target_attr] = target_value
-    
-    canonical_tag = page_soup.find("link", {"id": "canonical"})
-    if canonical_tag:
-        canonical_tag["href"] = article_url
-    
-    container = page_soup.find(id="articleContainer")
-    if container:
-        container.clear()
-        fragment = BeautifulSoup(article_inner_html, "html.parser")
-        for child in fragment.contents:
-            container.append(child)
-    
-    head_tag = page_soup.find("head")
-    if head_tag:
-        schema_tag = page_soup.new_tag("script", type="application/ld+json")
-        schema_tag.string = schema_json
-        head_tag.append(schema_tag)
-        
-        data_tag = page_soup.new_tag("script")
-        data_tag.string = f"window.__ARTICLE_DATA__ = {article_json};"
-        head_tag.append(data_tag)
+    try:
+        final_html = PageRenderService.render_article(article, public_site_url, view_count, related=related)
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="模板文件不存在")
     
-    final_html = "<!DOCTYPE html>\n" + str(page_soup)
-    return HTMLResponse(content=final_html, status_code=200)
+    # 栏目 / 分类名称变更通过 sections 标签失效；相关文章列表重算或其中的文章修改时一并失效
+    tags = [f"article:{article.id}", "sections", f"related:{article.id}"]
+    tags.extend(f"article:{item['id']}" for item in related)
+    page = store_page(cache_key, final_html, tags=tags)
+    return page.to_response(request, "MISS")
 
 
 # 公开平台详情页路由 - /platforms/:slug (SSR)
 @app.get("/platforms/{slug}", include_in_schema=False)
-async def view_platform(request: Request, slug: str, db: Session = Depends(get_db)):
+async def view_platform(request: Request, slug: str, db: Session = Depends(get_read_db)):
     """公开平台详情页 — 返回嵌入平台数据的HTML（SSR）"""
-    import json
     from app.models import Platform
     
     # 排除静态资源和列表页
@@ -679,168 +441,30 @@ async def view_platform(request: Request, slug: str, db: Session = Depends(get_d
         # 这是静态文件请求，跳过
         raise HTTPException(status_code=404, detail="Not found")
     
-    # 查询平台
-    platform = db.query(Platform).filter(Platform.slug == slug, Platform.is_active == True).first()
+    # 先从平台目录取 ID 与版本（updated_at），命中页面缓存时无需查询数据库
+    version = get_catalog(db).active_by_slug(slug)
     
-    if not platform:
+    if not version:
         raise HTTPException(status_code=404, detail="平台不存在")
     
-    # 读取模板
-    template_path = BACKEND_DIR / "static" / "platform_view.html"
-    if not template_path.exists():
-        raise HTTPException(status_code=500, detail="模板文件不存在")
-    html_content = template_path.read_text(encoding="utf-8")
-    
     public_site_url = get_public_site_url(request)
+    cache_key = page_cache_key("platform", slug, version.updated_at, public_site_url)
+    page = get_page(cache_key)
+    if page is not None:
+        return page.to_response(request, "HIT")
     
-    # 构建平台数据
-    platform_data = {
-        "id": platform.id,
-        "name": platform.name or "",
-        "slug": platform.slug or "",
-        "description": platform.description or "",
-        "rating": float(platform.rating) if platform.rating is not None else 0,
-        "rank": platform.rank,
-        "min_leverage": float(platform.min_leverage) if platform.min_leverage is not None else 1,
-        "max_leverage": float(platform.max_leverage) if platform.max_leverage is not None else 100,
-        "commission_rate": float(platform.commission_rate) if platform.commission_rate is not None else 0,
-        "is_regulated": platform.is_regulated,
-        "logo_url": platform.logo_url,
-        "website_url": platform.website_url,
-        "introduction": platform.introduction,
-        "main_features": platform.main_features,
-        "fee_structure": platform.fee_structure,
-        "account_opening_link": platform.account_opening_link,
-        "safety_rating": platform.safety_rating or "B",
-        "founded_year": platform.founded_year,
-        "fee_rate": float(platform.fee_rate) if platform.fee_rate is not None else None,
-        "is_recommended": platform.is_recommended,
-        "why_choose": platform.why_choose,
-        "trading_conditions": platform.trading_conditions,
-        "fee_advantages": platform.fee_advantages,
-        "account_types": platform.account_types,
-        "trading_tools": platform.trading_tools,
-        "opening_steps": platform.opening_steps,
-        "security_measures": platform.security_measures,
-        "customer_support": platform.customer_support,
-        "learning_resources": platform.learning_resources,
-        "platform_type": platform.platform_type,
-        "platform_source": platform.platform_source,
-        "platform_badges": platform.platform_badges,
-        "overview_intro": platform.overview_intro,
-    }
-    
-    platform_json = json.dumps(platform_data, ensure_ascii=False)
-    # 防止 XSS：转义 </script> 序列，避免脚本注入
-    platform_json = platform_json.replace("</", "<\\/")
-    
-    # SEO 数据
-    seo_title = platform.name or "平台详情"
-    seo_description = platform.description or f"{seo_title} 平台详情、费用、杠杆比例等信息"
-    platform_url = f"{public_site_url}/platforms/{platform.slug}/"
-    
-    # 构建 Schema.org 数据
-    schema_data = {
-        "@context": "https://schema.org",
-        "@type": "SoftwareApplication",
-        "name": platform.name,
-        "description": seo_description,
-        "applicationCategory": "FinanceApplication",
-        "operatingSystem": "Web",
-        "url": platform_url,
-    }
-    if platform.rating:
-        schema_data["aggregateRating"] = {
-            "@type": "AggregateRating",
-            "ratingValue": str(platform.rating),
-            "ratingCount": "100"
-        }
-    schema_json = json.dumps(schema_data, ensure_ascii=False, indent=2)
-    # 防止 XSS：转义 </script> 序列
-    schema_json = schema_json.replace("</", "<\\/")
-    
-    # 使用 BeautifulSoup 修改 HTML
-    from bs4 import BeautifulSoup
-    page_soup = BeautifulSoup(html_content, "html.parser")
-    
-    # 更新 title
-    if page_soup.title:
-        page_soup.title.string = f"{seo_title} - {SITE_NAME}"
+    platform = db.query(Platform).filter(Platform.id == version.id).first()
     
-    # 更新 meta 标签
-    meta_map = {
-        ("id", "seo-description"): ("content", seo_description),
-        ("id", "og-title"): ("content", f"{seo_title} - {SITE_NAME}"),
-        ("id", "og-description"): ("content", seo_description),
-        ("id", "og-url"): ("content", platform_url),
-        ("id", "twitter-title"): ("content", f"{seo_title} - {SITE_NAME}"),
-        ("id", "twitter-description"): ("content", seo_description),
-    }
-    for (attr_key, attr_val), (target_attr, target_value) in meta_map.items():
-        tag = page_soup.find(attrs={attr_key: attr_val})
-        if tag:
-            tag[target_attr] = target_value
-    
-    # 更新 canonical
-    canonical_tag = page_soup.find("link", {"id": "canonical"})
-    if canonical_tag:
-        canonical_tag["href"] = platform_url
-    
-    # 更新面包屑
-    breadcrumb_tag = page_soup.find(id="breadcrumb-name")
-    if breadcrumb_tag:
-        breadcrumb_tag.string = platform.name
-    
-    # 注入 Schema 和数据
-    head_tag = page_soup.find("head")
-    if head_tag:
-        schema_tag = page_soup.new_tag("script", type="application/ld+json")
-        schema_tag.string = schema_json
-        head_tag.append(schema_tag)
-        
-        data_tag = page_soup.new_tag("script")
-        data_tag.string = f"window.__PLATFORM_DATA__ = {platform_json};"
-        head_tag.append(data_tag)
+    try:
+        final_html = PageRenderService.render_platform(platform, public_site_url)
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="模板文件不存在")
     
-    final_html = "<!DOCTYPE html>\n" + str(page_soup)
-    return HTMLResponse(content=final_html, status_code=200)
+    page = store_page(cache_key, final_html, tags=[f"platform:{platform.id}"])
+    return page.to_response(request, "MISS")
 
 
 # 主前端路由 - 服务主站点的 index.html
-def get_site_dir():
-    """
-    获取前端site目录的正确路径，支持多种环境配置
-    
-    优先级：
-    1. 环境变量 SITE_DIR（推荐）
-    2. /site（容器默认挂载点）
-    3. BACKEND_DIR.parent / "site"（本地开发时的相对位置）
-    4. 当前工作目录的 site 目录
-    """
-    candidates = [
-        # 1. 环境变量设置的路径
-        os.getenv("SITE_DIR"),
-        # 2. 容器中的标准路径
-        "/site",
-        # 3. 相对于后端目录的位置（本地开发）
-        BACKEND_DIR.parent / "site",
-        # 4. 当前工作目录
-        Path.cwd() / "site",
-    ]
-    
-    for candidate in candidates:
-        if candidate:
-            try:
-                path = Path(candidate).resolve()
-                if path.exists():
-                    return path
-            except (OSError, ValueError):
-                continue
-    
-    # 如果都找不到，返回首选项（通常在容器中会存在）
-    return Path("/site")
-
-SITE_DIR = get_site_dir()
 
 if os.getenv("DEBUG", "False") == "True":
     print(f"[INIT] SITE_DIR: {SITE_DIR}", file=sys.stderr)
@@ -887,102 +511,38 @@ for subdir in ["guides", "wiki", "qa", "compare", "about", "legal"]:
 # 两融个股详情页: /margin/stock/600519.SH/ (SSR)
 @app.get("/margin/stock/{ts_code}/", include_in_schema=False)
 @app.get("/margin/stock/{ts_code}", include_in_schema=False)
-async def margin_stock_detail(request: Request, ts_code: str, db: Session = Depends(get_db)):
+async def margin_stock_detail(request: Request, ts_code: str, db: Session = Depends(get_read_db)):
     """返回两融个股详情页（SSR 预渲染 SEO 标签）"""
-    from bs4 import BeautifulSoup
     from app.models.margin import MarginDetail
-    import json
     
-    stock_index_path = SITE_DIR / "margin" / "stock" / "index.html"
-    if not stock_index_path.exists():
+    template = template_loader.get(MARGIN_STOCK_TEMPLATE_PATH, MARGIN_STOCK_TEMPLATE_SLOTS)
+    if template is None:
         raise HTTPException(status_code=404, detail="页面不存在")
     
     # 规范化股票代码
-    ts_code = ts_code.upper()
-    if '.' not in ts_code:
-        if ts_code.startswith('6'):
-            ts_code = f"{ts_code}.SH"
-        elif ts_code.startswith(('0', '3')):
-            ts_code = f"{ts_code}.SZ"
-        elif ts_code.startswith(('8', '4')):
-            ts_code = f"{ts_code}.BJ"
+    ts_code = PageRenderService.normalize_ts_code(ts_code)
     
     # 获取股票最新数据
     latest = db.query(MarginDetail).filter(
         MarginDetail.ts_code == ts_code
     ).order_by(MarginDetail.trade_date.desc()).first()
     
-    # 读取模板
-    html_content = stock_index_path.read_text(encoding="utf-8")
-    
     # 如果没有数据，返回默认页面
     if not latest:
-        return HTMLResponse(content=html_content, status_code=200)
+        return HTMLResponse(content=template.source, status_code=200)
     
-    # 构建 SEO 数据
-    stock_name = latest.name or ts_code.split('.')[0]
     public_site_url = get_public_site_url(request)
-    page_url = f"{public_site_url}/margin/stock/{ts_code}/"
-    page_title = f"{stock_name}({ts_code})两融数据 | {SITE_NAME}"
-    page_desc = f"{stock_name}({ts_code})融资融券数据查询，包含融资余额、融券余量、融资净买入等历史趋势分析。"
-    page_keywords = f"{stock_name},{ts_code},两融数据,融资融券,融资余额,融券余量"
-    
-    # 构建 Schema.org 结构化数据
-    schema_data = {
-        "@context": "https://schema.org",
-        "@type": "Dataset",
-        "name": f"{stock_name}两融数据",
-        "description": page_desc,
-        "url": page_url,
-        "keywords": page_keywords.split(','),
-        "creator": {"@type": "Organization", "name": SITE_NAME},
-        "dateModified": latest.trade_date.isoformat() if latest.trade_date else None,
-        "temporalCoverage": f"../{latest.trade_date.isoformat()}" if latest.trade_date else None,
-    }
-    schema_data = {k: v for k, v in schema_data.items() if v is not None}
-    schema_json = json.dumps(schema_data, ensure_ascii=False, indent=2).replace("</", "<\\/")
-    
-    # 使用 BeautifulSoup 修改 HTML
-    page_soup = BeautifulSoup(html_content, "html.parser")
-    
-    # 更新 title
-    if page_soup.title:
-        page_soup.title.string = page_title
-    
-    # 更新 meta 标签
-    meta_updates = {
-        "seo-description": page_desc,
-        "seo-keywords": page_keywords,
-        "og-title": page_title,
-        "og-description": page_desc,
-        "og-url": page_url,
-        "twitter-title": page_title,
-        "twitter-description": page_desc,
-    }
-    for tag_id, content in meta_updates.items():
-        tag = page_soup.find(id=tag_id)
-        if tag:
-            tag["content"] = content
-    
-    # 更新 canonical
-    canonical_tag = page_soup.find(id="canonical")
-    if canonical_tag:
-        canonical_tag["href"] = page_url
-    
-    # 更新面包屑
-    breadcrumb_tag = page_soup.find(id="breadcrumb-stock")
-    if breadcrumb_tag:
-        breadcrumb_tag.string = f"{stock_name}({ts_code.split('.')[0]})"
-    
-    # 注入 Schema.org 结构化数据
-    head_tag = page_soup.find("head")
-    if head_tag:
-        schema_tag = page_soup.new_tag("script", type="application/ld+json")
-        schema_tag.string = schema_json
-        head_tag.append(schema_tag)
-    
-    final_html = "<!DOCTYPE html>\n" + str(page_soup)
-    return HTMLResponse(content=final_html, status_code=200)
+    cache_key = page_cache_key("margin-stock", ts_code, latest.trade_date, public_site_url)
+    page = get_page(cache_key)
+    if page is not None:
+        return page.to_response(request, "HIT")
+    
+    final_html = PageRenderService.render_margin_stock(latest, ts_code, public_site_url)
+    tags = ["margin"]
+    if latest.trade_date:
+        tags.append(f"margin:{latest.trade_date.isoformat()}")
+    page = store_page(cache_key, final_html, tags=tags)
+    return page.to_response(request, "MISS")
 
 # 两融排行榜页: /margin/ranking/net_buy/
 @app.get("/margin/ranking/{order}/", include_in_schema=False)
@@ -0,0 +1,246 @@
+"""
+数据库查询监控中间件
+
+按请求统计 SQL 执行次数与耗时（Server-Timing / X-DB-Queries 响应头），
+记录慢查询，并检测同一语句形状在单个请求中重复执行的 N+1 查询。
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# 单条语句耗时超过该值（毫秒）记入慢查询日志
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+# 慢查询 / N+1 日志保留条数
+DB_QUERY_LOG_SIZE = int(os.getenv("DB_QUERY_LOG_SIZE", "200"))
+# 同一语句形状在单个请求中执行超过该次数视为 N+1
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "10"))
+# 每个请求保留的最慢语句数
+DB_SLOWEST_PER_REQUEST = 3
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|(?<!:):\w+|\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    将 SQL 归一化为语句形状：字面量与参数替换为 ?，IN 列表折叠，空白压缩
+
+    Args:
+        statement: 原始 SQL
+
+    Returns:
+        语句形状
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NAMED_PARAM.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    return _IN_LIST.sub("(?)", shape)
+
+
+class RequestQueryStats:
+    """单个请求的查询统计"""
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.slowest: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        """记录一次语句执行"""
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[normalize_statement(statement)] += 1
+
+        if len(self.slowest) < DB_SLOWEST_PER_REQUEST or duration_ms > self.slowest[-1][0]:
+            self.slowest.append((duration_ms, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[DB_SLOWEST_PER_REQUEST:]
+
+    def repeated_statements(self, threshold: int = None) -> List[Tuple[str, int]]:
+        """
+        获取疑似 N+1 的语句形状
+
+        Args:
+            threshold: 重复次数阈值，默认 DB_N_PLUS_ONE_THRESHOLD
+
+        Returns:
+            [(语句形状, 执行次数)]，按次数降序
+        """
+        threshold = DB_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头的值"""
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+
+class QueryLog:
+    """进程内的慢查询与 N+1 滚动日志"""
+
+    def __init__(self, maxlen: int = DB_QUERY_LOG_SIZE):
+        self._lock = Lock()
+        self.slow_queries: deque = deque(maxlen=maxlen)
+        self.n_plus_one: deque = deque(maxlen=maxlen)
+        self.requests = 0
+        self.queries = 0
+
+    def record_request(self, stats: RequestQueryStats) -> None:
+        """记录请求结束时的统计，并检测 N+1"""
+        repeated = stats.repeated_statements()
+        with self._lock:
+            self.requests += 1
+            self.queries += stats.count
+            for shape, count in repeated:
+                self.n_plus_one.append({
+                    "timestamp": datetime.now().isoformat(),
+                    "method": stats.method,
+                    "path": stats.path,
+                    "statement": shape,
+                    "count": count,
+                })
+
+        for shape, count in repeated:
+            logger.warning(f"疑似 N+1 查询: {stats.method} {stats.path} 执行 {count} 次: {shape[:200]}")
+
+    def record_slow(self, statement: str, duration_ms: float, stats: Optional[RequestQueryStats]) -> None:
+        """记录慢查询"""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "method": stats.method if stats else None,
+            "path": stats.path if stats else None,
+            "duration_ms": round(duration_ms, 2),
+            "statement": statement,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+        logger.warning(f"慢查询 {duration_ms:.1f}ms ({entry['path'] or '-'}): {statement[:200]}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计与最近日志（最新在前）"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "queries": self.queries,
+                "slow_query_ms": DB_SLOW_QUERY_MS,
+                "n_plus_one_threshold": DB_N_PLUS_ONE_THRESHOLD,
+                "slow_queries": list(reversed(self.slow_queries)),
+                "n_plus_one": list(reversed(self.n_plus_one)),
+            }
+
+    def clear(self) -> None:
+        """清空日志与计数"""
+        with self._lock:
+            self.slow_queries.clear()
+            self.n_plus_one.clear()
+            self.requests = 0
+            self.queries = 0
+
+
+query_log = QueryLog()
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("db_request_stats", default=None)
+_installed = False
+
+
+def get_current_stats() -> Optional[RequestQueryStats]:
+    """获取当前请求的查询统计（请求上下文之外返回 None）"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration_ms = (time.perf_counter() - start_times.pop()) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+    if duration_ms >= DB_SLOW_QUERY_MS:
+        query_log.record_slow(statement, duration_ms, stats)
+
+
+def _handle_error(exception_context):
+    # 执行失败时不会触发 after_cursor_execute，弹出对应的开始时间
+    connection = exception_context.connection
+    if connection is not None:
+        start_times = connection.info.get("query_start_time")
+        if start_times:
+            start_times.pop()
+
+
+def install_query_instrumentation() -> None:
+    """
+    在 Engine 类上注册执行钩子
+
+    对所有引擎生效（写引擎、只读引擎以及异步引擎底层的 sync_engine），重复调用无副作用。
+    """
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+class DBMetricsMiddleware:
+    """
+    请求级数据库查询统计中间件（纯 ASGI 实现）
+
+    响应头：
+    - Server-Timing: db;dur=<总耗时ms>;desc="<N> queries"
+    - X-DB-Queries: 查询次数
+    - X-DB-N-Plus-One: 疑似 N+1 的语句形状数（仅检测到时）
+    """
+
+    def __init__(self, app):
+        self.app = app
+        install_query_instrumentation()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope.get("method", ""), scope.get("path", ""))
+        token = _current_stats.set(stats)
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+                headers.append("X-DB-Queries", str(stats.count))
+                repeated = stats.repeated_statements()
+                if repeated:
+                    headers.append("X-DB-N-Plus-One", str(len(repeated)))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_stats.reset(token)
+            query_log.record_request(stats)
@@ -0,0 +1,132 @@
+"""
+添加文章派生字段并回填
+
+这个迁移脚本为 articles 表添加以下字段，并为已有文章计算取值：
+- plain_text: 纯文本
+- auto_summary: 自动摘要（纯文本前 160 个字符）
+- image_urls: 正文图片地址（JSON）
+- word_count: 字数
+- reading_time: 阅读时长（分钟）
+
+新保存的文章由 Article 模型的保存钩子自动计算；本脚本只处理已有数据。
+回填不修改 updated_at（它是 SSR 页面缓存的内容版本）。
+
+执行方式：
+    python -m app.migrations.add_article_derived_fields
+    python -m app.migrations.add_article_derived_fields --recompute   # 重新计算所有文章
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import bindparam, select, text, update
+
+from app.database import engine
+from app.models import Article
+from app.utils.article_text import extract_derived_fields
+
+# 每批回填的文章数
+BATCH_SIZE = 200
+
+NEW_COLUMNS = [
+    ("plain_text", "TEXT"),
+    ("auto_summary", "VARCHAR(200)"),
+    ("image_urls", "JSON"),
+    ("word_count", "INTEGER"),
+    ("reading_time", "INTEGER"),
+]
+
+
+def add_columns(conn) -> None:
+    """添加缺少的字段"""
+    result = conn.execute(text("PRAGMA table_info(articles)"))
+    columns = [row[1] for row in result]
+    for name, column_type in NEW_COLUMNS:
+        if name not in columns:
+            print(f"添加 {name} 字段...")
+            conn.execute(text(f"ALTER TABLE articles ADD COLUMN {name} {column_type}"))
+            conn.commit()
+            print(f"✅ {name} 字段已添加")
+        else:
+            print(f"⏭️  {name} 字段已存在，跳过")
+
+
+def backfill(conn, recompute: bool = False, batch_size: int = BATCH_SIZE) -> int:
+    """
+    按 ID 分批计算并写入派生字段
+
+    Args:
+        conn: 数据库连接
+        recompute: 是否重新计算已有取值的文章
+        batch_size: 每批文章数
+
+    Returns:
+        回填的文章数
+    """
+    table = Article.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("article_id"))
+        .values(
+            plain_text=bindparam("plain_text"),
+            auto_summary=bindparam("auto_summary"),
+            image_urls=bindparam("image_urls"),
+            word_count=bindparam("word_count"),
+            reading_time=bindparam("reading_time"),
+            updated_at=table.c.updated_at,
+        )
+    )
+
+    total = 0
+    last_id = 0
+    while True:
+        query = select(table.c.id, table.c.content).where(table.c.id > last_id)
+        if not recompute:
+            query = query.where(table.c.word_count.is_(None))
+        rows = conn.execute(query.order_by(table.c.id).limit(batch_size)).all()
+        if not rows:
+            break
+
+        params = [{"article_id": row.id, **extract_derived_fields(row.content or "")} for row in rows]
+        conn.execute(statement, params)
+        conn.commit()
+
+        last_id = rows[-1].id
+        total += len(rows)
+        print(f"  已回填 {total} 篇文章（至 ID {last_id}）")
+    return total
+
+
+def upgrade(recompute: bool = False):
+    """升级数据库：添加派生字段并回填"""
+    with engine.connect() as conn:
+        print("开始数据库迁移...")
+        add_columns(conn)
+
+        print("\n回填已有文章...")
+        total = backfill(conn, recompute=recompute)
+        print(f"\n✅ 数据库迁移完成！共回填 {total} 篇文章")
+
+
+def downgrade():
+    """降级数据库：删除新字段（SQLite不支持DROP COLUMN）"""
+    print("⚠️  警告：SQLite 不支持 DROP COLUMN 操作")
+    print("派生字段为空时详情页会现场计算，保留这些字段不影响旧版本运行")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='文章派生字段迁移脚本')
+    parser.add_argument('--recompute', action='store_true', help='重新计算所有文章的派生字段')
+    parser.add_argument('--downgrade', action='store_true', help='回退迁移（警告：SQLite不支持）')
+    args = parser.parse_args()
+
+    if args.downgrade:
+        downgrade()
+    else:
+        upgrade(recompute=args.recompute)
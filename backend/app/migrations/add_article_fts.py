@@ -0,0 +1,109 @@
+"""
+建立文章全文索引
+
+这个迁移脚本创建 articles_fts（SQLite FTS5 虚拟表），并为已有文章建立索引。
+之后的新增、修改、删除由 Article 模型的保存钩子同步；本脚本也可用于重建索引
+（例如调整分词规则之后）。
+
+执行方式：
+    python -m app.migrations.add_article_fts
+    python -m app.migrations.add_article_fts --downgrade   # 删除索引，搜索回退到 LIKE 查询
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import select, text
+
+from app.database import engine
+from app.models import Article
+from app.utils import article_search
+
+# 每批索引的文章数
+BATCH_SIZE = 200
+
+
+def rebuild(conn, batch_size: int = BATCH_SIZE) -> int:
+    """
+    清空并按 ID 分批重建索引
+
+    清空与全部写入在同一个事务中完成，提交前其他连接看到的仍是旧索引，
+    不会在重建过程中搜到不完整的结果；出错时回滚，旧索引保持不变。
+
+    Args:
+        conn: 数据库连接
+        batch_size: 每批文章数
+
+    Returns:
+        索引的文章数
+    """
+    table = Article.__table__
+    try:
+        conn.execute(text(f"DELETE FROM {article_search.FTS_TABLE}"))
+        total = _index_all(conn, table, batch_size)
+        conn.execute(text(f"INSERT INTO {article_search.FTS_TABLE}({article_search.FTS_TABLE}) VALUES ('optimize')"))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return total
+
+
+def _index_all(conn, table, batch_size: int) -> int:
+    """按 ID 分批读取文章并写入索引（不提交）"""
+    total = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.title, table.c.summary, table.c.tags, table.c.plain_text, table.c.content)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        total += article_search.index_rows(conn, rows)
+        last_id = rows[-1].id
+        print(f"  已索引 {total} 篇文章（至 ID {last_id}）")
+    return total
+
+
+def upgrade():
+    """升级数据库：创建全文索引并索引已有文章"""
+    with engine.connect() as conn:
+        print("开始数据库迁移...")
+        if not article_search.create_index(conn):
+            print("❌ 当前 SQLite 不支持 FTS5，搜索将继续使用 LIKE 查询")
+            return
+        conn.commit()
+        print(f"✅ {article_search.FTS_TABLE} 已创建")
+
+        print("\n索引已有文章...")
+        total = rebuild(conn)
+        print(f"\n✅ 数据库迁移完成！共索引 {total} 篇文章")
+
+
+def downgrade():
+    """降级数据库：删除全文索引"""
+    with engine.connect() as conn:
+        article_search.drop_index(conn)
+        conn.commit()
+    print(f"✅ {article_search.FTS_TABLE} 已删除，搜索回退到 LIKE 查询")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='文章全文索引迁移脚本')
+    parser.add_argument('--downgrade', action='store_true', help='删除全文索引')
+    args = parser.parse_args()
+
+    if args.downgrade:
+        downgrade()
+    else:
+        upgrade()
@@ -0,0 +1,56 @@
+"""
+添加内容计数表
+
+这个迁移脚本创建 content_counters 表，并按现有数据统计栏目 / 分类文章数、栏目分类数与全站统计。
+之后由文章、分类、栏目、平台的保存钩子在同一事务内增量更新，Celery Beat 每天校正一次；
+本脚本也可随时手动校正。
+
+执行方式：
+    python -m app.migrations.add_content_counters
+    python -m app.migrations.add_content_counters --downgrade   # 删除内容计数表
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database import SessionLocal, engine
+from app.models import ContentCounter
+from app.services.content_counters import ContentCounterService
+
+
+def upgrade():
+    """升级数据库：创建内容计数表并统计"""
+    print("开始数据库迁移...")
+    ContentCounter.__table__.create(bind=engine, checkfirst=True)
+    print(f"✅ {ContentCounter.__tablename__} 表已就绪")
+
+    print("\n统计内容数量...")
+    db = SessionLocal()
+    try:
+        stats = ContentCounterService.reconcile(db)
+    finally:
+        db.close()
+    print(f"\n✅ 数据库迁移完成！共 {stats['checked']} 项计数，修正 {stats['fixed']} 项")
+
+
+def downgrade():
+    """降级数据库：删除内容计数表"""
+    ContentCounter.__table__.drop(bind=engine, checkfirst=True)
+    print(f"✅ {ContentCounter.__tablename__} 表已删除")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='内容计数迁移脚本')
+    parser.add_argument('--downgrade', action='store_true', help='删除内容计数表')
+    args = parser.parse_args()
+
+    if args.downgrade:
+        downgrade()
+    else:
+        upgrade()
@@ -0,0 +1,120 @@
+"""
+规范化平台详情字段并添加 details_json
+
+这个迁移脚本：
+- 为 platforms 表添加 details_json 字段（详情字段解码后的紧凑 JSON 对象，详情页直接嵌入）
+- 将已有平台详情字段中的 JSON 统一为紧凑格式；无法解析的取值原样保留并列出，需在后台修正
+  （之后的写入会校验，以 [ 或 { 开头的取值必须是有效 JSON）
+- 为已有平台生成 details_json
+
+新保存的平台由 Platform 模型的保存钩子自动生成；本脚本只处理已有数据。
+不修改 updated_at（它是 SSR 页面缓存的内容版本），已缓存的详情页在缓存过期后使用新数据。
+
+执行方式：
+    python -m app.migrations.add_platform_details_json
+    python -m app.migrations.add_platform_details_json --check   # 只检查，不写入
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import select, text, update
+
+from app.database import engine
+from app.models import Platform
+from app.utils.platform_details import PLATFORM_JSON_FIELDS, build_details_json, normalize_detail
+
+
+def add_column(conn) -> None:
+    """添加 details_json 字段"""
+    result = conn.execute(text("PRAGMA table_info(platforms)"))
+    columns = [row[1] for row in result]
+    if "details_json" not in columns:
+        print("添加 details_json 字段...")
+        conn.execute(text("ALTER TABLE platforms ADD COLUMN details_json TEXT"))
+        conn.commit()
+        print("✅ details_json 字段已添加")
+    else:
+        print("⏭️  details_json 字段已存在，跳过")
+
+
+def normalize(conn, check_only: bool = False) -> dict:
+    """
+    规范化详情字段并生成 details_json
+
+    Args:
+        conn: 数据库连接
+        check_only: 只检查，不写入
+
+    Returns:
+        {"platforms": 平台数, "normalized": 规范化的字段数, "invalid": 无法解析的字段数}
+    """
+    table = Platform.__table__
+    stats = {"platforms": 0, "normalized": 0, "invalid": 0}
+    rows = conn.execute(select(table.c.id, table.c.name, *(table.c[field] for field in PLATFORM_JSON_FIELDS))).all()
+    for row in rows:
+        values = {field: getattr(row, field) for field in PLATFORM_JSON_FIELDS}
+        changes = {}
+        for field, value in values.items():
+            try:
+                normalized = normalize_detail(value)
+            except ValueError as exc:
+                stats["invalid"] += 1
+                print(f"  ⚠️  {row.name}（ID {row.id}）的 {field} {exc}，保留原值")
+                continue
+            if normalized != value:
+                changes[field] = normalized
+        stats["normalized"] += len(changes)
+        stats["platforms"] += 1
+        if check_only:
+            continue
+
+        values.update(changes)
+        conn.execute(
+            update(table)
+            .where(table.c.id == row.id)
+            .values(**changes, details_json=build_details_json(values), updated_at=table.c.updated_at)
+        )
+    if not check_only:
+        conn.commit()
+    return stats
+
+
+def upgrade(check_only: bool = False):
+    """升级数据库：添加 details_json，规范化详情字段并回填"""
+    with engine.connect() as conn:
+        print("开始数据库迁移...")
+        if not check_only:
+            add_column(conn)
+
+        print("\n处理已有平台...")
+        stats = normalize(conn, check_only=check_only)
+        action = "检查" if check_only else "迁移"
+        print(
+            f"\n✅ 数据库{action}完成！共 {stats['platforms']} 个平台，"
+            f"规范化 {stats['normalized']} 个字段，{stats['invalid']} 个字段不是有效 JSON"
+        )
+
+
+def downgrade():
+    """降级数据库：删除新字段（SQLite不支持DROP COLUMN）"""
+    print("⚠️  警告：SQLite 不支持 DROP COLUMN 操作")
+    print("details_json 为空时详情页会现场生成，保留该字段不影响旧版本运行")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='平台详情字段迁移脚本')
+    parser.add_argument('--check', action='store_true', help='只检查详情字段，不写入')
+    parser.add_argument('--downgrade', action='store_true', help='回退迁移（警告：SQLite不支持）')
+    args = parser.parse_args()
+
+    if args.downgrade:
+        downgrade()
+    else:
+        upgrade(check_only=args.check)
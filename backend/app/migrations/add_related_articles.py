@@ -0,0 +1,56 @@
+"""
+添加相关文章表并计算
+
+这个迁移脚本创建 article_related 表，并为所有已发布文章计算相关文章。
+之后文章发布、修改、下线时由 Celery 任务增量更新（RELATED_ARTICLES_ENABLED=True），
+Celery Beat 每天全量重建一次；本脚本也可随时手动全量重建。
+
+执行方式：
+    python -m app.migrations.add_related_articles
+    python -m app.migrations.add_related_articles --downgrade   # 删除相关文章表
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database import SessionLocal, engine
+from app.models import RelatedArticle
+from app.services.related_articles import RelatedArticleService
+
+
+def upgrade():
+    """升级数据库：创建相关文章表并全量计算"""
+    print("开始数据库迁移...")
+    RelatedArticle.__table__.create(bind=engine, checkfirst=True)
+    print(f"✅ {RelatedArticle.__tablename__} 表已就绪")
+
+    print("\n计算相关文章...")
+    db = SessionLocal()
+    try:
+        stats = RelatedArticleService.rebuild_all(db)
+    finally:
+        db.close()
+    print(f"\n✅ 数据库迁移完成！共 {stats['articles']} 篇已发布文章，{stats['changed']} 篇的相关文章有更新")
+
+
+def downgrade():
+    """降级数据库：删除相关文章表"""
+    RelatedArticle.__table__.drop(bind=engine, checkfirst=True)
+    print(f"✅ {RelatedArticle.__tablename__} 表已删除")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='相关文章迁移脚本')
+    parser.add_argument('--downgrade', action='store_true', help='删除相关文章表')
+    args = parser.parse_args()
+
+    if args.downgrade:
+        downgrade()
+    else:
+        upgrade()
@@ -6,6 +6,8 @@ from app.models.platform import Platform
 from app.models.section import Section
 from app.models.category import Category
 from app.models.article import Article
+from app.models.related_article import RelatedArticle
+from app.models.content_counter import ContentCounter
 from app.models.ai_task import AIGenerationTask, TaskStatus
 from app.models.ai_config import AIConfig
 from app.models.website_settings import WebsiteSettings
@@ -17,6 +19,8 @@ __all__ = [
     "Section",
     "Category",
     "Article",
+    "RelatedArticle",
+    "ContentCounter",
     "AIGenerationTask",
     "TaskStatus",
     "AIConfig",
@@ -3,9 +3,11 @@
 """
 from __future__ import annotations
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, JSON, event, inspect
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.utils import article_search
+from app.utils.article_text import extract_derived_fields
 
 
 class Article(Base):
@@ -40,6 +42,13 @@ class Article(Base):
     view_count = Column(Integer, default=0)
     like_count = Column(Integer, default=0)
 
+    # 由正文派生，保存时计算（见文件末尾的保存钩子与 app/migrations/add_article_derived_fields.py）
+    plain_text = Column(Text, nullable=True)
+    auto_summary = Column(String(200), nullable=True)
+    image_urls = Column(JSON, nullable=True)  # 正文 <img src> 原始地址
+    word_count = Column(Integer, nullable=True)
+    reading_time = Column(Integer, nullable=True)  # 分钟
+
     created_at = Column(DateTime, default=lambda: datetime.now(timezone(timedelta(hours=8))).replace(tzinfo=None))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone(timedelta(hours=8))).replace(tzinfo=None), onupdate=lambda: datetime.now(timezone(timedelta(hours=8))).replace(tzinfo=None))
     published_at = Column(DateTime, nullable=True)
@@ -50,6 +59,19 @@ class Article(Base):
     category_obj = relationship("Category", back_populates="articles", foreign_keys=[category_id])
     platform = relationship("Platform", back_populates="articles")
 
+    # 组合索引（与 migrations/003_add_composite_indexes.sql 保持一致）
+    # 列顺序：等值过滤列在前，排序列在后，使过滤 + ORDER BY + LIMIT 可以直接走索引
+    __table_args__ = (
+        Index("idx_articles_section_published_created", "section_id", "is_published", "created_at"),
+        Index("idx_articles_category_published_created", "category_id", "is_published", "created_at"),
+        Index("idx_articles_platform_published_created", "platform_id", "is_published", "created_at"),
+        Index("idx_articles_author_created", "author_id", "created_at"),
+        Index("idx_articles_published_created", "is_published", "created_at"),
+        Index("idx_articles_created", "created_at"),
+        Index("idx_articles_published_likes_views", "is_published", "like_count", "view_count"),
+        Index("idx_articles_featured_published_likes", "is_featured", "is_published", "like_count"),
+    )
+
     def __repr__(self):
         return f"<Article(id={self.id}, title={self.title}, author_id={self.author_id})>"
 
@@ -63,3 +85,53 @@ class Article(Base):
         except Exception:
             pass
         return None
+
+    def refresh_derived_fields(self) -> None:
+        """由正文重新计算派生字段（纯文本、自动摘要、图片、字数、阅读时长）"""
+        for field, value in extract_derived_fields(self.content or "").items():
+            setattr(self, field, value)
+
+
+@event.listens_for(Article, "before_insert")
+def _article_before_insert(mapper, connection, target: Article) -> None:
+    target.refresh_derived_fields()
+
+
+@event.listens_for(Article, "before_update")
+def _article_before_update(mapper, connection, target: Article) -> None:
+    # 仅正文变化时重新计算（浏览量、发布状态等更新不解析正文）
+    if inspect(target).attrs.content.history.has_changes() or target.plain_text is None:
+        target.refresh_derived_fields()
+
+
+# 全文索引涉及的字段
+_SEARCH_FIELDS = ("title", "summary", "tags", "content")
+
+
+@event.listens_for(Article, "after_insert")
+def _article_after_insert(mapper, connection, target: Article) -> None:
+    article_search.index_article(connection, target)
+
+
+@event.listens_for(Article, "after_update")
+def _article_after_update(mapper, connection, target: Article) -> None:
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _SEARCH_FIELDS):
+        article_search.index_article(connection, target)
+
+
+@event.listens_for(Article, "after_delete")
+def _article_after_delete(mapper, connection, target: Article) -> None:
+    article_search.remove_article(connection, target.id)
+
+
+@event.listens_for(Article.__table__, "after_create")
+def _articles_after_create(table, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        article_search.create_index(connection)
+
+
+@event.listens_for(Article.__table__, "before_drop")
+def _articles_before_drop(table, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        article_search.drop_index(connection)
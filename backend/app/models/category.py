@@ -28,6 +28,8 @@ class Category(Base):
     __table_args__ = (
         Index("idx_category_section", "section_id"),
         Index("idx_category_active", "is_active"),
+        # 覆盖栏目下有效分类计数
+        Index("idx_category_section_active", "section_id", "is_active"),
     )
 
     def __repr__(self):
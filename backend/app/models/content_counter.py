@@ -0,0 +1,207 @@
+"""
+内容计数模型
+
+栏目 / 分类的文章数、栏目的分类数与全站统计保存在 content_counters 表中，由文章、分类、栏目、
+平台的保存钩子在同一事务内增量更新，读取时只需按主键查询，不再对 articles 逐个 COUNT。
+钩子覆盖不到的修改（批量 UPDATE、手工改库）由 ContentCounterService.reconcile 定期校正。
+
+计数键 (scope, scope_id, state)：
+- site / 0：published、draft（文章）、sections、categories、platforms（启用的栏目、分类、平台）
+- section / 栏目 ID：published、draft（文章）、categories（启用的分类）
+- category / 分类 ID：published、draft（文章）
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Column, Integer, String, DateTime, delete, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import Base
+from app.models.article import Article
+from app.models.category import Category
+from app.models.platform import Platform
+from app.models.section import Section
+
+SCOPE_SITE, SCOPE_SECTION, SCOPE_CATEGORY = "site", "section", "category"
+STATE_PUBLISHED, STATE_DRAFT = "published", "draft"
+STATE_SECTIONS, STATE_CATEGORIES, STATE_PLATFORMS = "sections", "categories", "platforms"
+
+CounterKey = Tuple[str, int, str]
+
+
+class ContentCounter(Base):
+    """内容计数"""
+    __tablename__ = "content_counters"
+
+    scope = Column(String(20), primary_key=True)
+    scope_id = Column(Integer, primary_key=True)  # 全站计数为 0
+    state = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ContentCounter({self.scope}:{self.scope_id}:{self.state}={self.count})>"
+
+
+def apply_deltas(connection, deltas: Counter) -> None:
+    """
+    在当前事务内累加计数（行不存在时插入）
+
+    Args:
+        connection: 数据库连接（保存钩子中为 flush 所在的连接）
+        deltas: {(scope, scope_id, state): 增量}
+    """
+    table = ContentCounter.__table__
+    now = datetime.utcnow()
+    for (scope, scope_id, state), delta in deltas.items():
+        if not delta:
+            continue
+        values = {"scope": scope, "scope_id": scope_id, "state": state, "count": delta, "updated_at": now}
+        dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(connection.dialect.name)
+        if dialect is not None:
+            statement = dialect.insert(table).values(**values)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.scope, table.c.scope_id, table.c.state],
+                set_={"count": table.c.count + statement.excluded.count, "updated_at": now},
+            ))
+            continue
+        result = connection.execute(
+            table.update()
+            .where(table.c.scope == scope, table.c.scope_id == scope_id, table.c.state == state)
+            .values(count=table.c.count + delta, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**values))
+
+
+def _old_value(target, attr: str):
+    """flush 前的字段值（字段已修改时取修改前的值）"""
+    history = inspect(target).attrs[attr].history
+    if not history.has_changes():
+        return getattr(target, attr)
+    return history.deleted[0] if history.deleted else None
+
+
+def _article_keys(section_id: Optional[int], category_id: Optional[int], is_published) -> Iterable[CounterKey]:
+    state = STATE_PUBLISHED if is_published else STATE_DRAFT
+    yield SCOPE_SITE, 0, state
+    if section_id:
+        yield SCOPE_SECTION, section_id, state
+    if category_id:
+        yield SCOPE_CATEGORY, category_id, state
+
+
+def _category_keys(section_id: Optional[int], is_active) -> Iterable[CounterKey]:
+    if is_active:
+        yield SCOPE_SITE, 0, STATE_CATEGORIES
+        if section_id:
+            yield SCOPE_SECTION, section_id, STATE_CATEGORIES
+
+
+def _move(connection, target, attrs: Tuple[str, ...], keys) -> None:
+    """字段变化时从旧的计数键减一、向新的计数键加一"""
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in attrs):
+        return
+    deltas = Counter()
+    deltas.subtract(keys(*(_old_value(target, attr) for attr in attrs)))
+    deltas.update(keys(*(getattr(target, attr) for attr in attrs)))
+    apply_deltas(connection, deltas)
+
+
+# 计数依赖的字段：修改时需要知道旧值（active_history 保证修改前加载旧值）
+_ARTICLE_FIELDS = ("section_id", "category_id", "is_published")
+_CATEGORY_FIELDS = ("section_id", "is_active")
+
+
+def _load_old_value(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+for _attribute in (
+    *(getattr(Article, field) for field in _ARTICLE_FIELDS),
+    *(getattr(Category, field) for field in _CATEGORY_FIELDS),
+    Section.is_active,
+    Platform.is_active,
+):
+    event.listen(_attribute, "set", _load_old_value, active_history=True)
+
+
+@event.listens_for(Article, "after_insert")
+def _article_after_insert(mapper, connection, target: Article) -> None:
+    apply_deltas(connection, Counter(_article_keys(target.section_id, target.category_id, target.is_published)))
+
+
+@event.listens_for(Article, "after_update")
+def _article_after_update(mapper, connection, target: Article) -> None:
+    _move(connection, target, _ARTICLE_FIELDS, _article_keys)
+
+
+@event.listens_for(Article, "after_delete")
+def _article_after_delete(mapper, connection, target: Article) -> None:
+    deltas = Counter()
+    deltas.subtract(_article_keys(*(_old_value(target, field) for field in _ARTICLE_FIELDS)))
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(Category, "after_insert")
+def _category_after_insert(mapper, connection, target: Category) -> None:
+    apply_deltas(connection, Counter(_category_keys(target.section_id, target.is_active)))
+
+
+@event.listens_for(Category, "after_update")
+def _category_after_update(mapper, connection, target: Category) -> None:
+    _move(connection, target, _CATEGORY_FIELDS, _category_keys)
+
+
+@event.listens_for(Category, "after_delete")
+def _category_after_delete(mapper, connection, target: Category) -> None:
+    deltas = Counter()
+    deltas.subtract(_category_keys(*(_old_value(target, field) for field in _CATEGORY_FIELDS)))
+    apply_deltas(connection, deltas)
+    table = ContentCounter.__table__
+    connection.execute(delete(table).where(table.c.scope == SCOPE_CATEGORY, table.c.scope_id == target.id))
+
+
+def _active_keys(state: str):
+    def keys(is_active) -> Iterable[CounterKey]:
+        if is_active:
+            yield SCOPE_SITE, 0, state
+    return keys
+
+
+@event.listens_for(Section, "after_insert")
+def _section_after_insert(mapper, connection, target: Section) -> None:
+    apply_deltas(connection, Counter(_active_keys(STATE_SECTIONS)(target.is_active)))
+
+
+@event.listens_for(Section, "after_update")
+def _section_after_update(mapper, connection, target: Section) -> None:
+    _move(connection, target, ("is_active",), _active_keys(STATE_SECTIONS))
+
+
+@event.listens_for(Section, "after_delete")
+def _section_after_delete(mapper, connection, target: Section) -> None:
+    deltas = Counter()
+    deltas.subtract(_active_keys(STATE_SECTIONS)(_old_value(target, "is_active")))
+    apply_deltas(connection, deltas)
+    table = ContentCounter.__table__
+    connection.execute(delete(table).where(table.c.scope == SCOPE_SECTION, table.c.scope_id == target.id))
+
+
+@event.listens_for(Platform, "after_insert")
+def _platform_after_insert(mapper, connection, target: Platform) -> None:
+    apply_deltas(connection, Counter(_active_keys(STATE_PLATFORMS)(target.is_active)))
+
+
+@event.listens_for(Platform, "after_update")
+def _platform_after_update(mapper, connection, target: Platform) -> None:
+    _move(connection, target, ("is_active",), _active_keys(STATE_PLATFORMS))
+
+
+@event.listens_for(Platform, "after_delete")
+def _platform_after_delete(mapper, connection, target: Platform) -> None:
+    deltas = Counter()
+    deltas.subtract(_active_keys(STATE_PLATFORMS)(_old_value(target, "is_active")))
+    apply_deltas(connection, deltas)
@@ -66,6 +66,15 @@ class MarginDetail(Base):
     
     __table_args__ = (
         Index('ix_margin_detail_date_code', 'trade_date', 'ts_code', unique=True),
+        # 个股历史：ts_code 等值 + trade_date 范围/排序
+        Index('ix_margin_detail_code_date', 'ts_code', 'trade_date'),
+        # 排行榜：trade_date 等值 + 指标倒序 LIMIT
+        Index('ix_margin_detail_date_rzye', 'trade_date', 'rzye'),
+        Index('ix_margin_detail_date_rqye', 'trade_date', 'rqye'),
+        Index('ix_margin_detail_date_rzmre', 'trade_date', 'rzmre'),
+        Index('ix_margin_detail_date_rqyl', 'trade_date', 'rqyl'),
+        Index('ix_margin_detail_date_rqmcl', 'trade_date', 'rqmcl'),
+        Index('ix_margin_detail_date_net_buy', 'trade_date', (rzmre - rzche)),
     )
     
     def __repr__(self):
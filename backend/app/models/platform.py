@@ -2,9 +2,10 @@
 交易平台模型
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, event, inspect
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.utils.platform_details import PLATFORM_JSON_FIELDS, build_details_json
 
 
 class Platform(Base):
@@ -77,6 +78,10 @@ class Platform(Base):
     safety_info = Column(Text, nullable=True)     # 安全信息
     top_badges = Column(Text, nullable=True)      # 顶部徽章
 
+    # 详情字段解码后的紧凑 JSON 对象，保存时生成，详情页直接嵌入
+    # （见文件末尾的保存钩子与 app/migrations/add_platform_details_json.py）
+    details_json = Column(Text, nullable=True)
+
     # 状态
     is_active = Column(Boolean, default=True, index=True)
     is_featured = Column(Boolean, default=False)
@@ -89,3 +94,20 @@ class Platform(Base):
 
     def __repr__(self):
         return f"<Platform(id={self.id}, name={self.name}, rank={self.rank})>"
+
+    def refresh_details_json(self) -> None:
+        """由详情字段重新生成 details_json"""
+        self.details_json = build_details_json({field: getattr(self, field) for field in PLATFORM_JSON_FIELDS})
+
+
+@event.listens_for(Platform, "before_insert")
+def _platform_before_insert(mapper, connection, target: Platform) -> None:
+    target.refresh_details_json()
+
+
+@event.listens_for(Platform, "before_update")
+def _platform_before_update(mapper, connection, target: Platform) -> None:
+    # 仅详情字段变化时重新生成（排名、状态等更新不处理详情）
+    state = inspect(target)
+    if target.details_json is None or any(state.attrs[field].history.has_changes() for field in PLATFORM_JSON_FIELDS):
+        target.refresh_details_json()
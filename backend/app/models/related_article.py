@@ -0,0 +1,26 @@
+"""
+相关文章模型
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from app.database import Base
+
+
+class RelatedArticle(Base):
+    """相关文章 - 由后台任务按 TF-IDF 相似度预先计算（同栏目或同平台的已发布文章）"""
+    __tablename__ = "article_related"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    related_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, nullable=False)     # 1 为最相关
+    score = Column(Float, nullable=False)      # 余弦相似度
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # 详情页按 article_id + rank 读取；文章下线时按 related_id 找出引用它的文章
+        Index("idx_article_related_article_rank", "article_id", "rank"),
+        Index("idx_article_related_related", "related_id"),
+    )
+
+    def __repr__(self):
+        return f"<RelatedArticle(article_id={self.article_id}, related_id={self.related_id}, rank={self.rank})>"
@@ -42,5 +42,29 @@ class WebsiteSettings(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    def to_dict(self) -> dict:
+        """转换为字典（日期格式化为 ISO 格式）"""
+        return {
+            "id": self.id,
+            "site_title": self.site_title,
+            "site_description": self.site_description,
+            "site_keywords": self.site_keywords,
+            "site_name": self.site_name,
+            "site_author": self.site_author,
+            "site_favicon": self.site_favicon,
+            "site_logo": self.site_logo,
+            "google_analytics": self.google_analytics,
+            "baidu_analytics": self.baidu_analytics,
+            "custom_scripts": self.custom_scripts,
+            "icp_number": self.icp_number,
+            "company_name": self.company_name,
+            "company_address": self.company_address,
+            "contact_phone": self.contact_phone,
+            "contact_email": self.contact_email,
+            "footer_links": self.footer_links,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
     def __repr__(self):
         return f"<WebsiteSettings(id={self.id}, site_name={self.site_name})>"
@@ -7,10 +7,11 @@
 - 标准化的响应格式 (使用 app.schemas.response)
 - 清晰的错误消息
 """
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from fastapi.responses import FileResponse, HTMLResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, get_async_db
 from app.models import AdminUser, Article, Section
 from app.routes.auth import get_current_user
 from app.services.article_service import ArticleService
@@ -19,18 +20,52 @@ from app.schemas.article import (
     ArticleUpdate,
     ArticleResponse,
     ArticleListResponse,
+    ArticleListEntry,
+    ArticleListItem,
+    RelatedArticleItem,
 )
+from app.services.related_articles import RelatedArticleService
 from app.utils.exceptions import (
     ResourceNotFound,
     ValidationError,
     raise_resource_not_found,
 )
+from app.utils.cache import cached
+from app.utils.pagination import TOTAL_EXACT, TOTAL_NONE, InvalidCursor, Keyset
 from typing import Optional
 import os
 
 router = APIRouter(prefix="/api/articles", tags=["articles"])
 
 
+def _article_response(article: Article) -> ArticleResponse:
+    """文章响应：浏览量、点赞数叠加计数缓冲中尚未落库的增量"""
+    response = ArticleResponse.model_validate(article)
+    response.view_count, response.like_count = ArticleService.get_display_counts(article)
+    return response
+
+
+FIELDS_DESCRIPTION = (
+    "返回字段：为空时返回完整文章（含正文）；list 返回列表项字段（不含正文）；"
+    "也可以逗号分隔指定列表项字段，如 id,title,slug,summary,published_at"
+)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[list[str]]:
+    """解析 fields 参数，未知字段返回 400"""
+    try:
+        return ArticleService.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _article_entries(articles: list[Article], fields: Optional[list[str]]) -> list:
+    """列表接口的文章项：完整文章或只含所选字段的列表项"""
+    if fields is None:
+        return [_article_response(a) for a in articles]
+    return [ArticleListItem.model_validate(ArticleService.to_list_item(a, fields)) for a in articles]
+
+
 @router.get(
     "",
     response_model=ArticleListResponse,
@@ -62,13 +97,15 @@ router = APIRouter(prefix="/api/articles", tags=["articles"])
                         ],
                         "total": 150,
                         "skip": 0,
-                        "limit": 10
+                        "limit": 10,
+                        "next_cursor": "eyJrIjoiY3JlYXRlZF9hdCxpZDpkZXNjIiwidiI6WyIyMDI1LTExLTAxVDEwOjAwOjAwIiwxXX0"
                     }
                 }
             }
         }
     }
 )
+@cached(prefix="articles-list", ttl=120, tags=["articles"])
 async def list_articles(
     skip: int = Query(0, ge=0, description="跳过的记录数"),
     limit: int = Query(10, ge=1, le=100, description="每页记录数，最多 100"),
@@ -78,9 +115,16 @@ async def list_articles(
     author_id: Optional[int] = Query(None, description="作者 ID 过滤"),
     is_published: Optional[bool] = Query(None, description="发布状态：true/false/null(全部)"),
     is_featured: Optional[bool] = Query(None, description="精选状态：true/false/null(全部)"),
-    sort_by: str = Query("created_at", description="排序字段：created_at, updated_at, published_at, title, view_count, like_count"),
+    sort_by: str = Query("created_at", description="排序字段：created_at, updated_at, published_at, title, view_count, like_count, relevance（搜索相关度）"),
     sort_order: str = Query("desc", description="排序顺序：asc(升序) 或 desc(降序)"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="游标：上一页返回的 next_cursor，传入时忽略 skip"),
+    total: Optional[str] = Query(
+        None,
+        pattern="^(exact|estimate|none)$",
+        description="总数：exact（精确）/ estimate（缓存的近似值）/ none（不计算）；默认无游标时 exact、有游标时 none",
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取文章列表
@@ -90,31 +134,44 @@ async def list_articles(
     - **分类过滤**: 按分类ID过滤
     - **平台过滤**: 按平台过滤
     - **排序**: 按多个字段排序
-    - **分页**: 支持分页查询
+    - **分页**: 支持 skip 偏移分页与游标分页（响应中的 next_cursor 作为下一页的 cursor，深翻页不变慢）
+    - **字段**: fields=list 只返回列表页所需字段，不读取也不返回正文
     
     示例:
     ```
     GET /api/articles?search=bitcoin&category_id=5&sort_by=like_count&sort_order=desc&limit=20
+    GET /api/articles?is_published=true&limit=20&cursor=<上一页的 next_cursor>
+    GET /api/articles?is_published=true&limit=20&fields=id,title,slug,summary,published_at
     ```
     """
-    articles, total = ArticleService.get_articles(
-        db,
-        skip=skip,
-        limit=limit,
-        search=search,
-        category_id=category_id,
-        platform_id=platform_id,
-        author_id=author_id,
-        is_published=is_published,
-        is_featured=is_featured,
-        sort_by=sort_by,
-        sort_order=sort_order,
-    )
-
-    article_responses = [ArticleResponse.model_validate(a) for a in articles]
-    return ArticleListResponse(
-        data=article_responses, total=total, skip=skip, limit=limit
-    )
+    total_mode = total or (TOTAL_NONE if cursor else TOTAL_EXACT)
+    field_names = _parse_fields(fields)
+
+    def _query(session: Session) -> ArticleListResponse:
+        try:
+            page = ArticleService.get_articles_page(
+                session,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                total=total_mode,
+                fields=field_names,
+                search=search,
+                category_id=category_id,
+                platform_id=platform_id,
+                author_id=author_id,
+                is_published=is_published,
+                is_featured=is_featured,
+                sort_by=sort_by,
+                sort_order=sort_order,
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ArticleListResponse(
+            data=_article_entries(page.items, field_names), total=page.total, skip=skip, limit=limit, next_cursor=page.next_cursor
+        )
+
+    return await db.run_sync(_query)
 
 
 @router.post("", response_model=ArticleResponse, status_code=201)
@@ -168,7 +225,7 @@ async def create_article(
             article_data,
             author_id=current_user.id,
         )
-        return ArticleResponse.model_validate(article)
+        return _article_response(article)
     except HTTPException:
         raise
     except ValueError as e:
@@ -178,12 +235,12 @@ async def create_article(
 @router.get("/{article_id}", response_model=ArticleResponse)
 async def get_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     获取单个文章信息
     
-    自动增加文章的浏览量。
+    自动增加文章的浏览量（读取走只读会话，浏览量写入计数缓冲后批量落库）。
     
     Args:
         article_id: 文章 ID
@@ -193,10 +250,12 @@ async def get_article(
     GET /api/articles/1
     ```
     """
-    article = ArticleService.get_article(db, article_id)
+    article = ArticleService.get_article(db, article_id, increment_view=False)
     if not article:
         raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
-    return ArticleResponse.model_validate(article)
+    ArticleService.increment_view_count(article.id)
+    
+    return _article_response(article)
 
 
 @router.put("/{article_id}", response_model=ArticleResponse)
@@ -224,7 +283,7 @@ async def update_article(
         article = ArticleService.update_article(db, article_id, article_data)
         if not article:
             raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
-        return ArticleResponse.model_validate(article)
+        return _article_response(article)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -260,7 +319,7 @@ async def publish_article(
     article = ArticleService.publish_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
-    return ArticleResponse.model_validate(article)
+    return _article_response(article)
 
 
 @router.post("/{article_id}/unpublish", response_model=ArticleResponse)
@@ -277,7 +336,7 @@ async def unpublish_article(
     article = ArticleService.unpublish_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
-    return ArticleResponse.model_validate(article)
+    return _article_response(article)
 
 
 @router.post("/{article_id}/toggle-featured", response_model=ArticleResponse)
@@ -294,49 +353,102 @@ async def toggle_featured_article(
     article = ArticleService.toggle_featured(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
-    return ArticleResponse.model_validate(article)
+    return _article_response(article)
 
 
 @router.post("/{article_id}/like", response_model=ArticleResponse)
 async def like_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     点赞文章
     
-    增加文章的点赞数（不需要认证）。
+    增加文章的点赞数（不需要认证）。点赞数写入计数缓冲后批量落库。
     """
     article = ArticleService.like_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
-    return ArticleResponse.model_validate(article)
+    return _article_response(article)
+
+
+@router.post("/{article_id}/view", status_code=204)
+async def record_article_view(
+    article_id: int,
+    db: Session = Depends(get_read_db),
+):
+    """
+    上报文章浏览
+
+    静态导出的文章页由 nginx 直接返回，页面通过该接口上报浏览量（不需要认证）。
+    """
+    exists = db.query(Article.id).filter(Article.id == article_id, Article.is_published == True).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
+    ArticleService.increment_view_count(article_id)
+    return None
+
+
+@router.get("/{article_id}/related", response_model=list[RelatedArticleItem])
+@cached(
+    prefix="articles-related",
+    ttl=600,
+    tags=lambda article_id, **_: [f"article:{article_id}", f"related:{article_id}"],
+)
+async def get_related_articles(
+    article_id: int,
+    limit: int = Query(6, ge=1, le=20, description="最大返回数"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    获取相关文章
+
+    返回后台任务预先计算的同栏目或同平台相似文章（按相似度排序），请求时不做计算。
+
+    示例:
+    ```
+    GET /api/articles/1/related?limit=5
+    ```
+    """
+    def _query(session: Session) -> list[RelatedArticleItem]:
+        exists = session.query(Article.id).filter(Article.id == article_id, Article.is_published == True).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail=f"文章 ID {article_id} 不存在")
+        articles = RelatedArticleService.get_related(session, article_id, limit)
+        return [RelatedArticleItem(**item) for item in RelatedArticleService.to_items(articles)]
+
+    return await db.run_sync(_query)
 
 
 @router.get("/search/by-keyword", response_model=list[ArticleResponse])
 async def search_articles(
     keyword: str = Query(..., min_length=1, description="搜索关键词"),
     limit: int = Query(20, ge=1, le=100, description="最大返回数"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     搜索已发布的文章
     
-    按关键词搜索标题、内容、摘要和标签。
+    按关键词全文检索标题、内容、摘要和标签，按相关度排序（标题命中优先）。
     
     示例:
     ```
     GET /api/articles/search/by-keyword?keyword=bitcoin&limit=30
     ```
     """
-    articles = ArticleService.search_articles(db, keyword, limit)
-    return [ArticleResponse.model_validate(a) for a in articles]
+    def _query(session: Session) -> list[ArticleResponse]:
+        articles = ArticleService.search_articles(session, keyword, limit)
+        return [_article_response(a) for a in articles]
 
+    return await db.run_sync(_query)
 
-@router.get("/featured/list", response_model=list[ArticleResponse])
+
+@router.get("/featured/list", response_model=list[ArticleListEntry])
+@cached(prefix="articles-featured", ttl=120, tags=["articles"])
 async def get_featured_articles(
     limit: int = Query(5, ge=1, le=20, description="最大返回数"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取精选文章列表
@@ -346,16 +458,24 @@ async def get_featured_articles(
     示例:
     ```
     GET /api/articles/featured/list?limit=10
+    GET /api/articles/featured/list?limit=10&fields=list
     ```
     """
-    articles = ArticleService.get_featured_articles(db, limit)
-    return [ArticleResponse.model_validate(a) for a in articles]
+    field_names = _parse_fields(fields)
 
+    def _query(session: Session) -> list:
+        articles = ArticleService.get_featured_articles(session, limit, fields=field_names)
+        return _article_entries(articles, field_names)
 
-@router.get("/trending/list", response_model=list[ArticleResponse])
+    return await db.run_sync(_query)
+
+
+@router.get("/trending/list", response_model=list[ArticleListEntry])
+@cached(prefix="articles-trending", ttl=120, tags=["articles"])
 async def get_trending_articles(
     limit: int = Query(10, ge=1, le=50, description="最大返回数"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取热门文章列表
@@ -365,17 +485,23 @@ async def get_trending_articles(
     示例:
     ```
     GET /api/articles/trending/list?limit=20
+    GET /api/articles/trending/list?limit=20&fields=list
     ```
     """
-    articles = ArticleService.get_trending_articles(db, limit)
-    return [ArticleResponse.model_validate(a) for a in articles]
+    field_names = _parse_fields(fields)
+
+    def _query(session: Session) -> list:
+        articles = ArticleService.get_trending_articles(session, limit, fields=field_names)
+        return _article_entries(articles, field_names)
+
+    return await db.run_sync(_query)
 
 
 @router.get("/by-platform/{platform_id}", response_model=list[ArticleResponse])
 async def get_articles_by_platform(
     platform_id: int,
     limit: int = Query(10, ge=1, le=100, description="最大返回数"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取特定平台的文章
@@ -385,15 +511,18 @@ async def get_articles_by_platform(
     GET /api/articles/by-platform/1?limit=20
     ```
     """
-    articles = ArticleService.get_articles_by_platform(db, platform_id, limit=limit)
-    return [ArticleResponse.model_validate(a) for a in articles]
+    def _query(session: Session) -> list[ArticleResponse]:
+        articles = ArticleService.get_articles_by_platform(session, platform_id, limit=limit)
+        return [_article_response(a) for a in articles]
+
+    return await db.run_sync(_query)
 
 
 @router.get("/by-author/{author_id}", response_model=list[ArticleResponse])
 async def get_articles_by_author(
     author_id: int,
     limit: int = Query(10, ge=1, le=100, description="最大返回数"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取作者发布的文章
@@ -403,14 +532,17 @@ async def get_articles_by_author(
     GET /api/articles/by-author/1?limit=20
     ```
     """
-    articles = ArticleService.get_articles_by_author(db, author_id, limit=limit)
-    return [ArticleResponse.model_validate(a) for a in articles]
+    def _query(session: Session) -> list[ArticleResponse]:
+        articles = ArticleService.get_articles_by_author(session, author_id, limit=limit)
+        return [_article_response(a) for a in articles]
+
+    return await db.run_sync(_query)
 
 
 @router.get("/by-slug/{slug}", response_model=ArticleResponse)
 async def get_article_by_slug(
     slug: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     通过 slug 获取单篇已发布文章（用于前端 SEO 友好的 URL）
@@ -429,47 +561,59 @@ async def get_article_by_slug(
         raise HTTPException(status_code=404, detail="文章不存在")
     
     # 增加浏览量
-    article.view_count = (article.view_count or 0) + 1
-    db.commit()
-    db.refresh(article)
+    ArticleService.increment_view_count(article.id)
     
-    return ArticleResponse.model_validate(article)
+    return _article_response(article)
 
 
-@router.get("/by-section/{section_slug}", response_model=list[ArticleResponse])
+@router.get("/by-section/{section_slug}", response_model=list[ArticleListEntry])
 async def get_articles_by_section(
     section_slug: str,
+    response: Response,
     limit: int = Query(100, ge=1, le=500, description="最大返回数"),
     skip: int = Query(0, ge=0, description="跳过数量"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="游标：上一页响应头 X-Next-Cursor 的值，传入时忽略 skip"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     按栏目获取发布的文章（用于前端页面动态加载）
     
+    还有更多文章时，响应头 X-Next-Cursor 给出下一页的游标（无限滚动时用它代替 skip，深翻页不变慢）。
+    
     示例:
     ```
     GET /api/articles/by-section/wiki?limit=50
     GET /api/articles/by-section/faq?limit=20
+    GET /api/articles/by-section/wiki?limit=50&cursor=<X-Next-Cursor>
+    GET /api/articles/by-section/faq?limit=20&fields=list
     ```
     
     支持的 section_slug: wiki, faq, guide, review
     """
-    from sqlalchemy.orm import joinedload
+    field_names = _parse_fields(fields)
+    keyset = Keyset(Article.created_at, Article.id)
     
-    # 查询栏目
-    section = db.query(Section).filter(Section.slug == section_slug).first()
-    if not section:
-        return []
-    
-    # 查询该栏目下已发布的文章
-    articles = db.query(Article).filter(
-        Article.section_id == section.id,
-        Article.is_published == True
-    ).options(
-        joinedload(Article.section),
-        joinedload(Article.category_obj)
-    ).order_by(
-        Article.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    return [ArticleResponse.model_validate(a) for a in articles]
+    def _query(session: Session) -> list:
+        # 查询栏目
+        section = session.query(Section).filter(Section.slug == section_slug).first()
+        if not section:
+            return []
+        
+        # 查询该栏目下已发布的文章
+        query = session.query(Article).filter(
+            Article.section_id == section.id,
+            Article.is_published == True
+        ).options(
+            *ArticleService.list_load_options(field_names, *keyset.columns)
+        )
+        try:
+            page = keyset.paginate(query, limit, cursor=cursor, skip=skip)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        
+        return _article_entries(page.items, field_names)
+
+    return await db.run_sync(_query)
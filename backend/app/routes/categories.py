@@ -4,10 +4,14 @@
 from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
-from app.models import Category, Section, Article
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.database import get_db, get_async_db
+from app.models import Category, Section
+from app.models.content_counter import SCOPE_CATEGORY, STATE_PUBLISHED
 from app.routes.auth import get_current_user
+from app.services.content_counters import ContentCounterService
+from app.utils.cache import invalidate_tags
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
@@ -57,12 +61,16 @@ class CategoryWithCountResponse(BaseModel):
 
 @router.get("", response_model=list[CategoryResponse])
 async def list_all_categories(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """列出所有分类"""
-    categories = db.query(Category).filter(
-        Category.is_active == True
-    ).order_by(Category.sort_order).all()
+    categories = (
+        await db.execute(
+            select(Category).where(
+                Category.is_active == True
+            ).order_by(Category.sort_order)
+        )
+    ).scalars().all()
 
     return [CategoryResponse.model_validate(c) for c in categories]
 
@@ -70,51 +78,54 @@ async def list_all_categories(
 @router.get("/section/{section_id}/with-count", response_model=list[CategoryWithCountResponse])
 async def list_categories_with_article_count(
     section_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取某个栏目的分类及其文章数"""
-    section = db.query(Section).filter(Section.id == section_id).first()
+    section = await db.get(Section, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="栏目不存在")
 
-    categories = db.query(Category).filter(
-        Category.section_id == section_id,
-        Category.is_active == True
-    ).order_by(Category.sort_order).all()
-
-    result = []
-    for category in categories:
-        # 统计该分类下的文章数
-        article_count = db.query(func.count(Article.id)).filter(
-            Article.category_id == category.id,
-            Article.is_published == True
-        ).scalar() or 0
-        
-        result.append(CategoryWithCountResponse(
+    # 文章数读取计数表（一次查询），不再对每个分类 COUNT
+    article_count = ContentCounterService.count_column(SCOPE_CATEGORY, STATE_PUBLISHED, Category.id)
+    rows = (
+        await db.execute(
+            select(Category, article_count).where(
+                Category.section_id == section_id,
+                Category.is_active == True
+            ).order_by(Category.sort_order)
+        )
+    ).all()
+
+    return [
+        CategoryWithCountResponse(
             id=category.id,
             name=category.name,
             description=category.description,
-            article_count=article_count,
+            article_count=count,
             sort_order=category.sort_order
-        ))
-
-    return result
+        )
+        for category, count in rows
+    ]
 
 
 @router.get("/section/{section_id}", response_model=list[CategoryResponse])
 async def list_categories_by_section(
     section_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取某个栏目的所有分类"""
-    section = db.query(Section).filter(Section.id == section_id).first()
+    section = await db.get(Section, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="栏目不存在")
 
-    categories = db.query(Category).filter(
-        Category.section_id == section_id,
-        Category.is_active == True
-    ).order_by(Category.sort_order).all()
+    categories = (
+        await db.execute(
+            select(Category).where(
+                Category.section_id == section_id,
+                Category.is_active == True
+            ).order_by(Category.sort_order)
+        )
+    ).scalars().all()
 
     return [CategoryResponse.model_validate(c) for c in categories]
 
@@ -142,6 +153,7 @@ async def create_category(
     category = Category(**category_data.dict())
     db.add(category)
     db.commit()
+    invalidate_tags("sections")
     db.refresh(category)
 
     return CategoryResponse.model_validate(category)
@@ -150,10 +162,10 @@ async def create_category(
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取单个分类"""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="分类不存在")
 
@@ -177,6 +189,7 @@ async def update_category(
         setattr(category, field, value)
 
     db.commit()
+    invalidate_tags("sections")
     db.refresh(category)
 
     return CategoryResponse.model_validate(category)
@@ -195,5 +208,6 @@ async def delete_category(
 
     db.delete(category)
     db.commit()
+    invalidate_tags("sections")
 
     return {"message": "分类已删除"}
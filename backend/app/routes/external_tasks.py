@@ -590,18 +590,19 @@ async def get_content_stats(
     """
     获取内容统计
     
-    返回文章、平台等数量统计。
+    返回文章、平台等数量统计（读取增量维护的内容计数表）。
     """
-    from app.models import Article, Platform, Section, Category
+    from app.services.content_counters import ContentCounterService
     
+    counts = ContentCounterService.site_stats(db)
     return {
         "stats": {
-            "articles_total": db.query(Article).count(),
-            "articles_published": db.query(Article).filter(Article.is_published == True).count(),
-            "articles_draft": db.query(Article).filter(Article.is_published == False).count(),
-            "platforms": db.query(Platform).filter(Platform.is_active == True).count(),
-            "sections": db.query(Section).filter(Section.is_active == True).count(),
-            "categories": db.query(Category).filter(Category.is_active == True).count()
+            "articles_total": counts["published"] + counts["draft"],
+            "articles_published": counts["published"],
+            "articles_draft": counts["draft"],
+            "platforms": counts["platforms"],
+            "sections": counts["sections"],
+            "categories": counts["categories"]
         },
         "timestamp": datetime.now().isoformat()
     }
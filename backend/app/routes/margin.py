@@ -3,10 +3,11 @@
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.routes.auth import get_current_user
 from app.services.tushare_service import TushareService, MarginDataService
 from app.schemas.margin import (
@@ -22,80 +23,39 @@ from app.schemas.margin import (
     MarginOverviewResponse,
     SyncResultResponse,
 )
-from app.models.margin import MarginSummary, MarginDetail
+from app.models.margin import MarginDetail
+from app.utils.cache import cached
 
 router = APIRouter(prefix="/api/margin", tags=["两融数据"])
 
 
 @router.get("/overview", response_model=MarginOverviewResponse)
-async def get_margin_overview(db: Session = Depends(get_db)):
+@cached(prefix="margin-overview", ttl=3600, tags=["margin"])
+async def get_margin_overview(db: AsyncSession = Depends(get_async_db)):
     """
     获取两融数据总览
     
     返回最新交易日的市场汇总数据和变化率
     """
-    service = MarginDataService(db)
-    
-    # 获取最新数据
-    latest_summaries = service.get_latest_summary()
-    if not latest_summaries:
+    overview = await db.run_sync(lambda session: MarginDataService(session).get_overview())
+    if overview is None:
         raise HTTPException(status_code=404, detail="暂无两融数据，请先同步数据")
-    
-    trade_date = latest_summaries[0]["trade_date"]
-    
-    # 计算汇总
-    total_rzye = sum(s["rzye"] for s in latest_summaries)
-    total_rqye = sum(s["rqye"] for s in latest_summaries)
-    total_rzrqye = sum(s["rzrqye"] for s in latest_summaries)
-    
-    # 获取前一交易日数据计算变化率
-    current_date = datetime.strptime(trade_date, '%Y-%m-%d').date()
-    
-    # 查找最近的前一个交易日
-    prev_record = db.query(MarginSummary).filter(
-        MarginSummary.trade_date < current_date
-    ).order_by(MarginSummary.trade_date.desc()).first()
-    
-    if prev_record:
-        prev_date = prev_record.trade_date
-        prev_summaries = db.query(MarginSummary).filter(
-            MarginSummary.trade_date == prev_date
-        ).all()
-        
-        prev_rzye = sum(s.rzye for s in prev_summaries)
-        prev_rqye = sum(s.rqye for s in prev_summaries)
-        prev_rzrqye = sum(s.rzrqye for s in prev_summaries)
-        
-        rzye_change = ((total_rzye - prev_rzye) / prev_rzye * 100) if prev_rzye else 0
-        rqye_change = ((total_rqye - prev_rqye) / prev_rqye * 100) if prev_rqye else 0
-        rzrqye_change = ((total_rzrqye - prev_rzrqye) / prev_rzrqye * 100) if prev_rzrqye else 0
-    else:
-        rzye_change = rqye_change = rzrqye_change = 0.0
-    
-    return MarginOverviewResponse(
-        trade_date=trade_date,
-        total_rzye=total_rzye,
-        total_rqye=total_rqye,
-        total_rzrqye=total_rzrqye,
-        rzye_change=round(rzye_change, 2),
-        rqye_change=round(rqye_change, 2),
-        rzrqye_change=round(rzrqye_change, 2),
-        exchanges=[MarginSummaryResponse(**s) for s in latest_summaries]
-    )
+    return MarginOverviewResponse(**overview)
 
 
 @router.get("/summary", response_model=List[MarginSummaryResponse])
-async def get_margin_summary(db: Session = Depends(get_db)):
+@cached(prefix="margin-summary", ttl=3600, tags=["margin"])
+async def get_margin_summary(db: AsyncSession = Depends(get_async_db)):
     """获取最新市场汇总数据"""
-    service = MarginDataService(db)
-    summaries = service.get_latest_summary()
+    summaries = await db.run_sync(lambda session: MarginDataService(session).get_latest_summary())
     return [MarginSummaryResponse(**s) for s in summaries]
 
 
 @router.get("/trend", response_model=MarginTrendResponse)
+@cached(prefix="margin-trend", ttl=3600, tags=["margin"])
 async def get_margin_trend(
     days: int = Query(30, ge=7, le=365, description="天数"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取两融趋势数据
@@ -103,8 +63,9 @@ async def get_margin_trend(
     Args:
         days: 获取最近多少天的数据 (7-365)
     """
-    service = MarginDataService(db)
-    trend_data = service.get_summary_trend(days=days)
+    trend_data = await db.run_sync(
+        lambda session: MarginDataService(session).get_summary_trend(days=days)
+    )
     
     return MarginTrendResponse(
         data=[MarginTrendItem(**item) for item in trend_data],
@@ -113,11 +74,12 @@ async def get_margin_trend(
 
 
 @router.get("/ranking", response_model=MarginRankingResponse)
+@cached(prefix="margin-ranking", ttl=3600, tags=["margin"])
 async def get_margin_ranking(
     order_by: str = Query("rzye", description="排序字段: rzye, rqye, rzmre, rqyl, rqmcl, net_buy"),
     limit: int = Query(20, ge=1, le=100, description="返回数量"),
     trade_date: Optional[str] = Query(None, description="交易日期 YYYY-MM-DD"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取两融排行榜
@@ -140,8 +102,11 @@ async def get_margin_ranking(
             detail=f"无效的排序字段，可选: {', '.join(valid_order_fields)}"
         )
     
-    service = MarginDataService(db)
-    stocks = service.get_top_stocks(order_by=order_by, limit=limit, trade_date=trade_date)
+    stocks = await db.run_sync(
+        lambda session: MarginDataService(session).get_top_stocks(
+            order_by=order_by, limit=limit, trade_date=trade_date
+        )
+    )
     
     actual_date = stocks[0]["trade_date"] if stocks else trade_date
     
@@ -153,10 +118,11 @@ async def get_margin_ranking(
 
 
 @router.get("/stock/{ts_code}", response_model=MarginStockHistoryResponse)
+@cached(prefix="margin-stock", ttl=3600, tags=["margin"])
 async def get_stock_margin_history(
     ts_code: str,
     days: int = Query(90, ge=7, le=365, description="历史天数"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取个股两融历史数据
@@ -177,39 +143,47 @@ async def get_stock_margin_history(
     
     ts_code = ts_code.upper()
     
-    service = MarginDataService(db)
-    history = service.get_stock_margin_history(ts_code=ts_code, days=days)
+    def _query(session: Session):
+        history = MarginDataService(session).get_stock_margin_history(ts_code=ts_code, days=days)
+        if not history:
+            return history, None
+        
+        # 获取股票名称
+        latest = session.query(MarginDetail).filter(
+            MarginDetail.ts_code == ts_code
+        ).order_by(MarginDetail.trade_date.desc()).first()
+        return history, latest.name if latest else None
+    
+    history, name = await db.run_sync(_query)
     
     if not history:
         raise HTTPException(status_code=404, detail=f"未找到股票 {ts_code} 的两融数据")
     
-    # 获取股票名称
-    latest = db.query(MarginDetail).filter(
-        MarginDetail.ts_code == ts_code
-    ).order_by(MarginDetail.trade_date.desc()).first()
-    
     return MarginStockHistoryResponse(
         ts_code=ts_code,
-        name=latest.name if latest else None,
+        name=name,
         data=[MarginHistoryItem(**h) for h in history]
     )
 
 
 @router.get("/search", response_model=MarginSearchResponse)
 async def search_margin_stocks(
-    keyword: str = Query(..., min_length=1, description="搜索关键词（股票代码或名称）"),
+    keyword: str = Query(..., min_length=1, description="搜索关键词（股票代码、名称或拼音首字母）"),
     limit: int = Query(20, ge=1, le=50, description="返回数量"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     搜索两融标的
     
+    由内存索引直接返回（不按关键词缓存响应），结果按匹配程度和融资余额排序。
+    
     Args:
-        keyword: 股票代码或名称关键词
+        keyword: 股票代码、名称或拼音首字母（如 gzmt）
         limit: 返回数量
     """
-    service = MarginDataService(db)
-    stocks = service.search_stocks(keyword=keyword, limit=limit)
+    stocks = await db.run_sync(
+        lambda session: MarginDataService(session).search_stocks(keyword=keyword, limit=limit)
+    )
     
     return MarginSearchResponse(
         keyword=keyword,
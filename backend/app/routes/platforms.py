@@ -9,7 +9,8 @@
 """
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models import AdminUser
 from app.routes.auth import get_current_user
 from app.services.platform_service import PlatformService
@@ -25,12 +26,14 @@ from app.utils.exceptions import (
     raise_resource_not_found,
 )
 from app.schemas.response import ListResponse, success_response, list_response
+from app.utils.cache import cached
 from typing import Optional
 
 router = APIRouter(prefix="/api/platforms", tags=["platforms"])
 
 
 @router.get("", response_model=PlatformListResponse)
+@cached(prefix="platforms-list", ttl=600, tags=["platforms"])
 async def list_platforms(
     skip: int = Query(0, ge=0, description="跳过的记录数"),
     limit: int = Query(10, ge=1, le=100, description="每页记录数"),
@@ -39,7 +42,7 @@ async def list_platforms(
     sort_order: str = Query("asc", description="排序顺序: asc, desc"),
     is_active: Optional[bool] = Query(None, description="过滤活跃平台"),
     is_featured: Optional[bool] = Query(None, description="过滤精选平台"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取平台列表
@@ -55,21 +58,23 @@ async def list_platforms(
     GET /api/platforms?search=binance&sort_by=rank&sort_order=asc&limit=20
     ```
     """
-    platforms, total = PlatformService.get_platforms(
-        db,
-        skip=skip,
-        limit=limit,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        is_active=is_active,
-        is_featured=is_featured,
-    )
+    def _query(session: Session) -> PlatformListResponse:
+        platforms, total = PlatformService.get_platforms(
+            session,
+            skip=skip,
+            limit=limit,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            is_active=is_active,
+            is_featured=is_featured,
+        )
+        platform_responses = [PlatformResponse.model_validate(p) for p in platforms]
+        return PlatformListResponse(
+            data=platform_responses, total=total, skip=skip, limit=limit
+        )
 
-    platform_responses = [PlatformResponse.model_validate(p) for p in platforms]
-    return PlatformListResponse(
-        data=platform_responses, total=total, skip=skip, limit=limit
-    )
+    return await db.run_sync(_query)
 
 
 @router.post("", response_model=PlatformResponse, status_code=201)
@@ -110,7 +115,7 @@ async def create_platform(
 @router.get("/{platform_id}", response_model=PlatformResponse)
 async def get_platform(
     platform_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取单个平台信息
@@ -123,7 +128,7 @@ async def get_platform(
     GET /api/platforms/1
     ```
     """
-    platform = PlatformService.get_platform(db, platform_id)
+    platform = await db.run_sync(PlatformService.get_platform, platform_id)
     if not platform:
         raise_resource_not_found("Platform", platform_id)
     return PlatformResponse.model_validate(platform)
@@ -262,9 +267,10 @@ async def bulk_update_ranks(
 
 
 @router.get("/featured/list", response_model=list[PlatformResponse])
+@cached(prefix="platforms-featured", ttl=600, tags=["platforms"])
 async def get_featured_platforms(
     limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取精选平台列表
@@ -276,13 +282,14 @@ async def get_featured_platforms(
     GET /api/platforms/featured/list?limit=10
     ```
     """
-    platforms = PlatformService.get_featured_platforms(db, limit=limit)
+    platforms = await db.run_sync(PlatformService.get_featured_platforms, limit=limit)
     return [PlatformResponse.model_validate(p) for p in platforms]
 
 
 @router.get("/regulated/list", response_model=list[PlatformResponse])
+@cached(prefix="platforms-regulated", ttl=600, tags=["platforms"])
 async def get_regulated_platforms(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取监管平台列表
@@ -294,14 +301,14 @@ async def get_regulated_platforms(
     GET /api/platforms/regulated/list
     ```
     """
-    platforms = PlatformService.get_regulated_platforms(db)
+    platforms = await db.run_sync(PlatformService.get_regulated_platforms)
     return [PlatformResponse.model_validate(p) for p in platforms]
 
 
 @router.get("/by-slug/{slug}", response_model=PlatformResponse)
 async def get_platform_by_slug(
     slug: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     通过 slug 获取平台信息
@@ -317,11 +324,15 @@ async def get_platform_by_slug(
     GET /api/platforms/by-slug/gamma-trader
     ```
     """
+    from sqlalchemy import select
     from app.models import Platform
-    platform = db.query(Platform).filter(
-        Platform.slug == slug,
-        Platform.is_active == True  # 只返回活跃平台，防止数据泄露
-    ).first()
+    result = await db.execute(
+        select(Platform).where(
+            Platform.slug == slug,
+            Platform.is_active == True  # 只返回活跃平台，防止数据泄露
+        )
+    )
+    platform = result.scalars().first()
     if not platform:
         raise_resource_not_found("Platform", slug)
     return PlatformResponse.model_validate(platform)
@@ -3,18 +3,23 @@
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
-from app.models import Section, Category
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.database import get_db, get_async_db
+from app.models import Section
+from app.models.content_counter import SCOPE_SECTION, STATE_CATEGORIES
 from app.routes.auth import get_current_user
+from app.services.content_counters import ContentCounterService
 from app.schemas.section import SectionResponse, SectionListResponse, SectionCreate, SectionUpdate
+from app.utils.cache import cached, invalidate_tags
 
 router = APIRouter(prefix="/api/sections", tags=["sections"])
 
 
 @router.get("", response_model=SectionListResponse)
+@cached(prefix="sections-list", ttl=600, tags=["sections"])
 async def list_sections(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取所有栏目列表（包括 requires_platform 字段和分类数）
@@ -26,19 +31,19 @@ async def list_sections(
     GET /api/sections
     ```
     """
-    sections = db.query(Section).filter(Section.is_active == True).order_by(Section.sort_order).all()
+    # 分类数读取计数表（一次查询），不再对每个栏目 COUNT
+    category_count = ContentCounterService.count_column(SCOPE_SECTION, STATE_CATEGORIES, Section.id)
+    rows = (
+        await db.execute(
+            select(Section, category_count).where(Section.is_active == True).order_by(Section.sort_order)
+        )
+    ).all()
     
     result = []
-    for section in sections:
-        # 统计该栏目下的分类数
-        category_count = db.query(func.count(Category.id)).filter(
-            Category.section_id == section.id,
-            Category.is_active == True
-        ).scalar() or 0
-        
+    for section, count in rows:
         section_response = SectionResponse.model_validate(section)
         # 手动设置 category_count
-        section_response.category_count = category_count
+        section_response.category_count = count
         result.append(section_response)
     
     total = len(result)
@@ -51,7 +56,7 @@ async def list_sections(
 @router.get("/{section_id}", response_model=SectionResponse)
 async def get_section(
     section_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     获取单个栏目信息
@@ -64,7 +69,7 @@ async def get_section(
     GET /api/sections/1
     ```
     """
-    section = db.query(Section).filter(Section.id == section_id).first()
+    section = await db.get(Section, section_id)
     if not section:
         raise HTTPException(status_code=404, detail=f"栏目 ID {section_id} 不存在")
     return SectionResponse.model_validate(section)
@@ -94,6 +99,7 @@ async def create_section(
     )
     db.add(section)
     db.commit()
+    invalidate_tags("sections")
     db.refresh(section)
     return SectionResponse.model_validate(section)
 
@@ -136,6 +142,7 @@ async def update_section(
         section.is_active = section_data.is_active
     
     db.commit()
+    invalidate_tags("sections")
     db.refresh(section)
     return SectionResponse.model_validate(section)
 
@@ -155,4 +162,5 @@ async def delete_section(
     
     db.delete(section)
     db.commit()
+    invalidate_tags("sections")
     return {"message": "栏目已删除"}
@@ -0,0 +1,37 @@
+"""
+站点数据 API 路由
+"""
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.services.site_bundle import SiteBundleService
+
+router = APIRouter(prefix="/api/site", tags=["site"])
+
+# 快照响应头：允许缓存，但每次需用 ETag 重新验证（内容未变时返回 304）
+SITE_BUNDLE_CACHE_CONTROL = "public, no-cache"
+
+
+@router.get("/bundle")
+def get_site_bundle(request: Request, db: Session = Depends(get_read_db)):
+    """
+    获取首页数据快照（公开）
+
+    一次返回首页与栏目页首屏需要的全部数据：网站设置、栏目（含分类数）、分类（含文章数）、
+    精选 / 热门 / 最新文章（列表字段）、推荐平台与两融总览。
+    快照在内容或两融数据变更时重新生成，响应带 ETag，支持 If-None-Match 条件请求。
+    生成快照是同步的数据库查询，路由使用普通函数，由 FastAPI 在线程池中执行，不阻塞事件循环。
+
+    示例:
+    ```
+    GET /api/site/bundle
+    ```
+    """
+    page, cache_status = SiteBundleService.get_bundle(db)
+    return page.to_response(
+        request,
+        cache_status,
+        media_type="application/json",
+        cache_control=SITE_BUNDLE_CACHE_CONTROL,
+    )
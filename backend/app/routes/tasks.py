@@ -17,6 +17,8 @@ from app.routes.auth import get_current_user
 from app.utils.task_monitor import TaskMonitor
 from app.utils.backup import BackupManager
 from app.utils.cache import cache_manager
+from app.utils.pagination import TOTAL_EXACT, TOTAL_NONE, InvalidCursor, Keyset, count_total
+from app.middleware.db_metrics import query_log
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
@@ -458,17 +460,21 @@ def list_tasks(
     status: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="游标：上一页返回的 next_cursor，传入时忽略 skip"),
+    total: Optional[str] = Query(None, pattern="^(exact|estimate|none)$", description="总数计算方式"),
     current_user: AdminUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    列出当前用户的所有任务
+    列出当前用户的所有任务（按创建时间倒序）
     
     - **skip**: 跳过记录数 (分页)
     - **limit**: 返回记录数 (最多100条)
     - **status**: 筛选状态 (pending/processing/completed/failed)
     - **start_date**: 开始日期 (YYYY-MM-DD)
     - **end_date**: 结束日期 (YYYY-MM-DD)
+    - **cursor**: 游标 (上一页返回的 next_cursor)
+    - **total**: 总数 exact/estimate/none (默认无游标时 exact、有游标时 none)
     
     返回: 任务列表
     """
@@ -497,13 +503,22 @@ def list_tasks(
         except ValueError:
             pass  # 忽略无效日期格式
 
-    total = query.count()
-    tasks = query.offset(skip).limit(limit).all()
+    count = count_total(
+        query,
+        total or (TOTAL_NONE if cursor else TOTAL_EXACT),
+        cache_key=["tasks", current_user.id, status, start_date, end_date],
+    )
+    try:
+        page = Keyset(AIGenerationTask.created_at, AIGenerationTask.id).paginate(query, limit, cursor=cursor, skip=skip)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tasks = page.items
 
     return {
-        "total": total,
+        "total": count,
         "skip": skip,
         "limit": limit,
+        "next_cursor": page.next_cursor,
         "items": [
             {
                 "task_id": task.batch_id,
@@ -814,3 +829,43 @@ async def cleanup_expired_cache(
         "cleaned_count": cleaned_count,
         "message": f"已清理 {cleaned_count} 个过期缓存"
     }
+
+
+# ============= 数据库查询监控端点 =============
+
+@router.get("/db/query-stats")
+async def get_db_query_stats(
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """
+    获取数据库查询统计（慢查询日志、N+1 检测记录）
+    
+    需要超级管理员权限
+    """
+    if not current_user.is_superadmin:
+        raise HTTPException(status_code=403, detail="需要超级管理员权限")
+    
+    return {
+        "status": "success",
+        "stats": query_log.get_stats()
+    }
+
+
+@router.post("/db/query-stats/clear")
+async def clear_db_query_stats(
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """
+    清空数据库查询统计
+    
+    需要超级管理员权限
+    """
+    if not current_user.is_superadmin:
+        raise HTTPException(status_code=403, detail="需要超级管理员权限")
+    
+    query_log.clear()
+    
+    return {
+        "status": "success",
+        "message": "查询统计已清空"
+    }
@@ -3,10 +3,13 @@
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.database import get_db, get_async_db
 from app.models.website_settings import WebsiteSettings
 from app.models.admin_user import AdminUser
 from app.routes.auth import get_current_user
+from app.utils.cache import cached, invalidate_tags
 import json
 
 router = APIRouter(prefix="/api/website-settings", tags=["Website Settings"])
@@ -65,9 +68,10 @@ class WebsiteSettingsResponse(BaseModel):
 
 
 @router.get("/")
-async def get_website_settings(db: Session = Depends(get_db)):
+@cached(prefix="website-settings", ttl=3600, tags=["settings"])
+async def get_website_settings(db: AsyncSession = Depends(get_async_db)):
     """获取网站全局设置（公开）"""
-    settings = db.query(WebsiteSettings).first()
+    settings = (await db.execute(select(WebsiteSettings).limit(1))).scalars().first()
     
     if not settings:
         raise HTTPException(
@@ -75,28 +79,7 @@ async def get_website_settings(db: Session = Depends(get_db)):
             detail="网站设置不存在"
         )
     
-    # 手动转换为字典，日期格式化为 ISO 格式
-    return {
-        "id": settings.id,
-        "site_title": settings.site_title,
-        "site_description": settings.site_description,
-        "site_keywords": settings.site_keywords,
-        "site_name": settings.site_name,
-        "site_author": settings.site_author,
-        "site_favicon": settings.site_favicon,
-        "site_logo": settings.site_logo,
-        "google_analytics": settings.google_analytics,
-        "baidu_analytics": settings.baidu_analytics,
-        "custom_scripts": settings.custom_scripts,
-        "icp_number": settings.icp_number,
-        "company_name": settings.company_name,
-        "company_address": settings.company_address,
-        "contact_phone": settings.contact_phone,
-        "contact_email": settings.contact_email,
-        "footer_links": settings.footer_links,
-        "created_at": settings.created_at.isoformat() if settings.created_at else None,
-        "updated_at": settings.updated_at.isoformat() if settings.updated_at else None,
-    }
+    return settings.to_dict()
 
 
 @router.put("/", response_model=WebsiteSettingsResponse)
@@ -137,35 +120,16 @@ async def update_website_settings(
     db.add(settings)
     db.commit()
     db.refresh(settings)
+    invalidate_tags("settings")
     
-    # 手动转换为字典
-    return {
-        "id": settings.id,
-        "site_title": settings.site_title,
-        "site_description": settings.site_description,
-        "site_keywords": settings.site_keywords,
-        "site_name": settings.site_name,
-        "site_author": settings.site_author,
-        "site_favicon": settings.site_favicon,
-        "site_logo": settings.site_logo,
-        "google_analytics": settings.google_analytics,
-        "baidu_analytics": settings.baidu_analytics,
-        "custom_scripts": settings.custom_scripts,
-        "icp_number": settings.icp_number,
-        "company_name": settings.company_name,
-        "company_address": settings.company_address,
-        "contact_phone": settings.contact_phone,
-        "contact_email": settings.contact_email,
-        "footer_links": settings.footer_links,
-        "created_at": settings.created_at.isoformat() if settings.created_at else None,
-        "updated_at": settings.updated_at.isoformat() if settings.updated_at else None,
-    }
+    return settings.to_dict()
 
 
 @router.get("/seo")
-async def get_seo_settings(db: Session = Depends(get_db)):
+@cached(prefix="website-settings-seo", ttl=3600, tags=["settings"])
+async def get_seo_settings(db: AsyncSession = Depends(get_async_db)):
     """获取 SEO 相关设置（公开）"""
-    settings = db.query(WebsiteSettings).first()
+    settings = (await db.execute(select(WebsiteSettings).limit(1))).scalars().first()
     
     if not settings:
         raise HTTPException(
@@ -203,9 +167,9 @@ async def get_analytics_settings(
 
 
 @router.get("/footer")
-async def get_footer_settings(db: Session = Depends(get_db)):
+async def get_footer_settings(db: AsyncSession = Depends(get_async_db)):
     """获取页脚相关设置（公开）"""
-    settings = db.query(WebsiteSettings).first()
+    settings = (await db.execute(select(WebsiteSettings).limit(1))).scalars().first()
     
     if not settings:
         raise HTTPException(
@@ -1,8 +1,8 @@
 """
 文章 Schema (Pydantic 验证)
 """
-from pydantic import BaseModel, root_validator
-from typing import Optional
+from pydantic import BaseModel, Field, SerializerFunctionWrapHandler, model_serializer, root_validator
+from typing import Annotated, Optional, Union
 from datetime import datetime
 
 
@@ -83,9 +83,59 @@ class ArticleResponse(ArticleBase):
         from_attributes = True
 
 
+class ArticleListItem(BaseModel):
+    """
+    文章列表项 Schema（列表页展示所需字段，不含正文）
+
+    fields 参数可以只选择其中一部分字段（id 总是包含），因此除 id 外的字段都可以缺省；
+    序列化时只输出实际给出的字段，未选择的字段不会以 null 出现在响应中。
+    """
+    id: int
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    summary: Optional[str] = None  # 手写摘要，缺省时为自动摘要
+    section_id: Optional[int] = None
+    section_name: Optional[str] = None
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    platform_id: Optional[int] = None
+    tags: Optional[str] = None
+    is_featured: Optional[bool] = None
+    is_published: Optional[bool] = None
+    view_count: Optional[int] = None
+    like_count: Optional[int] = None
+    reading_time: Optional[int] = None  # 分钟
+    created_at: Optional[datetime] = None
+    published_at: Optional[datetime] = None
+
+    @model_serializer(mode="wrap")
+    def _selected_fields(self, handler: SerializerFunctionWrapHandler):
+        """只输出给出的字段（等同于 exclude_unset，对嵌套在列表响应中的列表项同样生效）"""
+        data = handler(self)
+        return {name: value for name, value in data.items() if name in self.model_fields_set}
+
+
+# 列表接口的文章项：默认完整的 ArticleResponse；指定 fields 时为只含所选字段的 ArticleListItem
+# （按顺序匹配：列表项缺少正文等必填字段，不会被当作 ArticleResponse）
+ArticleListEntry = Annotated[
+    Union[ArticleResponse, ArticleListItem],
+    Field(union_mode="left_to_right"),
+]
+
+
 class ArticleListResponse(BaseModel):
     """文章列表响应 Schema"""
-    data: list[ArticleResponse]
-    total: int
+    data: list[ArticleListEntry]
+    total: Optional[int] = None  # total=none 时不计算
     skip: int
     limit: int
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多数据时为空
+
+
+class RelatedArticleItem(BaseModel):
+    """相关文章 Schema（列表展示所需字段）"""
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str] = None  # 手写摘要，缺省时为自动摘要
+    published_at: Optional[datetime] = None
@@ -1,10 +1,12 @@
 """
 平台 Schema (Pydantic 验证)
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from app.utils.platform_details import PLATFORM_JSON_FIELDS, normalize_detail
+
 
 # ===== 详情页面的子字段Schema =====
 
@@ -119,7 +121,12 @@ class PlatformBase(BaseModel):
 
 class PlatformCreate(PlatformBase):
     """创建平台 Schema"""
-    pass
+
+    @field_validator(*PLATFORM_JSON_FIELDS)
+    @classmethod
+    def _normalize_json_fields(cls, value: Optional[str]) -> Optional[str]:
+        """JSON 详情字段写入前校验并统一为紧凑格式"""
+        return normalize_detail(value)
 
 
 class PlatformUpdate(BaseModel):
@@ -167,6 +174,12 @@ class PlatformUpdate(BaseModel):
     platform_badges: Optional[str] = None  # JSON
     top_badges: Optional[str] = None  # JSON: ["推荐平台", "新手友好"]
 
+    @field_validator(*PLATFORM_JSON_FIELDS)
+    @classmethod
+    def _normalize_json_fields(cls, value: Optional[str]) -> Optional[str]:
+        """JSON 详情字段写入前校验并统一为紧凑格式"""
+        return normalize_detail(value)
+
 
 class PlatformResponse(PlatformBase):
     """平台响应 Schema"""
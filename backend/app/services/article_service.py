@@ -2,13 +2,29 @@
 文章管理服务层
 处理文章的业务逻辑，包括 CRUD、发布、分类、搜索等
 """
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
-from app.models import Article, AdminUser, Platform
-from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleResponse
-from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy import or_, and_, func
+from sqlalchemy.exc import OperationalError
+from app.models import Article, AdminUser, Category, Platform, Section
+from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleResponse, ArticleListItem
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 from datetime import datetime, timezone, timedelta
 from slugify import slugify
+from app.utils import article_search
+from app.utils.cache import invalidate_tags
+from app.utils.pagination import TOTAL_EXACT, InvalidCursor, Keyset, Page, count_total
+from app.services.counter_buffer import counter_buffer
+from app.services.related_articles import request_related_update
+from app.services.static_export import request_static_export
+
+T = TypeVar("T")
+
+# 列表项字段（ArticleListItem）依赖的文章列
+LIST_FIELD_COLUMNS = {
+    "summary": ("summary", "auto_summary"),
+    "section_name": ("section_id",),
+    "category_name": ("category_id",),
+}
 
 
 class ArticleService:
@@ -19,6 +35,21 @@ class ArticleService:
         """获取中国时区的当前时间，并以无时区形式存库。"""
         return datetime.now(timezone(timedelta(hours=8))).replace(tzinfo=None)
 
+    @staticmethod
+    def _article_cache_tags(article: Article) -> List[str]:
+        """文章相关的缓存标签"""
+        tags = ["articles", f"article:{article.id}"]
+        if article.section is not None:
+            tags.append(f"section:{article.section.slug}")
+        return tags
+
+    @staticmethod
+    def _invalidate_article_cache(article: Article, extra_tags: Optional[List[str]] = None) -> None:
+        """文章写入后失效相关缓存（详情、所属栏目、列表）"""
+        invalidate_tags(*ArticleService._article_cache_tags(article), *(extra_tags or []))
+        request_static_export("articles", [article.id])
+        request_related_update(article.id)
+
     @staticmethod
     def create_article(
         db: Session,
@@ -78,16 +109,18 @@ class ArticleService:
         db.add(article)
         db.commit()
         db.refresh(article)
+        ArticleService._invalidate_article_cache(article)
         return article
 
     @staticmethod
-    def get_article(db: Session, article_id: int) -> Optional[Article]:
+    def get_article(db: Session, article_id: int, increment_view: bool = True) -> Optional[Article]:
         """
         获取单个文章
         
         Args:
             db: 数据库会话
             article_id: 文章 ID
+            increment_view: 是否同时增加浏览量（写入计数缓冲，不占用写会话）
             
         Returns:
             文章对象或 None
@@ -95,13 +128,164 @@ class ArticleService:
         article = db.query(Article).options(joinedload(Article.section)).filter(Article.id == article_id).first()
         
         # 增加浏览量
-        if article:
-            article.view_count = (article.view_count or 0) + 1
-            db.add(article)
-            db.commit()
+        if article and increment_view:
+            ArticleService.increment_view_count(article.id)
         
         return article
 
+    @staticmethod
+    def increment_view_count(article_id: int) -> None:
+        """
+        增加文章浏览量
+        
+        增量写入计数缓冲，由后台线程定期合并为批量
+        UPDATE ... SET view_count = view_count + n 落库，浏览不再占用 SQLite 写锁。
+        
+        Args:
+            article_id: 文章 ID
+        """
+        counter_buffer.incr("view_count", article_id)
+
+    @staticmethod
+    def get_display_counts(article: Article) -> Tuple[int, int]:
+        """
+        展示用的浏览量与点赞数（数据库中的值 + 尚未落库的增量）
+        
+        Args:
+            article: 文章对象
+            
+        Returns:
+            (浏览量, 点赞数)
+        """
+        return (
+            (article.view_count or 0) + counter_buffer.pending("view_count", article.id),
+            (article.like_count or 0) + counter_buffer.pending("like_count", article.id),
+        )
+
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+        """
+        解析列表接口的 fields 参数
+        
+        Args:
+            fields: 为空表示完整文章；list 表示 ArticleListItem 的全部字段；
+                或逗号分隔的 ArticleListItem 字段名（如 id,title,slug）
+            
+        Returns:
+            字段名列表（总是包含 id）；完整文章时返回 None
+            
+        Raises:
+            ValueError: 包含未知字段
+        """
+        if not fields or not fields.strip():
+            return None
+        if fields.strip() == "list":
+            return list(ArticleListItem.model_fields)
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in ArticleListItem.model_fields]
+        if unknown:
+            raise ValueError(f"未知字段: {', '.join(unknown)}")
+        return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+
+    @staticmethod
+    def list_load_options(fields: Optional[Sequence[str]], *extra_columns) -> list:
+        """
+        列表查询的加载选项
+        
+        完整文章预加载栏目与分类；指定字段时只加载这些字段依赖的列，正文等大字段不读取。
+        
+        Args:
+            fields: parse_fields 的结果
+            extra_columns: 额外需要加载的列（如游标分页的排序键）
+        """
+        if fields is None:
+            return [joinedload(Article.category_obj), joinedload(Article.section)]
+        names = {"id": None}
+        for field in fields:
+            for name in LIST_FIELD_COLUMNS.get(field, (field,)):
+                names[name] = None
+        for column in extra_columns:
+            names[column.key] = None
+        options = [load_only(*(getattr(Article, name) for name in names))]
+        if "section_name" in fields:
+            options.append(joinedload(Article.section).load_only(Section.id, Section.name))
+        if "category_name" in fields:
+            options.append(joinedload(Article.category_obj).load_only(Category.id, Category.name))
+        return options
+
+    @staticmethod
+    def to_list_item(article: Article, fields: Sequence[str]) -> Dict[str, Any]:
+        """
+        转为只含所选字段的列表项（浏览量、点赞数叠加尚未落库的增量）
+        
+        Args:
+            article: 按 list_load_options 加载的文章
+            fields: parse_fields 的结果
+        """
+        item = {}
+        for field in fields:
+            if field == "summary":
+                item[field] = (article.summary and article.summary.strip()) or article.auto_summary
+            elif field == "section_name":
+                item[field] = article.section.name if article.section is not None else None
+            elif field in ("view_count", "like_count"):
+                item[field] = (getattr(article, field) or 0) + counter_buffer.pending(field, article.id)
+            else:
+                item[field] = getattr(article, field)
+        return item
+
+    @staticmethod
+    def _apply_search(db: Session, query, keyword: str):
+        """
+        为查询添加关键词过滤
+
+        优先使用 FTS5 全文索引；索引不可用或关键词无法切分（如单个汉字）时回退到 LIKE 查询。
+        返回的查询需经 _run_search 执行，索引表被其他进程删除时才能回退。
+
+        Args:
+            db: 数据库会话
+            query: 文章查询
+            keyword: 搜索关键词
+
+        Returns:
+            (过滤后的查询, 相关度排序列；LIKE 查询时为 None)
+        """
+        match = article_search.build_match_query(keyword)
+        if match and article_search.is_available(db.connection()):
+            hits = article_search.search_subquery(match)
+            return query.join(hits, hits.c.article_id == Article.id), hits.c.rank
+
+        search_pattern = f"%{keyword}%"
+        return query.filter(
+            or_(
+                Article.title.ilike(search_pattern),
+                Article.content.ilike(search_pattern),
+                Article.summary.ilike(search_pattern),
+                Article.tags.ilike(search_pattern),
+            )
+        ), None
+
+    @staticmethod
+    def _run_search(db: Session, run: Callable[[], T]) -> T:
+        """
+        执行带关键词过滤的查询
+
+        全文索引表的存在按数据库缓存；表在确认存在后被其他进程删除
+        （add_article_fts --downgrade 或重建）时查询报 no such table，
+        此时清除缓存并重新执行一次，_apply_search 重新检查后回退到 LIKE 查询。
+
+        Args:
+            db: 数据库会话
+            run: 构建并执行查询的函数（内部调用 _apply_search）
+        """
+        try:
+            return run()
+        except OperationalError as exc:
+            if not article_search.is_missing_index_error(exc):
+                raise
+            article_search.forget(db.connection())
+            return run()
+
     @staticmethod
     def get_articles(
         db: Session,
@@ -124,89 +308,142 @@ class ArticleService:
             db: 数据库会话
             skip: 跳过的记录数
             limit: 返回的最大记录数
-            search: 搜索关键词（搜索标题、内容、摘要）
+            search: 搜索关键词（全文检索标题、内容、摘要、标签）
             category: 分类过滤（传统字符串字段，用于向后兼容）
             category_id: 分类 ID 过滤（推荐使用）
             platform_id: 平台过滤
             author_id: 作者过滤
             is_published: 发布状态过滤
             is_featured: 精选状态过滤
-            sort_by: 排序字段 (title, created_at, updated_at, view_count, like_count)
+            sort_by: 排序字段 (title, created_at, updated_at, published_at, view_count, like_count,
+                relevance：按搜索相关度，仅在有搜索关键词时生效)
             sort_order: 排序顺序 (asc, desc)
             
         Returns:
             (文章列表, 总数) 元组
         """
-        query = db.query(Article).options(joinedload(Article.category_obj), joinedload(Article.section))
+        page = ArticleService.get_articles_page(
+            db,
+            skip=skip,
+            limit=limit,
+            search=search,
+            category_id=category_id,
+            platform_id=platform_id,
+            author_id=author_id,
+            is_published=is_published,
+            is_featured=is_featured,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+        return page.items, page.total
 
-        # 应用搜索过滤
-        if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Article.title.ilike(search_pattern),
-                    Article.content.ilike(search_pattern),
-                    Article.summary.ilike(search_pattern),
-                    Article.tags.ilike(search_pattern),
-                )
+    @staticmethod
+    def _keyset(sort_by: str, sort_order: str) -> Keyset:
+        """排序字段对应的排序键（id 作为最后一列保证顺序唯一）"""
+        sort_columns = {
+            "title": Article.title,
+            "created_at": Article.created_at,
+            "updated_at": Article.updated_at,
+            "published_at": Article.published_at,
+            "view_count": Article.view_count,
+            "like_count": Article.like_count,
+        }
+        sort_column = sort_columns.get(sort_by, Article.created_at)
+        return Keyset(
+            sort_column,
+            Article.id,
+            descending=sort_order.lower() == "desc",
+            nullable=[Article.published_at],
+        )
+
+    @staticmethod
+    def get_articles_page(
+        db: Session,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        total: str = TOTAL_EXACT,
+        fields: Optional[Sequence[str]] = None,
+        search: Optional[str] = None,
+        category_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        is_published: Optional[bool] = None,
+        is_featured: Optional[bool] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+    ) -> Page:
+        """
+        获取一页文章（游标分页，兼容 skip 偏移）
+
+        除相关度排序外，每页都返回指向下一页的游标；带游标的请求从上一页末行继续，
+        深翻页不再随偏移量变慢。
+
+        Args:
+            db: 数据库会话
+            skip: 跳过的记录数（无游标时生效）
+            limit: 返回的最大记录数
+            cursor: 上一页返回的 next_cursor
+            total: 总数计算方式：exact / estimate（缓存的计数）/ none（不计算）
+            fields: 只加载列表项的这些字段（parse_fields 的结果），为空时加载完整文章
+            其余参数同 get_articles
+
+        Returns:
+            Page(文章列表, 总数, 下一页游标)
+
+        Raises:
+            ValueError: 游标无效，或相关度排序时传入游标
+        """
+        def build_page() -> Page:
+            keyset = ArticleService._keyset(sort_by, sort_order)
+            query = db.query(Article).options(*ArticleService.list_load_options(fields, *keyset.columns))
+
+            # 应用搜索过滤
+            search_rank = None
+            if search:
+                query, search_rank = ArticleService._apply_search(db, query, search)
+
+            # 应用分类过滤
+            if category_id:
+                query = query.filter(Article.category_id == category_id)
+
+            # 应用平台过滤
+            if platform_id:
+                query = query.filter(Article.platform_id == platform_id)
+
+            # 应用作者过滤
+            if author_id:
+                query = query.filter(Article.author_id == author_id)
+
+            # 应用发布状态过滤
+            if is_published is not None:
+                query = query.filter(Article.is_published == is_published)
+
+            # 应用精选状态过滤
+            if is_featured is not None:
+                query = query.filter(Article.is_featured == is_featured)
+
+            # 获取总数（过滤后，按需）
+            count = count_total(
+                query,
+                total,
+                cache_key=["articles", search, category_id, platform_id, author_id, is_published, is_featured],
+                tags=["articles"],
             )
 
-        # 应用分类过滤
-        if category_id:
-            query = query.filter(Article.category_id == category_id)
-
-        # 应用平台过滤
-        if platform_id:
-            query = query.filter(Article.platform_id == platform_id)
-
-        # 应用作者过滤
-        if author_id:
-            query = query.filter(Article.author_id == author_id)
-
-        # 应用发布状态过滤
-        if is_published is not None:
-            query = query.filter(Article.is_published == is_published)
-
-        # 应用精选状态过滤
-        if is_featured is not None:
-            query = query.filter(Article.is_featured == is_featured)
-
-        # 获取总数（过滤后）
-        total = query.count()
-
-        # 应用排序
-        if sort_by == "published_at":
-            if sort_order.lower() == "desc":
-                query = query.order_by(
-                    Article.published_at.is_(None),
-                    Article.published_at.desc(),
-                    Article.created_at.desc(),
-                )
-            else:
-                query = query.order_by(
-                    Article.published_at.is_(None),
-                    Article.published_at.asc(),
-                    Article.created_at.asc(),
-                )
-        else:
-            sort_columns = {
-                "title": Article.title,
-                "created_at": Article.created_at,
-                "updated_at": Article.updated_at,
-                "view_count": Article.view_count,
-                "like_count": Article.like_count,
-            }
-
-            sort_column = sort_columns.get(sort_by, Article.created_at)
-            if sort_order.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
+            if sort_by == "relevance" and search_rank is not None:
+                # 相关度是查询时计算的，不支持游标
+                if cursor:
+                    raise InvalidCursor("相关度排序不支持游标分页")
+                articles = query.order_by(search_rank, Article.id.desc()).offset(skip).limit(limit).all()
+                return Page(articles, count, None)
 
-        # 应用分页
-        articles = query.offset(skip).limit(limit).all()
+            page = keyset.paginate(query, limit, cursor=cursor, skip=skip)
+            return page._replace(total=count)
 
-        return articles, total
+        if search:
+            return ArticleService._run_search(db, build_page)
+        return build_page()
 
     @staticmethod
     def update_article(
@@ -226,6 +463,8 @@ class ArticleService:
         article = db.query(Article).filter(Article.id == article_id).first()
         if not article:
             raise ValueError(f"文章 ID {article_id} 不存在")
+        # 更新前的标签（栏目可能被修改）
+        previous_tags = ArticleService._article_cache_tags(article)
 
         # 更新字段 - 只更新设置了的字段
         update_data = article_data.model_dump(exclude_unset=True)
@@ -248,6 +487,7 @@ class ArticleService:
         db.add(article)
         db.commit()
         db.refresh(article)
+        ArticleService._invalidate_article_cache(article, previous_tags)
         return article
 
     @staticmethod
@@ -266,8 +506,12 @@ class ArticleService:
         if not article:
             return False
 
+        cache_tags = ArticleService._article_cache_tags(article)
         db.delete(article)
         db.commit()
+        invalidate_tags(*cache_tags)
+        request_static_export("articles", [article_id])
+        request_related_update(article_id)
         return True
 
     @staticmethod
@@ -291,6 +535,7 @@ class ArticleService:
         db.add(article)
         db.commit()
         db.refresh(article)
+        ArticleService._invalidate_article_cache(article)
         return article
 
     @staticmethod
@@ -314,6 +559,7 @@ class ArticleService:
         db.add(article)
         db.commit()
         db.refresh(article)
+        ArticleService._invalidate_article_cache(article)
         return article
 
     @staticmethod
@@ -336,6 +582,7 @@ class ArticleService:
         db.add(article)
         db.commit()
         db.refresh(article)
+        ArticleService._invalidate_article_cache(article)
         return article
 
     @staticmethod
@@ -347,17 +594,17 @@ class ArticleService:
             db: 数据库会话
             article_id: 文章 ID
             
+        点赞数写入计数缓冲，定期批量落库；返回的文章对象中 like_count 仍是数据库中的值，
+        展示时使用 get_display_counts 叠加未落库的增量。
+        
         Returns:
-            更新后的文章对象或 None
+            文章对象或 None
         """
         article = db.query(Article).filter(Article.id == article_id).first()
         if not article:
             return None
 
-        article.like_count = (article.like_count or 0) + 1
-        db.add(article)
-        db.commit()
-        db.refresh(article)
+        counter_buffer.incr("like_count", article.id)
         return article
 
     @staticmethod
@@ -391,7 +638,8 @@ class ArticleService:
     @staticmethod
     def get_featured_articles(
         db: Session,
-        limit: int = 5
+        limit: int = 5,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[Article]:
         """
         获取精选文章
@@ -399,12 +647,14 @@ class ArticleService:
         Args:
             db: 数据库会话
             limit: 最大返回数
+            fields: 只加载列表项的这些字段（parse_fields 的结果），为空时加载完整文章
             
         Returns:
             精选文章列表
         """
         return (
             db.query(Article)
+            .options(*ArticleService.list_load_options(fields))
             .filter(and_(Article.is_featured == True, Article.is_published == True))
             .order_by(Article.like_count.desc())
             .limit(limit)
@@ -443,7 +693,7 @@ class ArticleService:
         limit: int = 20
     ) -> List[Article]:
         """
-        搜索已发布的文章
+        搜索已发布的文章（按相关度排序，标题命中优先）
         
         Args:
             db: 数据库会话
@@ -453,29 +703,22 @@ class ArticleService:
         Returns:
             搜索结果列表
         """
-        search_pattern = f"%{keyword}%"
-        return (
-            db.query(Article)
-            .filter(
-                and_(
-                    Article.is_published == True,
-                    or_(
-                        Article.title.ilike(search_pattern),
-                        Article.content.ilike(search_pattern),
-                        Article.summary.ilike(search_pattern),
-                        Article.tags.ilike(search_pattern),
-                    )
-                )
-            )
-            .order_by(Article.like_count.desc())
-            .limit(limit)
-            .all()
-        )
+        def search() -> List[Article]:
+            query = db.query(Article).filter(Article.is_published == True)
+            query, search_rank = ArticleService._apply_search(db, query, keyword)
+            if search_rank is not None:
+                query = query.order_by(search_rank, Article.like_count.desc())
+            else:
+                query = query.order_by(Article.like_count.desc())
+            return query.limit(limit).all()
+
+        return ArticleService._run_search(db, search)
 
     @staticmethod
     def get_trending_articles(
         db: Session,
-        limit: int = 10
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[Article]:
         """
         获取热门文章（按点赞数排序）
@@ -483,12 +726,14 @@ class ArticleService:
         Args:
             db: 数据库会话
             limit: 最大返回数
+            fields: 只加载列表项的这些字段（parse_fields 的结果），为空时加载完整文章
             
         Returns:
             热门文章列表
         """
         return (
             db.query(Article)
+            .options(*ArticleService.list_load_options(fields))
             .filter(Article.is_published == True)
             .order_by(Article.like_count.desc(), Article.view_count.desc())
             .limit(limit)
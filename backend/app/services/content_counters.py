@@ -0,0 +1,158 @@
+"""
+内容计数服务
+
+读取 content_counters 表中增量维护的计数（见 app.models.content_counter），并定期与 articles、
+categories 等表的实际数量核对：
+
+- 读取：栏目分类数、分类文章数以关联子查询按主键读取，全站统计一次读出
+- 校正：按 GROUP BY 重新统计实际数量，与计数表不一致时修正并记录日志（Celery Beat 每天执行，
+  也可通过 python -m app.migrations.add_content_counters 手动执行）
+"""
+import logging
+from collections import Counter
+from typing import Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Article, Category, Platform, Section
+from app.models.content_counter import (
+    SCOPE_CATEGORY,
+    SCOPE_SECTION,
+    SCOPE_SITE,
+    STATE_CATEGORIES,
+    STATE_DRAFT,
+    STATE_PLATFORMS,
+    STATE_PUBLISHED,
+    STATE_SECTIONS,
+    ContentCounter,
+    apply_deltas,
+)
+from app.utils.cache import invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+
+class ContentCounterService:
+    """内容计数的读取与校正"""
+
+    @staticmethod
+    def count_column(scope: str, state: str, id_column):
+        """
+        计数列（关联子查询，按主键读取），用于在列表查询中直接带出计数
+
+        Args:
+            scope: section / category
+            state: 计数类型，如 published、categories
+            id_column: 外层查询中的 ID 列，如 Category.id
+
+        Returns:
+            可放入 select() 的列表达式（没有计数行时为 0）
+        """
+        count = (
+            select(ContentCounter.count)
+            .where(
+                ContentCounter.scope == scope,
+                ContentCounter.scope_id == id_column,
+                ContentCounter.state == state,
+            )
+            .scalar_subquery()
+        )
+        return func.coalesce(count, 0)
+
+    @staticmethod
+    def site_stats(db: Session) -> Dict[str, int]:
+        """
+        全站统计
+
+        Returns:
+            {published、draft、sections、categories、platforms: 数量}
+        """
+        stats = {state: 0 for state in (STATE_PUBLISHED, STATE_DRAFT, STATE_SECTIONS, STATE_CATEGORIES, STATE_PLATFORMS)}
+        rows = db.execute(
+            select(ContentCounter.state, ContentCounter.count)
+            .where(ContentCounter.scope == SCOPE_SITE, ContentCounter.scope_id == 0)
+        ).all()
+        for state, count in rows:
+            stats[state] = count
+        return stats
+
+    @staticmethod
+    def actual_counts(db: Session) -> Counter:
+        """按 GROUP BY 统计实际数量"""
+        counts = Counter()
+        for section_id, category_id, is_published, count in db.execute(
+            select(Article.section_id, Article.category_id, Article.is_published, func.count())
+            .group_by(Article.section_id, Article.category_id, Article.is_published)
+        ).all():
+            state = STATE_PUBLISHED if is_published else STATE_DRAFT
+            counts[(SCOPE_SITE, 0, state)] += count
+            if section_id:
+                counts[(SCOPE_SECTION, section_id, state)] += count
+            if category_id:
+                counts[(SCOPE_CATEGORY, category_id, state)] += count
+
+        for section_id, count in db.execute(
+            select(Category.section_id, func.count())
+            .where(Category.is_active == True)
+            .group_by(Category.section_id)
+        ).all():
+            counts[(SCOPE_SITE, 0, STATE_CATEGORIES)] += count
+            if section_id:
+                counts[(SCOPE_SECTION, section_id, STATE_CATEGORIES)] += count
+
+        counts[(SCOPE_SITE, 0, STATE_SECTIONS)] = db.execute(
+            select(func.count()).select_from(Section).where(Section.is_active == True)
+        ).scalar()
+        counts[(SCOPE_SITE, 0, STATE_PLATFORMS)] = db.execute(
+            select(func.count()).select_from(Platform).where(Platform.is_active == True)
+        ).scalar()
+        return counts
+
+    @staticmethod
+    def reconcile(db: Session, warn: bool = True) -> Dict[str, int]:
+        """
+        校正计数表
+
+        Args:
+            db: 数据库会话
+            warn: 有修正时是否记录警告日志（首次统计时不记录）
+
+        Returns:
+            {"checked": 核对的计数数, "fixed": 修正的计数数}
+        """
+        actual = ContentCounterService.actual_counts(db)
+        stored = Counter({
+            (scope, scope_id, state): count
+            for scope, scope_id, state, count in db.execute(
+                select(ContentCounter.scope, ContentCounter.scope_id, ContentCounter.state, ContentCounter.count)
+            ).all()
+        })
+        keys = set(actual) | set(stored)
+        deltas = Counter({key: actual[key] - stored[key] for key in keys if actual[key] != stored[key]})
+        if deltas and warn:
+            details = ", ".join(
+                f"{scope}:{scope_id}:{state}{delta:+d}" for (scope, scope_id, state), delta in sorted(deltas.items())[:20]
+            )
+            logger.warning(f"内容计数与实际不一致，已修正 {len(deltas)} 项: {details}")
+        if deltas:
+            apply_deltas(db.connection(), deltas)
+        db.commit()
+        if deltas:
+            invalidate_tags("sections")
+        return {"checked": len(keys), "fixed": len(deltas)}
+
+    @staticmethod
+    def ensure_initialized(db: Session) -> bool:
+        """
+        计数表为空而已有内容时（例如升级后首次启动）做一次全量统计
+
+        Returns:
+            是否执行了统计
+        """
+        if db.query(ContentCounter.scope).first() is not None:
+            return False
+        if db.query(Section.id).first() is None and db.query(Article.id).first() is None:
+            return False
+        ContentCounterService.reconcile(db, warn=False)
+        return True
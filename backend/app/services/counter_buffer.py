@@ -0,0 +1,198 @@
+"""
+文章计数写缓冲（write-behind）
+
+浏览量、点赞数先在进程内存中累加，由后台线程按固定间隔合并为批量
+UPDATE articles SET view_count = view_count + ? 落库，页面浏览不再逐次争用 SQLite 写锁。
+
+- 落库延迟上限为 COUNTER_FLUSH_INTERVAL 秒；待写增量达到 COUNTER_MAX_PENDING 时提前落库
+- 展示的计数 = 数据库中的值 + 尚未落库的增量（pending）
+- 落库失败时增量并回缓冲，下次重试；进程退出时（atexit）再落库一次
+- updated_at 保持不变：它是内容版本（SSR 页面缓存键），计数变化不算内容变更
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Article
+
+logger = logging.getLogger(__name__)
+
+# 落库间隔（秒）
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "5"))
+# 待写增量达到该值时提前落库
+COUNTER_MAX_PENDING = int(os.getenv("COUNTER_MAX_PENDING", "1000"))
+
+# 允许缓冲的计数列
+COUNTER_FIELDS = ("view_count", "like_count")
+
+
+def _build_increment_statement(field: str):
+    """UPDATE articles SET <field> = coalesce(<field>, 0) + :delta WHERE id = :article_id"""
+    table = Article.__table__
+    return (
+        update(table)
+        .where(table.c.id == bindparam("article_id"))
+        .values({
+            field: func.coalesce(table.c[field], 0) + bindparam("delta"),
+            "updated_at": table.c.updated_at,
+        })
+    )
+
+
+class CounterBuffer:
+    """按 (计数列, 文章 ID) 累加增量，定期批量落库"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = None,
+        max_pending: int = None,
+    ):
+        """
+        Args:
+            session_factory: 落库使用的写会话工厂
+            flush_interval: 落库间隔（秒），默认 COUNTER_FLUSH_INTERVAL
+            max_pending: 提前落库的待写增量阈值，默认 COUNTER_MAX_PENDING
+        """
+        self.session_factory = session_factory
+        self.flush_interval = COUNTER_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.max_pending = COUNTER_MAX_PENDING if max_pending is None else max_pending
+
+        self._lock = threading.Lock()
+        # 同一时间只允许一次落库
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, int], int] = defaultdict(int)
+        # 正在落库的增量，提交前仍计入展示值
+        self._flushing: Dict[Tuple[str, int], int] = {}
+        self._pending_total = 0
+
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+
+        self.flushes = 0
+        self.flushed_rows = 0
+
+    def incr(self, field: str, article_id: int, amount: int = 1) -> None:
+        """
+        累加计数
+
+        Args:
+            field: 计数列（view_count / like_count）
+            article_id: 文章 ID
+            amount: 增量
+        """
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"不支持的计数列: {field}")
+        with self._lock:
+            self._pending[(field, article_id)] += amount
+            self._pending_total += amount
+            flush_now = self._pending_total >= self.max_pending
+        self._ensure_worker()
+        if flush_now:
+            self._wake.set()
+
+    def pending(self, field: str, article_id: int) -> int:
+        """尚未落库的增量（含正在落库的部分）"""
+        key = (field, article_id)
+        with self._lock:
+            return self._pending.get(key, 0) + self._flushing.get(key, 0)
+
+    def flush(self) -> int:
+        """
+        将缓冲的增量批量写入数据库
+
+        每个计数列一条 executemany 语句，所有列在同一事务中提交。
+
+        Returns:
+            落库的行数（文章数 x 计数列）
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = dict(self._pending)
+                self._flushing = batch
+                self._pending = defaultdict(int)
+                self._pending_total = 0
+
+            try:
+                db = self.session_factory()
+                try:
+                    for field in COUNTER_FIELDS:
+                        params = [
+                            {"article_id": article_id, "delta": delta}
+                            for (name, article_id), delta in batch.items()
+                            if name == field and delta
+                        ]
+                        if params:
+                            db.execute(_build_increment_statement(field), params)
+                    db.commit()
+                finally:
+                    db.close()
+            except Exception as e:
+                logger.error(f"计数落库失败，{len(batch)} 条增量将在下次重试: {e}")
+                with self._lock:
+                    for key, delta in batch.items():
+                        self._pending[key] += delta
+                        self._pending_total += delta
+                    self._flushing = {}
+                return 0
+
+            with self._lock:
+                self._flushing = {}
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+            return len(batch)
+
+    def reset(self) -> None:
+        """丢弃所有未落库的增量（测试使用）"""
+        with self._flush_lock, self._lock:
+            self._pending = defaultdict(int)
+            self._flushing = {}
+            self._pending_total = 0
+
+    def get_stats(self) -> dict:
+        """缓冲统计"""
+        with self._lock:
+            return {
+                "pending_keys": len(self._pending),
+                "pending_total": self._pending_total,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "flush_interval": self.flush_interval,
+            }
+
+    def _ensure_worker(self) -> None:
+        """按需启动后台落库线程（fork 后的子进程重新启动）"""
+        pid = os.getpid()
+        worker = self._worker
+        if worker is not None and worker.is_alive() and self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._worker_pid == pid:
+                return
+            self._worker_pid = pid
+            self._worker = threading.Thread(target=self._run, name="counter-buffer-flush", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # 保证线程不退出
+                logger.error(f"计数落库线程异常: {e}")
+
+
+# 全局计数缓冲
+counter_buffer = CounterBuffer()
+atexit.register(counter_buffer.flush)
@@ -0,0 +1,195 @@
+"""
+两融标的搜索索引
+
+输入框联想搜索（/api/margin/search）每次按键都会请求一次，这里在内存中为最新交易日的标的
+建立有序数组索引，查询只做二分查找，不访问数据库。
+
+- 索引键：股票代码（600519.sh）、名称（贵州茅台）与拼音首字母（gzmt），以及它们的其余后缀；
+  两组有序数组上的前缀查找分别对应前缀匹配与包含匹配，前缀匹配已足够时不再查找后缀
+- 排序：代码完全匹配 > 前缀匹配 > 包含匹配；同级按代码、名称、拼音首字母，再按融资余额
+- 索引缓存在与 cache_manager 关联的缓存上并带 margin 标签：两融同步后（包括其他进程经
+  pub/sub 广播的失效）丢弃，下一次搜索按最新交易日重建
+- 拼音首字母依赖可选的 pypinyin，未安装时只按代码和名称匹配
+"""
+import heapq
+import logging
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.margin import MarginDetail
+from app.utils.cache import CacheManager, cache_manager
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pypinyin 为可选依赖，未安装时不支持拼音首字母搜索
+    lazy_pinyin = None
+
+logger = logging.getLogger(__name__)
+
+# 索引缓存时间（秒）；两融同步后按 margin 标签提前失效
+MARGIN_SEARCH_INDEX_TTL = 24 * 3600
+# 每个索引保留的最近查询结果数
+MARGIN_SEARCH_RESULT_CACHE_SIZE = 1024
+
+# 匹配字段的排序优先级
+FIELD_CODE, FIELD_NAME, FIELD_INITIALS = 0, 1, 2
+
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]")
+
+
+def pinyin_initials(name: str) -> str:
+    """
+    名称的拼音首字母（小写，只保留字母数字），如 贵州茅台 -> gzmt、*ST康美 -> stkm
+
+    未安装 pypinyin 时返回空字符串。
+    """
+    if not name or lazy_pinyin is None:
+        return ""
+    initials = "".join(lazy_pinyin(name, style=Style.FIRST_LETTER, errors="default"))
+    return _NON_ALNUM_RE.sub("", initials.lower())
+
+
+class MarginSearchIndex:
+    """某一交易日两融标的的内存搜索索引"""
+
+    def __init__(self, trade_date, stocks: List[Dict[str, Any]]):
+        """
+        Args:
+            trade_date: 索引对应的交易日
+            stocks: 标的列表（ts_code、name、rzye、rqyl）
+        """
+        self.trade_date = trade_date
+        self.stocks = stocks
+        prefixes: List[Tuple[str, int, int]] = []
+        infixes: List[Tuple[str, int, int]] = []
+        for position, stock in enumerate(stocks):
+            fields = (
+                (FIELD_CODE, stock["ts_code"].lower()),
+                (FIELD_NAME, stock["name"].lower()),
+                (FIELD_INITIALS, pinyin_initials(stock["name"])),
+            )
+            for field, value in fields:
+                if value:
+                    prefixes.append((value, field, position))
+                infixes.extend((value[offset:], field, position) for offset in range(1, len(value)))
+        prefixes.sort()
+        infixes.sort()
+        # 拆成并列数组：二分查找只比较字符串
+        self._prefix_keys = [key[0] for key in prefixes]
+        self._prefix_refs = [key[1:] for key in prefixes]
+        self._infix_keys = [key[0] for key in infixes]
+        self._infix_refs = [key[1:] for key in infixes]
+        # 最近查询的结果（联想搜索中同一前缀会被反复查询）
+        self._results: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._results_lock = threading.Lock()
+
+    @staticmethod
+    def _collect(keys: List[str], refs: List[Tuple[int, int]], query: str, contains: bool, best: Dict[int, tuple]):
+        """收集以 query 开头的键，记录每只标的的最佳匹配 (非完全匹配, 包含匹配, 字段)"""
+        index = bisect_left(keys, query)
+        while index < len(keys) and keys[index].startswith(query):
+            field, position = refs[index]
+            exact = 0 if not contains and field == FIELD_CODE and len(keys[index]) == len(query) else 1
+            score = (exact, int(contains), field)
+            if position not in best or score < best[position]:
+                best[position] = score
+            index += 1
+
+    def search(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        按代码、名称或拼音首字母搜索
+
+        Args:
+            keyword: 关键词
+            limit: 返回数量
+
+        Returns:
+            按相关度排序的标的列表
+        """
+        query = keyword.strip().lower()
+        if not query:
+            return []
+
+        cache_key = (query, limit)
+        with self._results_lock:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                self._results.move_to_end(cache_key)
+        if cached is None:
+            best: Dict[int, tuple] = {}
+            self._collect(self._prefix_keys, self._prefix_refs, query, False, best)
+            if len(best) < limit:
+                # 前缀匹配不足时才查找包含匹配（包含匹配总是排在前缀匹配之后）
+                self._collect(self._infix_keys, self._infix_refs, query, True, best)
+            ranked = heapq.nsmallest(
+                limit,
+                best.items(),
+                key=lambda item: (item[1], -(self.stocks[item[0]]["rzye"] or 0), self.stocks[item[0]]["ts_code"]),
+            )
+            cached = [self.stocks[position] for position, _ in ranked]
+            with self._results_lock:
+                self._results[cache_key] = cached
+                if len(self._results) > MARGIN_SEARCH_RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return [dict(stock) for stock in cached]
+
+    @classmethod
+    def build(cls, db: Session) -> Optional["MarginSearchIndex"]:
+        """
+        按最新交易日的明细建立索引
+
+        Returns:
+            索引；没有两融数据时返回 None
+        """
+        latest = db.query(func.max(MarginDetail.trade_date)).scalar()
+        if latest is None:
+            return None
+        rows = (
+            db.query(MarginDetail.ts_code, MarginDetail.name, MarginDetail.rzye, MarginDetail.rqyl)
+            .filter(MarginDetail.trade_date == latest)
+            .order_by(MarginDetail.ts_code)
+            .all()
+        )
+        stocks = [
+            {
+                "ts_code": ts_code,
+                "name": name or ts_code.split('.')[0],
+                "rzye": rzye,
+                "rqyl": rqyl,
+            }
+            for ts_code, name, rzye, rqyl in rows
+        ]
+        logger.info(f"两融搜索索引已重建: {latest} 共 {len(stocks)} 只标的")
+        return cls(latest, stocks)
+
+
+# 索引缓存（随 cache_manager 的 margin 标签失效）
+_index_cache = CacheManager(max_entries=1)
+cache_manager.link(_index_cache)
+_INDEX_KEY = "margin-search-index"
+_build_lock = threading.Lock()
+
+
+def get_search_index(db: Session) -> Optional[MarginSearchIndex]:
+    """
+    获取当前搜索索引，不存在或已失效时重建
+
+    Args:
+        db: 数据库会话（仅重建时使用）
+    """
+    index = _index_cache.get(_INDEX_KEY)
+    if index is not None:
+        return index
+    with _build_lock:
+        index = _index_cache.get(_INDEX_KEY)
+        if index is None:
+            index = MarginSearchIndex.build(db)
+            if index is not None:
+                _index_cache.set(_INDEX_KEY, index, ttl=MARGIN_SEARCH_INDEX_TTL, tags=["margin"])
+    return index
@@ -0,0 +1,412 @@
+"""
+SSR 页面渲染服务
+
+文章详情、平台详情与两融个股页的 HTML 渲染。
+FastAPI 的 SSR 路由（app/main.py）与静态页面导出（app/services/static_export.py）共用同一套渲染逻辑，
+两条路径输出的页面一致。
+"""
+import html
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.utils.article_text import extract_derived_fields, absolute_image_urls
+from app.utils.platform_details import PLATFORM_JSON_FIELDS, build_details_json
+from app.utils.site_paths import BACKEND_DIR, SITE_DIR
+from app.utils.ssr_template import CompiledTemplate, template_loader
+
+SITE_NAME = os.getenv("SITE_NAME", "鹰眼查融")
+
+# ==================== SSR 模板插槽 ====================
+# 模板只编译一次（文件修改后自动重新编译），渲染时按插槽拼接字符串；
+# 插槽写法见 app/utils/ssr_template.py
+
+_SEO_META_SLOTS = (
+    "title",
+    "seo-description@content",
+    "og-title@content",
+    "og-description@content",
+    "og-url@content",
+    "twitter-title@content",
+    "twitter-description@content",
+    "canonical@href",
+)
+ARTICLE_TEMPLATE_SLOTS = _SEO_META_SLOTS + ("seo-keywords@content", "articleContainer", "head_end")
+PLATFORM_TEMPLATE_SLOTS = _SEO_META_SLOTS + ("breadcrumb-name", "head_end")
+MARGIN_STOCK_TEMPLATE_SLOTS = _SEO_META_SLOTS + ("seo-keywords@content", "breadcrumb-stock", "head_end")
+
+ARTICLE_TEMPLATE_PATH = BACKEND_DIR / "static" / "article_view.html"
+PLATFORM_TEMPLATE_PATH = BACKEND_DIR / "static" / "platform_view.html"
+MARGIN_STOCK_TEMPLATE_PATH = SITE_DIR / "margin" / "stock" / "index.html"
+
+# 静态导出的文章页由 nginx 直接返回，浏览量通过该脚本上报
+_VIEW_BEACON_SCRIPT = (
+    "<script>(function(){{var u='/api/articles/{article_id}/view';"
+    "if(navigator.sendBeacon){{navigator.sendBeacon(u);}}"
+    "else{{fetch(u,{{method:'POST',keepalive:true}});}}}})();</script>"
+)
+
+
+class PageRenderService:
+    """SSR 页面渲染服务"""
+
+    @staticmethod
+    def _get_template(path: Path, slots) -> CompiledTemplate:
+        template = template_loader.get(path, slots)
+        if template is None:
+            raise FileNotFoundError(f"模板文件不存在: {path}")
+        return template
+
+    @staticmethod
+    def template_signature(path: Path) -> str:
+        """
+        模板文件签名（修改时间与大小），模板不存在时返回空字符串
+
+        静态导出把它计入页面版本，模板更新后重新导出全部页面。
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return ""
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    @staticmethod
+    def normalize_ts_code(ts_code: str) -> str:
+        """
+        规范化股票代码：转大写，缺少交易所后缀时按代码前缀补全
+
+        Args:
+            ts_code: 股票代码，如 600519 或 600519.sh
+
+        Returns:
+            如 600519.SH
+        """
+        ts_code = ts_code.upper()
+        if '.' not in ts_code:
+            if ts_code.startswith('6'):
+                ts_code = f"{ts_code}.SH"
+            elif ts_code.startswith(('0', '3')):
+                ts_code = f"{ts_code}.SZ"
+            elif ts_code.startswith(('8', '4')):
+                ts_code = f"{ts_code}.BJ"
+        return ts_code
+
+    @staticmethod
+    def render_article(
+        article,
+        public_site_url: str,
+        view_count: int,
+        view_beacon: bool = False,
+        related: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """
+        渲染文章详情页
+
+        Args:
+            article: 文章对象（需加载 section、category_obj）
+            public_site_url: 公开站点地址（canonical / og:url）
+            view_count: 页面展示的浏览量
+            view_beacon: 是否注入浏览量上报脚本（静态导出的页面不经过后端，需由前端上报）
+            related: 相关文章（RelatedArticleService.to_items 的结果）
+
+        Returns:
+            HTML 字符串
+
+        Raises:
+            FileNotFoundError: 模板文件不存在
+        """
+        template = PageRenderService._get_template(ARTICLE_TEMPLATE_PATH, ARTICLE_TEMPLATE_SLOTS)
+
+        section_name = article.section.name if article.section else "未分类"
+        category_name = article.category_obj.name if article.category_obj else "未分类"
+        content_html = article.content or ""
+
+        # 纯文本、图片、摘要与字数在保存文章时已计算；尚未回填的旧数据现场计算
+        derived = (
+            {
+                "auto_summary": article.auto_summary,
+                "image_urls": article.image_urls,
+                "word_count": article.word_count,
+                "reading_time": article.reading_time,
+            }
+            if article.word_count is not None
+            else extract_derived_fields(content_html)
+        )
+        auto_summary = derived["auto_summary"] or ""
+        images = absolute_image_urls(derived["image_urls"], public_site_url)
+        summary_text = (article.summary and article.summary.strip()) or auto_summary
+
+        seo_title = article.seo_title or article.title or SITE_NAME
+        seo_description = article.meta_description or summary_text or ""
+        seo_keywords = article.meta_keywords or ""
+
+        article_url = f"{public_site_url}/article/{article.slug}"
+
+        article_data = {
+            "id": article.id,
+            "title": article.title or "",
+            "slug": article.slug,
+            "content": content_html,
+            "summary": article.summary or "",
+            "section_name": section_name,
+            "category_name": category_name,
+            "view_count": view_count,
+            "reading_time": derived["reading_time"] or 0,
+            "created_at": article.created_at.isoformat() if article.created_at else None,
+            "published_at": article.published_at.isoformat() if article.published_at else None,
+            "is_published": article.is_published,
+            "seo_title": seo_title,
+            "seo_keywords": seo_keywords,
+            "seo_description": seo_description,
+            "canonical_url": article_url,
+            "related_articles": [
+                {
+                    "id": item["id"],
+                    "title": item["title"],
+                    "slug": item["slug"],
+                    "summary": item["summary"],
+                    "published_at": item["published_at"].isoformat() if item["published_at"] else None,
+                }
+                for item in related or []
+            ],
+        }
+
+        pub_date = article.published_at or article.created_at
+        pub_date_str = pub_date.isoformat() if pub_date else None
+
+        schema_data = {
+            "@context": "https://schema.org",
+            "@type": "Article",
+            "@id": f"{article_url}#article",
+            "headline": article.title,
+            "description": summary_text,
+            "articleSection": category_name,
+            "datePublished": pub_date_str,
+            "mainEntityOfPage": article_url,
+            "url": article_url,
+            "author": {"@type": "Person", "name": "Admin"},
+            "publisher": {"@type": "Organization", "name": SITE_NAME},
+            "inLanguage": "zh-CN",
+            "image": images or None,
+            "wordCount": derived["word_count"] or 0,
+        }
+        schema_data = {k: v for k, v in schema_data.items() if v is not None}
+
+        article_json = json.dumps(article_data, ensure_ascii=False)
+        # 防止 XSS：转义 </script> 序列，避免脚本注入
+        article_json = article_json.replace("</", "<\\/")
+        schema_json = json.dumps(schema_data, ensure_ascii=False, indent=2)
+        schema_json = schema_json.replace("</", "<\\/")
+
+        # 组装 SSR 内容
+        published_display = pub_date.strftime("%Y-%m-%d %H:%M") if pub_date else ""
+        status_badge = (
+            ""
+            if article.is_published
+            else '<span class="badge" style="background:#ffc107;color:#000">草稿</span>'
+        )
+        category_badge = (
+            f'<span class="badge">分类 {html.escape(category_name)}</span>'
+            if category_name
+            else ""
+        )
+        summary_block = (
+            f'<div class="summary-box"><strong>摘要：</strong>{html.escape(summary_text)}</div>'
+            if summary_text
+            else ""
+        )
+        public_link = (
+            f'<p style="margin-top:24px;font-size:13px;color:#666;">公开链接：'
+            f'<a href="/article/{article.slug}" target="_blank" rel="noopener">/article/{article.slug}</a></p>'
+            if article.is_published and article.slug
+            else ""
+        )
+        related_block = ""
+        if related:
+            related_links = "".join(
+                f'<li><a href="/article/{html.escape(item["slug"])}">{html.escape(item["title"] or "")}</a></li>'
+                for item in related
+            )
+            related_block = f'<section class="related-articles"><h2>相关文章</h2><ul>{related_links}</ul></section>'
+        article_inner_html = f"""
+            <h1>{html.escape(article.title or "")}</h1>
+            <div class="meta">
+              <span class="badge">栏目 {html.escape(section_name)}</span>
+              {category_badge}
+              {status_badge}
+              <span>浏览 {view_count}</span>
+              {f'<span style="margin-left:8px">发布时间 {published_display}</span>' if published_display else ''}
+            </div>
+            {summary_block}
+            <article class="content">{content_html}</article>
+            {related_block}
+            {public_link}
+        """
+
+        # 填充预编译模板的插槽：meta / title / canonical 全量更新并注入 SSR 内容
+        return template.render({
+            "title": f"{seo_title} - {SITE_NAME}",
+            "seo-description@content": seo_description,
+            "seo-keywords@content": seo_keywords,
+            "og-title@content": article.title or "",
+            "og-description@content": seo_description,
+            "og-url@content": article_url,
+            "twitter-title@content": article.title or "",
+            "twitter-description@content": seo_description,
+            "canonical@href": article_url,
+            "articleContainer": article_inner_html,
+            "head_end": (
+                f'<script type="application/ld+json">{schema_json}</script>'
+                f"<script>window.__ARTICLE_DATA__ = {article_json};</script>"
+                + (_VIEW_BEACON_SCRIPT.format(article_id=article.id) if view_beacon else "")
+            ),
+        })
+
+    @staticmethod
+    def render_platform(platform, public_site_url: str) -> str:
+        """
+        渲染平台详情页
+
+        Args:
+            platform: 平台对象
+            public_site_url: 公开站点地址
+
+        Returns:
+            HTML 字符串
+
+        Raises:
+            FileNotFoundError: 模板文件不存在
+        """
+        template = PageRenderService._get_template(PLATFORM_TEMPLATE_PATH, PLATFORM_TEMPLATE_SLOTS)
+
+        # 构建平台数据
+        platform_data = {
+            "id": platform.id,
+            "name": platform.name or "",
+            "slug": platform.slug or "",
+            "description": platform.description or "",
+            "rating": float(platform.rating) if platform.rating is not None else 0,
+            "rank": platform.rank,
+            "min_leverage": float(platform.min_leverage) if platform.min_leverage is not None else 1,
+            "max_leverage": float(platform.max_leverage) if platform.max_leverage is not None else 100,
+            "commission_rate": float(platform.commission_rate) if platform.commission_rate is not None else 0,
+            "is_regulated": platform.is_regulated,
+            "logo_url": platform.logo_url,
+            "website_url": platform.website_url,
+            "introduction": platform.introduction,
+            "account_opening_link": platform.account_opening_link,
+            "safety_rating": platform.safety_rating or "B",
+            "founded_year": platform.founded_year,
+            "fee_rate": float(platform.fee_rate) if platform.fee_rate is not None else None,
+            "is_recommended": platform.is_recommended,
+            "platform_type": platform.platform_type,
+            "platform_source": platform.platform_source,
+            "overview_intro": platform.overview_intro,
+        }
+
+        platform_json = json.dumps(platform_data, ensure_ascii=False)
+        # 防止 XSS：转义 </script> 序列，避免脚本注入
+        platform_json = platform_json.replace("</", "<\\/")
+        # 详情字段使用保存时生成的 details_json（已解码、已转义），直接拼入同一个对象
+        details_json = platform.details_json or build_details_json(
+            {field: getattr(platform, field) for field in PLATFORM_JSON_FIELDS}
+        )
+        platform_json = f"{platform_json[:-1]},{details_json[1:]}"
+
+        # SEO 数据
+        seo_title = platform.name or "平台详情"
+        seo_description = platform.description or f"{seo_title} 平台详情、费用、杠杆比例等信息"
+        platform_url = f"{public_site_url}/platforms/{platform.slug}/"
+
+        # 构建 Schema.org 数据
+        schema_data = {
+            "@context": "https://schema.org",
+            "@type": "SoftwareApplication",
+            "name": platform.name,
+            "description": seo_description,
+            "applicationCategory": "FinanceApplication",
+            "operatingSystem": "Web",
+            "url": platform_url,
+        }
+        if platform.rating:
+            schema_data["aggregateRating"] = {
+                "@type": "AggregateRating",
+                "ratingValue": str(platform.rating),
+                "ratingCount": "100"
+            }
+        schema_json = json.dumps(schema_data, ensure_ascii=False, indent=2)
+        # 防止 XSS：转义 </script> 序列
+        schema_json = schema_json.replace("</", "<\\/")
+
+        # 填充预编译模板的插槽：title、meta、canonical、面包屑，并注入 Schema 和数据
+        return template.render({
+            "title": f"{seo_title} - {SITE_NAME}",
+            "seo-description@content": seo_description,
+            "og-title@content": f"{seo_title} - {SITE_NAME}",
+            "og-description@content": seo_description,
+            "og-url@content": platform_url,
+            "twitter-title@content": f"{seo_title} - {SITE_NAME}",
+            "twitter-description@content": seo_description,
+            "canonical@href": platform_url,
+            "breadcrumb-name": html.escape(platform.name or ""),
+            "head_end": (
+                f'<script type="application/ld+json">{schema_json}</script>'
+                f"<script>window.__PLATFORM_DATA__ = {platform_json};</script>"
+            ),
+        })
+
+    @staticmethod
+    def render_margin_stock(latest, ts_code: str, public_site_url: str) -> str:
+        """
+        渲染两融个股详情页
+
+        Args:
+            latest: 该股票最新交易日的明细（需有 name、trade_date）
+            ts_code: 规范化后的股票代码
+            public_site_url: 公开站点地址
+
+        Returns:
+            HTML 字符串
+
+        Raises:
+            FileNotFoundError: 模板文件不存在
+        """
+        template = PageRenderService._get_template(MARGIN_STOCK_TEMPLATE_PATH, MARGIN_STOCK_TEMPLATE_SLOTS)
+
+        # 构建 SEO 数据
+        stock_name = latest.name or ts_code.split('.')[0]
+        page_url = f"{public_site_url}/margin/stock/{ts_code}/"
+        page_title = f"{stock_name}({ts_code})两融数据 | {SITE_NAME}"
+        page_desc = f"{stock_name}({ts_code})融资融券数据查询，包含融资余额、融券余量、融资净买入等历史趋势分析。"
+        page_keywords = f"{stock_name},{ts_code},两融数据,融资融券,融资余额,融券余量"
+
+        # 构建 Schema.org 结构化数据
+        schema_data = {
+            "@context": "https://schema.org",
+            "@type": "Dataset",
+            "name": f"{stock_name}两融数据",
+            "description": page_desc,
+            "url": page_url,
+            "keywords": page_keywords.split(','),
+            "creator": {"@type": "Organization", "name": SITE_NAME},
+            "dateModified": latest.trade_date.isoformat() if latest.trade_date else None,
+            "temporalCoverage": f"../{latest.trade_date.isoformat()}" if latest.trade_date else None,
+        }
+        schema_data = {k: v for k, v in schema_data.items() if v is not None}
+        schema_json = json.dumps(schema_data, ensure_ascii=False, indent=2).replace("</", "<\\/")
+
+        # 填充预编译模板的插槽：title、meta、canonical、面包屑，并注入 Schema.org 结构化数据
+        return template.render({
+            "title": page_title,
+            "seo-description@content": page_desc,
+            "seo-keywords@content": page_keywords,
+            "og-title@content": page_title,
+            "og-description@content": page_desc,
+            "og-url@content": page_url,
+            "twitter-title@content": page_title,
+            "twitter-description@content": page_desc,
+            "canonical@href": page_url,
+            "breadcrumb-stock": html.escape(f"{stock_name}({ts_code.split('.')[0]})"),
+            "head_end": f'<script type="application/ld+json">{schema_json}</script>',
+        })
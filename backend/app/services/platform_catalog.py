@@ -0,0 +1,166 @@
+"""
+平台目录（进程内）
+
+platforms 表行数少、很少写入，但列表、精选、监管、详情页每次请求都要查询一次并 COUNT / ORDER BY。
+平台目录把全部平台一次加载为只读快照，过滤、排序、分页都在内存中完成：
+
+- 快照中的平台是 PlatformResponse（与接口返回一致），按 ID、slug 建索引
+- 各排序方式（排名、评分、杠杆、费率、推荐等）在加载时预先排好，请求时只需过滤和切片
+- 快照缓存在关联到 cache_manager 的独立缓存上，带 platforms 标签：平台写操作提交后
+  （PlatformService 及任何经 ORM 的写入）按标签失效，下一次读取重新加载并递增版本号；
+  其他进程的写入经 L2 pub/sub 广播失效，PLATFORM_CATALOG_TTL 兜底
+"""
+import itertools
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Platform
+from app.schemas.platform import PlatformResponse
+from app.utils.cache import CacheManager, cache_manager, invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+# 目录缓存时间（秒）；平台写入时按标签提前失效
+PLATFORM_CATALOG_TTL = int(os.getenv("PLATFORM_CATALOG_TTL", "600"))
+
+PLATFORM_CATALOG_KEY = "platform-catalog"
+
+# 固定方向的排序方式：名称 -> (排序键, 是否降序)；键中有空值的平台总是排在最后
+_SORTS = {
+    # 评分最高排在前面
+    "rating": (lambda p: (p.rating,), True),
+    # 杠杆最高排在前面
+    "leverage": (lambda p: (p.max_leverage,), True),
+    # 费率最低排在前面
+    "fee": (lambda p: (p.commission_rate,), False),
+    # 推荐的平台优先，然后按评分排序
+    "recommended": (lambda p: (p.is_recommended, p.rating), True),
+}
+_SORTS["ranking"] = _SORTS["recommended"]
+
+# 可按 sort_order 升降序的字段
+_ORDERED_FIELDS = ("name", "rank", "commission_rate", "created_at")
+
+_versions = itertools.count(1)
+
+
+def _sorted_ids(platforms: Sequence[PlatformResponse], key, descending: bool) -> List[int]:
+    """按 key 排序后的平台 ID（同值按 ID 升序，空值排在最后）"""
+    def sort_key(platform):
+        values = key(platform)
+        if any(value is None for value in values):
+            return (False, ()) if descending else (True, ())
+        return (True, values) if descending else (False, values)
+
+    by_id = sorted(platforms, key=lambda p: p.id)
+    return [p.id for p in sorted(by_id, key=sort_key, reverse=descending)]
+
+
+class PlatformCatalog:
+    """
+    平台目录快照（只读，不要修改其中的平台对象）
+
+    Args:
+        platforms: 全部平台
+        version: 版本号（每次加载递增）
+    """
+
+    def __init__(self, platforms: Sequence[PlatformResponse], version: int):
+        self.version = version
+        self.by_id: Dict[int, PlatformResponse] = {p.id: p for p in platforms}
+        self.by_slug: Dict[str, PlatformResponse] = {p.slug: p for p in platforms if p.slug}
+        self._orders: Dict[Tuple[str, bool], List[int]] = {}
+        for name, (key, descending) in _SORTS.items():
+            self._orders[(name, descending)] = _sorted_ids(platforms, key, descending)
+        for field in _ORDERED_FIELDS:
+            key = lambda p, field=field: (getattr(p, field),)
+            for descending in (False, True):
+                self._orders[(field, descending)] = _sorted_ids(platforms, key, descending)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def ordered(self, sort_by: str = "rank", sort_order: str = "asc") -> List[PlatformResponse]:
+        """
+        按排序方式排好的全部平台
+
+        Args:
+            sort_by: rating / leverage / fee / recommended / ranking（固定方向），
+                或 name / rank / commission_rate / created_at（按 sort_order），其他值按 rank
+            sort_order: asc / desc
+        """
+        if sort_by in _SORTS:
+            order = self._orders[(sort_by, _SORTS[sort_by][1])]
+        else:
+            field = sort_by if sort_by in _ORDERED_FIELDS else "rank"
+            order = self._orders[(field, sort_order.lower() == "desc")]
+        return [self.by_id[platform_id] for platform_id in order]
+
+    def active_by_slug(self, slug: str) -> Optional[PlatformResponse]:
+        """按 slug 查找启用的平台"""
+        platform = self.by_slug.get(slug)
+        return platform if platform is not None and platform.is_active else None
+
+
+# 目录缓存（随 cache_manager 按标签失效、清空）
+catalog_cache = CacheManager(max_entries=1)
+cache_manager.link(catalog_cache)
+
+
+def load_catalog(db: Session) -> PlatformCatalog:
+    """从数据库加载平台目录"""
+    platforms = [PlatformResponse.model_validate(p) for p in db.query(Platform).all()]
+    catalog = PlatformCatalog(platforms, next(_versions))
+    logger.debug(f"平台目录已加载: {len(catalog)} 个平台（版本 {catalog.version}）")
+    return catalog
+
+
+def get_catalog(db: Session) -> PlatformCatalog:
+    """
+    获取平台目录（未加载或已失效时加载，同一时刻只加载一次）
+
+    Args:
+        db: 数据库会话（仅在需要加载时使用）
+    """
+    catalog = catalog_cache.get(PLATFORM_CATALOG_KEY)
+    if catalog is not None:
+        return catalog
+
+    def load() -> PlatformCatalog:
+        cached_catalog = catalog_cache.get(PLATFORM_CATALOG_KEY)
+        if cached_catalog is not None:
+            return cached_catalog
+        loaded = load_catalog(db)
+        catalog_cache.set(PLATFORM_CATALOG_KEY, loaded, ttl=PLATFORM_CATALOG_TTL, tags=["platforms"])
+        return loaded
+
+    return catalog_cache.flights.do(PLATFORM_CATALOG_KEY, load)
+
+
+# 经 ORM 写入平台的会话在提交后失效平台缓存（包括目录），不经 PlatformService 的写入同样生效
+_DIRTY_KEY = "platforms_changed"
+
+
+def _mark_changed(mapper, connection, target: Platform) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info[_DIRTY_KEY] = True
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Platform, _event, _mark_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        invalidate_tags("platforms")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -3,15 +3,24 @@
 处理平台的业务逻辑，包括 CRUD、搜索、排序、分页等
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 from app.models import Platform
 from app.schemas.platform import PlatformCreate, PlatformUpdate, PlatformResponse
 from typing import List, Optional, Tuple
+from app.utils.cache import invalidate_tags
+from app.services.platform_catalog import get_catalog
+from app.services.static_export import request_static_export
 
 
 class PlatformService:
     """平台管理服务类"""
 
+    @staticmethod
+    def _invalidate_platform_cache(*platform_ids: int) -> None:
+        """平台写入后失效相关缓存（详情与列表）"""
+        invalidate_tags("platforms", *(f"platform:{platform_id}" for platform_id in platform_ids))
+        request_static_export("platforms", platform_ids)
+
     @staticmethod
     def create_platform(db: Session, platform_data: PlatformCreate) -> Platform:
         """
@@ -37,6 +46,7 @@ class PlatformService:
         db.add(db_platform)
         db.commit()
         db.refresh(db_platform)
+        PlatformService._invalidate_platform_cache(db_platform.id)
         return db_platform
 
     @staticmethod
@@ -63,7 +73,7 @@ class PlatformService:
         sort_order: str = "asc",
         is_active: Optional[bool] = None,
         is_featured: Optional[bool] = None,
-    ) -> Tuple[List[Platform], int]:
+    ) -> Tuple[List[PlatformResponse], int]:
         """
         获取平台列表（支持搜索、排序、分页）
         
@@ -72,7 +82,8 @@ class PlatformService:
             skip: 跳过的记录数
             limit: 返回的最大记录数
             search: 搜索关键词（搜索名称和描述）
-            sort_by: 排序字段 (name, rank, rating, commission_rate, created_at, recommended)
+            sort_by: 排序字段 (name, rank, commission_rate, created_at 按 sort_order；
+                rating, leverage, fee, recommended, ranking 为固定方向)
             sort_order: 排序顺序 (asc, desc)
             is_active: 过滤活跃状态
             is_featured: 过滤精选状态
@@ -80,62 +91,25 @@ class PlatformService:
         Returns:
             (平台列表, 总数) 元组
         """
-        query = db.query(Platform)
+        # 过滤、排序、分页均在平台目录（内存快照）上完成
+        platforms = get_catalog(db).ordered(sort_by, sort_order)
 
         # 应用搜索过滤
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Platform.name.ilike(search_pattern),
-                    Platform.description.ilike(search_pattern),
-                )
-            )
+            keyword = search.lower()
+            platforms = [
+                p for p in platforms
+                if keyword in p.name.lower() or keyword in (p.description or "").lower()
+            ]
 
         # 应用状态过滤
         if is_active is not None:
-            query = query.filter(Platform.is_active == is_active)
+            platforms = [p for p in platforms if p.is_active == is_active]
 
         if is_featured is not None:
-            query = query.filter(Platform.is_featured == is_featured)
-
-        # 获取总数（过滤后）
-        total = query.count()
-
-        # Bug004修复：应用排序 - 支持推荐排序
-        if sort_by == "rating":
-            # 评分最高排在前面
-            query = query.order_by(Platform.rating.desc())
-        elif sort_by == "leverage":
-            # 杠杆最高排在前面
-            query = query.order_by(Platform.max_leverage.desc())
-        elif sort_by == "fee":
-            # 费率最低排在前面
-            query = query.order_by(Platform.commission_rate.asc())
-        elif sort_by == "recommended":
-            # Bug002修复：推荐排序 - 推荐的平台优先，然后按评分排序
-            query = query.order_by(Platform.is_recommended.desc(), Platform.rating.desc())
-        elif sort_by == "ranking":
-            # 推荐排序（默认）
-            query = query.order_by(Platform.is_recommended.desc(), Platform.rating.desc())
-        else:
-            # 默认排序字段
-            sort_columns = {
-                "name": Platform.name,
-                "rank": Platform.rank,
-                "commission_rate": Platform.commission_rate,
-                "created_at": Platform.created_at,
-            }
-            sort_column = sort_columns.get(sort_by, Platform.rank)
-            if sort_order.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-
-        # 应用分页
-        platforms = query.offset(skip).limit(limit).all()
+            platforms = [p for p in platforms if p.is_featured == is_featured]
 
-        return platforms, total
+        return platforms[skip:skip + limit], len(platforms)
 
     @staticmethod
     def update_platform(
@@ -175,6 +149,7 @@ class PlatformService:
         db.add(db_platform)
         db.commit()
         db.refresh(db_platform)
+        PlatformService._invalidate_platform_cache(platform_id)
         return db_platform
 
     @staticmethod
@@ -195,6 +170,7 @@ class PlatformService:
 
         db.delete(db_platform)
         db.commit()
+        PlatformService._invalidate_platform_cache(platform_id)
         return True
 
     @staticmethod
@@ -224,10 +200,11 @@ class PlatformService:
             updated_count += 1
 
         db.commit()
+        PlatformService._invalidate_platform_cache(*rank_data.keys())
         return updated_count
 
     @staticmethod
-    def get_featured_platforms(db: Session, limit: int = 5) -> List[Platform]:
+    def get_featured_platforms(db: Session, limit: int = 5) -> List[PlatformResponse]:
         """
         获取精选平台
         
@@ -238,16 +215,11 @@ class PlatformService:
         Returns:
             精选平台列表
         """
-        return (
-            db.query(Platform)
-            .filter(and_(Platform.is_featured == True, Platform.is_active == True))
-            .order_by(Platform.rank.asc())
-            .limit(limit)
-            .all()
-        )
+        platforms = get_catalog(db).ordered("rank")
+        return [p for p in platforms if p.is_featured and p.is_active][:limit]
 
     @staticmethod
-    def get_regulated_platforms(db: Session) -> List[Platform]:
+    def get_regulated_platforms(db: Session) -> List[PlatformResponse]:
         """
         获取所有监管平台
         
@@ -257,12 +229,8 @@ class PlatformService:
         Returns:
             监管平台列表
         """
-        return (
-            db.query(Platform)
-            .filter(and_(Platform.is_regulated == True, Platform.is_active == True))
-            .order_by(Platform.rank.asc())
-            .all()
-        )
+        platforms = get_catalog(db).ordered("rank")
+        return [p for p in platforms if p.is_regulated and p.is_active]
 
     @staticmethod
     def toggle_platform_status(db: Session, platform_id: int) -> Optional[Platform]:
@@ -284,6 +252,7 @@ class PlatformService:
         db.add(db_platform)
         db.commit()
         db.refresh(db_platform)
+        PlatformService._invalidate_platform_cache(platform_id)
         return db_platform
 
     @staticmethod
@@ -306,4 +275,5 @@ class PlatformService:
         db.add(db_platform)
         db.commit()
         db.refresh(db_platform)
+        PlatformService._invalidate_platform_cache(platform_id)
         return db_platform
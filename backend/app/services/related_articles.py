@@ -0,0 +1,358 @@
+"""
+相关文章服务
+
+后台任务为每篇已发布文章预先计算最相似的若干篇文章（同栏目或同平台），写入 article_related 表；
+接口与 SSR 页面只读取该表，请求时不做任何相似度计算。
+
+- 向量：标题、标签、摘要与正文纯文本按全文检索的规则切分（中文二元组、其他文字按单词），
+  词哈希到固定维度后计算 TF-IDF（对数词频、L2 归一化），以 SciPy 稀疏矩阵保存
+- 相似度：余弦相似度，按块做稀疏矩阵乘法，每篇文章只在同栏目或同平台的文章中取前 K 篇
+- 增量更新：文章发布、修改、下线或删除后只重算该文章，以及因此需要调整列表的文章；
+  Celery worker 进程内缓存每篇文章的词频（按 updated_at 失效），增量任务只切分变化的文章
+- 定时全量重建兜底（IDF 随语料变化，增量更新只重算受影响的文章）
+"""
+import logging
+import os
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, load_only
+
+from app.models import Article, RelatedArticle
+from app.utils.article_search import segment
+from app.utils.cache import invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+# 是否在文章写入后投递增量更新任务（需要 Celery worker）
+RELATED_ARTICLES_ENABLED = os.getenv("RELATED_ARTICLES_ENABLED", "False") == "True"
+# 每篇文章保存的相关文章数
+RELATED_ARTICLES_TOP_K = int(os.getenv("RELATED_ARTICLES_TOP_K", "6"))
+# 相似度下限，低于该值的文章不作为相关文章
+RELATED_ARTICLES_MIN_SCORE = float(os.getenv("RELATED_ARTICLES_MIN_SCORE", "0.05"))
+
+# 词哈希维度
+HASH_FEATURES = 1 << 18
+# 全量重建时每块计算的文章数（块大小 x 文章总数的稠密相似度矩阵）
+SIMILARITY_BLOCK_SIZE = 256
+# 加载正文时每批文章数
+LOAD_BATCH_SIZE = 500
+# 各字段的词频权重
+FIELD_WEIGHTS = (("title", 3), ("tags", 2), ("summary", 1), ("body", 1))
+
+# 进程内词频缓存：文章 ID -> (updated_at, 特征下标, 词频)
+_term_cache: Dict[int, Tuple[Optional[datetime], np.ndarray, np.ndarray]] = {}
+
+
+def term_counts(title, summary, tags, body) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算一篇文章的哈希词频
+
+    Returns:
+        (特征下标, 加权词频)，下标升序且不重复
+    """
+    fields = {"title": title, "summary": summary, "tags": (tags or "").replace(",", " "), "body": body}
+    counts: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for token, count in Counter(segment(fields[field])).items():
+            counts[token] += count * weight
+
+    features: Dict[int, float] = {}
+    for token, count in counts.items():
+        feature = zlib.crc32(token.encode("utf-8")) & (HASH_FEATURES - 1)
+        features[feature] = features.get(feature, 0.0) + count
+    indices = np.fromiter(sorted(features), dtype=np.int32, count=len(features))
+    values = np.array([features[i] for i in indices], dtype=np.float32)
+    return indices, values
+
+
+class RelatedCorpus:
+    """已发布文章的 TF-IDF 矩阵与分组信息"""
+
+    def __init__(self, ids: List[int], sections: np.ndarray, platforms: np.ndarray, matrix: sparse.csr_matrix):
+        self.ids = ids
+        self.sections = sections
+        self.platforms = platforms
+        self.matrix = matrix
+        self.positions = {article_id: position for position, article_id in enumerate(ids)}
+
+    @classmethod
+    def load(cls, db: Session) -> "RelatedCorpus":
+        """加载全部已发布文章（词频优先取进程内缓存）"""
+        rows = (
+            db.query(Article.id, Article.section_id, Article.platform_id, Article.updated_at)
+            .filter(Article.is_published == True)
+            .order_by(Article.id)
+            .all()
+        )
+        published = {row.id for row in rows}
+        for stale_id in [article_id for article_id in _term_cache if article_id not in published]:
+            del _term_cache[stale_id]
+
+        missing = [row.id for row in rows if row.id not in _term_cache or _term_cache[row.id][0] != row.updated_at]
+        for start in range(0, len(missing), LOAD_BATCH_SIZE):
+            batch = (
+                db.query(
+                    Article.id, Article.title, Article.summary, Article.tags,
+                    Article.plain_text, Article.content, Article.updated_at,
+                )
+                .filter(Article.id.in_(missing[start:start + LOAD_BATCH_SIZE]))
+                .all()
+            )
+            for row in batch:
+                body = row.plain_text if row.plain_text is not None else row.content
+                _term_cache[row.id] = (row.updated_at, *term_counts(row.title, row.summary, row.tags, body))
+
+        ids = [row.id for row in rows]
+        sections = np.array([row.section_id if row.section_id is not None else -1 for row in rows], dtype=np.int64)
+        platforms = np.array([row.platform_id if row.platform_id is not None else -1 for row in rows], dtype=np.int64)
+        return cls(ids, sections, platforms, cls._tfidf([_term_cache[article_id] for article_id in ids]))
+
+    @staticmethod
+    def _tfidf(entries: Sequence[Tuple[Optional[datetime], np.ndarray, np.ndarray]]) -> sparse.csr_matrix:
+        """由词频构建 L2 归一化的 TF-IDF 矩阵"""
+        lengths = np.array([len(indices) for _, indices, _ in entries], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        if entries and indptr[-1]:
+            indices = np.concatenate([indices for _, indices, _ in entries])
+            counts = np.concatenate([values for _, _, values in entries]).astype(np.float64)
+        else:
+            indices = np.zeros(0, dtype=np.int32)
+            counts = np.zeros(0, dtype=np.float64)
+
+        document_count = len(entries)
+        document_frequency = np.bincount(indices, minlength=HASH_FEATURES)
+        idf = np.log((1 + document_count) / (1 + document_frequency)) + 1.0
+        data = (1.0 + np.log(counts)) * idf[indices]
+
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(document_count, HASH_FEATURES))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+    def candidates_mask(self, positions: np.ndarray) -> np.ndarray:
+        """各目标文章的候选范围：同栏目或同平台，排除自身"""
+        sections = self.sections[positions][:, None]
+        platforms = self.platforms[positions][:, None]
+        mask = (self.sections[None, :] == sections) & (sections >= 0)
+        mask |= (self.platforms[None, :] == platforms) & (platforms >= 0)
+        mask[np.arange(len(positions)), positions] = False
+        return mask
+
+    def similarities(self, positions: np.ndarray) -> np.ndarray:
+        """目标文章与候选文章的相似度（非候选为 -1）"""
+        scores = (self.matrix[positions] @ self.matrix.T).toarray()
+        return np.where(self.candidates_mask(positions), scores, -1.0)
+
+    def neighbours(self, positions: Iterable[int], top_k: int = None, min_score: float = None) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        计算目标文章的相关文章
+
+        Args:
+            positions: 目标文章在矩阵中的行号
+            top_k: 每篇文章保留的数量
+            min_score: 相似度下限
+
+        Returns:
+            {文章 ID: [(相关文章 ID, 相似度), ...]}，按相似度降序
+        """
+        top_k = RELATED_ARTICLES_TOP_K if top_k is None else top_k
+        min_score = RELATED_ARTICLES_MIN_SCORE if min_score is None else min_score
+        positions = np.asarray(list(positions), dtype=np.int64)
+        result: Dict[int, List[Tuple[int, float]]] = {}
+        for start in range(0, len(positions), SIMILARITY_BLOCK_SIZE):
+            block = positions[start:start + SIMILARITY_BLOCK_SIZE]
+            scores = self.similarities(block)
+            k = min(top_k, scores.shape[1])
+            for row, position in zip(scores, block):
+                if k <= 0:
+                    result[self.ids[position]] = []
+                    continue
+                top = np.argpartition(-row, k - 1)[:k]
+                top = top[np.argsort(-row[top], kind="stable")]
+                result[self.ids[position]] = [
+                    (self.ids[other], float(row[other])) for other in top if row[other] >= min_score
+                ]
+        return result
+
+
+class RelatedArticleService:
+    """相关文章的读取、计算与写入"""
+
+    @staticmethod
+    def get_related(db: Session, article_id: int, limit: int = None) -> List[Article]:
+        """
+        读取预先计算的相关文章（只返回仍处于发布状态的文章）
+
+        Args:
+            db: 数据库会话
+            article_id: 文章 ID
+            limit: 最大返回数，默认 RELATED_ARTICLES_TOP_K
+
+        Returns:
+            按相关度排序的文章列表（只加载列表展示所需的字段）
+        """
+        return (
+            db.query(Article)
+            .options(load_only(
+                Article.id, Article.title, Article.slug, Article.summary, Article.auto_summary,
+                Article.section_id, Article.platform_id, Article.published_at, Article.updated_at,
+            ))
+            .join(RelatedArticle, RelatedArticle.related_id == Article.id)
+            .filter(RelatedArticle.article_id == article_id, Article.is_published == True)
+            .order_by(RelatedArticle.rank)
+            .limit(limit or RELATED_ARTICLES_TOP_K)
+            .all()
+        )
+
+    @staticmethod
+    def to_items(articles: Iterable[Article]) -> List[Dict]:
+        """转为列表展示所需的字段（接口与 SSR 页面共用）"""
+        return [
+            {
+                "id": article.id,
+                "title": article.title,
+                "slug": article.slug,
+                "summary": (article.summary and article.summary.strip()) or article.auto_summary or "",
+                "published_at": article.published_at,
+            }
+            for article in articles
+        ]
+
+    @staticmethod
+    def _write(db: Session, neighbours: Dict[int, List[Tuple[int, float]]], replace_all: bool = False) -> None:
+        """写入相关文章（替换这些文章原有的列表）"""
+        table = RelatedArticle.__table__
+        if replace_all:
+            db.execute(delete(table))
+        elif neighbours:
+            db.execute(delete(table).where(table.c.article_id.in_(list(neighbours))))
+        now = datetime.utcnow()
+        rows = [
+            {"article_id": article_id, "related_id": related_id, "rank": rank, "score": score, "computed_at": now}
+            for article_id, items in neighbours.items()
+            for rank, (related_id, score) in enumerate(items, start=1)
+        ]
+        if rows:
+            db.execute(table.insert(), rows)
+        db.commit()
+
+    @staticmethod
+    def _changed(before: Dict[int, List[int]], after: Dict[int, List[Tuple[int, float]]]) -> List[int]:
+        """列表发生变化的文章"""
+        return [
+            article_id for article_id, items in after.items()
+            if before.get(article_id, []) != [related_id for related_id, _ in items]
+        ]
+
+    @staticmethod
+    def _current(db: Session, article_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """读取文章当前的相关文章 ID（按排名）"""
+        article_ids = list(article_ids)
+        current: Dict[int, List[int]] = {article_id: [] for article_id in article_ids}
+        for start in range(0, len(article_ids), LOAD_BATCH_SIZE):
+            rows = db.execute(
+                select(RelatedArticle.article_id, RelatedArticle.related_id)
+                .where(RelatedArticle.article_id.in_(article_ids[start:start + LOAD_BATCH_SIZE]))
+                .order_by(RelatedArticle.article_id, RelatedArticle.rank)
+            ).all()
+            for article_id, related_id in rows:
+                current[article_id].append(related_id)
+        return current
+
+    @staticmethod
+    def _after_write(changed: List[int]) -> None:
+        """相关文章变化后失效页面缓存并重新导出静态页"""
+        if not changed:
+            return
+        from app.services.static_export import request_static_export
+
+        invalidate_tags(*(f"related:{article_id}" for article_id in changed))
+        request_static_export("articles", changed)
+
+    @staticmethod
+    def rebuild_all(db: Session) -> Dict[str, int]:
+        """
+        全量重建所有已发布文章的相关文章
+
+        Returns:
+            {"articles": 文章数, "changed": 列表变化的文章数}
+        """
+        corpus = RelatedCorpus.load(db)
+        neighbours = corpus.neighbours(range(len(corpus.ids)))
+        before = RelatedArticleService._current(db, corpus.ids)
+        changed = RelatedArticleService._changed(before, neighbours)
+        RelatedArticleService._write(db, neighbours, replace_all=True)
+        RelatedArticleService._after_write(changed)
+        return {"articles": len(corpus.ids), "changed": len(changed)}
+
+    @staticmethod
+    def update_article(db: Session, article_id: int) -> Dict[str, int]:
+        """
+        增量更新：文章发布、修改、下线或删除后调用
+
+        重算该文章的相关文章；同组中因此需要调整列表的文章（新文章的相似度超过其当前末位，
+        或当前列表中包含该文章）一并重算。
+
+        Returns:
+            {"recomputed": 重算的文章数, "changed": 列表变化的文章数}
+        """
+        table = RelatedArticle.__table__
+        corpus = RelatedCorpus.load(db)
+        referencing = {
+            row[0] for row in db.execute(select(table.c.article_id).where(table.c.related_id == article_id)).all()
+        }
+
+        targets = set(position for position in (corpus.positions.get(i) for i in referencing) if position is not None)
+        position = corpus.positions.get(article_id)
+        if position is not None:
+            targets.add(position)
+            scores = corpus.similarities(np.array([position]))[0]
+            peers = [int(p) for p in np.nonzero(scores >= RELATED_ARTICLES_MIN_SCORE)[0]]
+            if peers:
+                peer_ids = [corpus.ids[p] for p in peers]
+                current_scores: Dict[int, List[float]] = {peer_id: [] for peer_id in peer_ids}
+                for start in range(0, len(peer_ids), LOAD_BATCH_SIZE):
+                    for owner, score in db.execute(
+                        select(table.c.article_id, table.c.score)
+                        .where(table.c.article_id.in_(peer_ids[start:start + LOAD_BATCH_SIZE]))
+                    ).all():
+                        current_scores[owner].append(score)
+                for p, peer_id in zip(peers, peer_ids):
+                    existing = current_scores[peer_id]
+                    if len(existing) < RELATED_ARTICLES_TOP_K or scores[p] > min(existing):
+                        targets.add(p)
+
+        neighbours = corpus.neighbours(sorted(targets))
+        if position is None:
+            # 已下线或删除：清空它自己的列表
+            neighbours[article_id] = []
+        before = RelatedArticleService._current(db, neighbours)
+        changed = RelatedArticleService._changed(before, neighbours)
+        RelatedArticleService._write(db, neighbours)
+        RelatedArticleService._after_write(changed)
+        return {"recomputed": len(neighbours), "changed": len(changed)}
+
+
+def request_related_update(article_id: int) -> None:
+    """
+    文章写入后投递相关文章增量更新任务（未启用时忽略）
+
+    投递失败只记录日志，不影响写操作；定时全量重建会补上。
+
+    Args:
+        article_id: 文章 ID
+    """
+    if not RELATED_ARTICLES_ENABLED:
+        return
+    try:
+        from app.tasks.related_articles import update_related_articles
+
+        update_related_articles.delay(article_id)
+    except Exception as e:
+        logger.warning(f"相关文章任务投递失败 (article {article_id}): {e}")
@@ -0,0 +1,138 @@
+"""
+首页数据快照服务
+
+首页与栏目页首屏需要的数据（网站设置、栏目、分类、精选 / 热门 / 最新文章、推荐平台、两融总览）
+合并为一个 JSON 快照，由 /api/site/bundle 一次返回：
+
+- 快照序列化后缓存在 page_cache 上（与 SSR 页面一样预压缩并带 ETag），请求只需一次缓存查找，
+  客户端带 If-None-Match 时内容未变直接返回 304
+- 条目带 settings / sections / articles / platforms / margin 标签，内容或两融数据变更时随
+  invalidate_tags 失效，下一次请求重新生成（同一时刻只生成一次）
+- 文章的浏览量、点赞数是生成快照时的值，在 SITE_BUNDLE_TTL 内不刷新
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Category, Section
+from app.models.content_counter import SCOPE_CATEGORY, SCOPE_SECTION, STATE_CATEGORIES, STATE_PUBLISHED
+from app.models.website_settings import WebsiteSettings
+from app.schemas.platform import PlatformResponse
+from app.schemas.section import SectionResponse
+from app.services.article_service import ArticleService
+from app.services.content_counters import ContentCounterService
+from app.services.platform_service import PlatformService
+from app.services.tushare_service import MarginDataService
+from app.utils.page_cache import RenderedPage, get_page, page_cache, store_page
+from app.utils.pagination import TOTAL_NONE
+
+# 快照缓存时间（秒）；内容变更时按标签提前失效
+SITE_BUNDLE_TTL = int(os.getenv("SITE_BUNDLE_TTL", "300"))
+# 各列表的条数（与首页、栏目页原先单独请求时一致）
+SITE_BUNDLE_FEATURED_ARTICLES = 5
+SITE_BUNDLE_TRENDING_ARTICLES = 10
+SITE_BUNDLE_LATEST_ARTICLES = 3
+SITE_BUNDLE_FEATURED_PLATFORMS = 100
+
+SITE_BUNDLE_CACHE_KEY = "page:site-bundle"
+# 快照依赖的数据对应的失效标签
+SITE_BUNDLE_TAGS = ("settings", "sections", "articles", "platforms", "margin")
+
+
+class SiteBundleService:
+    """首页数据快照的生成与读取"""
+
+    @staticmethod
+    def build(db: Session) -> Dict[str, Any]:
+        """
+        查询并组装快照内容
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            可 JSON 序列化的快照
+        """
+        settings = db.query(WebsiteSettings).first()
+
+        category_count = ContentCounterService.count_column(SCOPE_SECTION, STATE_CATEGORIES, Section.id)
+        sections = []
+        for section, count in db.execute(
+            select(Section, category_count).where(Section.is_active == True).order_by(Section.sort_order)
+        ).all():
+            section_response = SectionResponse.model_validate(section)
+            section_response.category_count = count
+            sections.append(section_response)
+
+        article_count = ContentCounterService.count_column(SCOPE_CATEGORY, STATE_PUBLISHED, Category.id)
+        categories = [
+            {
+                "id": category.id,
+                "name": category.name,
+                "description": category.description,
+                "section_id": category.section_id,
+                "sort_order": category.sort_order,
+                "article_count": count,
+            }
+            for category, count in db.execute(
+                select(Category, article_count)
+                .where(Category.is_active == True)
+                .order_by(Category.section_id, Category.sort_order)
+            ).all()
+        ]
+
+        fields = ArticleService.parse_fields("list")
+        featured = ArticleService.get_featured_articles(db, limit=SITE_BUNDLE_FEATURED_ARTICLES, fields=fields)
+        trending = ArticleService.get_trending_articles(db, limit=SITE_BUNDLE_TRENDING_ARTICLES, fields=fields)
+        latest = ArticleService.get_articles_page(
+            db,
+            limit=SITE_BUNDLE_LATEST_ARTICLES,
+            total=TOTAL_NONE,
+            fields=fields,
+            is_published=True,
+            sort_by="published_at",
+            sort_order="desc",
+        ).items
+
+        platforms = PlatformService.get_featured_platforms(db, limit=SITE_BUNDLE_FEATURED_PLATFORMS)
+
+        return jsonable_encoder({
+            "generated_at": datetime.utcnow(),
+            "settings": settings.to_dict() if settings else None,
+            "sections": sections,
+            "categories": categories,
+            "featured_articles": [ArticleService.to_list_item(a, fields) for a in featured],
+            "trending_articles": [ArticleService.to_list_item(a, fields) for a in trending],
+            "latest_articles": [ArticleService.to_list_item(a, fields) for a in latest],
+            "featured_platforms": [PlatformResponse.model_validate(p) for p in platforms],
+            "margin_overview": MarginDataService(db).get_overview(),
+        })
+
+    @staticmethod
+    def get_bundle(db: Session) -> Tuple[RenderedPage, str]:
+        """
+        获取快照（缓存未命中时生成并缓存）
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            (序列化后的快照, X-Page-Cache 状态)
+        """
+        page = get_page(SITE_BUNDLE_CACHE_KEY)
+        if page is not None:
+            return page, "HIT"
+
+        def load() -> RenderedPage:
+            cached_page = get_page(SITE_BUNDLE_CACHE_KEY)
+            if cached_page is not None:
+                return cached_page
+            body = json.dumps(SiteBundleService.build(db), ensure_ascii=False, separators=(",", ":"))
+            return store_page(SITE_BUNDLE_CACHE_KEY, body, tags=SITE_BUNDLE_TAGS, ttl=SITE_BUNDLE_TTL)
+
+        return page_cache.flights.do(SITE_BUNDLE_CACHE_KEY, load), "MISS"
@@ -0,0 +1,322 @@
+"""
+Sitemap 服务
+
+/sitemap.xml 为 sitemap 索引，按类型拆分子 sitemap（/sitemap-{kind}-{page}.xml），
+每个子文件不超过协议规定的 50,000 个 URL。
+
+- 子文件按主键（个股按股票代码）范围分段：各段起始键扫描索引一次得出并缓存，
+  每个子文件从起始键开始按索引读取，深层分段不需要像 OFFSET 那样跳过前面的行；
+  逐行流式读取（yield_per），只取生成 URL 所需的列
+- 各类型的来源状态（条数、最新 updated_at / 交易日）缓存在 cache_manager 上，
+  随 articles / platforms / margin 标签失效；生成的 XML 以来源状态为版本缓存在 page_cache 上，
+  内容不变时不再查询数据库，ETag / Last-Modified 支持条件请求
+"""
+import html
+import math
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Article, Platform
+from app.models.margin import MarginDetail
+from app.utils.cache import cache_manager
+from app.utils.page_cache import RenderedPage, get_page, page_cache_key, store_page
+
+# 单个子 sitemap 的 URL 上限（协议上限 50,000）
+SITEMAP_MAX_URLS = min(int(os.getenv("SITEMAP_MAX_URLS", "50000")), 50000)
+# 流式读取时每批行数
+SITEMAP_YIELD_PER = int(os.getenv("SITEMAP_YIELD_PER", "1000"))
+# sitemap 缓存时间（秒）；来源变更时按标签提前失效
+SITEMAP_CACHE_TTL = int(os.getenv("SITEMAP_CACHE_TTL", "3600"))
+
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# 站点时区：文章时间以北京时间（无时区）存储，交易日按北京时间计；平台时间为 UTC
+SITE_TZ = timezone(timedelta(hours=8))
+
+# 子 sitemap 类型，按索引中的顺序
+SITEMAP_KINDS = ("pages", "platforms", "articles", "margin")
+
+# 各类型对应的失效标签
+_KIND_TAGS = {
+    "pages": (),
+    "platforms": ("platforms",),
+    "articles": ("articles",),
+    "margin": ("margin",),
+}
+
+# 固定页面：(路径, changefreq, priority)
+STATIC_PAGES = (
+    ("/", "daily", "1.0"),
+    ("/platforms/", "daily", "0.9"),
+    ("/compare/", "weekly", "0.85"),
+    ("/qa/", "weekly", "0.8"),
+    ("/wiki/", "weekly", "0.8"),
+    ("/guides/", "weekly", "0.8"),
+    ("/margin/", "daily", "0.9"),
+    ("/margin/ranking/net_buy/", "daily", "0.8"),
+    ("/margin/ranking/rzye/", "daily", "0.8"),
+    ("/margin/ranking/rqye/", "daily", "0.8"),
+    ("/margin/ranking/rqyl/", "daily", "0.8"),
+    ("/about/", "monthly", "0.7"),
+    ("/legal/", "yearly", "0.6"),
+)
+
+# 来源状态：(URL 数, 最后修改时间)
+SourceState = Tuple[int, Optional[datetime]]
+
+# 各类型的分段键与过滤条件
+_SEGMENT_KEYS = {
+    "platforms": (Platform.id, (Platform.is_active == True,)),
+    "articles": (Article.id, (Article.is_published == True,)),
+    "margin": (MarginDetail.ts_code, (MarginDetail.ts_code.isnot(None),)),
+}
+
+
+def _as_datetime(value, tz=timezone.utc) -> Optional[datetime]:
+    """
+    统一为带时区的 UTC 时间（日期按站点时区当天零点），用于比较与 Last-Modified
+
+    Args:
+        value: datetime 或 date；无时区的 datetime 按 tz 解释
+        tz: 无时区时间所在的时区
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=tz)
+        return value.astimezone(timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=SITE_TZ).astimezone(timezone.utc)
+    return None
+
+
+def _fmt_date(value) -> str:
+    """格式化 lastmod（YYYY-MM-DD；带时区的时间按站点时区取日期）"""
+    if not value:
+        return datetime.now().date().isoformat()
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(SITE_TZ)
+        return value.date().isoformat()
+    return value.isoformat()
+
+
+class SitemapService:
+    """Sitemap 索引与子 sitemap 生成"""
+
+    @staticmethod
+    def source_state(db: Session, kind: str) -> SourceState:
+        """
+        获取某类 URL 的来源状态（条数与最新修改时间），带缓存
+
+        Args:
+            db: 数据库会话
+            kind: SITEMAP_KINDS 之一
+
+        Returns:
+            (URL 数, 最后修改时间（UTC）)
+        """
+        if kind == "pages":
+            today = datetime.now(SITE_TZ).date()
+            return len(STATIC_PAGES), _as_datetime(today)
+
+        cache_key = f"sitemap:state:{kind}"
+        state = cache_manager.get(cache_key)
+        if state is not None:
+            return state
+
+        tz = timezone.utc
+        if kind == "platforms":
+            count, latest = db.query(
+                func.count(Platform.id),
+                func.max(func.coalesce(Platform.updated_at, Platform.created_at)),
+            ).filter(Platform.is_active == True).one()
+        elif kind == "articles":
+            count, latest = db.query(
+                func.count(Article.id),
+                func.max(func.coalesce(Article.updated_at, Article.created_at)),
+            ).filter(Article.is_published == True).one()
+            tz = SITE_TZ
+        else:
+            # 个股页数随交易日同步变化；最新交易日走 trade_date 索引，
+            # 股票数只在同步后（margin 标签失效）重新统计一次
+            latest = db.query(func.max(MarginDetail.trade_date)).scalar()
+            count = db.query(func.count(func.distinct(MarginDetail.ts_code))).scalar() if latest else 0
+
+        state = (count or 0, _as_datetime(latest, tz))
+        cache_manager.set(cache_key, state, ttl=SITEMAP_CACHE_TTL, tags=_KIND_TAGS[kind])
+        return state
+
+    @staticmethod
+    def page_count(count: int) -> int:
+        """URL 数对应的子 sitemap 数"""
+        return math.ceil(count / SITEMAP_MAX_URLS)
+
+    @staticmethod
+    def segment_starts(db: Session, kind: str) -> List[Any]:
+        """
+        各子 sitemap 的起始键（第 1、SITEMAP_MAX_URLS + 1、... 行的分段键），带缓存
+
+        Args:
+            db: 数据库会话
+            kind: platforms / articles / margin
+
+        Returns:
+            按分段顺序的起始键列表
+        """
+        cache_key = f"sitemap:segments:{kind}:{SITEMAP_MAX_URLS}"
+        starts = cache_manager.get(cache_key)
+        if starts is not None:
+            return starts
+
+        column, criteria = _SEGMENT_KEYS[kind]
+        keys = db.query(column.label("key")).filter(*criteria).distinct().subquery()
+        numbered = db.query(
+            keys.c.key,
+            func.row_number().over(order_by=keys.c.key).label("position"),
+        ).subquery()
+        starts = [
+            key for (key,) in db.query(numbered.c.key)
+            .filter((numbered.c.position - 1) % SITEMAP_MAX_URLS == 0)
+            .order_by(numbered.c.key)
+        ]
+        cache_manager.set(cache_key, starts, ttl=SITEMAP_CACHE_TTL, tags=_KIND_TAGS[kind])
+        return starts
+
+    @staticmethod
+    def _iter_urls(db: Session, kind: str, page: int, site_url: str, latest) -> Iterator[Tuple[str, str, str, str]]:
+        """
+        流式产出某个子 sitemap 的 URL
+
+        Yields:
+            (loc, lastmod, changefreq, priority)
+        """
+        if kind == "pages":
+            today = datetime.now(SITE_TZ).date().isoformat()
+            for path, changefreq, priority in STATIC_PAGES:
+                yield f"{site_url}{path}", today, changefreq, priority
+            return
+
+        starts = SitemapService.segment_starts(db, kind)
+        if page > len(starts):
+            return
+        start = starts[page - 1]
+        if kind == "platforms":
+            query = (
+                db.query(Platform.slug, Platform.updated_at, Platform.created_at)
+                .filter(Platform.is_active == True, Platform.id >= start)
+                .order_by(Platform.id)
+            )
+            for slug, updated_at, created_at in query.limit(SITEMAP_MAX_URLS).yield_per(SITEMAP_YIELD_PER):
+                yield f"{site_url}/platforms/{slug}/", _fmt_date(updated_at or created_at), "weekly", "0.85"
+        elif kind == "articles":
+            query = (
+                db.query(Article.slug, Article.published_at, Article.updated_at, Article.created_at)
+                .filter(Article.is_published == True, Article.id >= start)
+                .order_by(Article.id)
+            )
+            for slug, published_at, updated_at, created_at in query.limit(SITEMAP_MAX_URLS).yield_per(SITEMAP_YIELD_PER):
+                yield f"{site_url}/article/{slug}", _fmt_date(published_at or updated_at or created_at), "weekly", "0.8"
+        else:
+            lastmod = _fmt_date(latest)
+            query = (
+                db.query(MarginDetail.ts_code)
+                .filter(MarginDetail.ts_code >= start)
+                .distinct()
+                .order_by(MarginDetail.ts_code)
+            )
+            for (ts_code,) in query.limit(SITEMAP_MAX_URLS).yield_per(SITEMAP_YIELD_PER):
+                yield f"{site_url}/margin/stock/{ts_code}/", lastmod, "daily", "0.7"
+
+    @staticmethod
+    def _build_urlset(urls: Iterable[Tuple[str, str, str, str]]) -> str:
+        """生成 urlset XML"""
+        parts: List[str] = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<urlset xmlns="{SITEMAP_XMLNS}">',
+        ]
+        for loc, lastmod, changefreq, priority in urls:
+            parts.append(
+                f"  <url>\n"
+                f"    <loc>{html.escape(loc)}</loc>\n"
+                f"    <lastmod>{lastmod}</lastmod>\n"
+                f"    <changefreq>{changefreq}</changefreq>\n"
+                f"    <priority>{priority}</priority>\n"
+                f"  </url>"
+            )
+        parts.append("</urlset>")
+        return "\n".join(parts)
+
+    @staticmethod
+    def get_index(db: Session, site_url: str) -> Tuple[RenderedPage, Optional[datetime], str]:
+        """
+        获取 sitemap 索引
+
+        Args:
+            db: 数据库会话
+            site_url: 公开站点地址
+
+        Returns:
+            (页面, 最后修改时间, X-Page-Cache 状态)
+        """
+        states: Dict[str, SourceState] = {kind: SitemapService.source_state(db, kind) for kind in SITEMAP_KINDS}
+        last_modified = max((latest for _, latest in states.values() if latest), default=None)
+
+        version = "|".join(f"{kind}:{count}:{_fmt_date(latest)}" for kind, (count, latest) in states.items())
+        cache_key = page_cache_key("sitemap", "index", version, site_url)
+        page = get_page(cache_key)
+        if page is not None:
+            return page, last_modified, "HIT"
+
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<sitemapindex xmlns="{SITEMAP_XMLNS}">',
+        ]
+        for kind, (count, latest) in states.items():
+            for page_no in range(1, SitemapService.page_count(count) + 1):
+                parts.append(
+                    f"  <sitemap>\n"
+                    f"    <loc>{html.escape(f'{site_url}/sitemap-{kind}-{page_no}.xml')}</loc>\n"
+                    f"    <lastmod>{_fmt_date(latest)}</lastmod>\n"
+                    f"  </sitemap>"
+                )
+        parts.append("</sitemapindex>")
+
+        tags = ["sitemap"] + [tag for kind in SITEMAP_KINDS for tag in _KIND_TAGS[kind]]
+        page = store_page(cache_key, "\n".join(parts), tags=tags, ttl=SITEMAP_CACHE_TTL)
+        return page, last_modified, "MISS"
+
+    @staticmethod
+    def get_sitemap(db: Session, kind: str, page_no: int, site_url: str) -> Optional[Tuple[RenderedPage, Optional[datetime], str]]:
+        """
+        获取子 sitemap
+
+        Args:
+            db: 数据库会话
+            kind: SITEMAP_KINDS 之一
+            page_no: 分段序号（从 1 开始）
+            site_url: 公开站点地址
+
+        Returns:
+            (页面, 最后修改时间, X-Page-Cache 状态)；类型或分段不存在时返回 None
+        """
+        if kind not in SITEMAP_KINDS or page_no < 1:
+            return None
+        count, latest = SitemapService.source_state(db, kind)
+        if page_no > SitemapService.page_count(count):
+            return None
+
+        version = f"{count}:{latest.isoformat() if latest else ''}"
+        cache_key = page_cache_key("sitemap", f"{kind}-{page_no}", version, site_url)
+        page = get_page(cache_key)
+        if page is not None:
+            return page, latest, "HIT"
+
+        xml = SitemapService._build_urlset(SitemapService._iter_urls(db, kind, page_no, site_url, latest))
+        page = store_page(cache_key, xml, tags=["sitemap", *_KIND_TAGS[kind]], ttl=SITEMAP_CACHE_TTL)
+        return page, latest, "MISS"
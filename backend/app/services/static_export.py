@@ -0,0 +1,379 @@
+"""
+公开页面静态导出
+
+将已发布文章、启用的平台与两融个股页渲染为完整 HTML，写入 nginx 直接提供的目录（STATIC_EXPORT_DIR）：
+
+- article/{slug}/index.html
+- platforms/{slug}/index.html
+- margin/stock/{ts_code}/index.html
+
+渲染逻辑与 SSR 路由共用 PageRenderService。导出是增量的：目录下的 .manifest.json 记录每个页面的版本
+（内容的 updated_at / 最新交易日、相关文章、模板签名、站点地址），版本未变化的页面不重新渲染；
+下线、删除或改名的页面同时删除旧文件。每个页面另存一份 .gz，供 nginx gzip_static 使用。
+
+写操作通过 request_static_export 投递 Celery 任务（app/tasks/static_export.py），
+Celery Beat 定时做一次全量增量扫描兜底。
+"""
+import gzip
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, defer, joinedload
+
+from app.models import Article, Category, Platform, RelatedArticle, Section
+from app.models.margin import MarginDetail
+from app.services.counter_buffer import counter_buffer
+from app.services.page_render_service import (
+    ARTICLE_TEMPLATE_PATH,
+    MARGIN_STOCK_TEMPLATE_PATH,
+    PLATFORM_TEMPLATE_PATH,
+    PageRenderService,
+)
+from app.services.related_articles import RelatedArticleService
+from app.utils.site_paths import BACKEND_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows 开发环境没有 fcntl，不加锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 是否启用静态导出（启用后写操作会投递导出任务）
+STATIC_EXPORT_ENABLED = os.getenv("STATIC_EXPORT_ENABLED", "False") == "True"
+# 导出目录（nginx 挂载的只读目录）
+STATIC_EXPORT_DIR = os.getenv("STATIC_EXPORT_DIR", str(BACKEND_DIR / "prerendered"))
+# 每批渲染的页面数
+STATIC_EXPORT_BATCH_SIZE = 200
+
+MANIFEST_NAME = ".manifest.json"
+LOCK_NAME = ".manifest.lock"
+
+EXPORT_KINDS = ("articles", "platforms", "margin")
+
+# 可以直接作为目录名的 slug / 股票代码；其他页面不导出，继续由后端 SSR
+_SAFE_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+def _safe_name(name: Optional[str]) -> Optional[str]:
+    if name and _SAFE_NAME_RE.fullmatch(name) and ".." not in name:
+        return name
+    return None
+
+
+class StaticExporter:
+    """静态页面导出器"""
+
+    def __init__(self, db: Session, output_dir: str = None, site_url: str = None):
+        """
+        Args:
+            db: 数据库会话
+            output_dir: 导出目录，默认 STATIC_EXPORT_DIR
+            site_url: 公开站点地址，默认环境变量 PUBLIC_SITE_URL
+
+        Raises:
+            ValueError: 未配置公开站点地址（canonical / og:url 无法生成）
+        """
+        self.db = db
+        self.output_dir = Path(output_dir or STATIC_EXPORT_DIR)
+        self.site_url = (site_url or os.getenv("PUBLIC_SITE_URL", "")).rstrip("/")
+        if not self.site_url:
+            raise ValueError("静态导出需要配置 PUBLIC_SITE_URL")
+
+        self.stats = {"written": 0, "unchanged": 0, "removed": 0}
+
+    # ==================== 文件与清单 ====================
+
+    @contextmanager
+    def _manifest(self):
+        """加锁读取清单，退出时写回（多个 worker 并发导出时串行）"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_dir / LOCK_NAME, "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                path = self.output_dir / MANIFEST_NAME
+                try:
+                    manifest = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    manifest = {}
+                yield manifest
+                self._write_file(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_file(self, relative_path: str, data: bytes) -> None:
+        """先写临时文件再原子替换，nginx 不会读到写了一半的页面"""
+        path = self.output_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+    def _write_page(self, relative_path: str, page_html: str) -> None:
+        body = page_html.encode("utf-8")
+        self._write_file(relative_path, body)
+        self._write_file(relative_path + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+        self.stats["written"] += 1
+
+    def _remove_page(self, relative_path: str) -> None:
+        path = self.output_dir / relative_path
+        for target in (path, path.with_name(path.name + ".gz")):
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
+        self.stats["removed"] += 1
+
+    def _sync(
+        self,
+        manifest: Dict[str, dict],
+        prefix: str,
+        current: Dict[str, Tuple[str, str]],
+        scope: Optional[Iterable[str]],
+        render: Callable[[List[str]], Iterable[Tuple[str, str]]],
+    ) -> None:
+        """
+        按版本对比同步一类页面
+
+        Args:
+            manifest: 清单（页面键 -> {"path", "version"}）
+            prefix: 页面键前缀，如 "article:"
+            current: 应当存在的页面：页面键 -> (相对路径, 版本)
+            scope: 本次检查的页面键；None 表示该类全部页面
+            render: 按页面键批量渲染，产出 (页面键, HTML)
+        """
+        scope_keys = set(current) | (
+            {key for key in manifest if key.startswith(prefix)} if scope is None else set(scope)
+        )
+
+        for key in scope_keys:
+            entry = manifest.get(key)
+            if entry is None:
+                continue
+            target = current.get(key)
+            if target is None or target[0] != entry["path"]:
+                self._remove_page(entry["path"])
+                del manifest[key]
+
+        changed = [
+            key for key in scope_keys
+            if key in current and manifest.get(key, {}).get("version") != current[key][1]
+        ]
+        self.stats["unchanged"] += len([key for key in scope_keys if key in current]) - len(changed)
+
+        for start in range(0, len(changed), STATIC_EXPORT_BATCH_SIZE):
+            for key, page_html in render(changed[start:start + STATIC_EXPORT_BATCH_SIZE]):
+                path, version = current[key]
+                self._write_page(path, page_html)
+                manifest[key] = {"path": path, "version": version}
+
+    # ==================== 文章 ====================
+
+    def export_articles(self, article_ids: Optional[Iterable[int]] = None) -> dict:
+        """
+        导出已发布文章
+
+        Args:
+            article_ids: 只检查这些文章（新建、修改、下线、删除后调用）；None 检查全部
+
+        Returns:
+            导出统计
+        """
+        template_signature = PageRenderService.template_signature(ARTICLE_TEMPLATE_PATH)
+        if not template_signature:
+            logger.warning(f"静态导出跳过文章：模板不存在 {ARTICLE_TEMPLATE_PATH}")
+            return self.stats
+
+        # 栏目 / 分类名称显示在页面中，计入版本
+        query = (
+            self.db.query(Article.id, Article.slug, Article.updated_at, Section.name, Category.name)
+            .outerjoin(Section, Article.section_id == Section.id)
+            .outerjoin(Category, Article.category_id == Category.id)
+            .filter(Article.is_published == True)
+        )
+        scope = None
+        if article_ids is not None:
+            article_ids = list(article_ids)
+            query = query.filter(Article.id.in_(article_ids))
+            scope = [f"article:{article_id}" for article_id in article_ids]
+
+        related_versions = self._related_versions(article_ids)
+        current = {}
+        for article_id, slug, updated_at, section_name, category_name in query.yield_per(1000):
+            slug = _safe_name(slug)
+            if slug is None:
+                continue
+            version = "|".join([
+                updated_at.isoformat() if updated_at else "",
+                section_name or "",
+                category_name or "",
+                related_versions.get(article_id, ""),
+                template_signature,
+                self.site_url,
+            ])
+            current[f"article:{article_id}"] = (f"article/{slug}/index.html", version)
+
+        def render(keys: List[str]):
+            ids = [int(key.split(":", 1)[1]) for key in keys]
+            articles = (
+                self.db.query(Article)
+                .options(joinedload(Article.section), joinedload(Article.category_obj), defer(Article.plain_text))
+                .filter(Article.id.in_(ids))
+                .all()
+            )
+            for article in articles:
+                view_count = (article.view_count or 0) + counter_buffer.pending("view_count", article.id)
+                related = RelatedArticleService.to_items(RelatedArticleService.get_related(self.db, article.id))
+                yield f"article:{article.id}", PageRenderService.render_article(
+                    article, self.site_url, view_count, view_beacon=True, related=related
+                )
+
+        with self._manifest() as manifest:
+            self._sync(manifest, "article:", current, scope, render)
+        return self.stats
+
+    def _related_versions(self, article_ids: Optional[List[int]]) -> Dict[int, str]:
+        """相关文章的版本（ID 与 updated_at），列表重算或其中的文章修改后重新导出"""
+        query = (
+            self.db.query(RelatedArticle.article_id, RelatedArticle.related_id, Article.updated_at)
+            .join(Article, Article.id == RelatedArticle.related_id)
+            .filter(Article.is_published == True)
+            .order_by(RelatedArticle.article_id, RelatedArticle.rank)
+        )
+        if article_ids is not None:
+            query = query.filter(RelatedArticle.article_id.in_(article_ids))
+        versions: Dict[int, List[str]] = {}
+        for article_id, related_id, updated_at in query.yield_per(1000):
+            versions.setdefault(article_id, []).append(f"{related_id}@{updated_at.isoformat() if updated_at else ''}")
+        return {article_id: ",".join(items) for article_id, items in versions.items()}
+
+    # ==================== 平台 ====================
+
+    def export_platforms(self, platform_ids: Optional[Iterable[int]] = None) -> dict:
+        """
+        导出启用的平台
+
+        Args:
+            platform_ids: 只检查这些平台；None 检查全部
+
+        Returns:
+            导出统计
+        """
+        template_signature = PageRenderService.template_signature(PLATFORM_TEMPLATE_PATH)
+        if not template_signature:
+            logger.warning(f"静态导出跳过平台：模板不存在 {PLATFORM_TEMPLATE_PATH}")
+            return self.stats
+
+        query = self.db.query(Platform.id, Platform.slug, Platform.updated_at).filter(Platform.is_active == True)
+        scope = None
+        if platform_ids is not None:
+            platform_ids = list(platform_ids)
+            query = query.filter(Platform.id.in_(platform_ids))
+            scope = [f"platform:{platform_id}" for platform_id in platform_ids]
+
+        current = {}
+        for platform_id, slug, updated_at in query:
+            slug = _safe_name(slug)
+            if slug is None:
+                continue
+            version = "|".join([updated_at.isoformat() if updated_at else "", template_signature, self.site_url])
+            current[f"platform:{platform_id}"] = (f"platforms/{slug}/index.html", version)
+
+        def render(keys: List[str]):
+            ids = [int(key.split(":", 1)[1]) for key in keys]
+            for platform in self.db.query(Platform).filter(Platform.id.in_(ids)).all():
+                yield f"platform:{platform.id}", PageRenderService.render_platform(platform, self.site_url)
+
+        with self._manifest() as manifest:
+            self._sync(manifest, "platform:", current, scope, render)
+        return self.stats
+
+    # ==================== 两融个股 ====================
+
+    def export_margin_stocks(self) -> dict:
+        """
+        导出两融个股页（每只股票取最新交易日的数据）
+
+        版本为最新交易日与股票名称，同步后只有新交易日有数据的股票重新渲染。
+
+        Returns:
+            导出统计
+        """
+        template_signature = PageRenderService.template_signature(MARGIN_STOCK_TEMPLATE_PATH)
+        if not template_signature:
+            logger.warning(f"静态导出跳过两融个股：模板不存在 {MARGIN_STOCK_TEMPLATE_PATH}")
+            return self.stats
+
+        latest_dates = (
+            self.db.query(MarginDetail.ts_code, func.max(MarginDetail.trade_date).label("trade_date"))
+            .group_by(MarginDetail.ts_code)
+            .subquery()
+        )
+        rows = (
+            self.db.query(MarginDetail.ts_code, MarginDetail.name, MarginDetail.trade_date)
+            .join(
+                latest_dates,
+                (MarginDetail.ts_code == latest_dates.c.ts_code)
+                & (MarginDetail.trade_date == latest_dates.c.trade_date),
+            )
+            .yield_per(1000)
+        )
+
+        current = {}
+        latest_rows = {}
+        for row in rows:
+            ts_code = _safe_name(row.ts_code)
+            if ts_code is None:
+                continue
+            key = f"margin:{ts_code}"
+            version = "|".join([row.trade_date.isoformat(), row.name or "", template_signature, self.site_url])
+            current[key] = (f"margin/stock/{ts_code}/index.html", version)
+            latest_rows[key] = row
+
+        def render(keys: List[str]):
+            for key in keys:
+                row = latest_rows[key]
+                yield key, PageRenderService.render_margin_stock(row, row.ts_code, self.site_url)
+
+        with self._manifest() as manifest:
+            self._sync(manifest, "margin:", current, None, render)
+        return self.stats
+
+    def export_all(self) -> dict:
+        """增量导出全部页面"""
+        self.export_articles()
+        self.export_platforms()
+        self.export_margin_stocks()
+        return self.stats
+
+
+def request_static_export(kind: str, keys: Optional[Iterable[int]] = None) -> None:
+    """
+    写操作后投递静态导出任务（未启用静态导出时忽略）
+
+    投递失败（如 broker 不可用）只记录日志，不影响写操作；定时全量扫描会补上遗漏的页面。
+
+    Args:
+        kind: articles / platforms / margin
+        keys: 受影响的文章或平台 ID；None 表示检查该类全部页面
+    """
+    if not STATIC_EXPORT_ENABLED:
+        return
+    try:
+        from app.tasks.static_export import export_static_pages
+
+        export_static_pages.delay(kind, list(keys) if keys is not None else None)
+    except Exception as e:
+        logger.warning(f"静态导出任务投递失败 ({kind}): {e}")
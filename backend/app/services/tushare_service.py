@@ -6,10 +6,13 @@ Tushare Pro 服务 - 获取融资融券数据
 import tushare as ts
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.config import settings
 from app.models.margin import MarginSummary, MarginDetail
+from app.utils.cache import invalidate_tags
+from app.services.margin_search import get_search_index
+from app.services.static_export import request_static_export
 import logging
 
 logger = logging.getLogger(__name__)
@@ -175,6 +178,12 @@ class MarginDataService:
             self._tushare = TushareService()
         return self._tushare
     
+    @staticmethod
+    def _invalidate_margin_cache(*trade_dates) -> None:
+        """同步写入后失效对应交易日以及依赖最新交易日的缓存"""
+        invalidate_tags("margin", *(f"margin:{d.strftime('%Y-%m-%d')}" for d in trade_dates))
+        request_static_export("margin")
+    
     def sync_summary_data(self, days: int = 30) -> int:
         """
         同步市场汇总数据到数据库
@@ -193,8 +202,10 @@ class MarginDataService:
             return 0
         
         count = 0
+        synced_dates = set()
         for _, row in df.iterrows():
             trade_date = datetime.strptime(str(row['trade_date']), '%Y%m%d').date()
+            synced_dates.add(trade_date)
             
             # 检查是否已存在
             existing = self.db.query(MarginSummary).filter(
@@ -228,6 +239,7 @@ class MarginDataService:
                 count += 1
         
         self.db.commit()
+        self._invalidate_margin_cache(*synced_dates)
         logger.info(f"Synced {count} margin summary records")
         return count
     
@@ -291,6 +303,8 @@ class MarginDataService:
                 count += 1
         
         self.db.commit()
+        if count:
+            self._invalidate_margin_cache(trade_date_obj)
         logger.info(f"Synced {count} margin detail records for {trade_date}")
         return count
     
@@ -327,6 +341,9 @@ class MarginDataService:
                 self.db.commit()
                 total_count += updated_in_batch
         
+        if total_count:
+            invalidate_tags("margin")
+            request_static_export("margin")
         logger.info(f"Updated {total_count} stock names")
         return total_count
     
@@ -360,6 +377,58 @@ class MarginDataService:
             for s in summaries
         ]
     
+    def get_overview(self) -> Optional[Dict[str, Any]]:
+        """
+        获取两融数据总览（最新交易日的市场汇总及较前一交易日的变化率）
+        
+        Returns:
+            总览数据；没有数据时返回 None
+        """
+        latest_summaries = self.get_latest_summary()
+        if not latest_summaries:
+            return None
+        
+        trade_date = latest_summaries[0]["trade_date"]
+        
+        # 计算汇总
+        total_rzye = sum(s["rzye"] for s in latest_summaries)
+        total_rqye = sum(s["rqye"] for s in latest_summaries)
+        total_rzrqye = sum(s["rzrqye"] for s in latest_summaries)
+        
+        # 获取前一交易日数据计算变化率
+        current_date = datetime.strptime(trade_date, '%Y-%m-%d').date()
+        
+        # 查找最近的前一个交易日
+        prev_record = self.db.query(MarginSummary).filter(
+            MarginSummary.trade_date < current_date
+        ).order_by(MarginSummary.trade_date.desc()).first()
+        
+        if prev_record:
+            prev_summaries = self.db.query(MarginSummary).filter(
+                MarginSummary.trade_date == prev_record.trade_date
+            ).all()
+            
+            prev_rzye = sum(s.rzye for s in prev_summaries)
+            prev_rqye = sum(s.rqye for s in prev_summaries)
+            prev_rzrqye = sum(s.rzrqye for s in prev_summaries)
+            
+            rzye_change = ((total_rzye - prev_rzye) / prev_rzye * 100) if prev_rzye else 0
+            rqye_change = ((total_rqye - prev_rqye) / prev_rqye * 100) if prev_rqye else 0
+            rzrqye_change = ((total_rzrqye - prev_rzrqye) / prev_rzrqye * 100) if prev_rzrqye else 0
+        else:
+            rzye_change = rqye_change = rzrqye_change = 0.0
+        
+        return {
+            "trade_date": trade_date,
+            "total_rzye": total_rzye,
+            "total_rqye": total_rqye,
+            "total_rzrqye": total_rzrqye,
+            "rzye_change": round(rzye_change, 2),
+            "rqye_change": round(rqye_change, 2),
+            "rzrqye_change": round(rzrqye_change, 2),
+            "exchanges": latest_summaries,
+        }
+    
     def get_summary_trend(self, days: int = 30) -> List[Dict[str, Any]]:
         """获取市场汇总趋势数据"""
         from sqlalchemy import func
@@ -504,32 +573,12 @@ class MarginDataService:
         ]
     
     def search_stocks(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """搜索两融标的"""
-        # 从明细数据中搜索（有历史数据的股票）
-        from sqlalchemy import or_
-        
-        # 获取最新交易日
-        latest = self.db.query(MarginDetail).order_by(
-            MarginDetail.trade_date.desc()
-        ).first()
-        
-        if not latest:
+        """
+        搜索两融标的（最新交易日），支持代码、名称与拼音首字母
+
+        使用内存索引（见 app/services/margin_search.py），仅在索引失效后重建时查询数据库。
+        """
+        index = get_search_index(self.db)
+        if index is None:
             return []
-        
-        stocks = self.db.query(MarginDetail).filter(
-            MarginDetail.trade_date == latest.trade_date,
-            or_(
-                MarginDetail.ts_code.contains(keyword.upper()),
-                MarginDetail.name.contains(keyword)
-            )
-        ).limit(limit).all()
-        
-        return [
-            {
-                "ts_code": s.ts_code,
-                "name": s.name or s.ts_code.split('.')[0],
-                "rzye": s.rzye,
-                "rqyl": s.rqyl,
-            }
-            for s in stocks
-        ]
+        return index.search(keyword, limit=limit)
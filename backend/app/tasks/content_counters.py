@@ -0,0 +1,26 @@
+"""
+内容计数 Celery 任务
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="tasks.reconcile_content_counters")
+def reconcile_content_counters():
+    """按实际数量校正内容计数表"""
+    from app.database import SessionLocal
+    from app.services.content_counters import ContentCounterService
+
+    db = SessionLocal()
+    try:
+        stats = ContentCounterService.reconcile(db)
+        logger.info(f"内容计数校正完成: {stats}")
+        return {"success": True, **stats}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"内容计数校正失败: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
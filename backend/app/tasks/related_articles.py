@@ -0,0 +1,34 @@
+"""
+相关文章 Celery 任务
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="tasks.update_related_articles")
+def update_related_articles(article_id: int = None):
+    """
+    更新相关文章
+
+    Args:
+        article_id: 发布、修改、下线或删除的文章 ID；None 全量重建
+    """
+    from app.database import SessionLocal
+    from app.services.related_articles import RelatedArticleService
+
+    db = SessionLocal()
+    try:
+        if article_id is None:
+            stats = RelatedArticleService.rebuild_all(db)
+        else:
+            stats = RelatedArticleService.update_article(db, article_id)
+        logger.info(f"相关文章更新完成 ({article_id or 'all'}): {stats}")
+        return {"success": True, "article_id": article_id, **stats}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"相关文章更新失败 ({article_id or 'all'}): {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
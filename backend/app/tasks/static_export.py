@@ -0,0 +1,42 @@
+"""
+静态页面导出 Celery 任务
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="tasks.export_static_pages")
+def export_static_pages(kind: str = None, keys: list = None):
+    """
+    增量导出公开页面（供 nginx 直接提供）
+
+    Args:
+        kind: articles / platforms / margin；None 导出全部
+        keys: 受影响的文章或平台 ID；None 检查该类全部页面
+    """
+    from app.database import SessionLocal
+    from app.services.static_export import EXPORT_KINDS, StaticExporter
+
+    if kind is not None and kind not in EXPORT_KINDS:
+        return {"success": False, "error": f"未知的导出类型: {kind}"}
+
+    db = SessionLocal()
+    try:
+        exporter = StaticExporter(db)
+        if kind is None:
+            stats = exporter.export_all()
+        elif kind == "articles":
+            stats = exporter.export_articles(keys)
+        elif kind == "platforms":
+            stats = exporter.export_platforms(keys)
+        else:
+            stats = exporter.export_margin_stocks()
+        logger.info(f"静态页面导出完成 ({kind or 'all'}): {stats}")
+        return {"success": True, "kind": kind, **stats}
+    except Exception as e:
+        logger.error(f"静态页面导出失败 ({kind or 'all'}): {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
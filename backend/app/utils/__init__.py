@@ -11,7 +11,7 @@ from app.utils.security import (
     verify_token,
     create_refresh_token,
 )
-from app.utils.cache import cache_manager, cached
+from app.utils.cache import cache_manager, cached, invalidate_tags
 
 __all__ = [
     # 安全相关
@@ -24,4 +24,5 @@ __all__ = [
     # 缓存相关
     "cache_manager",
     "cached",
+    "invalidate_tags",
 ]
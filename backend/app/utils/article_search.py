@@ -0,0 +1,237 @@
+"""
+文章全文检索（SQLite FTS5）
+
+articles_fts 虚拟表以文章 ID 为 rowid，索引标题、摘要、标签与正文纯文本。
+
+- FTS5 自带的 unicode61 分词器会把连续的中文当成一个词，这里在写入和查询前自行切分：
+  中文按相邻两字切成二元组（比特币 -> 比特 特币），其他文字按单词切分；
+  查询词按同样规则切分后组成短语查询，相当于子串匹配
+- 按 BM25 排序，标题权重最高
+- 索引由 Article 模型的保存钩子同步（见 app/models/article.py），
+  已有数据用 python -m app.migrations.add_article_fts 建立
+- 数据库不支持 FTS5、索引表不存在或查询词无法切分（如单个汉字）时，调用方回退到 LIKE 查询；
+  索引表存在与否按数据库缓存，表被其他进程删除（降级或重建）后，查询与写入遇到
+  no such table 时清除缓存（forget）并回退，不会一直报错
+"""
+import logging
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Float, Integer, text
+from sqlalchemy.exc import OperationalError
+
+from app.utils.article_text import CJK_RE, extract_derived_fields
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "articles_fts"
+
+# BM25 列权重：标题、摘要、标签、正文
+BM25_WEIGHTS = (10.0, 4.0, 4.0, 1.0)
+
+_WORD_RUN_RE = re.compile(r"\w+")
+_CJK_RUN_RE = re.compile(f"(?:{CJK_RE.pattern})+")
+
+# 已确认存在索引表的数据库（按连接地址）
+_available_urls = set()
+
+
+def segment(value: Optional[str]) -> List[str]:
+    """
+    切分文本：中文按二元组，其他文字按单词（转小写）
+
+    Args:
+        value: 原文
+
+    Returns:
+        词列表
+    """
+    tokens: List[str] = []
+    for run in _WORD_RUN_RE.findall((value or "").lower()):
+        position = 0
+        for match in _CJK_RUN_RE.finditer(run):
+            if match.start() > position:
+                tokens.append(run[position:match.start()])
+            chars = match.group()
+            if len(chars) == 1:
+                tokens.append(chars)
+            else:
+                tokens.extend(chars[i:i + 2] for i in range(len(chars) - 1))
+            position = match.end()
+        if position < len(run):
+            tokens.append(run[position:])
+    return tokens
+
+
+def build_match_query(keyword: Optional[str]) -> Optional[str]:
+    """
+    生成 FTS5 MATCH 表达式
+
+    空白分隔的每部分组成一个短语，各部分需同时命中；非中文结尾的短语按前缀匹配。
+
+    Args:
+        keyword: 搜索关键词
+
+    Returns:
+        MATCH 表达式；无法用索引查询（无有效词、含单个汉字）时返回 None
+    """
+    phrases = []
+    for part in (keyword or "").split():
+        if any(len(run) == 1 for run in _CJK_RUN_RE.findall(part)):
+            # 单个汉字只出现在二元组中，无法准确命中
+            return None
+        tokens = segment(part)
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(tokens) + '"'
+        if not CJK_RE.search(tokens[-1]):
+            phrase += "*"
+        phrases.append(phrase)
+    return " AND ".join(phrases) or None
+
+
+def is_available(connection) -> bool:
+    """
+    检查当前数据库是否已建立全文索引
+
+    Args:
+        connection: SQLAlchemy 连接（Session 使用 session.connection()）
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    url = str(connection.engine.url)
+    if url in _available_urls:
+        return True
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    if exists:
+        _available_urls.add(url)
+    return exists is not None
+
+
+def forget(connection) -> None:
+    """清除索引表存在与否的缓存，下次使用前重新检查"""
+    _available_urls.discard(str(connection.engine.url))
+
+
+def is_missing_index_error(exc: Exception) -> bool:
+    """是否为索引表不存在导致的错误（表在本进程确认存在后被删除）"""
+    return isinstance(exc, OperationalError) and f"no such table: {FTS_TABLE}" in str(exc.orig)
+
+
+def create_index(connection) -> bool:
+    """
+    创建全文索引表
+
+    Returns:
+        是否创建成功（SQLite 未编译 FTS5 时返回 False）
+    """
+    try:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(title, summary, tags, body, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+    except Exception as e:
+        logger.warning(f"创建文章全文索引失败，搜索将使用 LIKE 查询: {e}")
+        return False
+    return True
+
+
+def drop_index(connection) -> None:
+    """删除全文索引表"""
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    forget(connection)
+
+
+def _document(article_id: int, title, summary, tags, body) -> dict:
+    """切分后的索引文档"""
+    return {
+        "article_id": article_id,
+        "title": " ".join(segment(title)),
+        "summary": " ".join(segment(summary)),
+        "tags": " ".join(segment((tags or "").replace(",", " "))),
+        "body": " ".join(segment(body)),
+    }
+
+
+_INSERT_SQL = text(
+    f"INSERT INTO {FTS_TABLE} (rowid, title, summary, tags, body) "
+    "VALUES (:article_id, :title, :summary, :tags, :body)"
+)
+
+
+def index_article(connection, article) -> None:
+    """
+    写入（或替换）一篇文章的索引
+
+    Args:
+        connection: 数据库连接
+        article: 文章对象（正文使用保存钩子计算好的 plain_text）
+    """
+    if not is_available(connection):
+        return
+    body = article.plain_text
+    if body is None:
+        body = extract_derived_fields(article.content or "")["plain_text"]
+    try:
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :article_id"), {"article_id": article.id})
+        connection.execute(_INSERT_SQL, _document(article.id, article.title, article.summary, article.tags, body))
+    except OperationalError as exc:
+        if not is_missing_index_error(exc):
+            raise
+        forget(connection)
+
+
+def remove_article(connection, article_id: int) -> None:
+    """删除一篇文章的索引"""
+    if not is_available(connection):
+        return
+    try:
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :article_id"), {"article_id": article_id})
+    except OperationalError as exc:
+        if not is_missing_index_error(exc):
+            raise
+        forget(connection)
+
+
+def index_rows(connection, rows: Iterable) -> int:
+    """
+    批量写入索引（重建时使用）
+
+    Args:
+        connection: 数据库连接
+        rows: 含 id、title、summary、tags、plain_text、content 的行
+
+    Returns:
+        写入的文章数
+    """
+    documents = []
+    for row in rows:
+        body = row.plain_text
+        if body is None:
+            body = extract_derived_fields(row.content or "")["plain_text"]
+        documents.append(_document(row.id, row.title, row.summary, row.tags, body))
+    if documents:
+        connection.execute(_INSERT_SQL, documents)
+    return len(documents)
+
+
+def search_subquery(match: str):
+    """
+    命中文章的子查询，列为 article_id 与 rank（BM25，越小越相关）
+
+    Args:
+        match: build_match_query 生成的 MATCH 表达式
+    """
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    return (
+        text(
+            f"SELECT rowid AS article_id, bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_match"
+        )
+        .bindparams(fts_match=match)
+        .columns(article_id=Integer, rank=Float)
+        .subquery("article_search")
+    )
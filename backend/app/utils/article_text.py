@@ -0,0 +1,93 @@
+"""
+文章派生字段
+
+由正文 HTML 计算纯文本、自动摘要、图片列表、字数与阅读时长。
+在文章保存时计算一次并写入 articles 表（见 app/models/article.py 的保存钩子），
+详情页等读路径直接使用，不再对每次浏览解析正文。
+"""
+import re
+from typing import Any, Dict, List
+
+from bs4 import BeautifulSoup
+
+# 自动摘要长度（字符）
+AUTO_SUMMARY_LENGTH = 160
+# 阅读速度：中文字符 / 分钟、英文单词 / 分钟
+READING_CJK_CHARS_PER_MINUTE = 400
+READING_WORDS_PER_MINUTE = 200
+
+# 单个中日韩统一表意文字（字数统计与全文检索切分共用）
+CJK_RE = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’.-][A-Za-z0-9]+)*")
+
+
+def count_words(plain_text: str) -> Dict[str, int]:
+    """
+    统计字数
+
+    Args:
+        plain_text: 纯文本
+
+    Returns:
+        {"cjk": 中日韩字符数, "words": 其他语言单词数}
+    """
+    cjk = len(CJK_RE.findall(plain_text))
+    words = len(_WORD_RE.findall(CJK_RE.sub(" ", plain_text)))
+    return {"cjk": cjk, "words": words}
+
+
+def extract_derived_fields(content_html: str) -> Dict[str, Any]:
+    """
+    由正文 HTML 计算派生字段
+
+    Args:
+        content_html: 正文 HTML
+
+    Returns:
+        plain_text: 空白折叠后的纯文本
+        auto_summary: 纯文本前 160 个字符（截断时追加省略号）
+        image_urls: 正文中 <img src> 的原始地址（按出现顺序，去重）
+        word_count: 字数（中文按字符、其他语言按单词计）
+        reading_time: 阅读时长（分钟，有内容时至少 1）
+    """
+    soup = BeautifulSoup(content_html or "", "html.parser")
+    plain_text = " ".join(soup.get_text().split())
+
+    image_urls: List[str] = []
+    for img in soup.find_all("img"):
+        src = (img.get("src") or "").strip()
+        if src and src not in image_urls:
+            image_urls.append(src)
+
+    auto_summary = ""
+    if plain_text:
+        auto_summary = plain_text[:AUTO_SUMMARY_LENGTH] + ("…" if len(plain_text) > AUTO_SUMMARY_LENGTH else "")
+
+    counts = count_words(plain_text)
+    minutes = counts["cjk"] / READING_CJK_CHARS_PER_MINUTE + counts["words"] / READING_WORDS_PER_MINUTE
+    reading_time = max(1, round(minutes)) if plain_text else 0
+
+    return {
+        "plain_text": plain_text,
+        "auto_summary": auto_summary,
+        "image_urls": image_urls,
+        "word_count": counts["cjk"] + counts["words"],
+        "reading_time": reading_time,
+    }
+
+
+def absolute_image_urls(image_urls: List[str], site_url: str) -> List[str]:
+    """
+    将图片地址转为绝对地址（结构化数据 image 字段使用）
+
+    Args:
+        image_urls: extract_derived_fields 返回的图片地址
+        site_url: 公开站点地址
+    """
+    result = []
+    for src in image_urls or []:
+        if src.startswith("http"):
+            result.append(src)
+        else:
+            result.append(f"{site_url}/{src.lstrip('/')}")
+    return result
@@ -1,23 +1,328 @@
 """
 API响应缓存工具
-提供内存缓存和基于时间的失效机制
+提供有界的内存缓存（LRU + TTL）和基于时间的失效机制，
+可选接入 Redis 二级缓存（见 cache_backends），在多个 worker 与 Celery 之间共享
 """
 from __future__ import annotations
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Callable
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Tuple, Iterable, Sequence, Set, Union
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from enum import Enum
 from functools import wraps
+import asyncio
 import hashlib
+import inspect
 import json
 import logging
+import os
+import pickle
+import sys
+import threading
+import time
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTasks
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
+
+from app.utils.cache_backends import (
+    CACHE_L2_ENABLED,
+    CACHE_L2_PREFIX,
+    CACHE_L2_URL,
+    RedisCacheBackend,
+)
 
 logger = logging.getLogger(__name__)
 
+# 缓存容量：条目数与字节数双重上限，任一超出即按 LRU 淘汰
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
 
-class CacheManager:
-    """内存缓存管理器"""
+
+# 依赖注入的对象不参与缓存键（每次请求都是新实例）
+_INJECTED_TYPES = (Session, AsyncSession, HTTPConnection, Response, BackgroundTasks)
+
+
+def _is_injected(value: Any) -> bool:
+    """是否为数据库会话、请求/响应对象或 ORM 实例（如 current_user）"""
+    return isinstance(value, _INJECTED_TYPES) or hasattr(value, "_sa_instance_state")
+
+
+def _normalize_key_value(value: Any) -> Any:
+    """
+    将参数值归一化为可稳定序列化的形式
+    
+    - 字符串去除首尾空白；枚举取值；日期转 ISO 格式
+    - 集合排序；字典按键排序（由 json.dumps 的 sort_keys 完成）
+    - 直接调用路由函数时未传的 Query(...) 默认值取其 default
+    - 依赖注入对象在容器中同样被跳过
+    """
+    if isinstance(value, FieldInfo):
+        value = None if value.is_required() else value.default
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, Enum):
+        return _normalize_key_value(value.value)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return _normalize_key_value(value.model_dump(mode="json"))
+    if isinstance(value, dict):
+        return {
+            str(k): _normalize_key_value(v) for k, v in value.items() if not _is_injected(v)
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize_key_value(v) for v in value if not _is_injected(v)]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize_key_value(v) for v in value), key=repr)
+    return str(value)
+
+
+def make_cache_key(prefix: str, material: Any) -> str:
+    """
+    根据前缀和键参数生成缓存键
+    
+    Args:
+        prefix: 键前缀
+        material: 参与缓存键的参数（会被归一化）
+    
+    Returns:
+        16 位十六进制缓存键
+    """
+    key_string = f"{prefix}:" + json.dumps(
+        _normalize_key_value(material), sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(key_string.encode()).hexdigest()[:16]
+
+
+def _estimate_size(value: Any) -> int:
+    """估算缓存值占用的字节数（优先使用 pickle 序列化长度）"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _CacheEntry:
+    """
+    缓存条目（过期时间使用 time.monotonic，不受系统时钟调整影响）
+    
+    expires_at 之后条目不再作为命中返回，但在 stale_until 之前仍保留，
+    供刷新期间的并发调用读取旧值。
+    """
+    
+    __slots__ = ("value", "expires_at", "stale_until", "created_at", "size", "tags")
+    
+    def __init__(
+        self,
+        value: Any,
+        expires_at: float,
+        stale_until: float,
+        created_at: float,
+        size: int,
+        tags: Tuple[str, ...] = (),
+    ):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.created_at = created_at
+        self.size = size
+        self.tags = tags
+
+
+class _Call:
+    """单次进行中的同步调用"""
+    
+    __slots__ = ("event", "result", "error")
     
     def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    请求合并（single-flight）
+    
+    同一 key 的并发调用只执行一次，其余调用等待并共享结果（包括异常）。
+    同步调用跨线程合并；异步调用在同一事件循环内合并。
+    异步执行方被取消（如客户端断开）时，取消只作用于执行方本身，由一个等待方接手重新执行。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.coalesced = 0
+    
+    def in_flight(self, key: str) -> bool:
+        """key 是否正在计算中"""
+        with self._lock:
+            if key in self._calls:
+                return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (id(loop), key) in self._async_calls
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        同步执行 fn，同一 key 的并发调用共享一次结果
+        
+        Args:
+            key: 合并键
+            fn: 无参可调用对象
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+    
+    async def do_async(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        异步执行 fn()（返回协程），同一事件循环内同一 key 的并发调用共享一次结果
+        
+        Args:
+            key: 合并键
+            fn: 返回协程的无参可调用对象
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        
+        future = self._async_calls.get(flight_key)
+        while future is not None:
+            with self._lock:
+                self.coalesced += 1
+            try:
+                # shield：等待方被取消时不影响执行方和其他等待方
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # 等待方自身被取消
+            # 执行方被取消：第一个醒来的等待方成为新的执行方，其余等待方等待它
+            future = self._async_calls.get(flight_key)
+        
+        future = loop.create_future()
+        self._async_calls[flight_key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # 只在执行方重新抛出；等待方看到 future 被取消后接手执行
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # 标记已读取，避免无人等待时的告警
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._async_calls.pop(flight_key, None)
+
+
+class CacheManager:
+    """
+    内存缓存管理器
+    
+    - LRU 淘汰：超出条目数或字节数上限时淘汰最久未访问的条目
+    - TTL：读取时惰性过期，cleanup_expired 可批量清理
+    - 线程安全：所有操作持有同一把 RLock
+    - 标签失效：条目可带标签，写操作后按标签批量删除相关条目
+    - 二级缓存（可选）：L1 未命中时读取 L2 并回填 L1，写入时同时写 L2；
+      delete / invalidate_tags / clear 同时作用于 L2，并通过 pub/sub 通知其他进程删除各自的 L1
+    - 关联缓存：link() 关联的其他管理器（如 SSR 页面缓存）随本管理器一起按标签失效和清空
+    
+    标签约定：
+    - article:{id} / section:{slug} / articles（文章列表类）
+    - platform:{id} / platforms（平台列表类）
+    - margin:{YYYY-MM-DD} / margin（依赖最新交易日的数据）
+    - sections（栏目列表，含分类数）
+    - settings（网站设置）
+    """
+    
+    def __init__(self, max_entries: int = None, max_bytes: int = None, l2: RedisCacheBackend = None):
+        self.max_entries = CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._tags: Dict[str, Set[str]] = {}
+        self.flights = SingleFlight()
+        self.l2: Optional[RedisCacheBackend] = None
+        self._linked: list = []
+        if l2 is not None:
+            self.attach_l2(l2)
+        
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_served = 0
+        self.invalidations = 0
+    
+    def attach_l2(self, backend: RedisCacheBackend):
+        """
+        接入二级缓存，并订阅其他进程发出的失效消息
+        
+        Args:
+            backend: L2 后端
+        """
+        self.l2 = backend
+        backend.subscribe(self._on_remote_invalidation)
+    
+    def link(self, other: "CacheManager"):
+        """
+        关联另一个缓存管理器：本管理器（含其他进程经 pub/sub 发来的）按标签失效和清空时，
+        对方的本地条目一并处理
+        
+        Args:
+            other: 被关联的缓存管理器
+        """
+        self._linked.append(other)
+    
+    def _on_remote_invalidation(self, op: str, items):
+        """处理其他进程的失效消息：只删除本地 L1"""
+        if op == "tags":
+            self._invalidate_local(items)
+        elif op == "keys":
+            with self._lock:
+                for key in items:
+                    self._remove(key)
+        elif op == "clear":
+            self._clear_local()
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """
@@ -28,27 +333,36 @@ class CacheManager:
             *args, **kwargs: 用于生成键的参数
         
         Returns:
-            缓存键
+            缓存键（数据库会话、请求等依赖注入对象不参与）
         """
-        # 将参数转换为字符串并哈希
-        key_parts = [prefix]
-        
-        if args:
-            key_parts.append(str(args))
-        
-        if kwargs:
-            # 排序kwargs以确保一致性
-            sorted_kwargs = sorted(kwargs.items())
-            key_parts.append(str(sorted_kwargs))
-        
-        key_string = ":".join(key_parts)
-        
-        # 使用SHA256哈希生成固定长度的键
-        return hashlib.sha256(key_string.encode()).hexdigest()[:16]
+        return make_cache_key(prefix, {"args": list(args), "kwargs": kwargs})
+    
+    def _remove(self, key: str) -> Optional[_CacheEntry]:
+        """移除条目并更新字节计数与标签索引（调用方需持有锁）"""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            for tag in entry.tags:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+        return entry
+    
+    def _evict(self):
+        """按 LRU 顺序淘汰直到满足容量上限（调用方需持有锁）"""
+        while self._cache and (
+            len(self._cache) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self.evictions += 1
+            logger.debug(f"缓存淘汰(LRU): {key}")
     
     def get(self, key: str) -> Optional[Any]:
         """
-        获取缓存值
+        获取缓存值（L1 未命中时读取 L2）
         
         Args:
             key: 缓存键
@@ -56,22 +370,77 @@ class CacheManager:
         Returns:
             缓存值或None(如果不存在或已过期)
         """
-        if key not in self._cache:
+        value = self._get_local(key)
+        if value is None and self.l2 is not None:
+            value = self._get_remote(key)
+        return value
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        """异步获取缓存值：L2 的网络读取放到线程中执行，不阻塞事件循环"""
+        value = self._get_local(key)
+        if value is None and self.l2 is not None:
+            value = await asyncio.to_thread(self._get_remote, key)
+        return value
+    
+    def _get_remote(self, key: str) -> Optional[Any]:
+        """读取 L2 并回填 L1（剩余 TTL 沿用 L2 的过期时间）"""
+        self.l2.ensure_subscriber()
+        result = self.l2.get(key)
+        if result is None:
             return None
+        value, ttl, tags = result
+        self._set_local(key, value, ttl if ttl is not None else 300, 0, tags)
+        return value
+    
+    def _get_local(self, key: str) -> Optional[Any]:
+        """获取 L1 缓存值"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            # 检查是否过期
+            now = time.monotonic()
+            if entry.expires_at <= now:
+                # 过期,超出旧值保留窗口时删除缓存
+                if entry.stale_until <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                    logger.debug(f"缓存过期并删除: {key}")
+                self.misses += 1
+                return None
+            
+            self._cache.move_to_end(key)
+            self.hits += 1
+            logger.debug(f"缓存命中: {key}")
+            return entry.value
+    
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        获取已过期但仍在旧值保留窗口内的缓存值
         
-        cache_entry = self._cache[key]
-        
-        # 检查是否过期
-        if cache_entry["expires_at"] < datetime.now():
-            # 过期,删除缓存
-            del self._cache[key]
-            logger.debug(f"缓存过期并删除: {key}")
-            return None
+        Args:
+            key: 缓存键
         
-        logger.debug(f"缓存命中: {key}")
-        return cache_entry["value"]
+        Returns:
+            旧值或None
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry.stale_until <= time.monotonic():
+                return None
+            self.stale_served += 1
+            return entry.value
     
-    def set(self, key: str, value: Any, ttl: int = 300):
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        tags: Optional[Iterable[str]] = None,
+    ):
         """
         设置缓存值
         
@@ -79,39 +448,127 @@ class CacheManager:
             key: 缓存键
             value: 缓存值
             ttl: 过期时间(秒),默认5分钟
+            stale_ttl: 过期后继续保留旧值的时间(秒)，用于刷新期间返回旧值
+            tags: 缓存标签，invalidate_tags 时一并删除
         """
-        expires_at = datetime.now() + timedelta(seconds=ttl)
+        entry_tags = tuple(dict.fromkeys(tags)) if tags else ()
+        self._set_local(key, value, ttl, stale_ttl, entry_tags)
+        if self.l2 is not None:
+            self.l2.ensure_subscriber()
+            self.l2.set(key, value, ttl, entry_tags)
+    
+    async def aset(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        tags: Optional[Iterable[str]] = None,
+    ):
+        """异步设置缓存值：L2 的网络写入放到线程中执行，不阻塞事件循环"""
+        entry_tags = tuple(dict.fromkeys(tags)) if tags else ()
+        self._set_local(key, value, ttl, stale_ttl, entry_tags)
+        if self.l2 is not None:
+            self.l2.ensure_subscriber()
+            await asyncio.to_thread(self.l2.set, key, value, ttl, entry_tags)
+    
+    def _set_local(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        stale_ttl: float,
+        entry_tags: Tuple[str, ...],
+    ):
+        """写入 L1"""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"缓存值过大未缓存: {key} ({size} bytes)")
+            return
         
-        self._cache[key] = {
-            "value": value,
-            "expires_at": expires_at,
-            "created_at": datetime.now()
-        }
+        now = time.monotonic()
+        with self._lock:
+            self._remove(key)
+            self._cache[key] = _CacheEntry(
+                value, now + ttl, now + ttl + stale_ttl, now, size, entry_tags
+            )
+            self._bytes += size
+            for tag in entry_tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self.sets += 1
+            self._evict()
         
         logger.debug(f"缓存设置: {key} (TTL: {ttl}s)")
     
     def delete(self, key: str):
         """删除缓存"""
-        if key in self._cache:
-            del self._cache[key]
-            logger.debug(f"缓存删除: {key}")
+        with self._lock:
+            if self._remove(key) is not None:
+                logger.debug(f"缓存删除: {key}")
+        if self.l2 is not None:
+            self.l2.delete(key)
+    
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        按标签删除缓存
+        
+        Args:
+            *tags: 标签，如 "article:12"、"section:guide"
+        
+        Returns:
+            本地删除的条目数
+        """
+        removed = self._invalidate_local(tags)
+        if self.l2 is not None:
+            self.l2.invalidate_tags(*tags)
+        return removed
+    
+    def _invalidate_local(self, tags: Iterable[str]) -> int:
+        """按标签删除 L1 条目"""
+        tags = tuple(tags)
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if self._remove(key) is not None:
+                        removed += 1
+            self.invalidations += removed
+        for linked in self._linked:
+            removed += linked._invalidate_local(tags)
+        
+        if removed:
+            logger.debug(f"按标签失效缓存: {tags} ({removed} 个条目)")
+        return removed
     
     def clear(self):
         """清空所有缓存"""
-        count = len(self._cache)
-        self._cache.clear()
+        self._clear_local()
+        if self.l2 is not None:
+            self.l2.clear()
+    
+    def _clear_local(self):
+        """清空 L1"""
+        with self._lock:
+            count = len(self._cache)
+            self._cache.clear()
+            self._tags.clear()
+            self._bytes = 0
         logger.info(f"清空所有缓存: {count} 个条目")
+        for linked in self._linked:
+            linked._clear_local()
     
     def cleanup_expired(self):
         """清理过期缓存"""
-        now = datetime.now()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry["expires_at"] < now
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
+        now = time.monotonic()
+        with self._lock:
+            expired_keys = [
+                key for key, entry in self._cache.items()
+                if entry.stale_until <= now
+            ]
+            
+            for key in expired_keys:
+                self._remove(key)
+            self.expirations += len(expired_keys)
         
         if expired_keys:
             logger.info(f"清理过期缓存: {len(expired_keys)} 个条目")
@@ -120,75 +577,206 @@ class CacheManager:
     
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
-        now = datetime.now()
-        active_count = sum(
-            1 for entry in self._cache.values()
-            if entry["expires_at"] >= now
-        )
-        expired_count = len(self._cache) - active_count
-        
-        return {
-            "total_entries": len(self._cache),
-            "active_entries": active_count,
-            "expired_entries": expired_count
-        }
+        now = time.monotonic()
+        with self._lock:
+            active_count = sum(
+                1 for entry in self._cache.values()
+                if entry.expires_at > now
+            )
+            total = len(self._cache)
+            lookups = self.hits + self.misses
+            
+            return {
+                "total_entries": total,
+                "active_entries": active_count,
+                "expired_entries": total - active_count,
+                "max_entries": self.max_entries,
+                "total_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "sets": self.sets,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_served": self.stale_served,
+                "tags": len(self._tags),
+                "invalidations": self.invalidations,
+                "coalesced": self.flights.coalesced,
+                "l2": self.l2.get_stats() if self.l2 is not None else None,
+            }
+
+
+def configure_l2(manager: CacheManager, url: str = CACHE_L2_URL) -> Optional[RedisCacheBackend]:
+    """
+    为缓存管理器接入 Redis 二级缓存
+    
+    只创建客户端，不建立连接；订阅线程在首次读写时按进程启动。
+    
+    Args:
+        manager: 缓存管理器
+        url: Redis 地址（memory:// 使用进程内 FakeRedis）
+    
+    Returns:
+        L2 后端；创建失败时返回 None 并继续只使用 L1
+    """
+    try:
+        backend = RedisCacheBackend.from_url(url, prefix=CACHE_L2_PREFIX)
+    except Exception as exc:
+        logger.warning(f"L2 缓存未启用: {exc}")
+        return None
+    manager.attach_l2(backend)
+    logger.info(f"L2 缓存已启用: {url.rsplit('@', 1)[-1]}")
+    return backend
 
 
 # 全局缓存实例
 cache_manager = CacheManager()
+if CACHE_L2_ENABLED:
+    configure_l2(cache_manager)
 
 
-def cached(prefix: str = "api", ttl: int = 300):
+def cached(
+    prefix: str = "api",
+    ttl: int = 300,
+    stale_ttl: int = 0,
+    tags: Union[Iterable[str], Callable[..., Iterable[str]], None] = None,
+    key_params: Optional[Sequence[str]] = None,
+    key_func: Optional[Callable[..., Any]] = None,
+):
     """
     缓存装饰器
     
+    未命中时同一缓存键的并发调用只计算一次（single-flight），其余调用等待结果。
+    设置 stale_ttl 后，条目过期后的 stale_ttl 秒内：一个调用负责刷新，
+    其他并发调用直接返回旧值而不等待。
+    
+    缓存键由前缀、函数名和参数生成：参数按函数签名绑定（位置/关键字传参结果相同，
+    未传的参数取默认值），数据库会话、Request、当前用户等依赖注入对象自动跳过，
+    字符串等查询参数先归一化。因此可以直接装饰 FastAPI 路由函数，
+    @router.get 需写在 @cached 之上。
+    
     Args:
         prefix: 缓存键前缀
         ttl: 过期时间(秒)
+        stale_ttl: 过期后允许返回旧值的时间(秒)，0 表示不返回旧值
+        tags: 缓存标签；可以是固定列表，也可以是接收被装饰函数参数、返回标签列表的函数
+        key_params: 只用这些参数生成缓存键（默认使用全部参数）
+        key_func: 自定义键函数，接收被装饰函数的参数，返回参与缓存键的值；优先于 key_params
     
     Example:
-        @cached(prefix="articles", ttl=600)
+        @cached(prefix="articles", ttl=600, stale_ttl=60, tags=["articles"])
         def get_articles():
             return fetch_articles_from_db()
+        
+        @cached(prefix="article", ttl=3600, tags=lambda article_id: [f"article:{article_id}"])
+        def get_article(article_id):
+            ...
+        
+        @router.get("/ranking")
+        @cached(prefix="margin-ranking", ttl=600, tags=["margin"], key_params=["order_by", "limit"])
+        async def get_ranking(order_by: str = "rzye", limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+            ...
     """
+    def resolve_tags(args, kwargs):
+        if tags is None:
+            return None
+        if callable(tags):
+            return tags(*args, **kwargs)
+        return tags
+    
     def decorator(func: Callable):
+        signature = inspect.signature(func)
+        func_name = f"{func.__module__}.{func.__qualname__}"
+        
+        def build_key(args, kwargs) -> str:
+            if key_func is not None:
+                return make_cache_key(prefix, [func_name, key_func(*args, **kwargs)])
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                # 参数不匹配时交给函数本身报错，这里按原始参数生成键
+                params = {"args": list(args), "kwargs": kwargs}
+            else:
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+            material = {
+                name: value for name, value in params.items()
+                if (key_params is None or name in key_params) and not _is_injected(value)
+            }
+            return make_cache_key(prefix, [func_name, material])
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             # 生成缓存键
-            cache_key = cache_manager._generate_key(prefix, *args, **kwargs)
+            cache_key = build_key(args, kwargs)
             
             # 尝试从缓存获取
-            cached_value = cache_manager.get(cache_key)
+            cached_value = await cache_manager.aget(cache_key)
             if cached_value is not None:
                 return cached_value
             
-            # 执行函数并缓存结果
-            result = await func(*args, **kwargs)
-            cache_manager.set(cache_key, result, ttl)
+            # 已有调用在刷新时直接返回旧值
+            if stale_ttl and cache_manager.flights.in_flight(cache_key):
+                stale_value = cache_manager.get_stale(cache_key)
+                if stale_value is not None:
+                    return stale_value
             
-            return result
+            async def load():
+                # 再次检查：上一轮计算可能恰好在本次未命中之后写入
+                cached_value = await cache_manager.aget(cache_key)
+                if cached_value is not None:
+                    return cached_value
+                
+                # 执行函数并缓存结果
+                result = await func(*args, **kwargs)
+                await cache_manager.aset(
+                    cache_key, result, ttl, stale_ttl=stale_ttl, tags=resolve_tags(args, kwargs)
+                )
+                return result
+            
+            return await cache_manager.flights.do_async(cache_key, load)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             # 生成缓存键
-            cache_key = cache_manager._generate_key(prefix, *args, **kwargs)
+            cache_key = build_key(args, kwargs)
             
             # 尝试从缓存获取
             cached_value = cache_manager.get(cache_key)
             if cached_value is not None:
                 return cached_value
             
-            # 执行函数并缓存结果
-            result = func(*args, **kwargs)
-            cache_manager.set(cache_key, result, ttl)
+            # 已有调用在刷新时直接返回旧值
+            if stale_ttl and cache_manager.flights.in_flight(cache_key):
+                stale_value = cache_manager.get_stale(cache_key)
+                if stale_value is not None:
+                    return stale_value
             
-            return result
+            def load():
+                # 再次检查：上一轮计算可能恰好在本次未命中之后写入
+                cached_value = cache_manager.get(cache_key)
+                if cached_value is not None:
+                    return cached_value
+                
+                # 执行函数并缓存结果
+                result = func(*args, **kwargs)
+                cache_manager.set(
+                    cache_key, result, ttl, stale_ttl=stale_ttl, tags=resolve_tags(args, kwargs)
+                )
+                return result
+            
+            return cache_manager.flights.do(cache_key, load)
         
         # 根据函数类型返回合适的包装器
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
             return sync_wrapper
     
     return decorator
+
+
+def invalidate_tags(*tags: str) -> int:
+    """按标签删除全局缓存中的条目（供服务层写操作后调用）"""
+    return cache_manager.invalidate_tags(*tags)
@@ -0,0 +1,547 @@
+"""
+缓存后端
+
+为 CacheManager 提供跨进程共享的二级缓存（L2）：
+- RedisCacheBackend: 基于 Redis，值以 pickle + zlib 紧凑序列化并用 SECRET_KEY 做 HMAC 签名
+  （签名校验通过才解压、反序列化，能写入 Redis 但没有密钥的一方无法让 worker 执行 pickle 载荷），
+  标签索引存为 Redis 集合；失效消息通过 pub/sub 频道广播，
+  各进程（API worker / Celery worker）收到后删除本地 L1 条目
+- FakeRedis: 进程内模拟的 Redis 子集，供测试和无 Redis 的本地开发使用（CACHE_L2_URL=memory://）
+"""
+from __future__ import annotations
+import fnmatch
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pickle
+import queue
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # redis 为可选依赖，未安装时只能使用 memory://
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# 是否启用 L2（默认关闭，仅使用进程内缓存）
+CACHE_L2_ENABLED = os.getenv("CACHE_L2_ENABLED", "False") == "True"
+# L2 地址，默认复用 REDIS_URL；memory:// 使用进程内 FakeRedis
+CACHE_L2_URL = os.getenv("CACHE_L2_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+# L2 键前缀（同一 Redis 上的多个部署需区分）
+CACHE_L2_PREFIX = os.getenv("CACHE_L2_PREFIX", "trustagency:cache:")
+# Redis 出错后暂停访问 L2 的时间（秒），期间只使用 L1
+CACHE_L2_RETRY_SECONDS = float(os.getenv("CACHE_L2_RETRY_SECONDS", "5"))
+# 序列化结果超过该字节数时使用 zlib 压缩
+CACHE_L2_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_L2_COMPRESS_MIN_BYTES", "1024"))
+# 标签集合的过期时间（秒），不短于其中条目的 TTL
+CACHE_L2_TAG_TTL = 24 * 3600
+# 缓存值的签名密钥（默认与 JWT 共用 SECRET_KEY；共享同一 Redis 的进程必须一致）
+CACHE_L2_SECRET = os.getenv("CACHE_L2_SECRET", os.getenv("SECRET_KEY", "your-secret-key-change-in-production"))
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+_SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def _sign(data: bytes, secret: str) -> bytes:
+    return hmac.new(secret.encode("utf-8"), data, hashlib.sha256).digest()
+
+
+def dumps(value: Any, secret: Optional[str] = None) -> bytes:
+    """
+    序列化缓存值：HMAC-SHA256 签名 + 1 字节格式标记 + pickle（较大时 zlib 压缩）
+
+    Args:
+        value: 缓存值
+        secret: 签名密钥，默认 CACHE_L2_SECRET
+
+    Returns:
+        字节串
+    """
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    body = _RAW + data
+    if len(data) >= CACHE_L2_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 1)
+        if len(compressed) < len(data):
+            body = _ZLIB + compressed
+    return _sign(body, secret or CACHE_L2_SECRET) + body
+
+
+def loads(blob: bytes, secret: Optional[str] = None) -> Any:
+    """
+    反序列化 dumps 生成的字节串
+
+    Raises:
+        ValueError: 签名不匹配（不是用同一密钥写入的）或格式未知；此时不会执行 pickle
+    """
+    signature, body = blob[:_SIGNATURE_SIZE], blob[_SIGNATURE_SIZE:]
+    if not hmac.compare_digest(signature, _sign(body, secret or CACHE_L2_SECRET)):
+        raise ValueError("缓存值签名无效")
+    flag, data = body[:1], body[1:]
+    if flag == _ZLIB:
+        data = zlib.decompress(data)
+    elif flag != _RAW:
+        raise ValueError(f"未知的缓存序列化格式: {flag!r}")
+    return pickle.loads(data)
+
+
+class RedisCacheBackend:
+    """
+    Redis 二级缓存
+
+    - 值键: {prefix}{key}，PX 过期，内容为 dumps((value, tags))
+    - 标签键: {prefix}tag:{tag}，集合，成员为值键
+    - 失效频道: {prefix}invalidate，消息为 JSON {"origin", "op", "items"}，
+      op 为 tags / keys / clear；发送方自身忽略回环消息
+
+    所有 Redis 异常都被吞掉并按未命中处理，出错后 CACHE_L2_RETRY_SECONDS 秒内不再访问 Redis，
+    保证 Redis 故障时请求退化为只用 L1 而不是报错或卡在连接超时上。
+    """
+
+    def __init__(self, client, prefix: str = CACHE_L2_PREFIX, channel: Optional[str] = None):
+        self.client = client
+        self.prefix = prefix
+        self.channel = channel or f"{prefix}invalidate"
+        self._node = uuid.uuid4().hex
+        self._listener: Optional[Callable[[str, List[str]], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._retry_at = 0.0
+
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.published = 0
+        self.received = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheBackend":
+        """
+        根据 URL 创建后端
+
+        Args:
+            url: redis://... 或 memory://
+
+        Returns:
+            RedisCacheBackend 实例
+        """
+        if url.startswith("memory://"):
+            return cls(FakeRedis(), **kwargs)
+        if redis is None:
+            raise RuntimeError("未安装 redis，无法启用 L2 缓存")
+        client = redis.Redis.from_url(url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return cls(client, **kwargs)
+
+    @property
+    def origin(self) -> str:
+        """消息来源标识（fork 后子进程的标识不同）"""
+        return f"{self._node}:{os.getpid()}"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    @property
+    def available(self) -> bool:
+        """是否可以访问 Redis（出错后的暂停期内为 False）"""
+        return time.monotonic() >= self._retry_at
+
+    def _failed(self, operation: str, exc: Exception) -> None:
+        self.errors += 1
+        self._retry_at = time.monotonic() + CACHE_L2_RETRY_SECONDS
+        logger.warning(f"L2 缓存 {operation} 失败，{CACHE_L2_RETRY_SECONDS:g}s 内仅使用本地缓存: {exc}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, Optional[float], Tuple[str, ...]]]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            (值, 剩余 TTL 秒数, 标签) 或 None
+        """
+        if not self.available:
+            return None
+        name = self._key(key)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(name)
+            pipe.pttl(name)
+            blob, pttl = pipe.execute()
+        except Exception as exc:
+            self._failed("读取", exc)
+            return None
+
+        if blob is None:
+            self.misses += 1
+            return None
+        try:
+            value, tags = loads(blob)
+        except Exception as exc:
+            logger.warning(f"L2 缓存反序列化失败，丢弃 {key}: {exc}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        ttl = pttl / 1000 if pttl and pttl > 0 else None
+        return value, ttl, tuple(tags)
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值（需可 pickle）
+            ttl: 过期时间(秒)
+            tags: 缓存标签
+        """
+        if not self.available:
+            return
+        tags = tuple(tags)
+        try:
+            blob = dumps((value, tags))
+        except Exception as exc:
+            logger.debug(f"缓存值无法序列化，跳过 L2: {key} ({exc})")
+            return
+
+        name = self._key(key)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(name, blob, px=max(1, int(ttl * 1000)))
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), name)
+                pipe.expire(self._tag_key(tag), max(CACHE_L2_TAG_TTL, int(ttl)))
+            pipe.execute()
+        except Exception as exc:
+            self._failed("写入", exc)
+
+    def delete(self, *keys: str) -> None:
+        """删除缓存并通知其他进程"""
+        if not keys or not self.available:
+            return
+        try:
+            self.client.delete(*[self._key(key) for key in keys])
+            self._publish("keys", keys)
+        except Exception as exc:
+            self._failed("删除", exc)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """按标签删除缓存并通知其他进程"""
+        if not tags or not self.available:
+            return
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = set()
+            for names in pipe.execute():
+                members.update(names or ())
+            self.client.delete(*tag_keys, *members)
+            self._publish("tags", tags)
+        except Exception as exc:
+            self._failed("按标签失效", exc)
+
+    def clear(self) -> None:
+        """删除本前缀下的所有缓存并通知其他进程"""
+        if not self.available:
+            return
+        try:
+            batch = []
+            for name in self.client.scan_iter(match=f"{self.prefix}*", count=500):
+                batch.append(name)
+                if len(batch) >= 500:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+            self._publish("clear", ())
+        except Exception as exc:
+            self._failed("清空", exc)
+
+    def _publish(self, op: str, items: Iterable[str]) -> None:
+        message = json.dumps({"origin": self.origin, "op": op, "items": list(items)})
+        self.client.publish(self.channel, message)
+        self.published += 1
+
+    # ==================== 失效订阅 ====================
+
+    def subscribe(self, listener: Callable[[str, List[str]], None]) -> None:
+        """
+        注册失效消息回调（订阅线程在首次 ensure_subscriber 时启动）
+
+        Args:
+            listener: listener(op, items)，op 为 tags / keys / clear
+        """
+        self._listener = listener
+
+    def ensure_subscriber(self) -> None:
+        """
+        确保当前进程的订阅线程在运行
+
+        线程按需启动而非在导入时启动：Celery prefork / gunicorn --preload 在 fork 之后
+        子进程中不存在父进程的线程，需要在子进程里重新启动。
+        """
+        if self._listener is None:
+            return
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread_pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop,), name="cache-l2-invalidation", daemon=True
+            )
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _run(self, stop: threading.Event) -> None:
+        reconnect = False
+        while not stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if reconnect and self._listener is not None:
+                    # 断线期间可能错过失效消息，清空 L1 以免返回旧数据
+                    self._listener("clear", [])
+                while not stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._handle(message["data"])
+            except Exception as exc:
+                reconnect = True
+                logger.warning(f"L2 缓存失效订阅中断，稍后重连: {exc}")
+                stop.wait(CACHE_L2_RETRY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _handle(self, data) -> None:
+        try:
+            if isinstance(data, bytes):
+                data = data.decode()
+            message = json.loads(data)
+        except (ValueError, UnicodeDecodeError):
+            logger.warning(f"忽略无法解析的缓存失效消息: {data!r}")
+            return
+        if message.get("origin") == self.origin or self._listener is None:
+            return
+        self.received += 1
+        try:
+            self._listener(message.get("op"), list(message.get("items") or ()))
+        except Exception:
+            logger.exception("处理缓存失效消息失败")
+
+    def close(self) -> None:
+        """停止订阅线程"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取 L2 统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+            "available": self.available,
+            "published": self.published,
+            "received": self.received,
+            "subscribed": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+# ==================== 进程内 Redis 模拟 ====================
+
+
+class FakeRedisServer:
+    """FakeRedis 共享的数据与频道，多个 FakeRedis 客户端连接同一实例即模拟多个进程"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self.subscribers: Dict[str, List["queue.Queue"]] = {}
+
+    def _alive(self, name: str):
+        """返回未过期的值（调用方需持有锁）"""
+        item = self.data.get(name)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[name]
+            return None
+        return value
+
+
+_default_server = FakeRedisServer()
+
+
+def _as_key(name) -> str:
+    return name.decode() if isinstance(name, bytes) else name
+
+
+class FakeRedis:
+    """
+    Redis 客户端的最小模拟，仅实现缓存后端用到的命令
+
+    与 redis-py（decode_responses=False）保持一致：取回的值、集合成员均为 bytes。
+    """
+
+    def __init__(self, server: Optional[FakeRedisServer] = None):
+        self.server = server or _default_server
+
+    def get(self, name):
+        with self.server.lock:
+            value = self.server._alive(_as_key(name))
+        return value if isinstance(value, bytes) else None
+
+    def set(self, name, value, ex: Optional[float] = None, px: Optional[int] = None):
+        if isinstance(value, str):
+            value = value.encode()
+        ttl = px / 1000 if px is not None else ex
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self.server.lock:
+            self.server.data[_as_key(name)] = (value, expires_at)
+        return True
+
+    def pttl(self, name) -> int:
+        with self.server.lock:
+            name = _as_key(name)
+            if self.server._alive(name) is None:
+                return -2
+            expires_at = self.server.data[name][1]
+        if expires_at is None:
+            return -1
+        return max(0, int((expires_at - time.monotonic()) * 1000))
+
+    def delete(self, *names) -> int:
+        removed = 0
+        with self.server.lock:
+            for name in names:
+                if self.server._alive(_as_key(name)) is not None:
+                    del self.server.data[_as_key(name)]
+                    removed += 1
+        return removed
+
+    def sadd(self, name, *values) -> int:
+        with self.server.lock:
+            name = _as_key(name)
+            members = self.server._alive(name)
+            if not isinstance(members, set):
+                members = set()
+                self.server.data[name] = (members, None)
+            before = len(members)
+            members.update(v.encode() if isinstance(v, str) else v for v in values)
+            return len(members) - before
+
+    def smembers(self, name) -> set:
+        with self.server.lock:
+            members = self.server._alive(_as_key(name))
+            return set(members) if isinstance(members, set) else set()
+
+    def expire(self, name, seconds) -> bool:
+        with self.server.lock:
+            name = _as_key(name)
+            value = self.server._alive(name)
+            if value is None:
+                return False
+            self.server.data[name] = (value, time.monotonic() + seconds)
+            return True
+
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None):
+        with self.server.lock:
+            names = [name for name in self.server.data if self.server._alive(name) is not None]
+        for name in names:
+            if match is None or fnmatch.fnmatchcase(name, match):
+                yield name.encode()
+
+    def flushall(self) -> bool:
+        with self.server.lock:
+            self.server.data.clear()
+        return True
+
+    def publish(self, channel, message) -> int:
+        if isinstance(message, str):
+            message = message.encode()
+        with self.server.lock:
+            subscribers = list(self.server.subscribers.get(_as_key(channel), ()))
+        for q in subscribers:
+            q.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "FakePubSub":
+        return FakePubSub(self.server)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """记录命令并在 execute 时依次执行"""
+
+    def __init__(self, client: FakeRedis):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return command
+
+    def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+class FakePubSub:
+    """pub/sub 订阅的模拟"""
+
+    def __init__(self, server: FakeRedisServer):
+        self._server = server
+        self._queue: "queue.Queue" = queue.Queue()
+        self._channels: List[str] = []
+
+    def subscribe(self, *channels) -> None:
+        with self._server.lock:
+            for channel in channels:
+                channel = _as_key(channel)
+                self._server.subscribers.setdefault(channel, []).append(self._queue)
+                self._channels.append(channel)
+
+    def get_message(self, timeout: float = 0.0):
+        try:
+            return self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        with self._server.lock:
+            for channel in self._channels:
+                subscribers = self._server.subscribers.get(channel, [])
+                if self._queue in subscribers:
+                    subscribers.remove(self._queue)
+            self._channels = []
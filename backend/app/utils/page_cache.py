@@ -0,0 +1,179 @@
+"""
+SSR 页面缓存
+
+缓存渲染后的完整 HTML 及预压缩的 gzip / brotli 版本，同一页面只渲染、压缩一次。
+
+- 缓存键包含内容版本（文章/平台的 updated_at、个股的最新交易日）和站点地址，
+  内容变更后自然换键，不会读到旧页面
+- 条目带标签（article:{id}、platform:{id}、margin 等），page_cache 关联在全局 cache_manager 上，
+  写操作调用 invalidate_tags 时（包括其他进程经 pub/sub 广播的失效）立即释放旧页面
+- 独立的字节上限，按 LRU 淘汰
+"""
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+
+from app.utils.cache import CacheManager, cache_manager
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只预压缩 gzip
+    brotli = None
+
+# 页面缓存字节上限（含压缩版本）
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# 页面缓存时间（秒）；页面中的浏览量在此时间内不刷新
+PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", "300"))
+# 是否预压缩 gzip / brotli 版本
+PAGE_CACHE_COMPRESS = os.getenv("PAGE_CACHE_COMPRESS", "True") == "True"
+# 小于该字节数的页面不压缩（与 GZipMiddleware 的 minimum_size 一致）
+PAGE_CACHE_COMPRESS_MIN_BYTES = 1000
+
+
+class RenderedPage:
+    """渲染后的页面：原文、压缩版本与 ETag"""
+
+    __slots__ = ("body", "gzip", "br", "etag")
+
+    def __init__(self, body: bytes, gzip_body: Optional[bytes] = None, br_body: Optional[bytes] = None):
+        self.body = body
+        self.gzip = gzip_body
+        self.br = br_body
+        self.etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+    @classmethod
+    def from_html(cls, html: str, compress: bool = None) -> "RenderedPage":
+        """
+        由 HTML 创建页面，并按配置生成压缩版本
+
+        Args:
+            html: 页面 HTML
+            compress: 是否预压缩，默认 PAGE_CACHE_COMPRESS
+        """
+        body = html.encode("utf-8")
+        compress = PAGE_CACHE_COMPRESS if compress is None else compress
+        if not compress or len(body) < PAGE_CACHE_COMPRESS_MIN_BYTES:
+            return cls(body)
+        gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        br_body = brotli.compress(body, quality=5) if brotli is not None else None
+        return cls(body, gzip_body, br_body)
+
+    def select(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """
+        按 Accept-Encoding 选择版本（优先 br，其次 gzip）
+
+        Returns:
+            (响应体, Content-Encoding 或 None)
+        """
+        accepted = set()
+        for item in (accept_encoding or "").lower().split(","):
+            coding, _, params = item.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(coding.strip())
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if self.gzip is not None and ("gzip" in accepted or "*" in accepted):
+            return self.gzip, "gzip"
+        return self.body, None
+
+    def to_response(
+        self,
+        request: Request,
+        cache_status: str,
+        media_type: str = None,
+        last_modified: datetime = None,
+        cache_control: str = None,
+    ) -> Response:
+        """
+        生成响应：If-None-Match（或 If-Modified-Since）匹配时返回 304，否则返回合适的压缩版本
+
+        Args:
+            request: 当前请求
+            cache_status: X-Page-Cache 响应头（HIT / MISS）
+            media_type: 响应类型，默认 HTML
+            last_modified: 内容最后修改时间（无时区按 UTC 处理），用于 Last-Modified
+            cache_control: Cache-Control 响应头
+        """
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding", "X-Page-Cache": cache_status}
+        if last_modified is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            last_modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        if self._not_modified(request, last_modified):
+            return Response(status_code=304, headers=headers)
+
+        body, encoding = self.select(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if media_type is None:
+            return HTMLResponse(content=body, status_code=200, headers=headers)
+        return Response(content=body, status_code=200, headers=headers, media_type=media_type)
+
+    def _not_modified(self, request: Request, last_modified: Optional[datetime]) -> bool:
+        """条件请求判断：有 If-None-Match 时只比较 ETag，否则比较 If-Modified-Since"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return self.etag in [tag.strip() for tag in if_none_match.split(",")]
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if last_modified is None or not if_modified_since:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+
+
+# 全局页面缓存（随 cache_manager 按标签失效）
+page_cache = CacheManager(max_bytes=PAGE_CACHE_MAX_BYTES)
+cache_manager.link(page_cache)
+
+
+def page_cache_key(kind: str, identity: str, version, site_url: str) -> str:
+    """
+    生成页面缓存键
+
+    Args:
+        kind: 页面类型（article / platform / margin-stock）
+        identity: slug 或股票代码
+        version: 内容版本（updated_at、交易日等）
+        site_url: 公开站点地址（页面中的 canonical / og:url 依赖它）
+    """
+    version = version.isoformat() if hasattr(version, "isoformat") else str(version)
+    return f"page:{kind}:{identity}:{version}:{site_url}"
+
+
+def get_page(key: str) -> Optional[RenderedPage]:
+    """读取缓存页面"""
+    return page_cache.get(key)
+
+
+def store_page(key: str, html: str, tags: Iterable[str], ttl: int = None) -> RenderedPage:
+    """
+    缓存渲染结果
+
+    Args:
+        key: page_cache_key 生成的键
+        html: 页面 HTML（或其他文本内容，如 sitemap XML）
+        tags: 失效标签
+        ttl: 缓存时间（秒），默认 PAGE_CACHE_TTL
+
+    Returns:
+        RenderedPage
+    """
+    page = RenderedPage.from_html(html)
+    page_cache.set(key, page, ttl=PAGE_CACHE_TTL if ttl is None else ttl, tags=tags)
+    return page
@@ -0,0 +1,206 @@
+"""
+游标（keyset）分页
+
+skip/limit（OFFSET）分页翻到越深，数据库需要扫描并丢弃的行越多，而且每一页都要额外执行一次
+COUNT。游标分页记住上一页最后一行的排序键，下一页直接从该位置继续（WHERE 排序键 < 上一页末行），
+配合排序索引时任意深度的翻页开销都与首页相同：
+
+    keyset = Keyset(Article.created_at, Article.id)
+    page = keyset.paginate(query, limit=20, cursor=cursor)
+    page.items, page.next_cursor
+
+- 游标是 base64url 编码的 JSON（排序方式 + 上一页末行的排序键），对客户端不透明；
+  排序方式与游标不一致、游标被篡改或排序键与列类型不符时抛出 InvalidCursor（ValueError 子类）
+- 最后一个排序键必须唯一（通常是 id），保证同值的行在翻页时不会丢失或重复
+- 可为空的排序键按 NULL 排在最后处理（与升降序无关）
+- 总数可按需计算：exact（精确）、estimate（缓存一段时间的计数）、none（不计算）
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, String, and_, false, or_
+from sqlalchemy.orm import Query
+
+from app.utils.cache import cache_manager, make_cache_key
+
+# 总数计算方式
+TOTAL_EXACT, TOTAL_ESTIMATE, TOTAL_NONE = "exact", "estimate", "none"
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_ESTIMATE, TOTAL_NONE)
+# estimate 模式下计数的缓存时间（秒）；缓存同时带上调用方的标签，写操作后提前失效
+TOTAL_ESTIMATE_TTL = 60
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析或与当前排序方式不一致"""
+
+
+class Page(NamedTuple):
+    """一页结果"""
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    """
+    还原游标中的排序键：只接受与列类型一致的 JSON 标量
+
+    Raises:
+        InvalidCursor: 值不是标量或与列类型不符（避免把客户端构造的对象、数组绑定到查询参数）
+    """
+    if value is None:
+        return None
+    column_type = column.type
+    try:
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column_type, Date):
+            return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor("游标无效")
+
+    if isinstance(column_type, Boolean):
+        valid = isinstance(value, bool)
+    elif isinstance(column_type, Integer):
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(column_type, (Float, Numeric)):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif isinstance(column_type, String):
+        valid = isinstance(value, str)
+    else:
+        valid = isinstance(value, (str, int, float, bool))
+    if not valid:
+        raise InvalidCursor("游标无效")
+    return value
+
+
+class Keyset:
+    """
+    一组排序键
+
+    Args:
+        *columns: 排序列（ORM 属性），最后一列必须唯一
+        descending: 是否降序
+        nullable: 可能为 NULL 的排序列（NULL 排在最后）
+    """
+
+    def __init__(self, *columns, descending: bool = True, nullable: Iterable = ()):
+        self.columns = columns
+        self.descending = descending
+        nullable_keys = {column.key for column in nullable}
+        self.nullable = [column.key in nullable_keys for column in columns]
+        self.signature = ",".join(column.key for column in columns) + (":desc" if descending else ":asc")
+
+    def order_by(self) -> list:
+        """ORDER BY 子句（与游标条件的顺序一致）"""
+        clauses = []
+        for column, nullable in zip(self.columns, self.nullable):
+            if nullable:
+                clauses.append(column.is_(None))
+            clauses.append(column.desc() if self.descending else column.asc())
+        return clauses
+
+    def _after(self, index: int, values: Sequence[Any]):
+        """排在 values 之后的行：第 index 列之前相等、第 index 列更靠后"""
+        column, value, nullable = self.columns[index], values[index], self.nullable[index]
+        last = index == len(self.columns) - 1
+
+        if value is None:
+            # NULL 排在最后：之后只有同为 NULL 且后续键更靠后的行
+            return false() if last else and_(column.is_(None), self._after(index + 1, values))
+
+        beyond = column < value if self.descending else column > value
+        if last:
+            condition = beyond
+        else:
+            # 先写成范围条件（列 <= 值），以便按索引定位，再细分相等时的后续键
+            reached = column <= value if self.descending else column >= value
+            condition = and_(reached, or_(beyond, self._after(index + 1, values)))
+        return or_(condition, column.is_(None)) if nullable else condition
+
+    def values(self, row) -> List[Any]:
+        """行的排序键"""
+        return [getattr(row, column.key) for column in self.columns]
+
+    def encode(self, row) -> str:
+        """由一行生成指向其后的游标"""
+        payload = {"k": self.signature, "v": [_encode_value(value) for value in self.values(row)]}
+        raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        """
+        解析游标
+
+        Raises:
+            InvalidCursor: 游标无效或不是由当前排序方式生成
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor("游标无效")
+        if not isinstance(payload, dict) or payload.get("k") != self.signature:
+            raise InvalidCursor("游标与当前排序方式不一致")
+        values = payload.get("v")
+        if not isinstance(values, list) or len(values) != len(self.columns):
+            raise InvalidCursor("游标无效")
+        return [_decode_value(column, value) for column, value in zip(self.columns, values)]
+
+    def paginate(self, query: Query, limit: int, cursor: Optional[str] = None, skip: int = 0) -> Page:
+        """
+        按排序键取一页
+
+        Args:
+            query: 已应用过滤条件（未排序）的查询
+            limit: 每页条数
+            cursor: 上一页返回的游标；为空时从头开始（或按 skip 偏移，兼容旧的分页参数）
+            skip: 无游标时跳过的记录数
+
+        Returns:
+            Page（total 为 None，由调用方按需计算）
+        """
+        if cursor:
+            query = query.filter(self._after(0, self.decode(cursor)))
+        query = query.order_by(*self.order_by())
+        if skip and not cursor:
+            query = query.offset(skip)
+        rows = query.limit(limit + 1).all()
+        items = rows[:limit]
+        next_cursor = self.encode(items[-1]) if len(rows) > limit else None
+        return Page(items, None, next_cursor)
+
+
+def count_total(query: Query, mode: str = TOTAL_EXACT, cache_key: Any = None, tags: Sequence[str] = ()) -> Optional[int]:
+    """
+    按需计算总数
+
+    Args:
+        query: 已应用过滤条件的查询
+        mode: exact（精确）/ estimate（缓存的计数，最多滞后 TOTAL_ESTIMATE_TTL 秒）/ none（不计算）
+        cache_key: estimate 模式的缓存键材料（过滤条件），为空时按 exact 计算
+        tags: estimate 模式的缓存标签
+
+    Returns:
+        总数；mode 为 none 时返回 None
+    """
+    if mode == TOTAL_NONE:
+        return None
+    if mode != TOTAL_ESTIMATE or cache_key is None:
+        return query.count()
+
+    key = make_cache_key("pagination-total", cache_key)
+    total = cache_manager.get(key)
+    if total is None:
+        total = query.count()
+        cache_manager.set(key, total, ttl=TOTAL_ESTIMATE_TTL, tags=list(tags))
+    return total
@@ -0,0 +1,83 @@
+"""
+平台详情字段
+
+平台的详情字段（为什么选择、交易条件、开户步骤、徽章等）以文本保存，内容可以是 JSON 数组 / 对象，
+也可以是普通文本（详情页按行拆分或按 Markdown 渲染）。
+
+- 写入时校验：以 [ 或 { 开头的取值必须是有效 JSON，并统一为紧凑格式
+- 保存时解码一次：各字段解码后合并为一个紧凑的 JSON 对象写入 platforms.details_json
+  （见 app/models/platform.py 的保存钩子），详情页直接嵌入，不再逐字段编码、由浏览器逐个解析
+"""
+import json
+from typing import Any, Dict, Optional
+
+# 以 JSON 保存的详情字段
+PLATFORM_JSON_FIELDS = (
+    "main_features",
+    "fee_structure",
+    "fee_table",
+    "why_choose",
+    "trading_conditions",
+    "fee_advantages",
+    "account_types",
+    "trading_tools",
+    "opening_steps",
+    "security_measures",
+    "customer_support",
+    "learning_resources",
+    "platform_badges",
+    "top_badges",
+)
+
+
+def _looks_like_json(value: str) -> bool:
+    return value.lstrip().startswith(("[", "{"))
+
+
+def normalize_detail(value: Optional[str]) -> Optional[str]:
+    """
+    校验并规范化详情字段
+
+    Args:
+        value: 字段取值（JSON 文本或普通文本）
+
+    Returns:
+        JSON 统一为紧凑格式；普通文本、空值原样返回
+
+    Raises:
+        ValueError: 以 [ 或 { 开头但不是有效 JSON
+    """
+    if not value or not _looks_like_json(value):
+        return value
+    try:
+        decoded = json.loads(value)
+    except ValueError as exc:
+        raise ValueError(f"不是有效的 JSON（第 {exc.lineno} 行第 {exc.colno} 列）") from None
+    return json.dumps(decoded, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_detail(value: Optional[str]) -> Any:
+    """
+    解码详情字段：JSON 文本解码为数组 / 对象，普通文本原样返回（无法解析的旧数据同样原样返回）
+    """
+    if not value or not _looks_like_json(value):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def build_details_json(values: Dict[str, Optional[str]]) -> str:
+    """
+    生成详情字段的预序列化数据
+
+    Args:
+        values: {字段名: 保存的文本}，缺少的字段按空值处理
+
+    Returns:
+        紧凑 JSON 对象文本（可直接嵌入 <script>）
+    """
+    details = {field: decode_detail(values.get(field)) for field in PLATFORM_JSON_FIELDS}
+    # 防止 XSS：转义 </script> 序列（JSON 字符串中的 <\/ 解码后不变）
+    return json.dumps(details, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
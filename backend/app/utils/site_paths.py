@@ -0,0 +1,85 @@
+"""
+站点目录定位
+
+后端目录（BACKEND_DIR）与前端 site 目录（SITE_DIR），供 FastAPI 应用、SSR 渲染与静态导出共用。
+"""
+import os
+from pathlib import Path
+
+
+def get_backend_dir():
+    """
+    获取后端目录的绝对路径，支持多环境
+
+    优先级顺序：
+    1. 环境变量 BACKEND_DIR（推荐用于 Docker 和生产）
+    2. __file__ 相对路径（本地开发和 Docker）
+    3. 当前工作目录（作为备选）
+    4. Docker 容器内的默认路径
+
+    这种方法确保在各种环境下都能正确识别路径
+    """
+    candidates = [
+        # 1. 环境变量（最高优先级）
+        os.getenv("BACKEND_DIR"),
+        # 2. 相对于当前文件的相对路径（最可靠）
+        str(Path(__file__).parent.parent.parent.resolve()),
+        # 3. 当前工作目录
+        os.getcwd(),
+        # 4. Docker 容器内的默认路径
+        "/app",
+    ]
+
+    for candidate in candidates:
+        if candidate:
+            try:
+                path = Path(candidate).resolve()
+                if path.exists():
+                    return path
+            except (OSError, ValueError):
+                # 某些路径在当前环境中不可访问
+                continue
+
+    # 最后的保障：使用 __file__ 计算路径
+    return Path(__file__).parent.parent.parent.resolve()
+
+
+# 获取后端目录
+BACKEND_DIR = get_backend_dir()
+
+
+def get_site_dir():
+    """
+    获取前端site目录的正确路径，支持多种环境配置
+
+    优先级：
+    1. 环境变量 SITE_DIR（推荐）
+    2. /site（容器默认挂载点）
+    3. BACKEND_DIR.parent / "site"（本地开发时的相对位置）
+    4. 当前工作目录的 site 目录
+    """
+    candidates = [
+        # 1. 环境变量设置的路径
+        os.getenv("SITE_DIR"),
+        # 2. 容器中的标准路径
+        "/site",
+        # 3. 相对于后端目录的位置（本地开发）
+        BACKEND_DIR.parent / "site",
+        # 4. 当前工作目录
+        Path.cwd() / "site",
+    ]
+
+    for candidate in candidates:
+        if candidate:
+            try:
+                path = Path(candidate).resolve()
+                if path.exists():
+                    return path
+            except (OSError, ValueError):
+                continue
+
+    # 如果都找不到，返回首选项（通常在容器中会存在）
+    return Path("/site")
+
+
+SITE_DIR = get_site_dir()
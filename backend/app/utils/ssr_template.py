@@ -0,0 +1,288 @@
+"""
+SSR 模板工具
+
+将静态 HTML 模板（article_view.html、platform_view.html、site/margin/stock/index.html）
+预编译为「静态片段 + 命名插槽」，渲染时只做转义与字符串拼接，
+不再对每个请求解析整棵 DOM 再序列化。
+
+插槽写法：
+- "title": <title> 的文本
+- "<元素id>@<属性名>": 指定元素的属性值，如 "og-url@content"、"canonical@href"
+- "<元素id>": 指定元素的内部 HTML，如 "articleContainer"
+- "head_end": </head> 之前的插入点（结构化数据、内联数据脚本）
+
+模板文件按修改时间自动重新编译。
+"""
+import html
+import logging
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 检查模板文件是否变化的最小间隔（秒）
+SSR_TEMPLATE_CHECK_INTERVAL = float(os.getenv("SSR_TEMPLATE_CHECK_INTERVAL", "2"))
+
+# 插槽值的转义方式
+_TEXT = "text"
+_ATTR = "attr"
+_RAW = "raw"
+
+_VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class TemplateCompileError(ValueError):
+    """模板插槽相互重叠，无法编译"""
+
+
+class _SlotLocator(HTMLParser):
+    """扫描模板，记录目标元素的起始标签、内部内容与 </head> 的位置"""
+
+    def __init__(self, source: str, element_ids: Iterable[str], inner_ids: Iterable[str]):
+        super().__init__(convert_charrefs=False)
+        # getpos() 返回 (行号, 列号)，行按 "\n" 划分
+        self._line_offsets = [0] + [m.end() for m in re.finditer("\n", source)]
+        self._element_ids = set(element_ids)
+        self._inner_ids = set(inner_ids)
+        self._open: List[List] = []  # [标签名, 元素id, 内部起点, 同名标签嵌套深度]
+
+        # 元素 id -> (起始标签起点, 起始标签终点)
+        self.start_tags: Dict[str, Tuple[int, int]] = {}
+        # 元素 id 或 "title" -> (内部起点, 内部终点)
+        self.inner: Dict[str, Tuple[int, int]] = {}
+        self.head_end: Optional[int] = None
+        self._title_start: Optional[int] = None
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        start = self._offset()
+        end = start + len(self.get_starttag_text())
+        element_id = dict(attrs).get("id")
+
+        if element_id in self._element_ids and element_id not in self.start_tags:
+            self.start_tags[element_id] = (start, end)
+        if tag == "title" and self._title_start is None and "title" not in self.inner:
+            self._title_start = end
+
+        for entry in self._open:
+            if entry[0] == tag:
+                entry[3] += 1
+        if element_id in self._inner_ids and element_id not in self.inner and tag not in _VOID_ELEMENTS:
+            self._open.append([tag, element_id, end, 0])
+
+    def handle_startendtag(self, tag, attrs):
+        start = self._offset()
+        element_id = dict(attrs).get("id")
+        if element_id in self._element_ids and element_id not in self.start_tags:
+            self.start_tags[element_id] = (start, start + len(self.get_starttag_text()))
+
+    def handle_endtag(self, tag):
+        start = self._offset()
+        if tag == "title" and self._title_start is not None and "title" not in self.inner:
+            self.inner["title"] = (self._title_start, start)
+        if tag == "head" and self.head_end is None:
+            self.head_end = start
+
+        for entry in reversed(self._open):
+            if entry[0] != tag:
+                continue
+            if entry[3]:
+                entry[3] -= 1
+                continue
+            self.inner[entry[1]] = (entry[2], start)
+            self._open.remove(entry)
+            break
+
+
+def _attribute_span(start_tag: str, attr: str) -> Optional[Tuple[int, int]]:
+    """属性值在起始标签文本中的位置（不含引号）"""
+    match = re.search(
+        rf'\s{re.escape(attr)}\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', start_tag, re.IGNORECASE
+    )
+    if match is None:
+        return None
+    group = next(i for i in (1, 2, 3) if match.group(i) is not None)
+    return match.span(group)
+
+
+class CompiledTemplate:
+    """
+    预编译模板
+
+    chunks 与 slots 交替排列：chunks[0] + slot[0] + chunks[1] + ... + chunks[-1]。
+    """
+
+    def __init__(self, source: str, slots: Iterable[str]):
+        """
+        Args:
+            source: 模板 HTML
+            slots: 插槽名列表（见模块说明）
+
+        Raises:
+            TemplateCompileError: 插槽相互重叠
+        
+        模板中找不到的插槽记入 missing 并忽略（与逐个查找标签、找不到即跳过的行为一致）。
+        """
+        self.source = source
+        slots = list(dict.fromkeys(slots))
+
+        element_ids = {slot.split("@", 1)[0] for slot in slots if "@" in slot}
+        inner_ids = {slot for slot in slots if "@" not in slot and slot not in ("title", "head_end")}
+        locator = _SlotLocator(source, element_ids | inner_ids, inner_ids)
+        locator.feed(source)
+        locator.close()
+
+        # (起点, 终点, 插槽名, 转义方式, 插入前缀, 插入后缀)
+        spans: List[Tuple[int, int, str, str, str, str]] = []
+        self.missing: List[str] = []
+        for slot in slots:
+            if slot == "head_end":
+                if locator.head_end is None:
+                    self.missing.append(slot)
+                    continue
+                spans.append((locator.head_end, locator.head_end, slot, _RAW, "", ""))
+            elif slot == "title":
+                if "title" not in locator.inner:
+                    self.missing.append(slot)
+                    continue
+                start, end = locator.inner["title"]
+                spans.append((start, end, slot, _TEXT, "", ""))
+            elif "@" in slot:
+                element_id, attr = slot.split("@", 1)
+                if element_id not in locator.start_tags:
+                    self.missing.append(slot)
+                    continue
+                tag_start, tag_end = locator.start_tags[element_id]
+                start_tag = source[tag_start:tag_end]
+                span = _attribute_span(start_tag, attr)
+                if span is not None:
+                    spans.append((tag_start + span[0], tag_start + span[1], slot, _ATTR, "", ""))
+                else:
+                    # 属性不存在时插入到标签名之后
+                    insert_at = tag_start + len(re.match(r"<[^\s/>]+", start_tag).group(0))
+                    spans.append((insert_at, insert_at, slot, _ATTR, f' {attr}="', '"'))
+            else:
+                if slot not in locator.inner:
+                    self.missing.append(slot)
+                    continue
+                start, end = locator.inner[slot]
+                spans.append((start, end, slot, _RAW, "", ""))
+
+        spans.sort(key=lambda span: (span[0], span[1]))
+        for previous, current in zip(spans, spans[1:]):
+            if current[0] < previous[1]:
+                raise TemplateCompileError(f"插槽 {previous[2]} 与 {current[2]} 重叠")
+
+        self.chunks: List[str] = []
+        self.slots: List[Tuple[str, str, str, str, str]] = []  # (插槽名, 转义方式, 前缀, 后缀, 模板原值)
+        cursor = 0
+        for start, end, slot, mode, prefix, suffix in spans:
+            self.chunks.append(source[cursor:start])
+            self.slots.append((slot, mode, prefix, suffix, source[start:end]))
+            cursor = end
+        self.chunks.append(source[cursor:])
+
+    @property
+    def slot_names(self) -> List[str]:
+        return [slot[0] for slot in self.slots]
+
+    def render(self, values: Dict[str, Union[str, int, float, None]]) -> str:
+        """
+        渲染模板
+
+        Args:
+            values: 插槽名 -> 值；title 与属性插槽按文本转义，内部 HTML 与 head_end 原样插入。
+                未提供的插槽保留模板中的原始内容。
+
+        Returns:
+            HTML 字符串
+        """
+        parts = [self.chunks[0]]
+        for (slot, mode, prefix, suffix, original), chunk in zip(self.slots, self.chunks[1:]):
+            if slot in values:
+                value = values[slot]
+                value = "" if value is None else str(value)
+                if mode == _TEXT:
+                    value = html.escape(value, quote=False)
+                elif mode == _ATTR:
+                    value = html.escape(value, quote=True)
+                parts.append(f"{prefix}{value}{suffix}")
+            else:
+                parts.append(original)
+            parts.append(chunk)
+        return "".join(parts)
+
+
+class TemplateLoader:
+    """
+    模板加载器：每个模板文件只读取、编译一次，文件修改后自动重新编译
+
+    文件状态最多每 SSR_TEMPLATE_CHECK_INTERVAL 秒检查一次。
+    """
+
+    def __init__(self, check_interval: float = None):
+        self.check_interval = SSR_TEMPLATE_CHECK_INTERVAL if check_interval is None else check_interval
+        self._lock = threading.Lock()
+        # (路径, 插槽) -> (文件签名, 上次检查时间, 编译结果)
+        self._templates: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple[int, int], float, CompiledTemplate]] = {}
+        self.compilations = 0
+
+    def get(self, path: Union[str, Path], slots: Iterable[str]) -> Optional[CompiledTemplate]:
+        """
+        获取编译后的模板
+
+        Args:
+            path: 模板文件路径
+            slots: 插槽名列表
+
+        Returns:
+            CompiledTemplate；文件不存在时返回 None
+        """
+        key = (str(path), tuple(slots))
+        now = time.monotonic()
+        cached = self._templates.get(key)
+        if cached is not None and now - cached[1] < self.check_interval:
+            return cached[2]
+
+        try:
+            stat = os.stat(key[0])
+        except OSError:
+            with self._lock:
+                self._templates.pop(key, None)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._templates.get(key)
+            if cached is not None and cached[0] == signature:
+                self._templates[key] = (signature, now, cached[2])
+                return cached[2]
+
+            source = Path(key[0]).read_text(encoding="utf-8")
+            template = CompiledTemplate(source, key[1])
+            self._templates[key] = (signature, now, template)
+            self.compilations += 1
+            logger.info(f"SSR 模板已编译: {key[0]} ({len(template.slots)} 个插槽)")
+            if template.missing:
+                logger.warning(f"SSR 模板 {key[0]} 缺少插槽: {', '.join(template.missing)}")
+            return template
+
+    def clear(self) -> None:
+        """清空已编译的模板"""
+        with self._lock:
+            self._templates.clear()
+
+
+# 全局模板加载器
+template_loader = TemplateLoader()
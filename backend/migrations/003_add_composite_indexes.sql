@@ -0,0 +1,58 @@
+-- Migration: 003_add_composite_indexes
+-- Description: Add composite / covering indexes for hot article and margin queries
+-- Created: 2026-10-18
+-- Status: Pending
+
+-- Note: Column order follows "equality filters first, sort column last", so that
+-- filter + ORDER BY + LIMIT is answered by walking the index without a temp sort.
+-- Index definitions mirror __table_args__ in app/models (article.py, category.py, margin.py);
+-- fresh databases get them from Base.metadata.create_all(), existing ones need this file.
+-- Regression coverage: tests/test_query_plans.py
+
+-- ==================== articles ====================
+
+-- GET /api/articles/by-section/{slug}: section_id + is_published ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_articles_section_published_created ON articles(section_id, is_published, created_at);
+
+-- Category article counts (covering) and category filtered lists
+CREATE INDEX IF NOT EXISTS idx_articles_category_published_created ON articles(category_id, is_published, created_at);
+
+-- GET /api/articles/by-platform/{id}
+CREATE INDEX IF NOT EXISTS idx_articles_platform_published_created ON articles(platform_id, is_published, created_at);
+
+-- GET /api/articles/by-author/{id}
+CREATE INDEX IF NOT EXISTS idx_articles_author_created ON articles(author_id, created_at);
+
+-- Published list ordered by created_at, sitemap
+CREATE INDEX IF NOT EXISTS idx_articles_published_created ON articles(is_published, created_at);
+
+-- Unfiltered list ordered by created_at (default sort of GET /api/articles)
+CREATE INDEX IF NOT EXISTS idx_articles_created ON articles(created_at);
+
+-- GET /api/articles/trending/list: is_published ORDER BY like_count DESC, view_count DESC
+CREATE INDEX IF NOT EXISTS idx_articles_published_likes_views ON articles(is_published, like_count, view_count);
+
+-- GET /api/articles/featured/list: is_featured + is_published ORDER BY like_count DESC
+CREATE INDEX IF NOT EXISTS idx_articles_featured_published_likes ON articles(is_featured, is_published, like_count);
+
+-- ==================== categories ====================
+
+-- GET /api/sections: active category count per section (covering)
+CREATE INDEX IF NOT EXISTS idx_category_section_active ON categories(section_id, is_active);
+
+-- ==================== margin_detail ====================
+
+-- Stock history: ts_code + trade_date range / latest date per stock
+CREATE INDEX IF NOT EXISTS ix_margin_detail_code_date ON margin_detail(ts_code, trade_date);
+
+-- Ranking: trade_date = ? ORDER BY <metric> DESC LIMIT ?
+CREATE INDEX IF NOT EXISTS ix_margin_detail_date_rzye ON margin_detail(trade_date, rzye);
+CREATE INDEX IF NOT EXISTS ix_margin_detail_date_rqye ON margin_detail(trade_date, rqye);
+CREATE INDEX IF NOT EXISTS ix_margin_detail_date_rzmre ON margin_detail(trade_date, rzmre);
+CREATE INDEX IF NOT EXISTS ix_margin_detail_date_rqyl ON margin_detail(trade_date, rqyl);
+CREATE INDEX IF NOT EXISTS ix_margin_detail_date_rqmcl ON margin_detail(trade_date, rqmcl);
+-- net_buy ranking sorts by the expression rzmre - rzche
+CREATE INDEX IF NOT EXISTS ix_margin_detail_date_net_buy ON margin_detail(trade_date, rzmre - rzche);
+
+-- Refresh planner statistics
+ANALYZE;
@@ -4,12 +4,15 @@ Pytest 配置和共享夹具
 提供测试环境设置、数据库、用户、令牌和其他测试工具。
 """
 
+import asyncio
+import itertools
 import pytest
 import os
 import sys
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 # 添加后端模块到路径
@@ -17,8 +20,8 @@ backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path))
 
 from app.main import app
-from app.database import Base, get_db
-from app.models import AdminUser, Platform, Article, AIGenerationTask
+from app.database import Base, get_db, get_read_db
+from app.models import AdminUser, Platform, Article, AIGenerationTask, Section
 from app.utils.security import hash_password
 
 
@@ -26,20 +29,32 @@ from app.utils.security import hash_password
 # 数据库配置
 # ============================================================================
 
-# 测试数据库 URL - 使用内存数据库
-TEST_DATABASE_URL = "sqlite:///:memory:"
+# 测试数据库 URL - 每个测试使用独立的临时文件数据库
+# （同步 Session 与 aiosqlite 的 AsyncSession 需要访问同一个数据库，内存库无法跨驱动共享）
+TEST_DATABASE_FILENAME = "test.db"
 
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db(tmp_path):
     """
     创建测试数据库 fixture
     
-    对每个测试函数创建一个新的内存数据库，确保测试隔离。
+    对每个测试函数创建一个新的临时数据库，确保测试隔离。
+    同时覆盖 get_db、只读 get_read_db 与异步 get_async_db 依赖，并清空路由响应缓存。
     """
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app.database import get_async_db, SessionLocal
+    from app.utils.cache import cache_manager
+    from app.services.counter_buffer import counter_buffer
+
+    cache_manager.clear()
+    counter_buffer.reset()
+
+    database_url = f"sqlite:///{tmp_path / TEST_DATABASE_FILENAME}"
+
     # 创建引擎和会话
     engine = create_engine(
-        TEST_DATABASE_URL,
+        database_url,
         connect_args={"check_same_thread": False}
     )
     TestingSessionLocal = sessionmaker(
@@ -47,9 +62,45 @@ def test_db():
         autoflush=False,
         bind=engine
     )
+    # 只读引擎：与生产一致使用独立连接并开启 query_only
+    read_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False}
+    )
+
+    @event.listens_for(read_engine, "connect")
+    def _set_query_only(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA query_only=ON")
+
+    TestingReadSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=read_engine
+    )
+    # TestClient 每个请求使用独立的事件循环，异步连接不能跨循环复用
+    async_engine = create_async_engine(
+        database_url.replace("sqlite:", "sqlite+aiosqlite:", 1),
+        poolclass=NullPool,
+    )
+    event.listen(async_engine.sync_engine, "connect", _set_query_only)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
     
     # 创建所有表
     Base.metadata.create_all(bind=engine)
+
+    # 预先建立一次异步连接，完成方言初始化；
+    # 否则并发请求的多个事件循环会在首次连接的初始化锁上互相等待
+    async def warm_up_async_engine():
+        async with async_engine.connect():
+            pass
+
+    asyncio.run(warm_up_async_engine())
     
     db = TestingSessionLocal()
     
@@ -59,14 +110,35 @@ def test_db():
             yield db
         finally:
             db.close()
+
+    def override_get_read_db():
+        read_db = TestingReadSessionLocal()
+        try:
+            yield read_db
+        finally:
+            read_db.close()
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    counter_buffer.session_factory = TestingSessionLocal
     
     yield db
     
     # 清理
+    counter_buffer.reset()
+    counter_buffer.session_factory = SessionLocal
+    db.close()
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    read_engine.dispose()
+    asyncio.run(async_engine.dispose())
     app.dependency_overrides.clear()
+    cache_manager.clear()
 
 
 # ============================================================================
@@ -199,6 +271,39 @@ def sample_article(test_db, admin_user, sample_platform) -> Article:
     return article
 
 
+@pytest.fixture
+def make_article(test_db, admin_user):
+    """
+    文章工厂夹具
+
+    make_article(**overrides) 创建并提交一篇文章并返回：作者为 admin_user，
+    未指定 section / section_id 时放入首次调用时创建的测试栏目；
+    其余字段（标题、slug、正文、发布状态、category_obj 等）按关键字覆盖。
+    """
+    sequence = itertools.count(1)
+    default_section = []
+
+    def _make(**overrides) -> Article:
+        number = next(sequence)
+        if "section" not in overrides and "section_id" not in overrides:
+            if not default_section:
+                default_section.append(Section(name="测试栏目", slug="test-section"))
+            overrides["section"] = default_section[0]
+        values = {
+            "title": f"测试文章 {number}",
+            "slug": f"test-article-{number}",
+            "content": "<p>正文</p>",
+            "author_id": admin_user.id,
+        }
+        values.update(overrides)
+        article = Article(**values)
+        test_db.add(article)
+        test_db.commit()
+        return article
+
+    return _make
+
+
 @pytest.fixture
 def sample_ai_task(test_db, admin_user) -> AIGenerationTask:
     """
@@ -283,6 +283,75 @@ class TestArticleRoutes:
         assert data["title"] == "新文章"
 
 
+class TestCounterBuffer:
+    """浏览量 / 点赞数写缓冲的测试类"""
+
+    @staticmethod
+    def _create_article(make_article):
+        article = make_article(title="计数文章", slug="counter-article", content="内容", is_published=True)
+        return article.id, article.updated_at
+
+    def test_counts_buffered_and_flushed(self, client, test_db, make_article):
+        """
+        测试计数缓冲与批量落库
+
+        验证：
+        - 浏览、点赞不立即写库，响应中的计数包含未落库的增量
+        - flush 一次写入全部增量，且不改变 updated_at
+        """
+        from app.models import Article
+        from app.services.counter_buffer import counter_buffer
+
+        article_id, updated_at = self._create_article(make_article)
+
+        client.get(f"/api/articles/{article_id}")
+        viewed = client.get(f"/api/articles/{article_id}").json()
+        client.post(f"/api/articles/{article_id}/like")
+        liked = client.post(f"/api/articles/{article_id}/like").json()
+
+        assert viewed["view_count"] == 2
+        assert liked["like_count"] == 2
+        test_db.expire_all()
+        stored = test_db.get(Article, article_id)
+        assert (stored.view_count, stored.like_count) == (0, 0)
+
+        assert counter_buffer.flush() == 2
+        test_db.expire_all()
+        stored = test_db.get(Article, article_id)
+        assert (stored.view_count, stored.like_count) == (2, 2)
+        assert stored.updated_at == updated_at
+        assert counter_buffer.pending("view_count", article_id) == 0
+        assert client.get(f"/api/articles/{article_id}").json()["view_count"] == 3
+
+    def test_failed_flush_keeps_increments(self, test_db, make_article):
+        """
+        测试落库失败
+
+        验证：
+        - 落库失败时增量并回缓冲，下次落库成功写入
+        """
+        from sqlalchemy.orm import sessionmaker
+        from app.models import Article
+        from app.services.counter_buffer import CounterBuffer
+
+        article_id, _ = self._create_article(make_article)
+        session_factory = sessionmaker(bind=test_db.get_bind())
+
+        def broken_session():
+            raise RuntimeError("database is locked")
+
+        buffer = CounterBuffer(session_factory=broken_session, flush_interval=3600)
+        buffer.incr("view_count", article_id, 3)
+
+        assert buffer.flush() == 0
+        assert buffer.pending("view_count", article_id) == 3
+
+        buffer.session_factory = session_factory
+        assert buffer.flush() == 1
+        test_db.expire_all()
+        assert test_db.get(Article, article_id).view_count == 3
+
+
 class TestAdminRoutes:
     """管理员 API 路由测试"""
     
@@ -528,3 +597,59 @@ class TestCaching:
         response2 = client.get(f"/api/platforms/{sample_platform.id}")
         
         assert response1.json() == response2.json()
+
+
+class TestAsyncReadRoutes:
+    """异步只读端点测试"""
+    
+    def test_async_route_reads_committed_data(self, client, test_db):
+        """
+        测试异步会话读取同步会话提交的数据
+        
+        验证：
+        - 公共只读端点通过 AsyncSession 返回最新数据
+        """
+        from app.models import Section
+        
+        test_db.add(Section(name="异步栏目", slug="async-section", sort_order=1))
+        test_db.commit()
+        
+        response = client.get("/api/sections")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [s["slug"] for s in data["data"]] == ["async-section"]
+        assert data["data"][0]["category_count"] == 0
+    
+    def test_cached_route_skips_session_in_key(self, client, test_db, admin_user):
+        """
+        测试路由响应缓存
+        
+        验证：
+        - 每次请求的会话不同，但仍命中缓存（不再执行 SQL）
+        - 查询参数首尾空白不影响缓存键
+        - 写操作按标签失效后重新查询
+        """
+        from app.models import Section
+        from app.utils.security import create_access_token
+        
+        token = create_access_token({"sub": admin_user.username})
+        test_db.add(Section(name="缓存栏目", slug="cached-section", sort_order=1))
+        test_db.commit()
+        
+        first = client.get("/api/platforms/featured/list?limit=5")
+        second = client.get("/api/platforms/featured/list", params={"limit": " 5 "})
+        assert first.status_code == second.status_code == 200
+        assert int(first.headers["x-db-queries"]) > 0
+        assert second.headers["x-db-queries"] == "0"
+        
+        assert client.get("/api/sections").json()["total"] == 1
+        assert client.get("/api/sections").headers["x-db-queries"] == "0"
+        
+        response = client.post(
+            "/api/sections",
+            json={"name": "新栏目", "slug": "new-section"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200
+        assert client.get("/api/sections").json()["total"] == 2
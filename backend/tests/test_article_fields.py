@@ -0,0 +1,122 @@
+"""
+文章列表字段选择测试
+
+测试 fields 参数的解析、列表查询只加载所需的列，以及各列表接口返回的字段。
+"""
+
+import pytest
+from sqlalchemy import inspect
+
+from app.schemas.article import ArticleListItem
+from app.services.article_service import ArticleService
+
+
+@pytest.fixture
+def listed_articles(make_article):
+    """一个栏目下的两篇已发布文章（其中一篇为精选）"""
+    from app.models import Category, Section
+
+    section = Section(name="百科", slug="wiki-fields")
+    category = Category(name="入门", section=section)
+    for i in range(2):
+        make_article(
+            title=f"列表文章 {i}",
+            slug=f"listed-{i}",
+            content="<p>" + "很长的正文。" * 200 + "</p>",
+            section=section,
+            category_obj=category,
+            is_published=True,
+            is_featured=i == 0,
+            like_count=i,
+        )
+    return section
+
+
+class TestParseFields:
+    """fields 参数解析测试"""
+
+    def test_parse_fields(self):
+        """
+        测试字段解析
+
+        验证：
+        - 为空返回 None（完整文章），list 展开为列表项的全部字段
+        - 指定字段时去重并总是包含 id，未知字段抛出 ValueError
+        """
+        assert ArticleService.parse_fields(None) is None
+        assert ArticleService.parse_fields(" ") is None
+        assert ArticleService.parse_fields("list") == list(ArticleListItem.model_fields)
+        assert ArticleService.parse_fields("title, slug,title") == ["id", "title", "slug"]
+        with pytest.raises(ValueError):
+            ArticleService.parse_fields("title,content")
+
+
+class TestArticleListFields:
+    """列表字段选择测试"""
+
+    def test_list_query_defers_content(self, test_db, listed_articles):
+        """
+        测试列表查询的加载列
+
+        验证：
+        - 指定字段时正文与其他未选字段不加载，栏目名通过预加载获得
+        - 完整文章仍加载正文
+        """
+        page = ArticleService.get_articles_page(test_db, fields=["id", "title", "section_name"])
+        state = inspect(page.items[0])
+        assert {"content", "plain_text", "summary"} <= state.unloaded
+        assert ArticleService.to_list_item(page.items[0], ["id", "title", "section_name"])["section_name"] == "百科"
+
+        test_db.expunge_all()
+        page = ArticleService.get_articles_page(test_db)
+        assert "content" not in inspect(page.items[0]).unloaded
+
+    def test_list_routes(self, client, test_db, listed_articles):
+        """
+        测试列表接口的 fields 参数
+
+        验证：
+        - 默认返回完整文章
+        - fields=list 返回列表项字段（不含正文），指定字段时只返回这些字段
+        - 栏目、精选、热门列表同样支持，未知字段返回 400
+        """
+        body = client.get("/api/articles").json()
+        assert "content" in body["data"][0]
+
+        body = client.get("/api/articles", params={"fields": "list"}).json()
+        item = body["data"][0]
+        assert set(item) == set(ArticleListItem.model_fields)
+        assert item["section_name"] == "百科" and item["category_name"] == "入门"
+        assert body["total"] == 2
+
+        body = client.get("/api/articles", params={"fields": "title,slug"}).json()
+        assert [set(item) for item in body["data"]] == [{"id", "title", "slug"}] * 2
+
+        items = client.get("/api/articles/by-section/wiki-fields", params={"fields": "list"}).json()
+        assert [item["slug"] for item in items] == ["listed-1", "listed-0"]
+        assert all("content" not in item for item in items)
+
+        items = client.get("/api/articles/featured/list", params={"fields": "id,title"}).json()
+        assert items == [{"id": items[0]["id"], "title": "列表文章 0"}]
+        items = client.get("/api/articles/trending/list", params={"fields": "slug,like_count"}).json()
+        assert [item["slug"] for item in items] == ["listed-1", "listed-0"]
+
+        assert client.get("/api/articles", params={"fields": "content"}).status_code == 400
+
+    def test_list_item_schema(self, client):
+        """
+        测试列表项的类型校验与接口文档
+
+        验证：
+        - 列表项按 ArticleListItem 校验类型，序列化时只输出给出的字段
+        - OpenAPI 文档中列表项引用 ArticleListItem
+        """
+        from pydantic import ValidationError
+
+        assert ArticleListItem.model_validate({"id": 1, "title": "标题"}).model_dump() == {"id": 1, "title": "标题"}
+        with pytest.raises(ValidationError):
+            ArticleListItem.model_validate({"id": 1, "view_count": "many"})
+
+        schema = client.get("/api/openapi.json").json()
+        entries = schema["components"]["schemas"]["ArticleListResponse"]["properties"]["data"]["items"]["anyOf"]
+        assert {"$ref": "#/components/schemas/ArticleListItem"} in entries
@@ -0,0 +1,135 @@
+"""
+内容计数测试
+
+测试保存钩子对计数表的增量维护、校正任务，以及读取计数的栏目 / 分类 / 统计接口。
+"""
+
+import pytest
+
+from app.models import Category, ContentCounter, Platform, Section
+from app.services.content_counters import ContentCounterService
+
+
+def counter(db, scope, scope_id, state):
+    row = db.get(ContentCounter, (scope, scope_id, state))
+    return row.count if row is not None else 0
+
+
+@pytest.fixture
+def content(test_db, make_article):
+    """两个栏目、两个分类与三篇文章（两篇已发布）"""
+    news, wiki = Section(name="新闻", slug="counted-news"), Section(name="百科", slug="counted-wiki")
+    basics, advanced = Category(name="入门", section=wiki), Category(name="进阶", section=wiki)
+    test_db.add_all([news, advanced])
+    articles = [
+        make_article(title=f"文章 {i}", slug=f"counted-{i}", section=wiki, category_obj=basics, is_published=i < 2)
+        for i in range(3)
+    ]
+    return {"news": news, "wiki": wiki, "basics": basics, "advanced": advanced, "articles": articles}
+
+
+class TestContentCounterHooks:
+    """保存钩子测试"""
+
+    def test_article_writes(self, test_db, content):
+        """
+        测试文章的新增、发布、下线、移动与删除
+
+        验证：
+        - 全站、栏目、分类的已发布 / 草稿计数随写操作在同一事务内更新
+        - 每一步之后校正都没有需要修正的项
+        """
+        wiki, basics, advanced = content["wiki"].id, content["basics"].id, content["advanced"].id
+        first, _, draft = content["articles"]
+
+        assert counter(test_db, "category", basics, "published") == 2
+        assert counter(test_db, "category", basics, "draft") == 1
+        assert counter(test_db, "section", wiki, "published") == 2
+        assert ContentCounterService.site_stats(test_db)["draft"] == 1
+
+        draft.is_published = True
+        test_db.commit()
+        assert counter(test_db, "category", basics, "published") == 3
+
+        first.category_id = advanced
+        first.is_published = False
+        test_db.commit()
+        assert counter(test_db, "category", basics, "published") == 2
+        assert counter(test_db, "category", advanced, "draft") == 1
+        assert counter(test_db, "section", wiki, "published") == 2
+
+        test_db.delete(draft)
+        test_db.commit()
+        assert counter(test_db, "category", basics, "published") == 1
+        assert ContentCounterService.site_stats(test_db)["published"] == 1
+
+        assert ContentCounterService.reconcile(test_db)["fixed"] == 0
+
+    def test_category_section_platform_writes(self, test_db, content):
+        """
+        测试分类、栏目、平台的启用状态与删除
+
+        验证：
+        - 栏目分类数与全站分类、栏目、平台数随启用状态与删除更新
+        """
+        wiki = content["wiki"].id
+        stats = ContentCounterService.site_stats(test_db)
+        assert (stats["sections"], stats["categories"]) == (2, 2)
+        assert counter(test_db, "section", wiki, "categories") == 2
+
+        content["advanced"].is_active = False
+        content["news"].is_active = False
+        test_db.add(Platform(name="计数平台", slug="counted-platform"))
+        test_db.commit()
+        assert counter(test_db, "section", wiki, "categories") == 1
+        stats = ContentCounterService.site_stats(test_db)
+        assert (stats["sections"], stats["categories"], stats["platforms"]) == (1, 1, 1)
+
+        test_db.delete(content["advanced"])
+        test_db.delete(content["basics"])
+        test_db.commit()
+        assert counter(test_db, "section", wiki, "categories") == 0
+        assert test_db.query(ContentCounter).filter(ContentCounter.scope == "category").count() == 0
+
+        assert ContentCounterService.reconcile(test_db)["fixed"] == 0
+
+    def test_reconcile_fixes_drift(self, test_db, content):
+        """
+        测试校正
+
+        验证：
+        - 计数被改乱或丢失后按实际数量修正
+        """
+        basics = content["basics"].id
+        test_db.query(ContentCounter).filter(ContentCounter.scope == "site").delete()
+        row = test_db.get(ContentCounter, ("category", basics, "published"))
+        row.count = 42
+        test_db.commit()
+
+        stats = ContentCounterService.reconcile(test_db)
+        assert stats["fixed"] > 1
+        assert counter(test_db, "category", basics, "published") == 2
+        assert ContentCounterService.site_stats(test_db)["published"] == 2
+        assert ContentCounterService.reconcile(test_db)["fixed"] == 0
+
+
+class TestContentCounterRoutes:
+    """计数接口测试"""
+
+    def test_counts_in_listings(self, client, test_db, content):
+        """
+        测试分类文章数与栏目分类数接口
+
+        验证：
+        - 分类文章数只统计已发布文章，没有计数行的分类为 0
+        - 栏目列表的分类数来自计数表
+        """
+        wiki = content["wiki"].id
+
+        response = client.get(f"/api/categories/section/{wiki}/with-count")
+        assert response.status_code == 200
+        assert {item["name"]: item["article_count"] for item in response.json()} == {"入门": 2, "进阶": 0}
+
+        sections = {item["slug"]: item["category_count"] for item in client.get("/api/sections").json()["data"]}
+        assert sections["counted-wiki"] == 2
+        assert sections["counted-news"] == 0
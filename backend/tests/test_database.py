@@ -433,3 +433,77 @@ class TestDatabaseTransactions:
         test_db.refresh(user)
         
         assert user.id is not None
+
+
+class TestSQLiteEngineConfig:
+    """SQLite 引擎配置测试"""
+    
+    def test_pooled_engine_applies_pragmas(self, tmp_path, monkeypatch):
+        """
+        测试 pooled 模式的连接 PRAGMA
+        
+        验证：
+        - 使用 QueuePool 而不是单连接
+        - 每个连接启用 WAL、busy_timeout 和 synchronous=NORMAL
+        """
+        from sqlalchemy import text
+        from sqlalchemy.pool import QueuePool
+        import app.database as database
+        
+        monkeypatch.setattr(database, "SQLITE_ENGINE_MODE", "pooled")
+        engine = database.create_sqlite_engine(
+            f"sqlite:///{tmp_path / 'pooled.db'}", pool_size=2, max_overflow=0
+        )
+        try:
+            assert isinstance(engine.pool, QueuePool)
+            with engine.connect() as conn_a, engine.connect() as conn_b:
+                assert conn_a.connection.dbapi_connection is not conn_b.connection.dbapi_connection
+                assert conn_a.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn_b.execute(text("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+                # NORMAL == 1
+                assert conn_b.execute(text("PRAGMA synchronous")).scalar() == 1
+        finally:
+            engine.dispose()
+    
+    def test_memory_database_keeps_static_pool(self, monkeypatch):
+        """
+        测试内存数据库
+        
+        验证：
+        - 即使配置为 pooled，内存数据库仍使用 StaticPool
+        """
+        from sqlalchemy.pool import StaticPool
+        import app.database as database
+        
+        monkeypatch.setattr(database, "SQLITE_ENGINE_MODE", "pooled")
+        engine = database.create_sqlite_engine("sqlite:///:memory:", pool_size=2, max_overflow=0)
+        assert isinstance(engine.pool, StaticPool)
+    
+    def test_read_engine_is_query_only(self, tmp_path):
+        """
+        测试只读引擎
+        
+        验证：
+        - 带 query_only 的连接可以读取
+        - 写入被拒绝
+        """
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+        import app.database as database
+        
+        url = f"sqlite:///{tmp_path / 'replica.db'}"
+        writer = database.create_sqlite_engine(url, pool_size=1, max_overflow=0)
+        reader = database.create_sqlite_engine(
+            url, pool_size=1, max_overflow=0, extra_pragmas=database.READ_ONLY_PRAGMAS
+        )
+        try:
+            with writer.begin() as conn:
+                conn.execute(text("CREATE TABLE t (id INTEGER)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+            with reader.connect() as conn:
+                assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+                with pytest.raises(OperationalError):
+                    conn.execute(text("INSERT INTO t VALUES (2)"))
+        finally:
+            writer.dispose()
+            reader.dispose()
@@ -0,0 +1,115 @@
+"""
+数据库查询监控测试
+
+测试语句归一化、请求级统计响应头和 N+1 检测。
+"""
+
+import pytest
+from app.middleware import db_metrics
+from app.middleware.db_metrics import RequestQueryStats, normalize_statement
+
+
+class TestNormalizeStatement:
+    """语句形状归一化测试"""
+
+    def test_literals_and_params_collapse(self):
+        """
+        测试字面量与参数归一化
+
+        验证：
+        - 不同参数值得到相同形状
+        - IN 列表折叠
+        """
+        a = normalize_statement("SELECT * FROM articles WHERE id = 1 AND slug = 'a'")
+        b = normalize_statement("SELECT *  FROM articles\n WHERE id = 42 AND slug = 'b''c'")
+        assert a == b == "SELECT * FROM articles WHERE id = ? AND slug = ?"
+
+        assert normalize_statement("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == \
+            normalize_statement("SELECT 1 FROM t WHERE id IN (?)")
+
+    def test_repeated_statements(self):
+        """
+        测试重复语句检测
+
+        验证：
+        - 超过阈值的形状被标记
+        """
+        stats = RequestQueryStats("GET", "/api/sections")
+        for i in range(4):
+            stats.record(f"SELECT count(id) FROM categories WHERE section_id = {i}", 1.0)
+        stats.record("SELECT * FROM sections", 5.0)
+
+        assert stats.count == 5
+        assert stats.repeated_statements(threshold=3) == [
+            ("SELECT count(id) FROM categories WHERE section_id = ?", 4)
+        ]
+        assert stats.slowest[0] == (5.0, "SELECT * FROM sections")
+
+
+class TestDBMetricsMiddleware:
+    """请求级查询统计中间件测试"""
+
+    def test_headers_and_n_plus_one(self, test_db, monkeypatch):
+        """
+        测试响应头与 N+1 记录
+
+        验证：
+        - 返回 Server-Timing 与 X-DB-Queries
+        - 逐行执行的同一语句被识别为 N+1
+        """
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from sqlalchemy import func
+
+        from app.middleware.db_metrics import DBMetricsMiddleware
+        from app.models import Category, Section
+
+        for i in range(3):
+            test_db.add(Section(name=f"栏目{i}", slug=f"section-{i}", sort_order=i))
+        test_db.commit()
+        monkeypatch.setattr(db_metrics, "DB_N_PLUS_ONE_THRESHOLD", 2)
+        db_metrics.query_log.clear()
+
+        # 测试用路由：逐个栏目 COUNT 分类
+        local_app = FastAPI()
+        local_app.add_middleware(DBMetricsMiddleware)
+
+        @local_app.get("/n-plus-one")
+        def n_plus_one():
+            sections = test_db.query(Section).all()
+            return {
+                section.id: test_db.query(func.count(Category.id)).filter(Category.section_id == section.id).scalar()
+                for section in sections
+            }
+
+        response = TestClient(local_app).get("/n-plus-one")
+
+        assert response.status_code == 200
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert int(response.headers["x-db-queries"]) >= 4
+        assert response.headers["x-db-n-plus-one"] == "1"
+
+        records = db_metrics.query_log.get_stats()["n_plus_one"]
+        assert records[0]["path"] == "/n-plus-one"
+        assert records[0]["count"] == 3
+
+    def test_sections_single_query(self, client, test_db, monkeypatch):
+        """
+        测试栏目列表
+
+        验证：
+        - 分类数读取计数表，栏目列表只执行一条查询，没有 N+1
+        """
+        from app.models import Section
+
+        for i in range(3):
+            test_db.add(Section(name=f"栏目{i}", slug=f"section-{i}", sort_order=i))
+        test_db.commit()
+        monkeypatch.setattr(db_metrics, "DB_N_PLUS_ONE_THRESHOLD", 2)
+
+        response = client.get("/api/sections")
+
+        assert response.status_code == 200
+        assert response.headers["x-db-queries"] == "1"
+        # 未检测到 N+1 时不返回 X-DB-N-Plus-One
+        assert response.headers.get("x-db-n-plus-one", "0") == "0"
@@ -0,0 +1,98 @@
+"""
+两融标的搜索测试
+
+测试内存搜索索引的匹配与排序、拼音首字母，以及同步后的重建。
+"""
+
+from datetime import date
+
+import pytest
+
+from app.services.margin_search import MarginSearchIndex, lazy_pinyin, pinyin_initials
+
+STOCKS = [
+    {"ts_code": "600519.SH", "name": "贵州茅台", "rzye": 100, "rqyl": 1},
+    {"ts_code": "600000.SH", "name": "浦发银行", "rzye": 50, "rqyl": 2},
+    {"ts_code": "601398.SH", "name": "工商银行", "rzye": 80, "rqyl": 3},
+    {"ts_code": "000858.SZ", "name": "五粮液", "rzye": 60, "rqyl": 4},
+]
+
+
+def codes(results):
+    return [stock["ts_code"] for stock in results]
+
+
+class TestMarginSearchIndex:
+    """搜索索引测试"""
+
+    def test_code_and_name_matching(self):
+        """
+        测试代码与名称匹配
+
+        验证：
+        - 代码完全匹配排在最前，前缀匹配优先于包含匹配
+        - 同级按融资余额排序，limit 生效
+        """
+        index = MarginSearchIndex(date(2026, 10, 16), STOCKS)
+
+        assert codes(index.search("600000.sh")) == ["600000.SH"]
+        assert codes(index.search("600")) == ["600519.SH", "600000.SH"]
+        assert codes(index.search("519")) == ["600519.SH"]
+        assert codes(index.search("银行")) == ["601398.SH", "600000.SH"]
+        assert codes(index.search("6", limit=2)) == ["600519.SH", "601398.SH"]
+        assert index.search("  ") == []
+        assert index.search("不存在") == []
+
+    @pytest.mark.skipif(lazy_pinyin is None, reason="pypinyin 未安装")
+    def test_pinyin_initials(self):
+        """
+        测试拼音首字母匹配
+
+        验证：
+        - 名称转为小写拼音首字母，非中文字符保留字母数字
+        - gzmt 找到贵州茅台，yh 按包含匹配找到银行股
+        """
+        assert pinyin_initials("贵州茅台") == "gzmt"
+        assert pinyin_initials("*ST康美") == "stkm"
+
+        index = MarginSearchIndex(date(2026, 10, 16), STOCKS)
+        assert codes(index.search("gzmt")) == ["600519.SH"]
+        assert codes(index.search("GZ")) == ["600519.SH"]
+        assert codes(index.search("yh")) == ["601398.SH", "600000.SH"]
+
+
+class TestMarginSearchRoute:
+    """搜索接口测试"""
+
+    def test_search_rebuilt_after_sync(self, client, test_db):
+        """
+        测试索引按最新交易日建立并在同步后重建
+
+        验证：
+        - 只包含最新交易日的标的
+        - margin 标签失效后按新的交易日重建
+        """
+        from app.models.margin import MarginDetail
+        from app.services.margin_search import get_search_index
+        from app.utils.cache import invalidate_tags
+
+        test_db.add_all([
+            MarginDetail(trade_date=date(2026, 10, 15), ts_code="600000.SH", name="浦发银行", rzye=1),
+            MarginDetail(trade_date=date(2026, 10, 16), ts_code="600519.SH", name="贵州茅台", rzye=2),
+        ])
+        test_db.commit()
+
+        response = client.get("/api/margin/search", params={"keyword": "600"})
+        assert response.status_code == 200
+        assert codes(response.json()["data"]) == ["600519.SH"]
+        assert get_search_index(test_db).trade_date == date(2026, 10, 16)
+
+        test_db.add_all([
+            MarginDetail(trade_date=date(2026, 10, 17), ts_code="600000.SH", name="浦发银行", rzye=3),
+            MarginDetail(trade_date=date(2026, 10, 17), ts_code="600519.SH", name="贵州茅台", rzye=2),
+        ])
+        test_db.commit()
+        invalidate_tags("margin")
+
+        response = client.get("/api/margin/search", params={"keyword": "600"})
+        assert codes(response.json()["data"]) == ["600000.SH", "600519.SH"]
@@ -0,0 +1,200 @@
+"""
+游标分页测试
+
+测试排序键游标的翻页完整性（同值、NULL、升降序）、游标校验，以及文章与任务列表接口。
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Article
+from app.services.article_service import ArticleService
+from app.utils.pagination import InvalidCursor, Keyset, count_total
+
+BASE_TIME = datetime(2026, 10, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def paged_articles(make_article):
+    """9 篇文章：创建时间两两相同，部分没有发布时间，点赞数有重复"""
+    from app.models import Section
+
+    section = Section(name="分页栏目", slug="paging")
+    for i in range(9):
+        make_article(
+            title=f"文章 {i}",
+            slug=f"paged-{i}",
+            content=f"<p>正文 {i}</p>",
+            section=section,
+            is_published=True,
+            created_at=BASE_TIME + timedelta(minutes=i // 2),
+            published_at=None if i % 3 == 0 else BASE_TIME + timedelta(hours=i),
+            like_count=i % 4,
+        )
+    return section
+
+
+def walk(keyset, query_factory, limit):
+    """按游标翻完所有页，返回 (每页 ID 列表)"""
+    pages, cursor = [], None
+    while True:
+        page = keyset.paginate(query_factory(), limit, cursor=cursor)
+        pages.append([row.id for row in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class TestKeyset:
+    """排序键游标测试"""
+
+    @pytest.mark.parametrize("column,descending", [
+        (Article.created_at, True),
+        (Article.created_at, False),
+        (Article.like_count, True),
+        (Article.published_at, True),
+        (Article.published_at, False),
+    ])
+    def test_pages_match_full_ordering(self, test_db, paged_articles, column, descending):
+        """
+        测试游标翻页与一次性排序结果一致
+
+        验证：
+        - 同值的行按 id 区分，翻页既不丢失也不重复
+        - NULL 排在最后（升降序均如此）
+        - 最后一页不返回游标
+        """
+        keyset = Keyset(column, Article.id, descending=descending, nullable=[Article.published_at])
+        expected = [row.id for row in test_db.query(Article).order_by(*keyset.order_by()).all()]
+
+        pages = walk(keyset, lambda: test_db.query(Article), limit=2)
+        assert [article_id for page in pages for article_id in page] == expected
+        assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+
+        if column is Article.published_at:
+            nulls = {row.id for row in test_db.query(Article).filter(Article.published_at.is_(None))}
+            assert set(expected[-len(nulls):]) == nulls
+
+    def test_invalid_cursor(self, client, test_db, paged_articles):
+        """
+        测试游标校验
+
+        验证：
+        - 被篡改的游标与其他排序方式生成的游标均抛出 InvalidCursor（ValueError）
+        - 排序键为对象、数组或与列类型不符时抛出 InvalidCursor，列表接口返回 400
+        """
+        import base64
+        import json
+
+        def forge(keyset, values):
+            raw = json.dumps({"k": keyset.signature, "v": values}).encode()
+            return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+        keyset = Keyset(Article.created_at, Article.id)
+        cursor = keyset.paginate(test_db.query(Article), 2).next_cursor
+
+        with pytest.raises(InvalidCursor):
+            keyset.paginate(test_db.query(Article), 2, cursor="not-a-cursor")
+        with pytest.raises(ValueError):
+            Keyset(Article.like_count, Article.id).paginate(test_db.query(Article), 2, cursor=cursor)
+        with pytest.raises(InvalidCursor):
+            Keyset(Article.created_at, Article.id, descending=False).paginate(test_db.query(Article), 2, cursor=cursor)
+
+        likes = Keyset(Article.like_count, Article.id)
+        titles = Keyset(Article.title, Article.id)
+        for keyset, values in (
+            (likes, [{"a": 1}, 1]),
+            (likes, [1, [2]]),
+            (likes, ["1", 1]),
+            (likes, [True, 1]),
+            (titles, [1, 1]),
+            (keyset, [{"a": 1}, 1]),
+        ):
+            with pytest.raises(InvalidCursor):
+                keyset.paginate(test_db.query(Article), 2, cursor=forge(keyset, values))
+        assert likes.paginate(test_db.query(Article), 2, cursor=forge(likes, [1, 3])).items
+
+        bad = forge(Keyset(Article.created_at, Article.id), [{"a": 1}, 1])
+        assert client.get("/api/articles", params={"cursor": bad}).status_code == 400
+        assert client.get("/api/articles/by-section/paging", params={"cursor": bad}).status_code == 400
+
+    def test_count_total_modes(self, test_db, paged_articles):
+        """
+        测试总数计算方式
+
+        验证：
+        - none 不计算；estimate 缓存计数直到标签失效
+        """
+        from app.utils.cache import invalidate_tags
+
+        query = test_db.query(Article)
+        assert count_total(query, "exact") == 9
+        assert count_total(query, "none") is None
+        assert count_total(query, "estimate", cache_key=["paging-test"], tags=["articles"]) == 9
+
+        test_db.query(Article).filter(Article.slug == "paged-0").delete()
+        test_db.commit()
+        assert count_total(test_db.query(Article), "estimate", cache_key=["paging-test"], tags=["articles"]) == 9
+        invalidate_tags("articles")
+        assert count_total(test_db.query(Article), "estimate", cache_key=["paging-test"], tags=["articles"]) == 8
+
+
+class TestArticlePagination:
+    """文章列表分页测试"""
+
+    def test_service_cursor_and_offset_agree(self, test_db, paged_articles):
+        """
+        测试 get_articles_page
+
+        验证：
+        - 偏移分页返回的游标可以继续翻页，结果与偏移分页一致
+        - 相关度排序不支持游标
+        """
+        offset_ids = [a.id for a in ArticleService.get_articles(test_db, limit=9, sort_by="published_at")[0]]
+
+        first = ArticleService.get_articles_page(test_db, limit=4, sort_by="published_at")
+        assert first.total == 9
+        second = ArticleService.get_articles_page(
+            test_db, limit=4, sort_by="published_at", cursor=first.next_cursor, total="none"
+        )
+        assert second.total is None
+        assert [a.id for a in first.items + second.items] == offset_ids[:8]
+
+        page = ArticleService.get_articles_page(test_db, skip=4, limit=4, sort_by="published_at")
+        assert [a.id for a in page.items] == offset_ids[4:8]
+
+        with pytest.raises(ValueError):
+            ArticleService.get_articles_page(test_db, search="正文", sort_by="relevance", cursor=first.next_cursor)
+
+    def test_list_routes(self, client, test_db, paged_articles):
+        """
+        测试文章列表与栏目列表接口
+
+        验证：
+        - 列表接口返回 next_cursor，带游标的页默认不计算总数，无效游标返回 400
+        - 栏目接口通过 X-Next-Cursor 响应头给出游标
+        """
+        expected = [a.id for a in test_db.query(Article).order_by(Article.created_at.desc(), Article.id.desc())]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+            body = client.get("/api/articles", params=params).json()
+            assert body["total"] == (None if cursor else 9)
+            seen.extend(item["id"] for item in body["data"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+        assert client.get("/api/articles", params={"cursor": "bad"}).status_code == 400
+
+        response = client.get("/api/articles/by-section/paging", params={"limit": 5})
+        assert [item["id"] for item in response.json()] == expected[:5]
+        response = client.get(
+            "/api/articles/by-section/paging",
+            params={"limit": 5, "cursor": response.headers["X-Next-Cursor"]},
+        )
+        assert [item["id"] for item in response.json()] == expected[5:]
+        assert "X-Next-Cursor" not in response.headers
@@ -0,0 +1,93 @@
+"""
+平台目录测试
+
+测试内存中的过滤、排序、分页，以及平台写入后目录的重新加载。
+"""
+
+import pytest
+
+from app.services.platform_catalog import get_catalog
+
+
+@pytest.fixture
+def platforms(test_db):
+    """四个平台：一个停用、一个未排名"""
+    from app.models import Platform
+
+    rows = [
+        Platform(name="Alpha", slug="alpha", description="老牌券商", rank=2, rating=4.5, max_leverage=10,
+                 commission_rate=0.002, is_featured=True, is_regulated=True),
+        Platform(name="Beta", slug="beta", description="新手友好", rank=1, rating=4.8, max_leverage=5,
+                 commission_rate=0.001, is_recommended=True),
+        Platform(name="Gamma", slug="gamma", description="高杠杆", rank=None, rating=3.9, max_leverage=20,
+                 commission_rate=0.003, is_featured=True),
+        Platform(name="Delta", slug="delta", description="已停用", rank=3, rating=5.0, is_active=False,
+                 is_regulated=True),
+    ]
+    test_db.add_all(rows)
+    test_db.commit()
+    return rows
+
+
+class TestPlatformCatalog:
+    """平台目录测试"""
+
+    def test_list_filter_and_sort(self, client, platforms):
+        """
+        测试列表接口
+
+        验证：
+        - 按排名升降序排序，未排名的平台排在最后
+        - 固定方向的排序（评分、杠杆、费率、推荐）
+        - 搜索名称 / 描述、状态过滤与分页，总数为过滤后的数量
+        """
+        def names(query):
+            response = client.get(f"/api/platforms?{query}")
+            assert response.status_code == 200
+            return [p["name"] for p in response.json()["data"]]
+
+        assert names("sort_by=rank&sort_order=asc") == ["Beta", "Alpha", "Delta", "Gamma"]
+        assert names("sort_by=rank&sort_order=desc") == ["Delta", "Alpha", "Beta", "Gamma"]
+        assert names("sort_by=rating&is_active=true") == ["Beta", "Alpha", "Gamma"]
+        assert names("sort_by=leverage&is_active=true") == ["Gamma", "Alpha", "Beta"]
+        assert names("sort_by=fee&is_active=true") == ["Beta", "Alpha", "Gamma"]
+        assert names("sort_by=recommended&is_active=true")[0] == "Beta"
+        assert names("search=ALPHA") == ["Alpha"]
+        assert names("search=杠杆") == ["Gamma"]
+        assert names("is_featured=true") == ["Alpha", "Gamma"]
+
+        page = client.get("/api/platforms?skip=1&limit=2&sort_by=name&sort_order=asc").json()
+        assert [p["name"] for p in page["data"]] == ["Beta", "Delta"]
+        assert page["total"] == 4
+
+        featured = client.get("/api/platforms/featured/list").json()
+        assert [p["name"] for p in featured] == ["Alpha", "Gamma"]
+        regulated = client.get("/api/platforms/regulated/list").json()
+        assert [p["name"] for p in regulated] == ["Alpha"]
+
+    def test_reload_after_write(self, test_db, platforms):
+        """
+        测试目录失效
+
+        验证：
+        - 没有写入时重复读取同一份目录
+        - 直接经 ORM 修改平台并提交后，目录重新加载、版本递增、内容更新
+        - 回滚的修改不会使目录失效
+        """
+        catalog = get_catalog(test_db)
+        assert get_catalog(test_db) is catalog
+        assert catalog.active_by_slug("delta") is None
+        assert catalog.active_by_slug("alpha").name == "Alpha"
+
+        alpha = platforms[0]
+        alpha.name = "Alpha Pro"
+        test_db.flush()
+        test_db.rollback()
+        assert get_catalog(test_db) is catalog
+
+        platforms[3].is_active = True
+        test_db.commit()
+        reloaded = get_catalog(test_db)
+        assert reloaded is not catalog
+        assert reloaded.version > catalog.version
+        assert reloaded.active_by_slug("delta").name == "Delta"
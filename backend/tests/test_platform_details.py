@@ -0,0 +1,112 @@
+"""
+平台详情字段测试
+
+测试详情字段的写入校验、保存时生成的 details_json、详情页嵌入以及迁移脚本的规范化。
+"""
+
+import json
+
+import pytest
+
+
+class TestPlatformDetails:
+    """平台详情字段测试"""
+
+    def test_write_validation(self):
+        """
+        测试写入校验
+
+        验证：
+        - JSON 统一为紧凑格式，普通文本与空值原样保留
+        - 以 [ 或 { 开头但不是有效 JSON 时校验失败
+        """
+        from app.schemas.platform import PlatformCreate, PlatformUpdate
+
+        update = PlatformUpdate(why_choose='[ {"title": "安全", "description": "监管"} ]', opening_steps="注册\n入金", fee_table="")
+        assert update.why_choose == '[{"title":"安全","description":"监管"}]'
+        assert update.opening_steps == "注册\n入金"
+        assert update.fee_table == ""
+
+        with pytest.raises(ValueError):
+            PlatformCreate(name="坏数据", trading_conditions='[{"label": "杠杆"')
+
+    def test_details_json_and_render(self, test_db, monkeypatch):
+        """
+        测试 details_json
+
+        验证：
+        - 新建平台时生成，JSON 字段已解码，</ 已转义
+        - 只修改详情字段时重新生成，其他字段更新不重新生成
+        - 详情页嵌入的数据中详情字段为数组 / 文本，其余字段照常
+        """
+        from app.models import Platform
+        from app.services.page_render_service import PageRenderService
+
+        platform = Platform(
+            name="详情平台",
+            slug="details-platform",
+            why_choose='[{"title":"</script>"}]',
+            opening_steps="注册\n入金",
+        )
+        test_db.add(platform)
+        test_db.commit()
+
+        assert "</script>" not in platform.details_json
+        details = json.loads(platform.details_json)
+        assert details["why_choose"] == [{"title": "</script>"}]
+        assert details["opening_steps"] == "注册\n入金"
+        assert details["platform_badges"] is None
+
+        refreshed = []
+        original_refresh = Platform.refresh_details_json
+        monkeypatch.setattr(Platform, "refresh_details_json", lambda self: refreshed.append(self.id) or original_refresh(self))
+        platform.rank = 3
+        test_db.commit()
+        assert refreshed == []
+
+        platform.platform_badges = '["推荐平台"]'
+        test_db.commit()
+        assert refreshed == [platform.id]
+        assert json.loads(platform.details_json)["platform_badges"] == ["推荐平台"]
+
+        html = PageRenderService.render_platform(platform, "https://example.com")
+        script = html.split("window.__PLATFORM_DATA__ = ", 1)[1].split(";</script>", 1)[0]
+        data = json.loads(script)
+        assert data["name"] == "详情平台"
+        assert data["rank"] == 3
+        assert data["platform_badges"] == ["推荐平台"]
+        assert data["why_choose"] == [{"title": "</script>"}]
+
+    def test_migration_normalize(self, test_db):
+        """
+        测试迁移脚本
+
+        验证：
+        - 已有数据中的 JSON 统一为紧凑格式并回填 details_json，updated_at 不变
+        - 无法解析的旧数据原样保留并计数
+        """
+        from sqlalchemy import update
+
+        from app.migrations.add_platform_details_json import normalize
+        from app.models import Platform
+
+        platform = Platform(name="旧平台", slug="legacy-platform")
+        test_db.add(platform)
+        test_db.commit()
+        updated_at = platform.updated_at
+        test_db.execute(
+            update(Platform.__table__)
+            .where(Platform.__table__.c.id == platform.id)
+            .values(why_choose='[ "稳定" ]', trading_tools="[坏数据", details_json=None, updated_at=updated_at)
+        )
+        test_db.commit()
+
+        stats = normalize(test_db.connection())
+        assert stats == {"platforms": 1, "normalized": 1, "invalid": 1}
+
+        test_db.expire_all()
+        platform = test_db.get(Platform, platform.id)
+        assert platform.why_choose == '["稳定"]'
+        assert platform.trading_tools == "[坏数据"
+        assert platform.updated_at == updated_at
+        assert json.loads(platform.details_json)["why_choose"] == ["稳定"]
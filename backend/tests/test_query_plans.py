@@ -0,0 +1,191 @@
+"""
+查询计划回归测试
+
+对 ArticleService / MarginDataService 的查询执行 EXPLAIN QUERY PLAN，
+任一查询退化为全表扫描（SCAN <table> 且未使用索引）即失败。
+"""
+
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.database import Base
+from app.models import Article, Section, Category, Platform
+from app.models.margin import MarginSummary, MarginDetail
+from app.services.article_service import ArticleService
+from app.services.tushare_service import MarginDataService
+
+
+# "SCAN articles" / "SCAN articles AS a" 为全表扫描；
+# "SCAN articles USING INDEX ..." 是按索引顺序扫描，可配合 LIMIT 提前结束
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_TABLES = set(Base.metadata.tables)
+
+
+@pytest.fixture
+def captured_selects(test_db):
+    """记录测试期间执行的 SELECT 语句及其参数"""
+    statements = []
+    bind = test_db.get_bind()
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(bind, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(bind, "before_cursor_execute", _capture)
+
+
+@pytest.fixture
+def seeded_db(test_db, admin_user, make_article):
+    """写入少量文章与两融数据，保证各查询走到完整路径"""
+    section = Section(name="计划栏目", slug="plan-section")
+    category = Category(name="计划分类", section=section)
+    platform = Platform(name="计划平台", slug="plan-platform")
+
+    for i in range(5):
+        make_article(
+            title=f"计划文章{i}",
+            slug=f"plan-article-{i}",
+            content="内容",
+            section=section,
+            category_obj=category,
+            platform=platform,
+            is_published=i % 2 == 0,
+            is_featured=i == 0,
+            like_count=i,
+            view_count=i * 10,
+        )
+
+    latest = date(2025, 1, 10)
+    for d in range(3):
+        trade_date = latest - timedelta(days=d)
+        for exchange in ("SSE", "SZSE"):
+            test_db.add(MarginSummary(trade_date=trade_date, exchange_id=exchange, rzye=100, rqye=10, rzrqye=110))
+        for code in ("600519.SH", "000001.SZ"):
+            test_db.add(MarginDetail(
+                trade_date=trade_date, ts_code=code, name=code[:6],
+                rzye=100, rzmre=20, rzche=10, rqye=5, rqyl=1, rqmcl=1, rzrqye=105,
+            ))
+    test_db.commit()
+    return {"admin": admin_user, "section": section, "category": category, "platform": platform}
+
+
+def assert_no_full_scan(db, statements, allow_temp_sort=True):
+    """
+    对记录的语句逐条执行 EXPLAIN QUERY PLAN 并检查全表扫描
+
+    Args:
+        db: 数据库会话
+        statements: [(SQL, 参数)]
+        allow_temp_sort: 为 False 时同时要求排序由索引完成（无 TEMP B-TREE）
+    """
+    assert statements, "没有记录到任何 SELECT 语句"
+    connection = db.connection()
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        details = [row[-1] for row in plan]
+        for detail in details:
+            match = _FULL_SCAN.match(detail)
+            assert not (match and match.group(1) in _TABLES), (
+                f"全表扫描 {match.group(1) if match else ''}:\n{statement}\n计划: {details}"
+            )
+            if not allow_temp_sort and "ORDER BY" in statement:
+                assert "USE TEMP B-TREE FOR ORDER BY" not in detail, (
+                    f"排序未走索引:\n{statement}\n计划: {details}"
+                )
+
+
+class TestArticleQueryPlans:
+    """ArticleService 查询计划测试"""
+
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {"is_published": True},
+        {"is_published": True, "sort_by": "published_at"},
+        {"is_published": True, "sort_by": "like_count"},
+        {"category_id": 1, "is_published": True},
+        {"platform_id": 1, "is_published": True},
+        {"author_id": 1},
+        {"is_featured": True, "is_published": True},
+    ])
+    def test_get_articles(self, test_db, seeded_db, captured_selects, kwargs):
+        """
+        测试文章列表查询
+
+        验证：
+        - 常用过滤/排序组合均走索引
+        """
+        ArticleService.get_articles(test_db, limit=10, **kwargs)
+        assert_no_full_scan(test_db, captured_selects)
+
+    @pytest.mark.parametrize("sort_by", ["created_at", "like_count"])
+    def test_cursor_page(self, test_db, seeded_db, captured_selects, sort_by):
+        """
+        测试游标翻页
+
+        验证：
+        - 带游标的下一页按排序索引定位，不做全表扫描
+        """
+        first = ArticleService.get_articles_page(test_db, limit=3, is_published=True, sort_by=sort_by)
+        captured_selects.clear()
+        ArticleService.get_articles_page(
+            test_db, limit=3, is_published=True, sort_by=sort_by, cursor=first.next_cursor, total="none"
+        )
+        assert_no_full_scan(test_db, captured_selects)
+
+    def test_lookup_queries(self, test_db, seeded_db, captured_selects):
+        """
+        测试单篇与按维度查询
+
+        验证：
+        - ID、栏目、平台、作者、精选、热门、关键词查询均走索引
+        """
+        section = seeded_db["section"]
+        ArticleService.get_article(test_db, 1, increment_view=False)
+        ArticleService.get_articles_by_platform(test_db, seeded_db["platform"].id)
+        ArticleService.get_articles_by_author(test_db, seeded_db["admin"].id)
+        ArticleService.get_featured_articles(test_db)
+        ArticleService.get_trending_articles(test_db)
+        ArticleService.search_articles(test_db, "计划")
+        (
+            test_db.query(Article)
+            .filter(Article.section_id == section.id, Article.is_published == True)
+            .order_by(Article.created_at.desc())
+            .limit(10)
+            .all()
+        )
+        assert_no_full_scan(test_db, captured_selects)
+
+
+class TestMarginQueryPlans:
+    """MarginDataService 查询计划测试"""
+
+    @pytest.mark.parametrize("order_by", ["rzye", "rqye", "rzmre", "rqyl", "rqmcl", "net_buy"])
+    def test_top_stocks(self, test_db, seeded_db, captured_selects, order_by):
+        """
+        测试排行榜查询
+
+        验证：
+        - trade_date + 指标排序走组合索引，无需临时排序
+        """
+        stocks = MarginDataService(test_db).get_top_stocks(order_by=order_by, limit=10)
+        assert stocks
+        assert_no_full_scan(test_db, captured_selects, allow_temp_sort=False)
+
+    def test_summary_history_and_search(self, test_db, seeded_db, captured_selects):
+        """
+        测试汇总、趋势、个股历史与搜索
+
+        验证：
+        - 所有查询走索引
+        """
+        service = MarginDataService(test_db)
+        assert service.get_latest_summary()
+        assert service.get_summary_trend(days=30)
+        assert service.get_stock_margin_history("600519.SH", days=30)
+        assert service.search_stocks("600")
+        assert_no_full_scan(test_db, captured_selects)
@@ -0,0 +1,126 @@
+"""
+相关文章测试
+
+测试 TF-IDF 相似度计算、全量重建与增量更新，以及相关文章接口与 SSR 页面。
+"""
+
+import pytest
+
+from app.services.related_articles import RelatedArticleService, RelatedCorpus
+
+
+@pytest.fixture
+def related_articles(make_article):
+    """同一栏目下主题相近的两篇文章、一篇无关文章，以及另一栏目下的相近文章"""
+    from app.models import Section
+
+    section = Section(name="杠杆交易", slug="leverage")
+    other_section = Section(name="新闻", slug="news")
+
+    def make(slug, title, content, section, tags="杠杆,保证金"):
+        return make_article(slug=slug, title=title, content=content, tags=tags, section=section, is_published=True)
+
+    articles = {
+        "margin": make("margin-basics", "保证金交易入门", "<p>保证金交易的杠杆倍数与强制平仓规则</p>", section),
+        "leverage": make("leverage-risk", "杠杆交易风险", "<p>杠杆倍数越高，强制平仓风险越大</p>", section),
+        "unrelated": make("fees", "手续费说明", "<p>各平台手续费对比</p>", section, tags="手续费"),
+        "news": make("news-leverage", "杠杆新闻", "<p>杠杆倍数与强制平仓规则调整</p>", other_section),
+    }
+    return {key: article.id for key, article in articles.items()}
+
+
+def related_ids(test_db, article_id):
+    return [article.id for article in RelatedArticleService.get_related(test_db, article_id)]
+
+
+class TestRelatedCorpus:
+    """相似度计算测试"""
+
+    def test_neighbours_within_section(self, test_db, related_articles):
+        """
+        测试近邻计算
+
+        验证：
+        - 向量经过 L2 归一化，自身相似度为 1
+        - 近邻只来自同一栏目 / 平台，不包含自身，按相似度降序
+        """
+        corpus = RelatedCorpus.load(test_db)
+        position = corpus.positions[related_articles["margin"]]
+        scores = corpus.matrix[position].multiply(corpus.matrix[position]).sum()
+        assert scores == pytest.approx(1.0)
+
+        neighbours = corpus.neighbours([position])[related_articles["margin"]]
+        ids = [related_id for related_id, _ in neighbours]
+        assert ids[0] == related_articles["leverage"]
+        assert related_articles["news"] not in ids
+        assert related_articles["margin"] not in ids
+        assert [score for _, score in neighbours] == sorted((score for _, score in neighbours), reverse=True)
+
+
+class TestRelatedArticleService:
+    """全量重建与增量更新测试"""
+
+    def test_rebuild_and_incremental_update(self, test_db, related_articles, make_article):
+        """
+        测试全量重建与增量更新
+
+        验证：
+        - 全量重建后最相近的同栏目文章排第一
+        - 新发布的相近文章增量加入已有文章的列表
+        - 文章下线后从其他文章的列表中移除，自身列表清空
+        """
+        from app.models import Article
+
+        stats = RelatedArticleService.rebuild_all(test_db)
+        assert stats["articles"] == 4
+        assert related_ids(test_db, related_articles["margin"])[0] == related_articles["leverage"]
+
+        article = make_article(
+            title="保证金交易强制平仓",
+            slug="margin-liquidation",
+            content="<p>保证金交易的强制平仓规则与杠杆倍数</p>",
+            tags="杠杆,保证金",
+            section_id=test_db.get(Article, related_articles["margin"]).section_id,
+            is_published=True,
+        )
+        new_id = article.id
+
+        RelatedArticleService.update_article(test_db, new_id)
+        assert new_id in related_ids(test_db, related_articles["margin"])
+        assert related_articles["margin"] in related_ids(test_db, new_id)
+
+        article.is_published = False
+        test_db.commit()
+        RelatedArticleService.update_article(test_db, new_id)
+        assert new_id not in related_ids(test_db, related_articles["margin"])
+        assert related_ids(test_db, new_id) == []
+
+
+class TestRelatedArticleRoutes:
+    """相关文章接口与 SSR 页面测试"""
+
+    def test_related_endpoint_and_page(self, client, test_db, related_articles):
+        """
+        测试相关文章接口与文章页
+
+        验证：
+        - 接口返回按相关度排序的文章摘要，limit 生效
+        - 未发布或不存在的文章返回 404
+        - SSR 页面渲染相关文章区块
+        """
+        margin_id = related_articles["margin"]
+        leverage_id = related_articles["leverage"]
+        RelatedArticleService.rebuild_all(test_db)
+
+        response = client.get(f"/api/articles/{margin_id}/related", params={"limit": 1})
+        assert response.status_code == 200
+        items = response.json()
+        assert [item["id"] for item in items] == [leverage_id]
+        assert items[0]["slug"] == "leverage-risk"
+
+        assert client.get("/api/articles/999999/related").status_code == 404
+
+        response = client.get("/article/margin-basics")
+        assert response.status_code == 200
+        assert "相关文章" in response.text
+        assert "/article/leverage-risk" in response.text
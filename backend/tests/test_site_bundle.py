@@ -0,0 +1,85 @@
+"""
+首页数据快照测试
+
+测试 /api/site/bundle 的内容、ETag 条件请求以及内容变更后的重新生成。
+"""
+
+import pytest
+
+
+@pytest.fixture
+def content(test_db, make_article):
+    """一个栏目、一个分类、两篇文章（一篇精选）、一个推荐平台与网站设置"""
+    from app.models import Category, Platform, Section
+    from app.models.website_settings import WebsiteSettings
+
+    section = Section(name="百科", slug="bundle-wiki")
+    category = Category(name="入门", section=section)
+    test_db.add_all([
+        WebsiteSettings(site_name="鹰眼查融"),
+        Platform(name="推荐平台", slug="bundle-platform", is_featured=True),
+    ])
+    make_article(title="精选文章", slug="bundle-featured", section=section, category_obj=category,
+                 is_published=True, is_featured=True)
+    make_article(title="普通文章", slug="bundle-plain", section=section, category_obj=category, is_published=True)
+    return {"section": section, "category": category}
+
+
+class TestSiteBundle:
+    """首页数据快照测试"""
+
+    def test_bundle_content(self, client, content):
+        """
+        测试快照内容
+
+        验证：
+        - 一次返回网站设置、栏目、分类（含文章数）、文章列表与推荐平台
+        - 文章为列表字段，不含正文
+        - 没有两融数据时 margin_overview 为 null
+        """
+        response = client.get("/api/site/bundle")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        bundle = response.json()
+
+        assert bundle["settings"]["site_name"] == "鹰眼查融"
+        assert [s["slug"] for s in bundle["sections"]] == ["bundle-wiki"]
+        assert bundle["sections"][0]["category_count"] == 1
+        assert bundle["categories"][0]["article_count"] == 2
+        assert [a["slug"] for a in bundle["featured_articles"]] == ["bundle-featured"]
+        assert {a["slug"] for a in bundle["latest_articles"]} == {"bundle-featured", "bundle-plain"}
+        assert "content" not in bundle["trending_articles"][0]
+        assert bundle["trending_articles"][0]["section_name"] == "百科"
+        assert [p["slug"] for p in bundle["featured_platforms"]] == ["bundle-platform"]
+        assert bundle["margin_overview"] is None
+
+    def test_etag_and_invalidation(self, client, test_db, content):
+        """
+        测试条件请求与失效
+
+        验证：
+        - 第二次请求命中缓存，ETag 不变；If-None-Match 匹配时返回 304
+        - 失效标签后重新生成，快照与 ETag 随之更新
+        """
+        from app.models import Article
+        from app.utils.cache import invalidate_tags
+
+        first = client.get("/api/site/bundle")
+        second = client.get("/api/site/bundle")
+        assert first.headers["x-page-cache"] == "MISS"
+        assert second.headers["x-page-cache"] == "HIT"
+        assert second.headers["etag"] == first.headers["etag"]
+
+        not_modified = client.get("/api/site/bundle", headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
+
+        article = test_db.query(Article).filter(Article.slug == "bundle-plain").one()
+        article.is_featured = True
+        test_db.commit()
+        invalidate_tags("articles")
+
+        refreshed = client.get("/api/site/bundle", headers={"If-None-Match": first.headers["etag"]})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["x-page-cache"] == "MISS"
+        assert refreshed.headers["etag"] != first.headers["etag"]
+        assert len(refreshed.json()["featured_articles"]) == 2
@@ -0,0 +1,111 @@
+"""
+Sitemap 测试
+
+测试 sitemap 索引、子 sitemap 分段、条件请求以及内容变更后的刷新。
+"""
+
+import pytest
+
+from app.services import sitemap_service
+
+
+@pytest.fixture
+def articles(make_article):
+    """两篇已发布文章与一篇草稿"""
+    for slug, published in (("first-article", True), ("second-article", True), ("draft-article", False)):
+        make_article(title=slug, slug=slug, is_published=published)
+
+
+class TestSitemap:
+    """Sitemap 测试"""
+
+    def test_index_and_children(self, client, articles):
+        """
+        测试 sitemap 索引
+
+        验证：
+        - /sitemap.xml 为 sitemapindex，列出有内容的子 sitemap
+        - 文章子 sitemap 只包含已发布文章
+        - 没有数据的类型返回 404
+        """
+        index = client.get("/sitemap.xml")
+        assert index.status_code == 200
+        assert index.headers["content-type"].startswith("application/xml")
+        assert "<sitemapindex" in index.text
+        assert "/sitemap-pages-1.xml</loc>" in index.text
+        assert "/sitemap-articles-1.xml</loc>" in index.text
+        assert "/sitemap-margin-1.xml" not in index.text
+
+        pages = client.get("/sitemap-pages-1.xml")
+        assert "<loc>http://testserver/margin/</loc>" in pages.text
+
+        child = client.get("/sitemap-articles-1.xml")
+        assert "<loc>http://testserver/article/first-article</loc>" in child.text
+        assert "<loc>http://testserver/article/second-article</loc>" in child.text
+        assert "draft-article" not in child.text
+
+        assert client.get("/sitemap-margin-1.xml").status_code == 404
+        assert client.get("/sitemap-unknown-1.xml").status_code == 404
+
+    def test_conditional_get(self, client, articles):
+        """
+        测试条件请求
+
+        验证：
+        - 第二次请求命中缓存，返回 ETag 与 Last-Modified
+        - If-None-Match / If-Modified-Since 匹配时返回 304
+        """
+        first = client.get("/sitemap-articles-1.xml")
+        second = client.get("/sitemap-articles-1.xml")
+        assert first.headers["x-page-cache"] == "MISS"
+        assert second.headers["x-page-cache"] == "HIT"
+        assert second.headers["etag"] == first.headers["etag"]
+
+        not_modified = client.get("/sitemap-articles-1.xml", headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
+
+        since = client.get("/sitemap-articles-1.xml", headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert since.status_code == 304
+
+    def test_last_modified_not_in_future(self, client, articles):
+        """
+        测试 Last-Modified 时区
+
+        验证：
+        - 刚保存的文章（北京时间存储）换算为 UTC，Last-Modified 不晚于响应时间
+        """
+        from datetime import datetime, timezone
+        from email.utils import parsedate_to_datetime
+
+        for path in ("/sitemap.xml", "/sitemap-articles-1.xml", "/sitemap-pages-1.xml"):
+            response = client.get(path)
+            date = response.headers.get("date")
+            now = parsedate_to_datetime(date) if date else datetime.now(timezone.utc)
+            assert parsedate_to_datetime(response.headers["last-modified"]) <= now
+
+    def test_segmented_and_refreshed(self, client, test_db, articles, monkeypatch):
+        """
+        测试分段与刷新
+
+        验证：
+        - 超过单文件上限时拆分为多个子 sitemap，各段按起始主键读取
+        - 发布新文章后索引与子 sitemap 随之更新
+        """
+        from app.models import Article
+        from app.services.article_service import ArticleService
+
+        monkeypatch.setattr(sitemap_service, "SITEMAP_MAX_URLS", 1)
+
+        index = client.get("/sitemap.xml")
+        assert "/sitemap-articles-2.xml</loc>" in index.text
+        assert "/sitemap-articles-3.xml" not in index.text
+        assert "second-article" in client.get("/sitemap-articles-2.xml").text
+        assert client.get("/sitemap-articles-3.xml").status_code == 404
+        published_ids = [a.id for a in test_db.query(Article).filter(Article.is_published == True).order_by(Article.id)]
+        assert sitemap_service.SitemapService.segment_starts(test_db, "articles") == published_ids
+
+        draft_id = test_db.query(Article).filter(Article.slug == "draft-article").one().id
+        ArticleService.publish_article(test_db, draft_id)
+
+        assert "/sitemap-articles-3.xml</loc>" in client.get("/sitemap.xml").text
+        assert "draft-article" in client.get("/sitemap-articles-3.xml").text
@@ -0,0 +1,217 @@
+"""
+SSR 预编译模板测试
+
+测试插槽定位、转义、模板热更新以及文章详情页的渲染结果。
+"""
+
+import os
+
+from app.utils.ssr_template import CompiledTemplate, TemplateLoader
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+  <title>加载中...</title>
+  <meta id="seo-description" name="description" content="默认描述" />
+  <meta id="og-url" property="og:url">
+  <link id="canonical" rel="canonical" href='https://example.com/' />
+</head>
+<body>
+  <div id="container"><div class="inner">加载中...</div></div>
+  <span id="crumb">默认</span>
+</body>
+</html>
+"""
+
+SLOTS = ["title", "seo-description@content", "og-url@content", "canonical@href", "container", "crumb", "head_end"]
+
+
+class TestCompiledTemplate:
+    """预编译模板测试"""
+
+    def test_render_fills_slots(self):
+        """
+        测试插槽填充与转义
+
+        验证：
+        - title / 属性值被转义，内部 HTML 与 head_end 原样插入
+        - 缺少的属性被插入到标签中
+        - 嵌套的同名标签不会提前结束插槽
+        """
+        template = CompiledTemplate(TEMPLATE, SLOTS)
+        html = template.render({
+            "title": "A&B <标题>",
+            "seo-description@content": '描述 "引号"',
+            "og-url@content": "https://example.com/a?x=1&y=2",
+            "canonical@href": "https://example.com/a",
+            "container": "<p>正文</p>",
+            "crumb": "面包屑",
+            "head_end": "<script>window.__DATA__ = {};</script>",
+        })
+
+        assert "<title>A&amp;B &lt;标题&gt;</title>" in html
+        assert 'content="描述 &quot;引号&quot;"' in html
+        assert '<meta content="https://example.com/a?x=1&amp;y=2" id="og-url" property="og:url">' in html
+        assert "href='https://example.com/a'" in html
+        assert '<div id="container"><p>正文</p></div>\n' in html
+        assert '<span id="crumb">面包屑</span>' in html
+        assert "<script>window.__DATA__ = {};</script></head>" in html
+        assert html.count("<!DOCTYPE html>") == 1
+
+    def test_unfilled_and_missing_slots(self):
+        """
+        测试未提供与不存在的插槽
+
+        验证：
+        - 未提供值的插槽保留模板原文
+        - 模板中不存在的插槽记入 missing 且不影响渲染
+        """
+        template = CompiledTemplate(TEMPLATE, SLOTS + ["not-exist@content"])
+
+        assert template.render({}) == TEMPLATE
+        assert template.missing == ["not-exist@content"]
+        assert template.render({"not-exist@content": "x"}) == TEMPLATE
+
+
+class TestTemplateLoader:
+    """模板加载器测试"""
+
+    def test_compiles_once_and_reloads_on_change(self, tmp_path):
+        """
+        测试模板缓存与热更新
+
+        验证：
+        - 文件未变化时不重新编译
+        - 文件修改后重新编译
+        - 文件不存在返回 None
+        """
+        path = tmp_path / "page.html"
+        path.write_text(TEMPLATE, encoding="utf-8")
+        loader = TemplateLoader(check_interval=0)
+
+        first = loader.get(path, SLOTS)
+        assert loader.get(path, SLOTS) is first
+        assert loader.compilations == 1
+
+        path.write_text(TEMPLATE.replace("加载中...</title>", "新标题</title>"), encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = loader.get(path, SLOTS)
+        assert second is not first
+        assert "<title>新标题</title>" in second.render({})
+        assert loader.compilations == 2
+
+        assert loader.get(tmp_path / "missing.html", SLOTS) is None
+
+
+class TestArticlePage:
+    """文章详情页 SSR 测试"""
+
+    def test_article_page_rendered(self, client, make_article):
+        """
+        测试文章详情页
+
+        验证：
+        - title、canonical、正文与内联数据被写入页面
+        - 标题中的 HTML 被转义
+        """
+        make_article(title="<SSR> 文章", slug="ssr-article", content="<p>正文内容</p>", is_published=True)
+
+        response = client.get("/article/ssr-article")
+
+        assert response.status_code == 200
+        page = response.text
+        assert "<title>&lt;SSR&gt; 文章 - " in page
+        assert 'href="http://testserver/article/ssr-article"' in page
+        assert '<article class="content"><p>正文内容</p></article>' in page
+        assert "window.__ARTICLE_DATA__ = " in page
+        assert page.count("<!DOCTYPE html>") == 1
+
+
+class TestPageCache:
+    """SSR 页面缓存测试"""
+
+    @staticmethod
+    def _create_article(make_article):
+        return make_article(
+            title="缓存文章",
+            slug="cached-article",
+            content="<p>" + "正文" * 600 + "</p>",
+            is_published=True,
+        )
+
+    def test_select_encoding(self):
+        """
+        测试压缩版本选择
+
+        验证：
+        - 优先 br，其次 gzip；q=0 视为不接受
+        - 小页面不压缩
+        """
+        import gzip
+        from app.utils.page_cache import RenderedPage
+
+        page = RenderedPage.from_html("<html>" + "x" * 5000 + "</html>", compress=True)
+        assert gzip.decompress(page.gzip) == page.body
+
+        assert page.select("gzip, deflate, br")[1] == ("br" if page.br else "gzip")
+        assert page.select("gzip, br;q=0")[1] == "gzip"
+        assert page.select("identity") == (page.body, None)
+        assert RenderedPage.from_html("<p>small</p>").gzip is None
+
+    def test_article_page_cached_and_invalidated(self, client, test_db, make_article):
+        """
+        测试文章页缓存
+
+        验证：
+        - 第二次请求命中缓存，浏览量仍然递增且不改变 updated_at
+        - 返回预压缩版本，If-None-Match 返回 304
+        - 编辑文章后重新渲染
+        """
+        from app.models import Article
+        from app.schemas.article import ArticleUpdate
+        from app.services.article_service import ArticleService
+        from app.services.counter_buffer import counter_buffer
+
+        article = self._create_article(make_article)
+        article_id, updated_at = article.id, article.updated_at
+
+        first = client.get("/article/cached-article")
+        second = client.get("/article/cached-article", headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["x-page-cache"] == "MISS"
+        assert second.headers["x-page-cache"] == "HIT"
+        assert second.headers["content-encoding"] == "gzip"
+        assert second.text == first.text
+        counter_buffer.flush()
+        test_db.expire_all()
+        stored = test_db.get(Article, article_id)
+        assert stored.view_count == 2
+        assert stored.updated_at == updated_at
+
+        not_modified = client.get("/article/cached-article", headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
+
+        ArticleService.update_article(test_db, article_id, ArticleUpdate(content="<p>新正文</p>"))
+        third = client.get("/article/cached-article")
+        assert third.headers["x-page-cache"] == "MISS"
+        assert "<p>新正文</p>" in third.text
+
+    def test_invalidate_tags_releases_pages(self, client, make_article):
+        """
+        测试按标签失效释放页面缓存
+
+        验证：
+        - invalidate_tags 同时作用于关联的页面缓存
+        """
+        from app.utils.cache import invalidate_tags
+        from app.utils.page_cache import page_cache
+
+        article_id = self._create_article(make_article).id
+        client.get("/article/cached-article")
+        assert page_cache.get_stats()["total_entries"] == 1
+
+        invalidate_tags(f"article:{article_id}")
+
+        assert page_cache.get_stats()["total_entries"] == 0
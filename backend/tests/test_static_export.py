@@ -0,0 +1,146 @@
+"""
+静态页面导出测试
+
+测试文章、平台与两融个股页的增量导出，以及静态页面的浏览量上报接口。
+"""
+
+import gzip
+import json
+from datetime import date
+
+import pytest
+
+from app.services.static_export import StaticExporter
+
+SITE_URL = "https://example.com"
+
+
+@pytest.fixture
+def published_article(make_article):
+    """已发布文章与一篇草稿"""
+    article = make_article(title="导出文章", slug="exported-article", content="<p>导出正文</p>", is_published=True)
+    make_article(title="草稿", slug="draft-article", content="<p>草稿</p>", is_published=False)
+    return article
+
+
+class TestStaticExporter:
+    """静态导出测试"""
+
+    def test_export_articles_incrementally(self, test_db, published_article, tmp_path):
+        """
+        测试文章导出
+
+        验证：
+        - 只导出已发布文章，同时写入 .gz 与清单
+        - 页面包含 canonical 与浏览量上报脚本
+        - 未变化的文章不重新渲染，修改后重新导出，下线后删除
+        """
+        from app.schemas.article import ArticleUpdate
+        from app.services.article_service import ArticleService
+
+        article_id = published_article.id
+        page_path = tmp_path / "article" / "exported-article" / "index.html"
+
+        stats = StaticExporter(test_db, tmp_path, SITE_URL).export_articles()
+        assert stats["written"] == 1
+        page = page_path.read_text(encoding="utf-8")
+        assert 'href="https://example.com/article/exported-article"' in page
+        assert f"/api/articles/{article_id}/view" in page
+        assert gzip.decompress((page_path.parent / "index.html.gz").read_bytes()).decode("utf-8") == page
+        assert not (tmp_path / "article" / "draft-article").exists()
+        assert f"article:{article_id}" in json.loads((tmp_path / ".manifest.json").read_text())
+
+        stats = StaticExporter(test_db, tmp_path, SITE_URL).export_articles()
+        assert (stats["written"], stats["unchanged"]) == (0, 1)
+
+        ArticleService.update_article(test_db, article_id, ArticleUpdate(content="<p>新正文</p>"))
+        stats = StaticExporter(test_db, tmp_path, SITE_URL).export_articles([article_id])
+        assert stats["written"] == 1
+        assert "<p>新正文</p>" in page_path.read_text(encoding="utf-8")
+
+        ArticleService.unpublish_article(test_db, article_id)
+        stats = StaticExporter(test_db, tmp_path, SITE_URL).export_articles([article_id])
+        assert stats["removed"] == 1
+        assert not page_path.exists()
+        assert not page_path.parent.exists()
+
+    def test_export_platforms(self, test_db, tmp_path):
+        """
+        测试平台导出
+
+        验证：
+        - 启用的平台导出到 platforms/{slug}/index.html，停用后删除
+        """
+        from app.models import Platform
+
+        platform = Platform(name="导出平台", slug="export-platform", is_active=True)
+        test_db.add(platform)
+        test_db.commit()
+
+        StaticExporter(test_db, tmp_path, SITE_URL).export_platforms()
+        page_path = tmp_path / "platforms" / "export-platform" / "index.html"
+        assert "window.__PLATFORM_DATA__" in page_path.read_text(encoding="utf-8")
+
+        platform.is_active = False
+        test_db.commit()
+        StaticExporter(test_db, tmp_path, SITE_URL).export_platforms([platform.id])
+        assert not page_path.exists()
+
+    def test_export_margin_stocks_after_sync(self, test_db, tmp_path):
+        """
+        测试两融个股导出
+
+        验证：
+        - 每只股票按最新交易日渲染
+        - 没有新交易日数据时不重新渲染，同步新交易日后重新导出
+        """
+        from app.models.margin import MarginDetail
+
+        test_db.add_all([
+            MarginDetail(trade_date=date(2026, 10, 15), ts_code="600519.SH", name="贵州茅台"),
+            MarginDetail(trade_date=date(2026, 10, 16), ts_code="600519.SH", name="贵州茅台"),
+        ])
+        test_db.commit()
+
+        stats = StaticExporter(test_db, tmp_path, SITE_URL).export_margin_stocks()
+        page_path = tmp_path / "margin" / "stock" / "600519.SH" / "index.html"
+        assert stats["written"] == 1
+        assert '"dateModified": "2026-10-16"' in page_path.read_text(encoding="utf-8")
+
+        assert StaticExporter(test_db, tmp_path, SITE_URL).export_margin_stocks()["written"] == 0
+
+        test_db.add(MarginDetail(trade_date=date(2026, 10, 17), ts_code="600519.SH", name="贵州茅台"))
+        test_db.commit()
+        assert StaticExporter(test_db, tmp_path, SITE_URL).export_margin_stocks()["written"] == 1
+        assert '"dateModified": "2026-10-17"' in page_path.read_text(encoding="utf-8")
+
+    def test_requires_site_url(self, test_db, tmp_path, monkeypatch):
+        """
+        测试缺少站点地址
+
+        验证：
+        - 未配置 PUBLIC_SITE_URL 时拒绝导出
+        """
+        monkeypatch.delenv("PUBLIC_SITE_URL", raising=False)
+        with pytest.raises(ValueError):
+            StaticExporter(test_db, tmp_path)
+
+
+class TestViewBeacon:
+    """静态页面浏览量上报测试"""
+
+    def test_record_view(self, client, published_article):
+        """
+        测试浏览量上报
+
+        验证：
+        - 已发布文章返回 204 并计入浏览量
+        - 不存在的文章返回 404
+        """
+        from app.services.counter_buffer import counter_buffer
+
+        article_id = published_article.id
+
+        assert client.post(f"/api/articles/{article_id}/view").status_code == 204
+        assert counter_buffer.pending("view_count", article_id) == 1
+        assert client.post("/api/articles/999999/view").status_code == 404
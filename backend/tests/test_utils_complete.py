@@ -49,6 +49,660 @@ class TestCacheManager:
         stats = cache.get_stats()
         assert stats["total_entries"] == 2
         assert stats["active_entries"] == 2
+    
+    def test_cache_lru_eviction(self):
+        """测试超出条目上限时淘汰最久未访问的条目"""
+        cache = CacheManager(max_entries=2)
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.get("key1")  # key1 变为最近访问
+        cache.set("key3", "value3")
+        
+        assert cache.get("key2") is None
+        assert cache.get("key1") == "value1"
+        assert cache.get("key3") == "value3"
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_cache_byte_budget(self):
+        """测试字节上限"""
+        cache = CacheManager(max_bytes=2048)
+        cache.set("big", "x" * 4096)  # 单个值超出上限，不缓存
+        assert cache.get("big") is None
+        
+        for i in range(10):
+            cache.set(f"key{i}", "y" * 500)
+        
+        stats = cache.get_stats()
+        assert stats["total_bytes"] <= 2048
+        assert stats["evictions"] > 0
+        assert cache.get("key9") == "y" * 500
+    
+    def test_cache_hit_miss_counters(self):
+        """测试命中/未命中计数"""
+        cache = CacheManager()
+        cache.set("key1", "value1")
+        cache.get("key1")
+        cache.get("key1")
+        cache.get("missing")
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == round(2 / 3, 4)
+    
+    def test_cache_concurrent_access(self):
+        """测试多线程并发读写后容量与字节计数保持一致"""
+        import threading
+        cache = CacheManager(max_entries=50)
+        
+        def worker(n):
+            for i in range(200):
+                cache.set(f"key{n}-{i}", i)
+                cache.get(f"key{n}-{i // 2}")
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        stats = cache.get_stats()
+        assert stats["total_entries"] == 50
+        assert stats["total_bytes"] == sum(e.size for e in cache._cache.values())
+
+
+class TestCacheTags:
+    """缓存标签失效测试"""
+    
+    def test_invalidate_tags(self):
+        """测试按标签删除条目并清理标签索引"""
+        cache = CacheManager()
+        cache.set("article-1", "a1", tags=["article:1", "section:guide"])
+        cache.set("article-2", "a2", tags=["article:2", "section:guide"])
+        cache.set("settings", "s", tags=["settings"])
+        
+        assert cache.invalidate_tags("article:1") == 1
+        assert cache.get("article-1") is None
+        assert cache.get("article-2") == "a2"
+        
+        assert cache.invalidate_tags("section:guide", "missing") == 1
+        assert cache.get("settings") == "s"
+        assert cache.get_stats()["tags"] == 1
+    
+    def test_cached_with_tag_function(self):
+        """测试装饰器根据参数生成标签"""
+        from app.utils.cache import cached, invalidate_tags
+        
+        calls = []
+        
+        @cached(prefix="test-tags", ttl=60, tags=lambda article_id: [f"article:{article_id}"])
+        def load(article_id):
+            calls.append(article_id)
+            return {"id": article_id}
+        
+        load(7)
+        load(7)
+        invalidate_tags("article:7")
+        load(7)
+        
+        assert calls == [7, 7]
+    
+    def test_article_write_invalidates_tags(self, test_db, make_article):
+        """测试文章写操作失效文章与栏目标签"""
+        from app.models import Section
+        from app.services.article_service import ArticleService
+        from app.utils.cache import cache_manager
+        
+        article = make_article(section=Section(name="标签栏目", slug="tag-section"))
+        
+        cache_manager.set("detail", "cached", tags=[f"article:{article.id}"])
+        cache_manager.set("section-list", "cached", tags=["section:tag-section"])
+        
+        ArticleService.toggle_featured(test_db, article.id)
+        
+        assert cache_manager.get("detail") is None
+        assert cache_manager.get("section-list") is None
+
+
+class TestCachedDecorator:
+    """缓存装饰器测试"""
+    
+    def test_sync_single_flight(self):
+        """测试同步调用并发未命中时只计算一次"""
+        import threading
+        import time
+        from app.utils.cache import cached
+        
+        calls = []
+        
+        @cached(prefix="test-sync-flight", ttl=60)
+        def compute(x):
+            calls.append(x)
+            time.sleep(0.2)
+            return x * 2
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(compute(21))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert results == [42] * 8
+        assert calls == [21]
+    
+    def test_async_single_flight(self):
+        """测试异步调用并发未命中时只计算一次，异常共享且不缓存"""
+        import asyncio
+        from app.utils.cache import cached
+        
+        calls = []
+        
+        @cached(prefix="test-async-flight", ttl=60)
+        async def compute(x):
+            calls.append(x)
+            await asyncio.sleep(0.05)
+            if x < 0:
+                raise ValueError("negative")
+            return x * 2
+        
+        async def run():
+            ok = await asyncio.gather(*[compute(5) for _ in range(10)])
+            failed = await asyncio.gather(*[compute(-1) for _ in range(3)], return_exceptions=True)
+            return ok, failed
+        
+        ok, failed = asyncio.run(run())
+        
+        assert ok == [10] * 10
+        assert all(isinstance(e, ValueError) for e in failed)
+        assert calls == [5, -1]
+    
+    def test_async_leader_cancelled(self):
+        """
+        测试异步执行方被取消
+        
+        验证：
+        - 执行方被取消（如客户端断开）时只有执行方收到 CancelledError
+        - 一个等待方接手重新执行，其余等待方共享其结果
+        """
+        import asyncio
+        from app.utils.cache import cached
+        
+        calls = []
+        
+        @cached(prefix="test-async-cancel", ttl=60)
+        async def compute(x):
+            calls.append(x)
+            await asyncio.sleep(0.05)
+            return x * 2
+        
+        async def run():
+            leader = asyncio.ensure_future(compute(3))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.ensure_future(compute(3)) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*waiters)
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return results
+        
+        assert asyncio.run(run()) == [6] * 5
+        assert calls == [3, 3]
+    
+    def test_stale_value_served_during_refresh(self):
+        """测试刷新期间其他调用返回旧值"""
+        import threading
+        import time
+        from app.utils.cache import cached, cache_manager
+        
+        release = threading.Event()
+        calls = []
+        
+        @cached(prefix="test-stale", ttl=60, stale_ttl=60)
+        def compute():
+            calls.append(1)
+            if len(calls) > 1:
+                release.wait(5)
+            return len(calls)
+        
+        assert compute() == 1
+        # 让条目过期（仍在旧值窗口内）
+        for entry in cache_manager._cache.values():
+            entry.expires_at = 0
+        
+        refresher = threading.Thread(target=compute)
+        refresher.start()
+        while not calls[1:]:
+            time.sleep(0.01)
+        
+        assert compute() == 1  # 刷新进行中，返回旧值
+        release.set()
+        refresher.join()
+        assert compute() == 2
+
+
+class TestCacheKeyBuilder:
+    """缓存键生成测试"""
+    
+    def test_injected_objects_skipped(self, test_db):
+        """测试数据库会话与 ORM 实例不参与缓存键"""
+        from sqlalchemy.orm import Session
+        from app.models import AdminUser
+        from app.utils.cache import cached
+        
+        calls = []
+        
+        @cached(prefix="test-key-injected", ttl=60)
+        def load(section_id, db=None, current_user=None):
+            calls.append(section_id)
+            return section_id
+        
+        load(1, db=test_db, current_user=AdminUser(username="a"))
+        load(1, db=Session(), current_user=AdminUser(username="b"))
+        load(2, db=test_db)
+        
+        assert calls == [1, 2]
+    
+    def test_params_normalized(self):
+        """测试位置/关键字传参、默认值与字符串空白归一化"""
+        from fastapi import Query
+        from app.utils.cache import cached
+        
+        calls = []
+        
+        @cached(prefix="test-key-normalize", ttl=60)
+        def search(keyword: str, limit: int = Query(20), tags=None):
+            calls.append(keyword)
+            return keyword
+        
+        search("btc")
+        search(keyword="  btc ")
+        search("btc", 20, None)
+        search("btc", limit=20, tags=None)
+        search("btc", limit=50)
+        
+        assert calls == ["btc", "btc"]
+    
+    def test_key_params_and_key_func(self):
+        """测试声明的键参数与自定义键函数"""
+        from app.utils.cache import cached
+        
+        calls = []
+        
+        @cached(prefix="test-key-params", ttl=60, key_params=["order_by"])
+        def ranking(order_by, request_id=None):
+            calls.append(order_by)
+            return order_by
+        
+        @cached(prefix="test-key-func", ttl=60, key_func=lambda ts_code, **_: ts_code.upper())
+        def stock(ts_code, days=90):
+            calls.append(ts_code)
+            return ts_code
+        
+        ranking("rzye", request_id=1)
+        ranking("rzye", request_id=2)
+        stock("600519.sh", days=30)
+        stock("600519.SH", days=90)
+        
+        assert calls == ["rzye", "600519.sh"]
+    
+    def test_generate_key_ignores_session(self, test_db):
+        """测试 _generate_key 同样跳过会话参数"""
+        from sqlalchemy.orm import Session
+        
+        cache = CacheManager()
+        assert cache._generate_key("p", 1, db=test_db) == cache._generate_key("p", 1, db=Session())
+        assert cache._generate_key("p", 1) != cache._generate_key("p", 2)
+
+
+class TestTwoTierCache:
+    """L1 + Redis L2 两级缓存测试（FakeRedis 模拟多进程共享的 Redis）"""
+    
+    @staticmethod
+    def _wait_for(predicate, timeout=2.0):
+        import time
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return predicate()
+    
+    @pytest.fixture
+    def workers(self):
+        """两个缓存管理器连接同一个 FakeRedis，模拟两个 worker 进程"""
+        from app.utils.cache_backends import FakeRedis, FakeRedisServer, RedisCacheBackend
+        
+        server = FakeRedisServer()
+        backends = [RedisCacheBackend(FakeRedis(server), prefix="test:") for _ in range(2)]
+        managers = [CacheManager(l2=backend) for backend in backends]
+        # 同一测试进程内的两个后端需要不同的来源标识
+        backends[1]._node = "other"
+        yield managers
+        for backend in backends:
+            backend.close()
+    
+    def test_serialization_roundtrip(self):
+        """测试紧凑序列化：小值不压缩，大值压缩"""
+        import pickle
+        from app.utils.cache_backends import dumps, loads
+        
+        small = {"rzye": 1.5, "items": [1, 2, 3]}
+        large = {"items": [{"name": "平台", "rank": i} for i in range(500)]}
+        
+        assert dumps(small)[32:33] == b"\x00"
+        assert dumps(large)[32:33] == b"\x01"
+        assert len(dumps(large)) < len(pickle.dumps(large, protocol=pickle.HIGHEST_PROTOCOL))
+        assert loads(dumps(small)) == small
+        assert loads(dumps(large)) == large
+    
+    def test_unsigned_payload_rejected(self, monkeypatch):
+        """
+        测试签名校验
+        
+        验证：
+        - 未签名、篡改或其他密钥签名的值在反序列化前被拒绝，pickle 不会执行
+        - L2 中的这类值按未命中处理
+        """
+        import pickle
+        from app.utils.cache_backends import FakeRedis, FakeRedisServer, RedisCacheBackend, dumps, loads
+        
+        executed = []
+        
+        class Payload:
+            def __reduce__(self):
+                return executed.append, ("pwned",)
+        
+        forged = b"\x00" * 32 + b"\x00" + pickle.dumps(Payload())
+        blob = dumps({"total": 1})
+        with pytest.raises(ValueError):
+            loads(forged)
+        with pytest.raises(ValueError):
+            loads(blob[:-1] + bytes([blob[-1] ^ 1]))
+        with pytest.raises(ValueError):
+            loads(dumps({"total": 1}, secret="other-secret"))
+        assert executed == []
+        
+        backend = RedisCacheBackend(FakeRedis(FakeRedisServer()), prefix="test:")
+        backend.client.set("test:overview", forged)
+        assert backend.get("overview") is None
+        assert executed == []
+        backend.close()
+    
+    def test_l2_shared_between_workers(self, workers):
+        """测试一个 worker 写入后，另一个 worker 从 L2 读取并回填 L1"""
+        a, b = workers
+        a.set("overview", {"total": 100}, ttl=60, tags=["margin"])
+        
+        assert b.get("overview") == {"total": 100}
+        assert b.l2.hits == 1
+        # 已回填 L1，再次读取不访问 L2
+        assert b.get("overview") == {"total": 100}
+        assert b.l2.hits == 1
+        assert "overview" in b._tags["margin"]
+    
+    def test_invalidation_broadcast(self, workers):
+        """测试按标签失效同时删除 L2 与其他 worker 的 L1"""
+        a, b = workers
+        a.set("overview", {"total": 100}, ttl=60, tags=["margin"])
+        a.set("settings", {"name": "站点"}, ttl=60, tags=["settings"])
+        assert b.get("overview") and b.get("settings")
+        assert self._wait_for(lambda: b.l2.get_stats()["subscribed"])
+        
+        a.invalidate_tags("margin")
+        
+        assert a.get("overview") is None
+        assert self._wait_for(lambda: "overview" not in b._cache)
+        assert b.get("overview") is None
+        assert b.get("settings") == {"name": "站点"}
+        
+        a.clear()
+        assert self._wait_for(lambda: not b._cache)
+        assert b.get("settings") is None
+    
+    def test_redis_failure_degrades_to_l1(self):
+        """测试 Redis 故障时退化为只使用 L1"""
+        from app.utils.cache_backends import RedisCacheBackend
+        
+        class BrokenRedis:
+            def __getattr__(self, name):
+                raise ConnectionError("redis down")
+        
+        manager = CacheManager(l2=RedisCacheBackend(BrokenRedis(), prefix="test:"))
+        manager.set("key", "value", ttl=60)
+        
+        assert manager.get("key") == "value"
+        assert manager.get("missing") is None
+        assert manager.l2.errors == 1
+        assert manager.get_stats()["l2"]["available"] is False
+        manager.l2.close()
+    
+    def test_cached_async_uses_l2(self, workers, monkeypatch):
+        """测试异步缓存装饰器读取其他 worker 写入的 L2"""
+        import asyncio
+        from app.utils import cache
+        from app.utils.cache import cached
+        
+        a, b = workers
+        calls = []
+        
+        @cached(prefix="test-l2", ttl=60)
+        async def overview():
+            calls.append(1)
+            return {"total": len(calls)}
+        
+        monkeypatch.setattr(cache, "cache_manager", a)
+        assert asyncio.run(overview()) == {"total": 1}
+        monkeypatch.setattr(cache, "cache_manager", b)
+        assert asyncio.run(overview()) == {"total": 1}
+        assert calls == [1]
+
+
+class TestArticleDerivedFields:
+    """文章派生字段测试"""
+    
+    def test_extract_derived_fields(self):
+        """
+        测试派生字段计算
+        
+        验证：
+        - 纯文本折叠空白，摘要截断到 160 个字符并追加省略号
+        - 图片按出现顺序去重，相对地址可转为绝对地址
+        - 中文按字符、英文按单词计数
+        """
+        from app.utils.article_text import extract_derived_fields, absolute_image_urls
+        
+        fields = extract_derived_fields(
+            '<p>比特币  入门</p><img src="/a.png"><p>hello world</p><img src="https://cdn/b.png"><img src="/a.png">'
+        )
+        assert fields["plain_text"] == "比特币 入门hello world"
+        assert fields["image_urls"] == ["/a.png", "https://cdn/b.png"]
+        assert fields["word_count"] == 7
+        assert fields["reading_time"] == 1
+        assert absolute_image_urls(fields["image_urls"], "https://site") == ["https://site/a.png", "https://cdn/b.png"]
+        
+        long_text = extract_derived_fields("<p>" + "字" * 200 + "</p>")
+        assert long_text["auto_summary"] == "字" * 160 + "…"
+        assert extract_derived_fields("") == {
+            "plain_text": "", "auto_summary": "", "image_urls": [], "word_count": 0, "reading_time": 0,
+        }
+    
+    def test_computed_on_save(self, test_db, make_article):
+        """
+        测试保存时计算
+        
+        验证：
+        - 新建文章时写入派生字段
+        - 修改正文后重新计算，其他字段修改不重新计算
+        """
+        from unittest.mock import patch
+        from app.models import article as article_module
+        
+        article = make_article(content="<p>旧正文</p>")
+        assert (article.plain_text, article.word_count) == ("旧正文", 3)
+        
+        article.content = '<p>新正文</p><img src="/x.png">'
+        test_db.commit()
+        assert article.plain_text == "新正文"
+        assert article.image_urls == ["/x.png"]
+        
+        with patch.object(article_module, "extract_derived_fields") as extract:
+            article.title = "新标题"
+            test_db.commit()
+        extract.assert_not_called()
+    
+    def test_backfill(self, test_db, make_article):
+        """
+        测试回填已有文章
+        
+        验证：
+        - 只回填派生字段为空的文章，且不修改 updated_at
+        """
+        from sqlalchemy import update
+        from app.migrations.add_article_derived_fields import backfill
+        from app.models import Article
+        
+        article = make_article(content="<p>回填正文</p>")
+        article_id, updated_at = article.id, article.updated_at
+        test_db.execute(update(Article.__table__).values(plain_text=None, word_count=None, updated_at=updated_at))
+        test_db.commit()
+        
+        with test_db.get_bind().connect() as conn:
+            assert backfill(conn, batch_size=1) == 1
+            assert backfill(conn) == 0
+        
+        test_db.expire_all()
+        stored = test_db.get(Article, article_id)
+        assert (stored.plain_text, stored.word_count) == ("回填正文", 4)
+        assert stored.updated_at == updated_at
+
+
+class TestArticleSearch:
+    """文章全文检索测试"""
+    
+    def test_segment_and_match_query(self):
+        """
+        测试分词与查询表达式
+        
+        验证：
+        - 中文切成二元组，其他文字按单词小写切分
+        - 非中文结尾的短语按前缀匹配，含单个汉字时不使用索引
+        """
+        from app.utils.article_search import segment, build_match_query
+        
+        assert segment("BTC交易所, Hello") == ["btc", "交易", "易所", "hello"]
+        assert build_match_query("比特币 Bitcoin") == '"比特 特币" AND "bitcoin"*'
+        assert build_match_query("币") is None
+        assert build_match_query("!!") is None
+    
+    def test_search_ranked_and_synced(self, test_db, make_article):
+        """
+        测试全文检索
+        
+        验证：
+        - 标题命中排在正文命中之前，草稿不出现在公开搜索中
+        - 修改、删除文章后索引同步
+        - 单个汉字回退到 LIKE 查询
+        """
+        from app.schemas.article import ArticleUpdate
+        from app.services.article_service import ArticleService
+        
+        rows = [
+            ("body-hit", "市场周报", "<p>本周比特币价格上涨</p>", True),
+            ("title-hit", "比特币入门", "<p>数字资产基础知识</p>", True),
+            ("other", "杠杆交易", "<p>保证金说明</p>", True),
+            ("draft", "比特币草稿", "<p>草稿</p>", False),
+        ]
+        ids = {}
+        for slug, title, content, published in rows:
+            ids[slug] = make_article(title=title, slug=slug, content=content, is_published=published).id
+        
+        def search(keyword):
+            return [a.slug for a in ArticleService.search_articles(test_db, keyword)]
+        
+        assert search("比特币") == ["title-hit", "body-hit"]
+        articles, total = ArticleService.get_articles(test_db, search="比特币", sort_by="relevance")
+        assert total == 3
+        assert articles[0].slug in ("title-hit", "draft")
+        
+        ArticleService.update_article(test_db, ids["other"], ArticleUpdate(content="<p>比特币保证金</p>"))
+        assert search("比特币保证金") == ["other"]
+        ArticleService.delete_article(test_db, ids["title-hit"])
+        assert sorted(search("比特币")) == ["body-hit", "other"]
+        
+        assert sorted(search("币")) == ["body-hit", "other"]
+    
+    def test_search_falls_back_after_index_dropped(self, test_db, make_article):
+        """
+        测试索引表被其他进程删除
+        
+        验证：
+        - 已缓存“索引可用”时，搜索遇到 no such table 后回退到 LIKE 查询
+        - 保存文章不因索引表缺失而失败
+        """
+        from sqlalchemy import text
+        from app.services.article_service import ArticleService
+        from app.utils import article_search
+        
+        make_article(title="比特币入门", slug="fts-hit", is_published=True)
+        assert [a.slug for a in ArticleService.search_articles(test_db, "比特币")] == ["fts-hit"]
+        assert article_search.is_available(test_db.connection())
+        
+        # 模拟另一个进程删除索引表（不经过 drop_index，本进程的缓存不会更新）
+        with test_db.get_bind().connect() as conn:
+            conn.execute(text(f"DROP TABLE {article_search.FTS_TABLE}"))
+            conn.commit()
+        test_db.commit()
+        
+        assert [a.slug for a in ArticleService.search_articles(test_db, "比特币")] == ["fts-hit"]
+        assert not article_search.is_available(test_db.connection())
+        
+        article_search._available_urls.add(str(test_db.get_bind().url))
+        make_article(title="比特币周报", slug="after-drop", is_published=True)
+        article_search._available_urls.add(str(test_db.get_bind().url))
+        articles, total = ArticleService.get_articles(test_db, search="比特币")
+        assert total == 2
+        assert not article_search.is_available(test_db.connection())
+    
+    def test_rebuild_is_atomic(self, test_db, make_article, monkeypatch):
+        """
+        测试重建索引
+        
+        验证：
+        - 重建结果与保存钩子建立的索引一致
+        - 重建中途出错时回滚，旧索引保持完整
+        """
+        from app.migrations import add_article_fts
+        from app.services.article_service import ArticleService
+        from app.utils import article_search
+        
+        for i in range(3):
+            make_article(title=f"比特币 {i}", slug=f"rebuild-{i}", is_published=True)
+        
+        def search():
+            return sorted(a.slug for a in ArticleService.search_articles(test_db, "比特币"))
+        
+        expected = ["rebuild-0", "rebuild-1", "rebuild-2"]
+        with test_db.get_bind().connect() as conn:
+            assert add_article_fts.rebuild(conn, batch_size=2) == 3
+        assert search() == expected
+        
+        index_rows = article_search.index_rows
+        calls = []
+        
+        def failing_index_rows(conn, rows):
+            calls.append(rows)
+            if len(calls) > 1:
+                raise RuntimeError("中途失败")
+            return index_rows(conn, rows)
+        
+        monkeypatch.setattr(article_search, "index_rows", failing_index_rows)
+        with test_db.get_bind().connect() as conn:
+            with pytest.raises(RuntimeError):
+                add_article_fts.rebuild(conn, batch_size=2)
+        test_db.commit()
+        assert search() == expected
 
 
 class TestTaskMonitor: